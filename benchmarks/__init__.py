@@ -0,0 +1,3 @@
+"""
+MDL Benchmarks - Timing suite for the lexer, parser, compiler and mdl build
+"""
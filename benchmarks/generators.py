@@ -0,0 +1,93 @@
+"""
+Benchmark Generators - Synthetic MDL programs that stress one dimension each
+
+Every generator takes a single size and returns MDL source text.
+"""
+
+from typing import Callable, Dict, List
+
+HEADER = 'pack "bench" "Synthetic benchmark pack" 82;\nnamespace "bench";\n'
+
+
+def many_functions(count: int) -> str:
+    """count small functions, each calling the next."""
+    lines = [HEADER, 'var num counter<@s> = 0;']
+    for i in range(count):
+        call = f'    exec bench:f{i + 1};' if i + 1 < count else '    say "done";'
+        lines.append(f'function bench:f{i}<@s> {{\n    counter<@s> = $counter<@s>$ + 1;\n{call}\n}}')
+    lines.append('on_load bench:f0;')
+    return "\n".join(lines) + "\n"
+
+
+def deep_nesting(depth: int) -> str:
+    """One function with depth nested if/while blocks."""
+    lines = [HEADER, 'var num level<@s> = 0;', 'function bench:nested<@s> {']
+    for i in range(depth):
+        indent = "    " * (i + 1)
+        keyword = "while" if i % 3 == 2 else "if"
+        lines.append(f'{indent}{keyword} $level<@s>$ < {depth} {{')
+        lines.append(f'{indent}    level<@s> = $level<@s>$ + 1;')
+    for i in reversed(range(depth)):
+        lines.append("    " * (i + 1) + "}")
+    lines.append('}')
+    return "\n".join(lines) + "\n"
+
+
+def long_arithmetic(terms: int) -> str:
+    """A single assignment whose right-hand side has terms operands."""
+    operators = ["+", "-", "*", "/"]
+    expression = "$a<@s>$"
+    for i in range(1, terms):
+        operand = "$b<@s>$" if i % 2 else str(i % 7 + 1)
+        expression += f" {operators[i % len(operators)]} {operand}"
+    return (f'{HEADER}var num a<@s> = 1;\nvar num b<@s> = 2;\nvar num result<@s> = 0;\n'
+            f'function bench:math<@s> {{\n    result<@s> = {expression};\n}}\n')
+
+
+def many_variables(count: int) -> str:
+    """count variable declarations, all assigned in one function."""
+    lines = [HEADER]
+    lines.extend(f'var num v{i}<@s> = {i};' for i in range(count))
+    lines.append('function bench:assign<@s> {')
+    lines.extend(f'    v{i}<@s> = $v{(i + 1) % count}<@s>$ + {i};' for i in range(count))
+    lines.append('}')
+    return "\n".join(lines) + "\n"
+
+
+def big_raw_blocks(lines_per_block: int) -> str:
+    """Ten raw blocks of lines_per_block commands each."""
+    body = []
+    for block in range(10):
+        body.append('    $!raw')
+        body.extend(f'    scoreboard players add #raw{block}_{i} bench_raw 1' for i in range(lines_per_block))
+        body.append('    raw!$')
+    return f'{HEADER}function bench:raw<@s> {{\n' + "\n".join(body) + '\n}\n'
+
+
+def many_tags(count: int) -> str:
+    """count registry tags spread over the tag kinds the compiler emits."""
+    kinds = ["recipe", "loot_table", "advancement", "item_modifier", "predicate", "structure"]
+    lines = [HEADER]
+    lines.extend(f'tag {kinds[i % len(kinds)]} "t{i}" "{kinds[i % len(kinds)]}s/t{i}.json";' for i in range(count))
+    lines.append('function bench:main<@s> {\n    say "tags";\n}')
+    return "\n".join(lines) + "\n"
+
+
+# Generator name -> generator, and the sizes each one runs at by default
+GENERATORS: Dict[str, Callable[[int], str]] = {
+    "many_functions": many_functions,
+    "deep_nesting": deep_nesting,
+    "long_arithmetic": long_arithmetic,
+    "many_variables": many_variables,
+    "big_raw_blocks": big_raw_blocks,
+    "many_tags": many_tags,
+}
+
+DEFAULT_SIZES: Dict[str, List[int]] = {
+    "many_functions": [100, 1000],
+    "deep_nesting": [10, 50],
+    "long_arithmetic": [20, 200],
+    "many_variables": [100, 1000],
+    "big_raw_blocks": [100, 2000],
+    "many_tags": [100, 1000],
+}
@@ -0,0 +1,89 @@
+"""
+Memory Benchmark - Size of the AST the parser builds for large programs
+
+    python -m benchmarks.memory
+    python -m benchmarks.memory --scale 10
+    python -m benchmarks.memory --compare benchmarks/memory_baseline.json
+
+For each generator at its largest default size (times --scale), tracemalloc
+measures the memory still held by the parsed Program (retained_kb) and the peak
+while lexing and parsing (peak_kb). Unlike timings, these numbers barely depend
+on the machine, only on the Python version.
+"""
+
+import argparse
+import gc
+import platform
+import sys
+import tracemalloc
+from typing import Dict, List, Optional
+
+from minecraft_datapack_language.mdl_parser import MDLParser
+
+from .generators import DEFAULT_SIZES, GENERATORS
+from .run import BASELINE_VERSION, load_baseline, save_and_compare
+
+
+def measure_parse(source: str) -> Dict[str, float]:
+    """Retained and peak KB of parsing source; only the Program outlives the measurement."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        program = MDLParser("bench.mdl").parse(source)
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del program
+    return {"retained_kb": round(retained / 1024, 1), "peak_kb": round(peak / 1024, 1)}
+
+
+def run_memory(scale: int = 1, only: Optional[List[str]] = None) -> dict:
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name, generator in GENERATORS.items():
+        if only and name not in only:
+            continue
+        size = DEFAULT_SIZES[name][-1] * scale
+        results[f"{name}[{size}]"] = {"parse": measure_parse(generator(size))}
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "results": results,
+    }
+
+
+def format_memory(current: dict, baseline: Optional[dict] = None) -> str:
+    header = f"{'Case':<24} {'Retained KB':>12} {'Peak KB':>12}"
+    if baseline:
+        header += f" {'Baseline':>12} {'Ratio':>7}"
+    lines = [header]
+    for case, stages in current["results"].items():
+        sizes = stages["parse"]
+        line = f"{case:<24} {sizes['retained_kb']:>12.1f} {sizes['peak_kb']:>12.1f}"
+        before = (baseline or {}).get("results", {}).get(case, {}).get("parse")
+        if before and before["retained_kb"] > 0:
+            line += f" {before['retained_kb']:>12.1f} {sizes['retained_kb'] / before['retained_kb']:>6.2f}x"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the memory held by parsed MDL programs")
+    parser.add_argument("--scale", type=int, default=1, help="Multiply each generator's largest size (default: 1)")
+    parser.add_argument("--only", action="append", choices=sorted(GENERATORS), help="Run only this generator (repeatable)")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed growth of retained memory as a fraction of the baseline (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    current = run_memory(args.scale, args.only)
+    baseline = load_baseline(args.compare)
+    print(format_memory(current, baseline))
+    return save_and_compare(current, baseline, args.save, args.threshold, metric="retained_kb", unit="KB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
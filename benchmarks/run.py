@@ -0,0 +1,172 @@
+"""
+Benchmark Runner - Times each build stage on the synthetic programs and compares against a baseline
+
+    python -m benchmarks.run                          # print results
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --threshold 0.25
+
+Exits with status 1 when --compare finds a stage whose median got slower than the threshold allows.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from minecraft_datapack_language.mdl_lexer import MDLLexer
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+from minecraft_datapack_language import cli
+
+from .generators import GENERATORS, DEFAULT_SIZES
+
+STAGES = ["lex", "skim", "parse", "compile", "build"]
+BASELINE_VERSION = 1
+
+
+def _time(action: Callable[[], object], repeat: int) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": round(min(samples), 3), "median_ms": round(statistics.median(samples), 3)}
+
+
+def _run_cli_build(mdl_file: Path, output_dir: Path):
+    # The CLI configures console logging; undo that so later library stages stay silent
+    package_logger = logging.getLogger("minecraft_datapack_language")
+    handlers, level = list(package_logger.handlers), package_logger.level
+    argv = sys.argv
+    sys.argv = ["mdl", "build", "--mdl", str(mdl_file), "-o", str(output_dir)]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = cli.main()
+    finally:
+        sys.argv = argv
+        package_logger.handlers[:] = handlers
+        package_logger.setLevel(level)
+    if status != 0:
+        raise RuntimeError(f"mdl build failed for {mdl_file}")
+
+
+def bench_case(source: str, repeat: int, stages: List[str] = STAGES) -> Dict[str, Dict[str, float]]:
+    """Time every requested stage on one program. Each stage starts from scratch (parse includes lexing)."""
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        mdl_file = tmp_path / "bench.mdl"
+        mdl_file.write_text(source, encoding="utf-8")
+        ast = MDLParser(str(mdl_file)).parse(source)
+        if "lex" in stages:
+            results["lex"] = _time(lambda: MDLLexer(str(mdl_file)).lex(source), repeat)
+        if "skim" in stages:
+            results["skim"] = _time(lambda: MDLParser(str(mdl_file), lazy_bodies=True).parse(source), repeat)
+        if "parse" in stages:
+            results["parse"] = _time(lambda: MDLParser(str(mdl_file)).parse(source), repeat)
+        if "compile" in stages:
+            results["compile"] = _time(lambda: MDLCompiler().compile(ast, str(tmp_path / "compiled")), repeat)
+        if "build" in stages:
+            results["build"] = _time(lambda: _run_cli_build(mdl_file, tmp_path / "built"), repeat)
+    return results
+
+
+def run_benchmarks(repeat: int = 5, only: Optional[List[str]] = None, quick: bool = False,
+                   stages: List[str] = STAGES) -> dict:
+    """Run the suite and return it in baseline format: results[case][stage] = timings."""
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name, generator in GENERATORS.items():
+        if only and name not in only:
+            continue
+        sizes = DEFAULT_SIZES[name][:1] if quick else DEFAULT_SIZES[name]
+        for size in sizes:
+            results[f"{name}[{size}]"] = bench_case(generator(size), repeat, stages)
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float, metric: str = "median_ms",
+            unit: str = "ms") -> List[str]:
+    """Cases/stages whose metric is more than threshold (a fraction) above the baseline."""
+    regressions: List[str] = []
+    for case, stages in current["results"].items():
+        for stage, timing in stages.items():
+            before = baseline.get("results", {}).get(case, {}).get(stage)
+            if not before or before.get(metric, 0) <= 0:
+                continue
+            ratio = timing[metric] / before[metric]
+            if ratio > 1 + threshold:
+                regressions.append(f"{case} {stage}: {before[metric]:.2f} {unit} -> "
+                                   f"{timing[metric]:.2f} {unit} ({ratio:.2f}x)")
+    return regressions
+
+
+def load_baseline(path: Optional[str]) -> Optional[dict]:
+    return json.loads(Path(path).read_text(encoding="utf-8")) if path else None
+
+
+def save_and_compare(current: dict, baseline: Optional[dict], save: Optional[str], threshold: float,
+                     metric: str = "median_ms", unit: str = "ms") -> int:
+    """Write current to save (if given) and print its regressions against baseline; the exit status."""
+    if save:
+        Path(save).write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        print(f"Saved baseline: {save}")
+    if baseline:
+        regressions = compare(current, baseline, threshold, metric, unit)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+def format_results(current: dict, baseline: Optional[dict] = None) -> str:
+    header = f"{'Case':<24} {'Stage':<8} {'Median ms':>10} {'Min ms':>10}"
+    if baseline:
+        header += f" {'Baseline':>10} {'Ratio':>7}"
+    lines = [header]
+    for case, stages in current["results"].items():
+        for stage, timing in stages.items():
+            line = f"{case:<24} {stage:<8} {timing['median_ms']:>10.2f} {timing['min_ms']:>10.2f}"
+            before = (baseline or {}).get("results", {}).get(case, {}).get(stage)
+            if before and before["median_ms"] > 0:
+                line += f" {before['median_ms']:>10.2f} {timing['median_ms'] / before['median_ms']:>6.2f}x"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the MDL lexer, parser, compiler and mdl build")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage (default: 5)")
+    parser.add_argument("--only", action="append", choices=sorted(GENERATORS), help="Run only this generator (repeatable)")
+    parser.add_argument("--stage", action="append", choices=STAGES, help="Run only this stage (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="Run only the smallest size of each generator")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown as a fraction of the baseline median (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.repeat, args.only, args.quick, args.stage or STAGES)
+    baseline = load_baseline(args.compare)
+    print(format_results(current, baseline))
+    return save_and_compare(current, baseline, args.save, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Startup Benchmark - Wall time and import time of short mdl commands
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --save benchmarks/startup_baseline.json
+    python -m benchmarks.startup --compare benchmarks/startup_baseline.json
+
+Each command runs in a fresh interpreter. Import time is the sum of the top-level
+entries reported by `python -X importtime`, which is what `mdl check` in a
+pre-commit hook pays on every commit.
+"""
+
+import argparse
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .run import BASELINE_VERSION, format_results, load_baseline, save_and_compare
+
+SAMPLE = 'pack "s" "startup" 82;\nnamespace "s";\nfunction s:main<@s> {\n    say "hi";\n}\n'
+
+# Case name -> mdl arguments; {mdl} is replaced with a small sample file
+COMMANDS: Dict[str, List[str]] = {
+    "version": ["--version"],
+    "completion": ["completion", "print", "bash"],
+    "check": ["check", "{mdl}"],
+    "build": ["build", "--mdl", "{mdl}", "-o", "{out}", "--no-zip"],
+}
+
+# "import time: self [us] | cumulative | imported package"
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """Total import time in ms, and cumulative ms of each minecraft_datapack_language module."""
+    total_us = 0
+    package: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        if not indent:
+            total_us += cumulative
+        if name.startswith("minecraft_datapack_language"):
+            package[name] = cumulative / 1000
+    return total_us / 1000, package
+
+
+def _run(args: List[str], importtime: bool) -> subprocess.CompletedProcess:
+    flags = ["-X", "importtime"] if importtime else []
+    return subprocess.run([sys.executable, *flags, "-m", "minecraft_datapack_language.cli", *args],
+                          capture_output=True, text=True)
+
+
+def bench_command(args: List[str], repeat: int) -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
+    wall: List[float] = []
+    imports: List[float] = []
+    modules: Dict[str, float] = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run(args, importtime=False)
+        wall.append((time.perf_counter() - start) * 1000)
+        total, modules = parse_importtime(_run(args, importtime=True).stderr)
+        imports.append(total)
+    timings = {
+        "wall": {"min_ms": round(min(wall), 3), "median_ms": round(statistics.median(wall), 3)},
+        "imports": {"min_ms": round(min(imports), 3), "median_ms": round(statistics.median(imports), 3)},
+    }
+    return timings, modules
+
+
+def run_startup(repeat: int = 5, top: int = 0) -> dict:
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    modules: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        mdl_file = Path(tmp) / "startup.mdl"
+        mdl_file.write_text(SAMPLE, encoding="utf-8")
+        for case, template in COMMANDS.items():
+            args = [a.format(mdl=mdl_file, out=Path(tmp) / "out") for a in template]
+            results[case], loaded = bench_command(args, repeat)
+            if top:
+                modules[case] = dict(sorted(loaded.items(), key=lambda item: -item[1])[:top])
+    report = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+    if top:
+        report["modules"] = modules
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark mdl startup and import time")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per command (default: 5)")
+    parser.add_argument("--top", type=int, default=5, help="List the N slowest package imports per command (default: 5)")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown as a fraction of the baseline median (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    current = run_startup(args.repeat, args.top)
+    baseline = load_baseline(args.compare)
+    print(format_results(current, baseline))
+    for case, loaded in current.get("modules", {}).items():
+        print(f"\nSlowest package imports for '{case}' (cumulative ms):")
+        for name, ms in loaded.items():
+            print(f"  {ms:>8.2f}  {name}")
+    return save_and_compare(current, baseline, args.save, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
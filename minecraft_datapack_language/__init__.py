@@ -1,35 +1,79 @@
 
-from .mdl_lexer import MDLLexer, Token, TokenType
-from .mdl_parser import MDLParser
-from .ast_nodes import *
-from .dir_map import DirMap
-from .python_api import Pack
+import logging
+from typing import TYPE_CHECKING
 
-__all__ = [
-    "MDLLexer", "Token", "TokenType",
-    "MDLParser",
+# Public names -> defining submodule. They are imported on first access (module
+# __getattr__), so `import minecraft_datapack_language` and CLI startup stay cheap.
+_EXPORTS = {
+    "MDLLexer": "mdl_lexer", "Token": "mdl_lexer", "TokenType": "mdl_lexer",
+    "MDLParser": "mdl_parser",
+    "DirMap": "dir_map",
+    "Pack": "python_api",
+}
+_AST_EXPORTS = [
     "ASTNode", "Program", "PackDeclaration", "NamespaceDeclaration", "TagDeclaration",
     "VariableDeclaration", "VariableAssignment", "VariableSubstitution", "FunctionDeclaration",
     "FunctionCall", "IfStatement", "WhileLoop", "HookDeclaration", "RawBlock",
     "SayCommand", "TellrawCommand", "ExecuteCommand", "ScoreboardCommand",
     "BinaryExpression", "UnaryExpression", "ParenthesizedExpression", "LiteralExpression",
-    "ScopeSelector",
+    "ScopeSelector", "SourceSpan",
+]
+
+__all__ = [
+    "MDLLexer", "Token", "TokenType",
+    "MDLParser",
+    *_AST_EXPORTS,
     "DirMap",
     "Pack"
 ]
 
+if TYPE_CHECKING:
+    from .mdl_lexer import MDLLexer, Token, TokenType
+    from .mdl_parser import MDLParser
+    from .ast_nodes import *
+    from .dir_map import DirMap
+    from .python_api import Pack
+
+# Library use stays silent unless the application configures logging (the CLI does)
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
 # CLI entry point
 def main():
     """CLI entry point for the mdl command."""
     from .cli import main as cli_main
     return cli_main()
 
-try:
-    from ._version import version as __version__   # written by setuptools-scm
-except Exception:
-    # Fallback for editable dev before _version.py exists
+
+def _read_version() -> str:
     try:
-        from importlib.metadata import version as _pkg_version
-        __version__ = _pkg_version("minecraft-datapack-language")
+        from ._version import version   # written by setuptools-scm
+        return version
     except Exception:
-        __version__ = "0.0.0"
\ No newline at end of file
+        # Fallback for editable dev before _version.py exists
+        try:
+            from importlib.metadata import version as _pkg_version
+            return _pkg_version("minecraft-datapack-language")
+        except Exception:
+            return "0.0.0"
+
+
+def __getattr__(name):
+    import importlib
+    if name == "__version__":
+        value = _read_version()
+    elif name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    elif not name.startswith("_"):
+        # Everything `from .ast_nodes import *` used to re-export (e.g. MacroLine)
+        ast_nodes = importlib.import_module(".ast_nodes", __name__)
+        if not hasattr(ast_nodes, name):
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        value = getattr(ast_nodes, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | {"__version__"})
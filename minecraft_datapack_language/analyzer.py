@@ -0,0 +1,508 @@
+"""
+Cost Analyzer - Static worst-case command counts and call depth for generated functions
+
+While loops compile to self-recursive functions, and the game silently aborts a chain
+once maxCommandChainLength is reached. This pass walks the IR call graph, infers loop
+trip counts from literal-initialised counters, and reports bounds per function plus the
+most expensive paths that run every tick.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .call_graph import function_references
+from .ir import (
+    IRModule, Block, Instruction, Score, Condition, ScoreMatches, ScoreCompare,
+    ScoreSet, ScoreAdd, ScoreRemove, ScoreOperation, Call, Schedule, Execute, Raw,
+    Comment, Blank, referenced_objectives
+)
+
+# Default value of the maxCommandChainLength game rule
+MAX_COMMAND_CHAIN_LENGTH = 65536
+# Nesting depth reported as a warning; deep recursion overflows the server stack on older versions
+DEFAULT_MAX_CALL_DEPTH = 512
+# 'execute unless entity ... run summon' prepended to functions that use global scope
+_ENSURE_GLOBAL_COST = 2
+
+
+@dataclass
+class LoopInfo:
+    """Trip-count inference for one while-loop function."""
+    function_id: str
+    status: str  # 'bounded', 'unknown' or 'infinite'
+    trips: Optional[int] = None
+    counter: Optional[Score] = None
+    reason: str = ""
+
+
+@dataclass
+class FunctionCost:
+    """Worst-case commands and call depth for one invocation; None means unbounded."""
+    function_id: str
+    own_commands: int
+    commands: Optional[int] = None
+    depth: Optional[int] = None
+
+
+@dataclass
+class Issue:
+    severity: str  # 'error' or 'warning'
+    function_id: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.severity}: {self.function_id}: {self.message}"
+
+
+@dataclass
+class HotPath:
+    """An entry point with its cost and the chain of calls that dominates it."""
+    root: str
+    commands: Optional[int]
+    depth: Optional[int]
+    path: List[str] = field(default_factory=list)
+
+
+@dataclass
+class AnalysisReport:
+    functions: Dict[str, FunctionCost] = field(default_factory=dict)
+    loops: Dict[str, LoopInfo] = field(default_factory=dict)
+    tick_paths: List[HotPath] = field(default_factory=list)
+    load_paths: List[HotPath] = field(default_factory=list)
+    issues: List[Issue] = field(default_factory=list)
+
+    @property
+    def has_errors(self) -> bool:
+        return any(issue.severity == "error" for issue in self.issues)
+
+    def to_dict(self) -> dict:
+        def path_dict(p: HotPath) -> dict:
+            return {"root": p.root, "commands": p.commands, "depth": p.depth, "path": p.path}
+        return {
+            "functions": {
+                fid: {"own_commands": c.own_commands, "commands": c.commands, "depth": c.depth}
+                for fid, c in self.functions.items()
+            },
+            "loops": {
+                fid: {"status": l.status, "trips": l.trips, "reason": l.reason,
+                      "counter": f"{l.counter.holder} {l.counter.objective}" if l.counter else None}
+                for fid, l in self.loops.items()
+            },
+            "tick_paths": [path_dict(p) for p in self.tick_paths],
+            "load_paths": [path_dict(p) for p in self.load_paths],
+            "issues": [{"severity": i.severity, "function": i.function_id, "message": i.message}
+                       for i in self.issues],
+        }
+
+
+# Per-instruction facts
+def _command_count(instruction: Instruction) -> int:
+    """Commands one instruction runs in the worst case; a passing 'execute ... run' counts twice."""
+    if isinstance(instruction, (Comment, Blank)):
+        return 0
+    if isinstance(instruction, Execute):
+        return 2
+    if isinstance(instruction, Raw):
+        total = 0
+        for line in instruction.text.split("\n"):
+            line = line.strip()
+            if line and not line.startswith("#"):
+                total += 2 if " run " in line else 1
+        return total
+    return 1
+
+
+def _calls(instruction: Instruction) -> Tuple[List[str], List[str]]:
+    """(functions called in the same chain, functions scheduled for a later tick)."""
+    if isinstance(instruction, Call):
+        return [instruction.function], []
+    if isinstance(instruction, Schedule):
+        return [], [instruction.function]
+    if isinstance(instruction, Execute):
+        direct, scheduled = _calls(instruction.run)
+        for clause in instruction.clauses:
+            if isinstance(clause, Condition):
+                direct = direct + function_references(clause.render())
+        return direct, scheduled
+    if isinstance(instruction, Raw):
+        direct: List[str] = []
+        scheduled: List[str] = []
+        for line in instruction.text.split("\n"):
+            for target in function_references(line):
+                (scheduled if f"schedule function {target}" in line else direct).append(target)
+        return direct, scheduled
+    return [], []
+
+
+def _written_objectives(instruction: Instruction, writes: Dict[str, Set[str]]) -> Set[str]:
+    """Objectives an instruction may assign, including through the functions it calls."""
+    if isinstance(instruction, Execute):
+        names = _written_objectives(instruction.run, writes)
+    elif isinstance(instruction, Raw):
+        names = referenced_objectives(instruction)
+    elif instruction.written_score() is not None:
+        names = {instruction.written_score().objective}
+    else:
+        names = set()
+    for target in _calls(instruction)[0]:
+        names |= writes.get(target, set())
+    return names
+
+
+# Abstract values: ('const', n) or ('rel', score, offset) meaning score's entry value + offset
+_Value = Optional[Tuple]
+
+
+class _ScoreState:
+    """Linear facts about scores along straight-line code."""
+
+    def __init__(self, relative: bool):
+        # relative=True: scores not yet assigned stand for their value at block entry
+        self.relative = relative
+        self.values: Dict[Score, _Value] = {}
+        # Objectives a call or raw command may have changed behind our back
+        self.clobbered: Set[str] = set()
+
+    def lookup(self, score: Score) -> _Value:
+        if score in self.values:
+            return self.values[score]
+        if self.relative and score.objective not in self.clobbered:
+            return ("rel", score, 0)
+        return None
+
+    def apply(self, instruction: Instruction, writes: Dict[str, Set[str]]):
+        if isinstance(instruction, ScoreSet):
+            self.values[instruction.target] = _literal(instruction.value)
+        elif isinstance(instruction, (ScoreAdd, ScoreRemove)):
+            amount = _literal(instruction.amount)
+            current = self.lookup(instruction.target)
+            if amount is None or current is None:
+                self.values[instruction.target] = None
+            else:
+                delta = amount[1] if isinstance(instruction, ScoreAdd) else -amount[1]
+                self.values[instruction.target] = current[:-1] + (current[-1] + delta,)
+        elif isinstance(instruction, ScoreOperation):
+            source = self.lookup(instruction.source)
+            target = self.lookup(instruction.target)
+            if instruction.operator == "=":
+                self.values[instruction.target] = source
+            elif instruction.operator in ("+=", "-=") and source and source[0] == "const" and target:
+                delta = source[1] if instruction.operator == "+=" else -source[1]
+                self.values[instruction.target] = target[:-1] + (target[-1] + delta,)
+            else:
+                self.values[instruction.target] = None
+                if instruction.operator == "><":
+                    self.values[instruction.source] = None
+        else:
+            written = _written_objectives(instruction, writes)
+            for score in list(self.values):
+                if score.objective in written:
+                    self.values[score] = None
+            self.clobbered |= written
+
+
+def _literal(text: str) -> _Value:
+    try:
+        return ("const", int(text))
+    except (TypeError, ValueError):
+        return None
+
+
+def _condition_range(condition: Condition, state: _ScoreState) -> Optional[Tuple[Score, Optional[int], Optional[int]]]:
+    """Express a loop condition as 'counter in [low, high]' when possible."""
+    if isinstance(condition, ScoreMatches):
+        low_text, _, high_text = condition.range.partition("..") if ".." in condition.range else (condition.range, "", condition.range)
+        try:
+            low = int(low_text) if low_text else None
+            high = int(high_text) if high_text else None
+        except ValueError:
+            return None
+        counter = condition.score
+    elif isinstance(condition, ScoreCompare):
+        other = state.lookup(condition.right)
+        if not other or other[0] != "const":
+            return None
+        limit = other[1]
+        low, high = {
+            "<": (None, limit - 1), "<=": (None, limit), "=": (limit, limit),
+            ">=": (limit, None), ">": (limit + 1, None),
+        }.get(condition.operator, (None, None))
+        if low is None and high is None:
+            return None
+        counter = condition.left
+    else:
+        return None
+    if getattr(condition, "negate", False):
+        # 'unless' keeps looping outside the range; only one-sided complements are a single range
+        if low is None:
+            low, high = high + 1, None
+        elif high is None:
+            low, high = None, low - 1
+        else:
+            return None
+    return counter, low, high
+
+
+def _trip_count(start: int, step: int, low: Optional[int], high: Optional[int]) -> Tuple[str, Optional[int]]:
+    def inside(v: int) -> bool:
+        return (low is None or v >= low) and (high is None or v <= high)
+    if not inside(start):
+        return "bounded", 0
+    if step > 0 and high is not None:
+        return "bounded", (high - start) // step + 1
+    if step < 0 and low is not None:
+        return "bounded", (start - low) // -step + 1
+    return "infinite", None
+
+
+class _Analyzer:
+    def __init__(self, module: IRModule, max_command_chain: int, max_call_depth: int):
+        self.module = module
+        self.max_command_chain = max_command_chain
+        self.max_call_depth = max_call_depth
+        self.report = AnalysisReport()
+        self.direct: Dict[str, List[str]] = {}
+        self.scheduled: Dict[str, Set[str]] = {}
+        self.own: Dict[str, int] = {}
+        for block in module.blocks():
+            fid = block.function_id
+            self.direct[fid] = []
+            self.scheduled[fid] = set()
+            self.own[fid] = _ENSURE_GLOBAL_COST if block.ensure_global else 0
+            for instruction in block.instructions:
+                self.own[fid] += _command_count(instruction)
+                direct, scheduled = _calls(instruction)
+                self.direct[fid].extend(direct)
+                self.scheduled[fid].update(scheduled)
+        self.writes = self._transitive_writes()
+        self._in_progress: Set[str] = set()
+
+    def _transitive_writes(self) -> Dict[str, Set[str]]:
+        own: Dict[str, Set[str]] = {}
+        for block in self.module.blocks():
+            names: Set[str] = set()
+            for instruction in block.instructions:
+                names |= _written_objectives(instruction, {})
+            own[block.function_id] = names
+        result: Dict[str, Set[str]] = {}
+        for fid in own:
+            seen, pending, names = set(), [fid], set()
+            while pending:
+                current = pending.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                names |= own.get(current, set())
+                pending.extend(self.direct.get(current, []))
+            result[fid] = names
+        return result
+
+    # Loops
+    def _loop_guard(self, block: Block) -> Optional[Execute]:
+        """The trailing 'execute if <cond> run function <self>' of a while-loop function."""
+        body = [i for i in block.instructions if not isinstance(i, (Comment, Blank))]
+        if body and isinstance(body[-1], Execute) and isinstance(body[-1].run, Call) \
+                and body[-1].run.function == block.function_id and len(body[-1].clauses) == 1:
+            return body[-1]
+        return None
+
+    def infer_loops(self):
+        for block in self.module.blocks():
+            guard = self._loop_guard(block)
+            if guard is not None:
+                self.report.loops[block.function_id] = self._infer_loop(block, guard)
+
+    def _infer_loop(self, block: Block, guard: Execute) -> LoopInfo:
+        fid = block.function_id
+        condition = guard.clauses[0]
+        state = _ScoreState(relative=True)
+        for instruction in block.instructions:
+            if instruction is guard:
+                break
+            state.apply(instruction, self.writes)
+        bounds = _condition_range(condition, state)
+        if bounds is None:
+            return LoopInfo(fid, "unknown", reason=f"condition '{condition.render()}' is not a literal range")
+        counter, low, high = bounds
+        final = state.lookup(counter)
+        if final is None or final[0] != "rel" or final[1] != counter:
+            return LoopInfo(fid, "unknown", counter=counter, reason="counter is not changed by a constant step")
+        step = final[2]
+        if step == 0:
+            return LoopInfo(fid, "infinite", counter=counter, reason="loop body never changes the counter")
+        starts = self._entry_values(fid, counter)
+        if not starts or None in starts:
+            return LoopInfo(fid, "unknown", counter=counter,
+                            reason="counter is not set to a literal before the loop starts")
+        worst = 0
+        for start in starts:
+            status, trips = _trip_count(start, step, low, high)
+            if status == "infinite":
+                return LoopInfo(fid, "infinite", counter=counter,
+                                reason=f"counter starts at {start} and moves by {step} away from the exit")
+            worst = max(worst, trips)
+        return LoopInfo(fid, "bounded", trips=worst, counter=counter)
+
+    def _entry_values(self, loop_id: str, counter: Score) -> List[Optional[int]]:
+        """Counter value at each call site that enters the loop from outside."""
+        values: List[Optional[int]] = []
+        for block in self.module.blocks():
+            if block.function_id == loop_id:
+                continue
+            state = _ScoreState(relative=False)
+            for instruction in block.instructions:
+                if loop_id in _calls(instruction)[0]:
+                    value = state.lookup(counter)
+                    values.append(value[1] if value and value[0] == "const" else None)
+                state.apply(instruction, self.writes)
+        return values
+
+    # Costs
+    def cost(self, fid: str) -> FunctionCost:
+        if fid in self.report.functions:
+            return self.report.functions[fid]
+        if fid not in self.own:
+            # Outside this module (vanilla or another pack): nothing to count
+            return FunctionCost(fid, 0, 0, 0)
+        if fid in self._in_progress:
+            return FunctionCost(fid, self.own[fid], None, None)
+        self._in_progress.add(fid)
+        loop = self.report.loops.get(fid)
+        per_call, depth = self.own[fid], 0
+        for callee in self.direct[fid]:
+            if loop is not None and callee == fid:
+                continue
+            callee_cost = self.cost(callee)
+            if callee == fid or callee_cost.commands is None:
+                per_call, depth = None, None
+                if callee in self._in_progress:
+                    self._flag_recursion(fid, callee)
+                break
+            per_call += callee_cost.commands
+            depth = max(depth, callee_cost.depth)
+        self._in_progress.discard(fid)
+        if loop is not None and per_call is not None:
+            if loop.trips is None:
+                per_call, depth = None, None
+            else:
+                per_call, depth = per_call * loop.trips, depth + loop.trips
+        elif per_call is not None:
+            depth += 1
+        result = FunctionCost(fid, self.own[fid], per_call, depth)
+        self.report.functions[fid] = result
+        return result
+
+    def _flag_recursion(self, caller: str, callee: str):
+        message = f"recursive call to {callee} with no inferable bound"
+        if not any(i.function_id == caller and i.message == message for i in self.report.issues):
+            self.report.issues.append(Issue("warning", caller, message))
+
+    def hot_path(self, root: str) -> HotPath:
+        cost = self.cost(root)
+        path, current, seen = [root], root, {root}
+        while True:
+            callees = [c for c in self.direct.get(current, []) if c not in seen and c in self.own]
+            if not callees:
+                break
+            def weight(c: str) -> float:
+                value = self.cost(c).commands
+                return float("inf") if value is None else value
+            current = max(callees, key=weight)
+            seen.add(current)
+            path.append(current)
+        return HotPath(root, cost.commands, cost.depth, path)
+
+    def run(self, on_load: List[str], on_tick: List[str]) -> AnalysisReport:
+        self.infer_loops()
+        for loop in self.report.loops.values():
+            if loop.status == "infinite":
+                self.report.issues.append(Issue("error", loop.function_id, f"loop never terminates: {loop.reason}"))
+            elif loop.status == "unknown":
+                self.report.issues.append(Issue("warning", loop.function_id,
+                                                f"unbounded recursion, trip count unknown: {loop.reason}"))
+        for fid in self.own:
+            self.cost(fid)
+        # Scheduled functions start their own chain on a later tick, so they rank with tick work
+        scheduled = sorted({t for targets in self.scheduled.values() for t in targets if t in self.own})
+        tick_roots = list(dict.fromkeys(list(on_tick) + scheduled))
+        self.report.tick_paths = sorted(
+            (self.hot_path(root) for root in tick_roots),
+            key=lambda p: float("inf") if p.commands is None else p.commands, reverse=True,
+        )
+        self.report.load_paths = [self.hot_path(root) for root in on_load]
+        self._check_limits(on_load, "load")
+        self._check_limits(on_tick, "tick")
+        for path in self.report.tick_paths:
+            if path.root not in on_tick:
+                self._check_limits([path.root], "scheduled")
+        return self.report
+
+    def _check_limits(self, roots: List[str], label: str):
+        """Hook functions of one kind share a single chain through the generated load/tick function."""
+        known = [self.cost(root) for root in roots]
+        if not known:
+            return
+        if all(c.commands is not None for c in known):
+            total = sum(c.commands for c in known)
+            if total > self.max_command_chain:
+                self.report.issues.append(Issue(
+                    "error", ", ".join(roots),
+                    f"{label} chain runs up to {total} commands, over maxCommandChainLength "
+                    f"({self.max_command_chain}); the game aborts it silently"))
+        for c in known:
+            if c.depth is not None and c.depth > self.max_call_depth:
+                self.report.issues.append(Issue(
+                    "warning", c.function_id, f"call depth reaches {c.depth} (limit {self.max_call_depth})"))
+
+
+def analyze_module(module: IRModule, on_load: Iterable[str] = (), on_tick: Iterable[str] = (),
+                   max_command_chain: int = MAX_COMMAND_CHAIN_LENGTH,
+                   max_call_depth: int = DEFAULT_MAX_CALL_DEPTH) -> AnalysisReport:
+    """Estimate worst-case commands per invocation for every function in an IR module.
+
+    Counts are per executor: 'execute as' fan-out multiplies them by the number of
+    matching entities at runtime.
+    """
+    return _Analyzer(module, max_command_chain, max_call_depth).run(list(on_load), list(on_tick))
+
+
+def analyze_program(ast, max_command_chain: int = MAX_COMMAND_CHAIN_LENGTH,
+                    max_call_depth: int = DEFAULT_MAX_CALL_DEPTH, **compiler_options) -> AnalysisReport:
+    """Compile a parsed program in memory and analyze the generated functions."""
+    from .mdl_compiler import MDLCompiler
+
+    compiler = MDLCompiler(**compiler_options)
+    compiler.generate(ast)
+    hooks = ast.hooks or []
+    on_load = [f"{h.namespace}:{h.name}" for h in hooks if h.hook_type == "on_load"]
+    on_tick = [f"{h.namespace}:{h.name}" for h in hooks if h.hook_type == "on_tick"]
+    return analyze_module(compiler.ir, on_load, on_tick, max_command_chain, max_call_depth)
+
+
+def format_report(report: AnalysisReport, top: int = 5) -> str:
+    """Human-readable summary: issues, loops, most expensive tick paths, costliest functions."""
+    def fmt(value: Optional[int]) -> str:
+        return "unbounded" if value is None else str(value)
+
+    lines: List[str] = []
+    if report.tick_paths:
+        lines.append("Most expensive tick paths (commands per executor):")
+        for path in report.tick_paths[:top]:
+            lines.append(f"  {fmt(path.commands):>10}  depth {fmt(path.depth):>6}  {' -> '.join(path.path)}")
+    if report.loops:
+        lines.append("Loops:")
+        for loop in report.loops.values():
+            detail = f"{loop.trips} iterations" if loop.trips is not None else loop.reason
+            lines.append(f"  {loop.function_id}: {loop.status} ({detail})")
+    ranked = sorted(report.functions.values(),
+                    key=lambda c: float("inf") if c.commands is None else c.commands, reverse=True)
+    if ranked:
+        lines.append("Costliest functions (commands per invocation):")
+        for cost in ranked[:top]:
+            lines.append(f"  {fmt(cost.commands):>10}  own {cost.own_commands:>4}  depth {fmt(cost.depth):>6}  {cost.function_id}")
+    if report.issues:
+        lines.append("Issues:")
+        lines.extend(f"  {issue}" for issue in report.issues)
+    else:
+        lines.append("No issues found.")
+    return "\n".join(lines)
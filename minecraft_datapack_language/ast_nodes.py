@@ -3,17 +3,130 @@ AST Node Definitions - Data classes for the MDL Abstract Syntax Tree
 Updated to match the new language specification
 """
 
-from dataclasses import dataclass
+import hashlib
+import sys
+from collections import UserList
+from dataclasses import dataclass, fields
 from typing import List, Optional, Any, Union
 
 
-@dataclass
-class ASTNode:
-    """Base class for AST nodes."""
-    pass
+def _slotted(cls=None, **options):
+    """dataclass(slots=True): nodes without a __dict__, which large programs have many of.
+    Python 3.9 has no slots option, so there the class is rebuilt with __slots__ by hand.
+    """
+    def wrap(cls):
+        if sys.version_info >= (3, 10):
+            return dataclass(cls, slots=True, **options)
+        cls = dataclass(cls, **options)
+        inherited = {name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())}
+        names = tuple(f.name for f in fields(cls) if f.name not in inherited)
+        namespace = {key: value for key, value in cls.__dict__.items()
+                     if key not in names and key not in ("__dict__", "__weakref__")}
+        namespace["__slots__"] = names
+        slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+        slotted.__qualname__ = cls.__qualname__
+        return slotted
+    return wrap if cls is None else wrap(cls)
+
+
+@_slotted(frozen=True)
+class SourceSpan:
+    """Where a node starts in MDL source (1-based line and column)."""
+    file_path: Optional[str]
+    line: int
+    column: int
+
+    def __reduce__(self):
+        # Frozen slotted instances cannot be restored attribute by attribute on every Python
+        return (SourceSpan, (self.file_path, self.line, self.column))
 
 
 @dataclass
+class ASTNode:
+    """Base class for AST nodes."""
+    # The span is set by the parser. It lives in a slot rather than a dataclass field,
+    # so it does not take part in node equality
+    __slots__ = ("_span", "_fingerprint")
+
+    def __post_init__(self):
+        self._span = None
+        self._fingerprint = None
+
+    @property
+    def span(self) -> Optional[SourceSpan]:
+        return self._span
+
+    @span.setter
+    def span(self, value: Optional[SourceSpan]):
+        self._span = value
+
+    def fingerprint(self) -> str:
+        """Structural hash of this subtree: node types and field values, not source spans.
+        
+        Equal subtrees have equal fingerprints across runs and machines. The digest is
+        computed bottom-up once and memoized on every node, so a node must not be changed
+        after it has been fingerprinted.
+        """
+        return self._digest().hex()
+
+    def _digest(self) -> bytes:
+        if self._fingerprint is None:
+            # Children first, with an explicit stack so deeply nested trees do not recurse
+            stack = [(self, False)]
+            while stack:
+                node, children_done = stack.pop()
+                if node._fingerprint is not None:
+                    continue
+                if not children_done:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in _child_nodes(node)
+                                 if child._fingerprint is None)
+                    continue
+                hasher = hashlib.blake2b(type(node).__name__.encode(), digest_size=16)
+                for f in fields(node):
+                    _hash_value(hasher, getattr(node, f.name))
+                node._fingerprint = hasher.digest()
+        return self._fingerprint
+
+
+def _child_nodes(node: "ASTNode") -> List["ASTNode"]:
+    """Nodes held directly by node's fields, including inside lists."""
+    children = []
+    pending = [getattr(node, f.name) for f in fields(node)]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, ASTNode):
+            children.append(value)
+        elif isinstance(value, (list, tuple, UserList)):
+            pending.extend(value)
+    return children
+
+
+def _hash_value(hasher, value):
+    # Every value is tagged with its kind (and strings with their length) so that
+    # different field layouts can never produce the same byte stream.
+    # Child nodes are already fingerprinted (see ASTNode._digest).
+    if isinstance(value, ASTNode):
+        hasher.update(b"N" + value._fingerprint)
+    elif value is None:
+        hasher.update(b"0")
+    elif isinstance(value, bool):
+        hasher.update(b"T" if value else b"F")
+    elif isinstance(value, str):
+        data = value.encode()
+        hasher.update(b"s%d:" % len(data) + data)
+    elif isinstance(value, (int, float)):
+        hasher.update(b"n" + repr(value).encode() + b";")
+    elif isinstance(value, (list, tuple, UserList)):
+        hasher.update(b"[%d:" % len(value))
+        for item in value:
+            _hash_value(hasher, item)
+    else:
+        data = repr(value).encode()
+        hasher.update(b"r%d:" % len(data) + data)
+
+
+@_slotted
 class PackDeclaration(ASTNode):
     """Pack declaration with name, description, and pack format."""
     name: str
@@ -21,13 +134,13 @@ class PackDeclaration(ASTNode):
     pack_format: int
 
 
-@dataclass
+@_slotted
 class NamespaceDeclaration(ASTNode):
     """Namespace declaration."""
     name: str
 
 
-@dataclass
+@_slotted
 class TagDeclaration(ASTNode):
     """Tag declaration for datapack resources."""
     tag_type: str  # recipe, loot_table, advancement, item_modifier, predicate, structure
@@ -35,7 +148,7 @@ class TagDeclaration(ASTNode):
     file_path: str
 
 
-@dataclass
+@_slotted
 class VariableDeclaration(ASTNode):
     """Variable declaration with explicit scope."""
     var_type: str  # num
@@ -44,7 +157,7 @@ class VariableDeclaration(ASTNode):
     initial_value: Any
 
 
-@dataclass
+@_slotted
 class VariableAssignment(ASTNode):
     """Variable assignment with explicit scope."""
     name: str
@@ -52,14 +165,14 @@ class VariableAssignment(ASTNode):
     value: Any
 
 
-@dataclass
+@_slotted
 class VariableSubstitution(ASTNode):
     """Variable substitution for reading values."""
     name: str
     scope: str  # <@s>, <@a>, etc.
 
 
-@dataclass
+@_slotted
 class FunctionDeclaration(ASTNode):
     """Function declaration with optional scope."""
     namespace: str
@@ -68,7 +181,7 @@ class FunctionDeclaration(ASTNode):
     body: List[ASTNode]
 
 
-@dataclass
+@_slotted
 class FunctionCall(ASTNode):
     """Function execution with exec keyword."""
     namespace: str
@@ -79,7 +192,7 @@ class FunctionCall(ASTNode):
     with_clause: Optional[str] = None  # Raw "with <data source> [path]" clause (without leading 'with')
 
 
-@dataclass
+@_slotted
 class IfStatement(ASTNode):
     """If statement with condition and bodies."""
     condition: Any  # Expression
@@ -87,21 +200,21 @@ class IfStatement(ASTNode):
     else_body: Optional[List[ASTNode]]
 
 
-@dataclass
+@_slotted
 class WhileLoop(ASTNode):
     """While loop with condition and body."""
     condition: Any  # Expression
     body: List[ASTNode]
 
 
-@dataclass
+@_slotted
 class ScheduledWhileLoop(ASTNode):
     """Scheduled-while loop that iterates via Minecraft's schedule command each tick."""
     condition: Any  # Expression
     body: List[ASTNode]
 
 
-@dataclass
+@_slotted
 class HookDeclaration(ASTNode):
     """Hook declaration (on_load, on_tick)."""
     hook_type: str  # on_load, on_tick
@@ -110,46 +223,46 @@ class HookDeclaration(ASTNode):
     scope: Optional[str]  # Optional scope for the hook
 
 
-@dataclass
+@_slotted
 class RawBlock(ASTNode):
     """Raw block of Minecraft commands."""
     content: str
 
 
-@dataclass
+@_slotted
 class SayCommand(ASTNode):
     """Say command that auto-converts to tellraw."""
     message: str
     variables: List[VariableSubstitution]  # Variables to substitute
 
 
-@dataclass
+@_slotted
 class TellrawCommand(ASTNode):
     """Tellraw command with JSON structure."""
     target: str  # @s, @a, etc.
     json_content: str
 
 
-@dataclass
+@_slotted
 class ExecuteCommand(ASTNode):
     """Execute command."""
     command: str
 
 
-@dataclass
+@_slotted
 class ScoreboardCommand(ASTNode):
     """Scoreboard command."""
     command: str
 
 
-@dataclass
+@_slotted
 class MacroLine(ASTNode):
     """A raw macro line for mcfunction starting with '$' and containing $(vars)."""
     content: str
 
 
 # Expression nodes
-@dataclass
+@_slotted
 class BinaryExpression(ASTNode):
     """Binary expression with operator."""
     left: Any
@@ -157,33 +270,33 @@ class BinaryExpression(ASTNode):
     right: Any
 
 
-@dataclass
+@_slotted
 class UnaryExpression(ASTNode):
     """Unary expression."""
     operator: str
     operand: Any
 
 
-@dataclass
+@_slotted
 class ParenthesizedExpression(ASTNode):
     """Expression in parentheses."""
     expression: Any
 
 
-@dataclass
+@_slotted
 class LiteralExpression(ASTNode):
     """Literal value."""
     value: Union[str, int, float]
     type: str  # string, number
 
 
-@dataclass
+@_slotted
 class ScopeSelector(ASTNode):
     """Scope selector like <@s>, <@a[team=red]>."""
     selector: str  # @s, @a[team=red], etc.
 
 
-@dataclass
+@_slotted
 class Program(ASTNode):
     """Complete MDL program."""
     pack: Optional[PackDeclaration]
@@ -0,0 +1,288 @@
+"""
+AST Serializer - Compact binary encoding of MDL syntax trees
+
+dumps() turns a Program (or any node) into bytes and loads() rebuilds it, spans
+included, so parsed trees can be cached on disk or handed to other processes.
+
+Layout: magic, format version, a string table (every distinct string once), a
+node-type table (class name and field names of each node type used), then the
+tree as tagged values. Node types are resolved by name when loading, and their
+field names are checked, so data written by an incompatible version of
+ast_nodes is rejected instead of silently misread.
+"""
+
+import struct
+from collections import UserList
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from . import ast_nodes
+from .ast_nodes import ASTNode, SourceSpan
+
+MAGIC = b"MDLAST"
+FORMAT_VERSION = 1
+
+# Value tags
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR, _LIST, _NODE, _SPANNED_NODE = range(9)
+
+_DOUBLE = struct.Struct("<d")
+
+# Node classes by name; every ASTNode subclass defined in ast_nodes
+NODE_TYPES: Dict[str, type] = {
+    name: cls for name, cls in vars(ast_nodes).items()
+    if isinstance(cls, type) and issubclass(cls, ASTNode) and cls is not ASTNode
+}
+
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    return tuple(cls.__dataclass_fields__)
+
+
+@lru_cache(maxsize=None)
+def _reversed_field_names(cls: type) -> Tuple[str, ...]:
+    return _field_names(cls)[::-1]
+
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class _Encoder:
+    def __init__(self):
+        self.out = bytearray()
+        self.strings: Dict[str, int] = {}
+        self.types: Dict[type, int] = {}
+
+    def string(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def node_type(self, cls: type) -> int:
+        index = self.types.get(cls)
+        if index is None:
+            if NODE_TYPES.get(cls.__name__) is not cls:
+                raise TypeError(f"Cannot serialize node type {cls.__qualname__}")
+            index = self.types[cls] = len(self.types)
+        return index
+
+    def value(self, root: Any):
+        """Write root and everything under it; pending values sit on an explicit stack
+        (last one next) so deeply nested trees do not recurse."""
+        out = self.out
+        strings = self.strings
+        stack = [root]
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            value = pop()
+            if type(value) is str:
+                out.append(_STR)
+                index = strings.get(value)
+                if index is None:
+                    index = strings[value] = len(strings)
+                _write_varint(out, index)
+            elif isinstance(value, ASTNode):
+                cls = type(value)
+                span = value.span
+                if span is None:
+                    out.append(_NODE)
+                    _write_varint(out, self.node_type(cls))
+                else:
+                    out.append(_SPANNED_NODE)
+                    _write_varint(out, self.node_type(cls))
+                    self.scalar(span.file_path)
+                    _write_varint(out, span.line)
+                    _write_varint(out, span.column)
+                extend([getattr(value, name) for name in _reversed_field_names(cls)])
+            elif isinstance(value, (list, tuple, UserList)):
+                out.append(_LIST)
+                _write_varint(out, len(value))
+                extend(reversed(value))
+            else:
+                self.scalar(value)
+
+    def scalar(self, value: Any):
+        out = self.out
+        if isinstance(value, str):
+            out.append(_STR)
+            _write_varint(out, self.string(value))
+        elif value is None:
+            out.append(_NONE)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif isinstance(value, int):
+            out.append(_INT)
+            # Zigzag, so small negative numbers stay short
+            _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(value)
+        else:
+            raise TypeError(f"Cannot serialize {type(value).__name__} value {value!r}")
+
+    def finish(self) -> bytes:
+        body = self.out
+        # Type table strings join the string table, so they are added before it is written
+        type_entries = [(self.string(cls.__name__), [self.string(n) for n in _field_names(cls)])
+                        for cls in self.types]
+        head = bytearray(MAGIC)
+        head.append(FORMAT_VERSION)
+        _write_varint(head, len(self.strings))
+        for text in self.strings:
+            data = text.encode("utf-8")
+            _write_varint(head, len(data))
+            head += data
+        _write_varint(head, len(type_entries))
+        for name, field_indexes in type_entries:
+            _write_varint(head, name)
+            _write_varint(head, len(field_indexes))
+            for index in field_indexes:
+                _write_varint(head, index)
+        return bytes(head + body)
+
+
+def dumps(node: Any) -> bytes:
+    """Serialize a Program, any node, or a list of nodes. Lazy function bodies are parsed first."""
+    encoder = _Encoder()
+    encoder.value(node)
+    return encoder.finish()
+
+
+class _Decoder:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+        self.strings: List[str] = []
+        self.types: List[Tuple[type, int]] = []
+
+    def varint(self) -> int:
+        data = self.data
+        byte = data[self.pos]
+        if byte < 0x80:
+            self.pos += 1
+            return byte
+        result = shift = 0
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def header(self):
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a serialized MDL syntax tree")
+        self.pos = len(MAGIC)
+        version = self.data[self.pos]
+        self.pos += 1
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported syntax tree format version {version} (expected {FORMAT_VERSION})")
+        for _ in range(self.varint()):
+            length = self.varint()
+            self.strings.append(self.data[self.pos:self.pos + length].decode("utf-8"))
+            self.pos += length
+        for _ in range(self.varint()):
+            name = self.strings[self.varint()]
+            fields = tuple(self.strings[self.varint()] for _ in range(self.varint()))
+            cls = NODE_TYPES.get(name)
+            if cls is None or _field_names(cls) != fields:
+                raise ValueError(f"Serialized node type {name}{fields} does not match ast_nodes")
+            self.types.append((cls, len(fields)))
+
+    def value(self) -> Any:
+        """Read one value. Lists and nodes whose items are still being read wait on an
+        explicit stack of [kind, node class, span, item count, items] frames."""
+        data, strings, types = self.data, self.strings, self.types
+        frames: List[list] = []
+        while True:
+            tag = data[self.pos]
+            self.pos += 1
+            if tag == _STR:
+                index = data[self.pos]
+                if index < 0x80:
+                    self.pos += 1
+                    result = strings[index]
+                else:
+                    result = strings[self.varint()]
+            elif tag == _SPANNED_NODE or tag == _NODE:
+                cls, count = types[self.varint()]
+                if tag == _SPANNED_NODE:
+                    file_path = self.scalar(data[self.pos])
+                    line = self.varint()
+                    span = SourceSpan(file_path, line, self.varint())
+                else:
+                    span = None
+                if count:
+                    frames.append([_NODE, cls, span, count, []])
+                    continue
+                result = cls()
+                result._span = span
+            elif tag == _LIST:
+                count = self.varint()
+                if count:
+                    frames.append([_LIST, None, None, count, []])
+                    continue
+                result = []
+            else:
+                self.pos -= 1
+                result = self.scalar(tag)
+            # Hand the finished value to the frame waiting for it, closing frames that fill up
+            while frames:
+                frame = frames[-1]
+                items = frame[4]
+                items.append(result)
+                if len(items) < frame[3]:
+                    break
+                frames.pop()
+                if frame[0] == _LIST:
+                    result = items
+                else:
+                    result = frame[1](*items)
+                    result._span = frame[2]
+            else:
+                return result
+
+    def scalar(self, tag: int) -> Any:
+        """Read the scalar whose tag is at the current position."""
+        data = self.data
+        self.pos += 1
+        if tag == _STR:
+            index = data[self.pos]
+            if index < 0x80:
+                self.pos += 1
+                return self.strings[index]
+            return self.strings[self.varint()]
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT:
+            zigzag = self.varint()
+            return zigzag >> 1 if not zigzag & 1 else -(zigzag >> 1) - 1
+        if tag == _FLOAT:
+            (number,) = _DOUBLE.unpack_from(data, self.pos)
+            self.pos += _DOUBLE.size
+            return number
+        raise ValueError(f"Corrupt syntax tree data: unknown tag {tag} at offset {self.pos - 1}")
+
+
+def loads(data: bytes) -> Any:
+    """Rebuild what dumps() serialized. Raises ValueError for data it cannot read."""
+    decoder = _Decoder(bytes(data))
+    try:
+        decoder.header()
+        result = decoder.value()
+    except (IndexError, UnicodeDecodeError, struct.error) as e:
+        raise ValueError(f"Truncated or corrupt syntax tree data: {e}") from None
+    if decoder.pos != len(decoder.data):
+        raise ValueError("Trailing bytes after serialized syntax tree")
+    return result
@@ -0,0 +1,107 @@
+"""
+Call Graph - Which generated functions a datapack can reach from its entry points
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from .ir import IRModule, Instruction, Call, Schedule, Execute, Raw, RawCondition
+
+logger = logging.getLogger(__name__)
+
+# Matches 'function ns:name', 'schedule function ns:name', 'execute if function ns:name'
+# and function tag references ('function #ns:tag') inside raw command text
+FUNCTION_REFERENCE_RE = re.compile(r"\bfunction\s+(#?[A-Za-z0-9_.\-]+:[A-Za-z0-9_./\-$()]+)")
+
+
+def function_references(text: str) -> List[str]:
+    """Return every function id (or #tag) a block of command text refers to."""
+    return FUNCTION_REFERENCE_RE.findall(text)
+
+
+@dataclass
+class CallGraph:
+    """Caller -> callee edges between the functions of one IR module.
+    Function tags the pack defines are nodes too ("#ns:tag"), with edges to their members."""
+    edges: Dict[str, Set[str]] = field(default_factory=dict)
+    # Functions (or tags) that call a target only known at runtime: macro placeholders
+    # and function tags the pack does not define
+    dynamic_callers: Set[str] = field(default_factory=set)
+
+    def callees(self, function_id: str) -> Set[str]:
+        return self.edges.get(function_id, set())
+
+    def reachable(self, roots: Iterable[str]) -> Set[str]:
+        """Every function reachable from the given entry points, roots included."""
+        seen: Set[str] = set()
+        pending = [root for root in roots]
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            pending.extend(self.callees(current) - seen)
+        return seen
+
+
+def _instruction_targets(instruction: Instruction) -> List[str]:
+    if isinstance(instruction, (Call, Schedule)):
+        return [instruction.function]
+    if isinstance(instruction, Execute):
+        targets: List[str] = []
+        for clause in instruction.clauses:
+            if isinstance(clause, RawCondition):
+                targets.extend(function_references(clause.render()))
+        return targets + _instruction_targets(instruction.run)
+    if isinstance(instruction, Raw):
+        return function_references(instruction.text)
+    return []
+
+
+def build_call_graph(module: IRModule, function_tags: Optional[Dict[str, List[str]]] = None) -> CallGraph:
+    """Collect call edges from typed calls and from function commands inside raw text.
+    function_tags maps the ids of the pack's own function tags (without '#') to their
+    values; calls to those tags become edges to the tagged functions.
+    """
+    function_tags = function_tags or {}
+    graph = CallGraph()
+
+    def add_edge(caller: str, target: str):
+        if "$(" in target or (target.startswith("#") and target[1:] not in function_tags):
+            graph.dynamic_callers.add(caller)
+        else:
+            graph.edges.setdefault(caller, set()).add(target)
+
+    for block in module.blocks():
+        graph.edges.setdefault(block.function_id, set())
+        for instruction in block.instructions:
+            for target in _instruction_targets(instruction):
+                add_edge(block.function_id, target)
+    for tag, values in function_tags.items():
+        graph.edges.setdefault(f"#{tag}", set())
+        for value in values:
+            add_edge(f"#{tag}", value)
+    return graph
+
+
+def prune_unreachable(module: IRModule, roots: Iterable[str],
+                      function_tags: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """Drop functions no entry point can reach; returns the removed function ids.
+
+    Calls to the pack's own function tags (function_tags, as for build_call_graph) are
+    followed. Pruning is skipped entirely when a reachable function calls a target that
+    is only known at runtime, since any function could be the callee.
+    """
+    graph = build_call_graph(module, function_tags)
+    live = graph.reachable(roots)
+    dynamic = live & graph.dynamic_callers
+    if dynamic:
+        logger.warning("Not pruning unreachable functions: %s call functions by macro or by a #tag "
+                       "this pack does not define", ", ".join(sorted(dynamic)))
+        return []
+    removed = [function_id for function_id in module.functions if function_id not in live]
+    for function_id in removed:
+        del module.functions[function_id]
+    return removed
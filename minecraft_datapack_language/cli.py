@@ -4,21 +4,52 @@ MDL CLI - Command Line Interface for Minecraft Datapack Language
 """
 
 import argparse
+import contextlib
+import json
+import logging
 import sys
 import os
 from pathlib import Path
 import shutil
-from typing import Optional
-try:
-    # Python 3.9+
-    from importlib.resources import files as importlib_resources_files
-except Exception:  # pragma: no cover
-    import importlib_resources  # type: ignore
-    importlib_resources_files = importlib_resources.files  # type: ignore
-from .mdl_lexer import MDLLexer
-from .mdl_parser import MDLParser
-from .mdl_compiler import MDLCompiler
-from .mdl_errors import MDLLexerError, MDLParserError, MDLCompilerError
+from typing import TYPE_CHECKING, List, Optional
+
+# Each command imports the parts of the toolchain it needs, so `mdl --version`,
+# `mdl completion` and `mdl check` do not pay for loading the compiler
+if TYPE_CHECKING:
+    from .instrumentation import PhaseTimer
+
+
+def importlib_resources_files(package: str):
+    try:
+        # Python 3.9+
+        from importlib.resources import files
+    except Exception:  # pragma: no cover
+        from importlib_resources import files  # type: ignore
+    return files(package)
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """Log handler that writes to whatever sys.stdout is at emit time (follows redirect_stdout)."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+_console_handler = _ConsoleHandler()
+_console_handler.setFormatter(logging.Formatter("%(message)s"))
+
+
+def _configure_logging(verbose: bool):
+    """Show compiler summaries on the console, and per-item detail with --verbose."""
+    package_logger = logging.getLogger(__package__)
+    if _console_handler not in package_logger.handlers:
+        package_logger.addHandler(_console_handler)
+    package_logger.setLevel(logging.DEBUG if verbose else logging.INFO)
 
 
 def main():
@@ -31,8 +62,19 @@ Examples:
   mdl build                                 # Build all MDL files in current directory (to ./dist)
   mdl build --mdl main.mdl                  # Build a single MDL file (to ./dist)
   mdl build -o out                          # Build current directory to custom output
+  mdl build --target-format 48              # Build for a specific pack_format
+  mdl build --target-format 48 --target-format 82  # One pack with per-format overlays
+  mdl build --prune-unreachable --keep lib:api      # Drop functions nothing can call
+  mdl build --profile                       # Call counters + /function <ns>:profile/dump
+  mdl build --timings json                  # Per-phase build times as JSON (progress on stderr)
+  mdl watch --mdl src -o dist               # Rebuild on every change, writing only changed files
+  mdl serve                                 # Language server for editors and build scripts
+  mdl analyze --mdl main.mdl                # Worst-case command counts and loop bounds
   mdl check                                 # Check all .mdl files in current directory
   mdl check main.mdl                        # Check a single file
+  mdl check --cache                         # Skip files that passed before (e.g. in pre-commit)
+  mdl check --format sarif > mdl.sarif      # Diagnostics as SARIF for code scanning (also json, ndjson)
+  mdl lint src                              # Syntax errors plus style and correctness warnings
   mdl new my_project                        # Create a new project
         """
     )
@@ -48,11 +90,52 @@ Examples:
     build_parser.add_argument('--verbose', action='store_true', help='Show detailed output')
     build_parser.add_argument('--wrapper', help='Optional wrapper directory name for the datapack output')
     build_parser.add_argument('--no-zip', action='store_true', help='Do not create a zip archive (zip is created by default)')
+    build_parser.add_argument('--target-format', type=int, action='append', help='Compile for this pack_format instead of the one declared in the pack; repeat to build one pack with overlays for each format')
+    build_parser.add_argument('--prune-unreachable', action='store_true', help='Drop functions that no hook, function tag or --keep entry point can reach')
+    build_parser.add_argument('--keep', action='append', default=[], metavar='NS:FUNC', help='Keep this function (and everything it calls) when pruning; repeatable')
+    build_parser.add_argument('--source-map', action='store_true', help='Write .mdl-sourcemap.json mapping each generated function line to its MDL source')
+    build_parser.add_argument('--timings', nargs='?', const='human', choices=['human', 'json'], help='Report wall time and CPU time per build phase (default format: human)')
+    build_parser.add_argument('--timings-memory', action='store_true', help='Also report peak memory per phase with --timings (tracing memory slows the build down)')
+    build_parser.add_argument('--profile', action='store_true', help='Count calls of every function on the mdl_prof objective and add <ns>:profile/dump and <ns>:profile/reset')
+    
+    # Watch command
+    watch_parser = subparsers.add_parser('watch', help='Rebuild the datapack whenever a source file changes')
+    watch_parser.add_argument('--mdl', default='.', help='MDL file(s) or directory to watch (default: .)')
+    watch_parser.add_argument('-o', '--output', default='dist', help='Output directory for the datapack (default: dist)')
+    watch_parser.add_argument('--verbose', action='store_true', help='Show detailed output')
+    watch_parser.add_argument('--wrapper', help='Optional wrapper directory name for the datapack output')
+    watch_parser.add_argument('--no-zip', action='store_true', help='Do not keep a zip archive up to date')
+    watch_parser.add_argument('--target-format', type=int, action='append', help='Compile for this pack_format; repeat to build one pack with overlays for each format')
+    watch_parser.add_argument('--prune-unreachable', action='store_true', help='Drop functions that no hook, function tag or --keep entry point can reach')
+    watch_parser.add_argument('--keep', action='append', default=[], metavar='NS:FUNC', help='Keep this function (and everything it calls) when pruning; repeatable')
+    watch_parser.add_argument('--source-map', action='store_true', help='Write .mdl-sourcemap.json mapping each generated function line to its MDL source')
+    watch_parser.add_argument('--profile', action='store_true', help='Count calls of every function on the mdl_prof objective')
+    watch_parser.add_argument('--interval', type=float, default=0.25, help='Seconds between checks for changed files (default: 0.25)')
+    
+    # Serve command
+    serve_parser = subparsers.add_parser('serve', help='Run the MDL language server (JSON-RPC over stdio)')
+    serve_parser.add_argument('--verbose', action='store_true', help='Log server activity to stderr')
+    
+    # Analyze command
+    analyze_parser = subparsers.add_parser('analyze', help='Estimate worst-case command counts and call depth')
+    analyze_parser.add_argument('--mdl', default='.', help='MDL file(s) or directory to analyze (default: .)')
+    analyze_parser.add_argument('--top', type=int, default=5, help='Number of tick paths and functions to list (default: 5)')
+    analyze_parser.add_argument('--json', action='store_true', help='Print the full report as JSON')
+    analyze_parser.add_argument('--max-commands', type=int, default=65536, help='maxCommandChainLength to check against (default: 65536)')
+    analyze_parser.add_argument('--max-depth', type=int, default=512, help='Warn when function nesting exceeds this depth (default: 512)')
+    analyze_parser.add_argument('--target-format', type=int, help='Analyze the code generated for this pack_format')
+    analyze_parser.add_argument('--verbose', action='store_true', help='Show detailed output')
     
     # Check command
     check_parser = subparsers.add_parser('check', help='Check MDL files for syntax errors')
     check_parser.add_argument('files', nargs='*', help='MDL files or directories to check (default: current directory)')
     check_parser.add_argument('--verbose', action='store_true', help='Show detailed output')
+    _add_lint_arguments(check_parser)
+
+    lint_parser = subparsers.add_parser('lint', help='Lint MDL files for errors and style issues')
+    lint_parser.add_argument('files', nargs='*', help='MDL files or directories to lint (default: current directory)')
+    lint_parser.add_argument('--verbose', action='store_true', help='Show a suggestion under each issue')
+    _add_lint_arguments(lint_parser)
     
     # New command
     new_parser = subparsers.add_parser('new', help='Create a new MDL project')
@@ -99,11 +182,20 @@ Examples:
         print("     Then open the Getting Started guide in your browser: mdl docs")
         return 0
     
+    _configure_logging(getattr(args, 'verbose', False))
     try:
         if args.command == 'build':
             return build_command(args)
+        elif args.command == 'watch':
+            return watch_command(args)
+        elif args.command == 'serve':
+            return serve_command(args)
+        elif args.command == 'analyze':
+            return analyze_command(args)
         elif args.command == 'check':
             return check_command(args)
+        elif args.command == 'lint':
+            return lint_command(args)
         elif args.command == 'new':
             return new_command(args)
         elif args.command == 'completion':
@@ -121,14 +213,16 @@ Examples:
         return 1
 
 
-def build_command(args):
-    """Build MDL files into a datapack."""
-    mdl_path = Path(args.mdl)
-    output_dir = Path(args.output)
-    
+def _load_program(mdl_path: Path, verbose: bool = False, timer: Optional["PhaseTimer"] = None):
+    """Parse every .mdl file under mdl_path and merge them into one program; None on error."""
+    from .mdl_parser import MDLParser
+    from .mdl_errors import MDLLexerError, MDLParserError
+    from .instrumentation import timed
+    from .watch import merge_programs
+
     if not mdl_path.exists():
         print(f"Error: MDL path '{mdl_path}' does not exist")
-        return 1
+        return None
     
     # Determine what to build
     if mdl_path.is_file():
@@ -137,12 +231,12 @@ def build_command(args):
         mdl_files = list(mdl_path.glob("**/*.mdl"))
         if not mdl_files:
             print(f"Error: No .mdl files found in directory '{mdl_path}'")
-            return 1
+            return None
     else:
         print(f"Error: Invalid MDL path '{mdl_path}'")
-        return 1
+        return None
     
-    if args.verbose:
+    if verbose:
         print(f"Building {len(mdl_files)} MDL file(s)...")
         for f in mdl_files:
             print(f"  {f}")
@@ -154,10 +248,10 @@ def build_command(args):
             with open(mdl_file, 'r', encoding='utf-8') as f:
                 source = f.read()
             
-            if args.verbose:
+            if verbose:
                 print(f"Parsing {mdl_file}...")
             
-            parser = MDLParser(str(mdl_file))
+            parser = MDLParser(str(mdl_file), timer=timer)
             ast = parser.parse(source)
             all_asts.append(ast)
             # Indicate per-file success
@@ -165,20 +259,71 @@ def build_command(args):
             
         except (MDLLexerError, MDLParserError) as e:
             print(f"Error in {mdl_file}: {e}")
-            return 1
+            return None
     
     # Merge all ASTs if multiple files
-    if len(all_asts) == 1:
-        final_ast = all_asts[0]
-    else:
-        # Merge multiple ASTs
-        final_ast = all_asts[0]
-        for ast in all_asts[1:]:
-            final_ast.variables.extend(ast.variables)
-            final_ast.functions.extend(ast.functions)
-            final_ast.tags.extend(ast.tags)
-            final_ast.hooks.extend(ast.hooks)
-            final_ast.statements.extend(ast.statements)
+    with timed(timer, "merge"):
+        final_ast = all_asts[0] if len(all_asts) == 1 else merge_programs(all_asts)
+    return final_ast
+
+
+def _add_lint_arguments(subparser):
+    subparser.add_argument('-j', '--jobs', type=int, default=0,
+                           help='Worker processes for checking files (default: 0, one per CPU)')
+    subparser.add_argument('--cache', action='store_true',
+                           help='Reuse results for files whose contents did not change since the last run')
+    subparser.add_argument('--cache-dir', default='.mdl_cache',
+                           help='Directory for --cache results (default: .mdl_cache)')
+    subparser.add_argument('--format', default='text', choices=['text', 'json', 'ndjson', 'sarif'],
+                           help='Output format; json, ndjson and sarif stream one record per issue '
+                                'to stdout as each file finishes (default: text)')
+
+
+def _compiler_options(args, timer: Optional["PhaseTimer"] = None) -> dict:
+    """MDLCompiler keyword arguments shared by build and watch."""
+    return {
+        'prune_unreachable': getattr(args, 'prune_unreachable', False),
+        'keep_functions': getattr(args, 'keep', None) or [],
+        'profile': getattr(args, 'profile', False),
+        'source_map': getattr(args, 'source_map', False),
+        'timer': timer,
+    }
+
+
+def build_command(args):
+    """Build MDL files into a datapack."""
+    from .instrumentation import PhaseTimer
+
+    mdl_path = Path(args.mdl)
+    output_dir = Path(args.output)
+    
+    timings = getattr(args, 'timings', None)
+    # tracemalloc slows every phase down, so memory is only measured on request
+    timer = PhaseTimer(track_memory=getattr(args, 'timings_memory', False)) if timings else None
+    # Keep stdout machine-readable for --timings json; progress output goes to stderr instead
+    progress = contextlib.redirect_stdout(sys.stderr) if timings == 'json' else contextlib.nullcontext()
+    try:
+        with progress:
+            return _build(args, mdl_path, output_dir, timer)
+    finally:
+        if timer is not None:
+            timer.close()
+            if timings == 'json':
+                print(timer.to_json())
+            else:
+                print("Build timings:")
+                print(timer.format_human())
+
+
+def _build(args, mdl_path: Path, output_dir: Path, timer: Optional["PhaseTimer"]):
+    """Parse, compile, write and zip; the body of build_command."""
+    from .mdl_compiler import MDLCompiler
+    from .mdl_errors import MDLCompilerError
+    from .instrumentation import timed
+
+    final_ast = _load_program(mdl_path, args.verbose, timer)
+    if final_ast is None:
+        return 1
     
     # Compile
     try:
@@ -188,14 +333,21 @@ def build_command(args):
         # Support optional wrapper directory
         if getattr(args, 'wrapper', None):
             output_dir = output_dir / args.wrapper
-        compiler = MDLCompiler()
-        output_path = compiler.compile(final_ast, str(output_dir))
+        target_formats = getattr(args, 'target_format', None) or []
+        compiler_options = _compiler_options(args, timer)
+        if len(set(target_formats)) > 1:
+            from .overlays import compile_with_overlays
+            output_path = compile_with_overlays(final_ast, target_formats, str(output_dir), str(output_dir), **compiler_options)
+        else:
+            compiler = MDLCompiler(target_format=target_formats[0] if target_formats else None, **compiler_options)
+            output_path = compiler.compile(final_ast, str(output_dir))
 
         # Zip the datapack by default unless disabled
         if not getattr(args, 'no_zip', False):
             base_name = str(Path(output_path))
             # Create archive next to the output directory (base_name.zip)
-            archive_path = shutil.make_archive(base_name, 'zip', root_dir=str(Path(output_path)))
+            with timed(timer, "zip"):
+                archive_path = shutil.make_archive(base_name, 'zip', root_dir=str(Path(output_path)))
             if args.verbose:
                 print(f"Created archive: {archive_path}")
         
@@ -207,14 +359,79 @@ def build_command(args):
         return 1
 
 
-def check_command(args):
-    """Check MDL files for syntax errors."""
-    all_errors = []
+def watch_command(args):
+    """Rebuild the datapack whenever a watched source changes."""
+    from .watch import IncrementalBuilder
 
-    # If no files provided, default to scanning current directory
-    input_paths = args.files if getattr(args, 'files', None) else ['.']
+    output_dir = Path(args.output)
+    if getattr(args, 'wrapper', None):
+        output_dir = output_dir / args.wrapper
+    builder = IncrementalBuilder(
+        args.mdl, output_dir,
+        target_formats=args.target_format,
+        zip_output=not args.no_zip,
+        **_compiler_options(args),
+    )
+
+    def report(result):
+        if result.error:
+            print(result.error)
+            print("Keeping the previous build; waiting for changes...")
+        elif result.changed:
+            print(f"Rebuilt in {result.duration * 1000:.1f} ms: {len(result.parsed)} source(s) parsed, "
+                  f"{len(result.changed_functions)} function(s) changed, "
+                  f"{len(result.written)} file(s) written, {len(result.removed)} removed")
+        elif args.verbose:
+            print(f"No output changes ({result.duration * 1000:.1f} ms)")
+
+    print(f"Watching {args.mdl} -> {output_dir} (Ctrl+C to stop)")
+    try:
+        builder.watch(interval=args.interval, on_rebuild=report)
+    except KeyboardInterrupt:
+        print("Stopped.")
+    return 0
+
+
+def serve_command(args):
+    """Run the JSON-RPC language server on stdin/stdout."""
+    from .server import LanguageServer
+
+    reader, writer = sys.stdin.buffer, sys.stdout.buffer
+    # stdout carries the protocol; anything printed or logged goes to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        return LanguageServer().serve(reader, writer)
 
-    # Collect .mdl files from provided files/directories
+
+def analyze_command(args):
+    """Estimate worst-case command counts and call depth of the generated functions."""
+    from .analyzer import analyze_program, format_report
+    from .mdl_errors import MDLCompilerError
+
+    # Keep stdout machine-readable for --json; progress output goes to stderr instead
+    progress = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    with progress:
+        final_ast = _load_program(Path(args.mdl), args.verbose)
+        if final_ast is None:
+            return 1
+        try:
+            report = analyze_program(
+                final_ast,
+                max_command_chain=args.max_commands,
+                max_call_depth=args.max_depth,
+                target_format=args.target_format,
+            )
+        except MDLCompilerError as e:
+            print(f"Compilation error: {e}")
+            return 1
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(format_report(report, top=args.top))
+    return 1 if report.has_errors else 0
+
+
+def _collect_mdl_files(input_paths, stream=None) -> List[Path]:
+    """.mdl files named by, or found under, the given paths (reporting missing ones to stream)."""
     mdl_files = []
     for input_path in input_paths:
         path_obj = Path(input_path)
@@ -224,41 +441,113 @@ def check_command(args):
             if path_obj.suffix.lower() == '.mdl':
                 mdl_files.append(path_obj)
         else:
-            print(f"Error: Path '{path_obj}' does not exist")
+            print(f"Error: Path '{path_obj}' does not exist", file=stream or sys.stdout)
+    return mdl_files
+
+
+def _lint_cache(args, rules):
+    from .mdl_linter import LintCache
+    return LintCache(args.cache_dir, rules) if args.cache else None
+
+
+def lint_command(args):
+    """Lint MDL files: syntax errors plus style and correctness rules."""
+    from .mdl_linter import MDLLinter
 
+    mdl_files = _collect_mdl_files(args.files if args.files else ['.'], _message_stream(args))
     if not mdl_files:
-        print("Error: No .mdl files found to check")
+        print("Error: No .mdl files found to lint", file=_message_stream(args))
+        if args.format != 'text':
+            # Still a complete (empty) document, so consumers can parse stdout
+            _write_diagnostics(args.format, [])
         return 1
 
-    for file_path in mdl_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source = f.read()
+    linter = MDLLinter()
+    results = linter.iter_lint_files([str(p) for p in mdl_files], jobs=args.jobs or None,
+                                     cache=_lint_cache(args, linter.rules))
+    if args.format != 'text':
+        return _write_diagnostics(args.format, results)
 
-            if args.verbose:
-                print(f"Checking {file_path}...")
+    counts = {'error': 0, 'warning': 0, 'info': 0}
+    for file_path, issues in results:
+        for issue in issues:
+            counts[issue.severity] = counts.get(issue.severity, 0) + 1
+            column = f":{issue.column}" if issue.column else ""
+            print(f"{file_path}:{issue.line_number}{column}: {issue.severity}: {issue.message} [{issue.category}]")
+            if args.verbose and issue.suggestion:
+                print(f"    {issue.suggestion}")
 
-            # Lex and parse to check for errors
-            lexer = MDLLexer(str(file_path))
-            tokens = list(lexer.lex(source))
+    print(f"\n{len(mdl_files)} file(s): {counts['error']} error(s), {counts['warning']} warning(s), "
+          f"{counts['info']} info")
+    return 1 if counts['error'] else 0
 
-            parser = MDLParser(str(file_path))
-            ast = parser.parse(source)
 
-            if args.verbose:
-                print(f"  ✓ {file_path} - {len(ast.functions)} functions, {len(ast.variables)} variables")
-            # Indicate per-file success
-            print(f"[OK] {file_path}")
-
-        except MDLLexerError as e:
-            print(f"Lexer error in {file_path}: {e}")
-            all_errors.append(e)
-        except MDLParserError as e:
-            print(f"Parser error in {file_path}: {e}")
-            all_errors.append(e)
-        except Exception as e:
-            print(f"Unexpected error in {file_path}: {e}")
-            all_errors.append(e)
+def _message_stream(args):
+    # Machine-readable output keeps stdout parseable, so messages go to stderr
+    return sys.stdout if args.format == 'text' else sys.stderr
+
+
+def _write_diagnostics(output_format: str, results) -> int:
+    """Stream (path, issues) results to stdout in a machine-readable format."""
+    from .diagnostics import diagnostic_writer
+
+    writer = diagnostic_writer(output_format)
+    writer.begin()
+    for file_path, issues in results:
+        writer.file(file_path, issues)
+    writer.end()
+    return 1 if writer.counts['error'] else 0
+
+
+def check_command(args):
+    """Check MDL files for syntax errors."""
+    from .mdl_parser import MDLParser
+    from .mdl_errors import MDLLexerError, MDLErrorCollector
+    from .mdl_linter import MDLLinter
+
+    all_errors = []
+
+    # If no files provided, default to scanning current directory
+    mdl_files = _collect_mdl_files(args.files if getattr(args, 'files', None) else ['.'], _message_stream(args))
+    if not mdl_files:
+        print("Error: No .mdl files found to check", file=_message_stream(args))
+        if args.format != 'text':
+            # Still a complete (empty) document, so consumers can parse stdout
+            _write_diagnostics(args.format, [])
+        return 1
+
+    # A linter without rules reports exactly the syntax errors; it checks files in
+    # parallel and, with --cache, skips files whose contents passed before
+    linter = MDLLinter(rules=[])
+    results = linter.iter_lint_files([str(p) for p in mdl_files], jobs=args.jobs or None,
+                                     cache=_lint_cache(args, linter.rules))
+    if args.format != 'text':
+        return _write_diagnostics(args.format, results)
+
+    for file_path, (_, issues) in zip(mdl_files, results):
+        if args.verbose:
+            print(f"Checking {file_path}...")
+        if any(issue.category == 'file' for issue in issues):
+            for issue in issues:
+                print(f"Unexpected error in {file_path}: {issue.message}")
+                all_errors.append(issue)
+            continue
+
+        if issues or args.verbose:
+            # Parse again for the full errors (with context) or the summary counts
+            collector = MDLErrorCollector()
+            ast = MDLParser(str(file_path), error_collector=collector).parse(
+                file_path.read_text(encoding='utf-8'))
+            for error in collector.errors:
+                kind = "Lexer" if isinstance(error, MDLLexerError) else "Parser"
+                print(f"{kind} error in {file_path}: {error}")
+                all_errors.append(error)
+            if collector.has_errors():
+                continue
+            print(f"  ✓ {file_path} - {len(ast.functions)} functions, {len(ast.variables)} variables")
+
+        # Indicate per-file success
+        print(f"[OK] {file_path}")
 
     if all_errors:
         print(f"\nFound {len(all_errors)} error(s)")
@@ -5,7 +5,7 @@ _mdl_complete() {
   words=("${COMP_WORDS[@]}")
   cword=${COMP_CWORD}
 
-  local subcommands="build check new completion docs"
+  local subcommands="build watch serve analyze check lint new completion docs"
   if [[ ${cword} -eq 1 ]]; then
     if [[ "$cur" == -* ]]; then
       COMPREPLY=( $(compgen -W "-h --help --version" -- "$cur") )
@@ -23,13 +23,27 @@ _mdl_complete() {
 
   case "${words[1]}" in
     build)
-      COMPREPLY=( $(compgen -W "--mdl -o --output --verbose --wrapper --no-zip -h --help" -- "$cur") )
+      COMPREPLY=( $(compgen -W "--mdl -o --output --verbose --wrapper --no-zip --target-format --prune-unreachable --keep --profile --source-map --timings --timings-memory -h --help" -- "$cur") )
       [[ "$prev" == "--mdl" ]] && { COMPREPLY=( $(compgen -f -d -- "$cur") ); return; }
       [[ "$prev" == "-o" || "$prev" == "--output" ]] && { COMPREPLY=( $(compgen -d -- "$cur") ); return; }
       [[ ${cur} == -* ]] || COMPREPLY+=( $(compgen -f -d -- "$cur") )
       ;;
-    check)
+    watch)
+      COMPREPLY=( $(compgen -W "--mdl -o --output --verbose --wrapper --no-zip --target-format --prune-unreachable --keep --profile --source-map --interval -h --help" -- "$cur") )
+      [[ "$prev" == "--mdl" ]] && { COMPREPLY=( $(compgen -f -d -- "$cur") ); return; }
+      [[ "$prev" == "-o" || "$prev" == "--output" ]] && { COMPREPLY=( $(compgen -d -- "$cur") ); return; }
+      ;;
+    serve)
       COMPREPLY=( $(compgen -W "--verbose -h --help" -- "$cur") )
+      ;;
+    analyze)
+      COMPREPLY=( $(compgen -W "--mdl --top --json --max-commands --max-depth --target-format --verbose -h --help" -- "$cur") )
+      [[ "$prev" == "--mdl" ]] && { COMPREPLY=( $(compgen -f -d -- "$cur") ); return; }
+      ;;
+    check|lint)
+      COMPREPLY=( $(compgen -W "--verbose -j --jobs --cache --cache-dir --format -h --help" -- "$cur") )
+      [[ "$prev" == "--cache-dir" ]] && { COMPREPLY=( $(compgen -d -- "$cur") ); return; }
+      [[ "$prev" == "--format" ]] && { COMPREPLY=( $(compgen -W "text json ndjson sarif" -- "$cur") ); return; }
       [[ ${cur} == -* ]] || COMPREPLY+=( $(compgen -f -d -- "$cur") )
       ;;
     new)
@@ -1,5 +1,9 @@
 complete -c mdl -n "__fish_use_subcommand" -a "build" -d "Build MDL files into a datapack"
+complete -c mdl -n "__fish_use_subcommand" -a "watch" -d "Rebuild on every source change"
+complete -c mdl -n "__fish_use_subcommand" -a "serve" -d "Run the language server"
+complete -c mdl -n "__fish_use_subcommand" -a "analyze" -d "Estimate worst-case command counts"
 complete -c mdl -n "__fish_use_subcommand" -a "check" -d "Check MDL files for syntax errors"
+complete -c mdl -n "__fish_use_subcommand" -a "lint" -d "Lint MDL files for errors and style issues"
 complete -c mdl -n "__fish_use_subcommand" -a "new" -d "Create a new MDL project"
 complete -c mdl -n "__fish_use_subcommand" -a "completion" -d "Shell completion utilities"
 complete -c mdl -n "__fish_use_subcommand" -a "docs" -d "Docs utilities"
@@ -14,11 +18,50 @@ complete -c mdl -n "__fish_seen_subcommand_from build" -s o -l output -d "Output
 complete -c mdl -n "__fish_seen_subcommand_from build" -l verbose -d "Verbose output"
 complete -c mdl -n "__fish_seen_subcommand_from build" -l wrapper -d "Wrapper directory" -r
 complete -c mdl -n "__fish_seen_subcommand_from build" -l no-zip -d "Do not zip"
+complete -c mdl -n "__fish_seen_subcommand_from build" -l target-format -d "Target pack format" -r
+complete -c mdl -n "__fish_seen_subcommand_from build" -l prune-unreachable -d "Drop unreachable functions"
+complete -c mdl -n "__fish_seen_subcommand_from build" -l keep -d "Keep function when pruning" -r
+complete -c mdl -n "__fish_seen_subcommand_from build" -l profile -d "Count function calls"
+complete -c mdl -n "__fish_seen_subcommand_from build" -l source-map -d "Write source map"
+complete -c mdl -n "__fish_seen_subcommand_from build" -l timings -a "human json" -d "Print phase timings"
+complete -c mdl -n "__fish_seen_subcommand_from build" -l timings-memory -d "Include peak memory in timings"
 complete -c mdl -n "__fish_seen_subcommand_from build" -s h -l help -d "Help"
 
-# check options
-complete -c mdl -n "__fish_seen_subcommand_from check" -l verbose -d "Verbose output"
-complete -c mdl -n "__fish_seen_subcommand_from check" -s h -l help -d "Help"
+# watch options
+complete -c mdl -n "__fish_seen_subcommand_from watch" -l mdl -d "MDL file or directory" -r -F
+complete -c mdl -n "__fish_seen_subcommand_from watch" -s o -l output -d "Output directory" -r -F
+complete -c mdl -n "__fish_seen_subcommand_from watch" -l verbose -d "Verbose output"
+complete -c mdl -n "__fish_seen_subcommand_from watch" -l wrapper -d "Wrapper directory" -r
+complete -c mdl -n "__fish_seen_subcommand_from watch" -l no-zip -d "Do not zip"
+complete -c mdl -n "__fish_seen_subcommand_from watch" -l target-format -d "Target pack format" -r
+complete -c mdl -n "__fish_seen_subcommand_from watch" -l prune-unreachable -d "Drop unreachable functions"
+complete -c mdl -n "__fish_seen_subcommand_from watch" -l keep -d "Keep function when pruning" -r
+complete -c mdl -n "__fish_seen_subcommand_from watch" -l profile -d "Count function calls"
+complete -c mdl -n "__fish_seen_subcommand_from watch" -l source-map -d "Write source map"
+complete -c mdl -n "__fish_seen_subcommand_from watch" -l interval -d "Seconds between checks" -r
+complete -c mdl -n "__fish_seen_subcommand_from watch" -s h -l help -d "Help"
+
+# serve options
+complete -c mdl -n "__fish_seen_subcommand_from serve" -l verbose -d "Verbose output"
+complete -c mdl -n "__fish_seen_subcommand_from serve" -s h -l help -d "Help"
+
+# analyze options
+complete -c mdl -n "__fish_seen_subcommand_from analyze" -l mdl -d "MDL file or directory" -r -F
+complete -c mdl -n "__fish_seen_subcommand_from analyze" -l top -d "Entries to list" -r
+complete -c mdl -n "__fish_seen_subcommand_from analyze" -l json -d "JSON report"
+complete -c mdl -n "__fish_seen_subcommand_from analyze" -l max-commands -d "Command chain limit" -r
+complete -c mdl -n "__fish_seen_subcommand_from analyze" -l max-depth -d "Call depth limit" -r
+complete -c mdl -n "__fish_seen_subcommand_from analyze" -l target-format -d "Target pack format" -r
+complete -c mdl -n "__fish_seen_subcommand_from analyze" -l verbose -d "Verbose output"
+complete -c mdl -n "__fish_seen_subcommand_from analyze" -s h -l help -d "Help"
+
+# check and lint options
+complete -c mdl -n "__fish_seen_subcommand_from check lint" -l verbose -d "Verbose output"
+complete -c mdl -n "__fish_seen_subcommand_from check lint" -s j -l jobs -d "Worker processes" -r
+complete -c mdl -n "__fish_seen_subcommand_from check lint" -l cache -d "Reuse results for unchanged files"
+complete -c mdl -n "__fish_seen_subcommand_from check lint" -l cache-dir -d "Cache directory" -r -a "(__fish_complete_directories)"
+complete -c mdl -n "__fish_seen_subcommand_from check lint" -l format -d "Output format" -r -a "text json ndjson sarif"
+complete -c mdl -n "__fish_seen_subcommand_from check lint" -s h -l help -d "Help"
 
 # new options
 complete -c mdl -n "__fish_seen_subcommand_from new" -l pack-name -d "Custom datapack name" -r
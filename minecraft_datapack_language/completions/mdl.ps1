@@ -3,16 +3,25 @@ Register-ArgumentCompleter -Native -CommandName mdl -ScriptBlock {
     $line = $commandAst.ToString()
     $parts = [System.Management.Automation.PSParser]::Tokenize($line, [ref]$null) | Where-Object { $_.Type -eq 'CommandArgument' } | ForEach-Object { $_.Content }
     if ($parts.Count -lt 1) {
-        'build','check','new','completion','docs','--help','-h','--version' | Where-Object { $_ -like "$wordToComplete*" } | ForEach-Object { [System.Management.Automation.CompletionResult]::new($_, $_, 'ParameterValue', $_) }
+        'build','watch','serve','analyze','check','lint','new','completion','docs','--help','-h','--version' | Where-Object { $_ -like "$wordToComplete*" } | ForEach-Object { [System.Management.Automation.CompletionResult]::new($_, $_, 'ParameterValue', $_) }
         return
     }
     switch ($parts[0]) {
         'build' {
-            '--mdl','-o','--output','--verbose','--wrapper','--no-zip','--help','-h' | Where-Object { $_ -like "$wordToComplete*" } | ForEach-Object { [System.Management.Automation.CompletionResult]::new($_, $_, 'ParameterName', $_) }
+            '--mdl','-o','--output','--verbose','--wrapper','--no-zip','--target-format','--prune-unreachable','--keep','--profile','--source-map','--timings','--timings-memory','--help','-h' | Where-Object { $_ -like "$wordToComplete*" } | ForEach-Object { [System.Management.Automation.CompletionResult]::new($_, $_, 'ParameterName', $_) }
         }
-        'check' {
+        'watch' {
+            '--mdl','-o','--output','--verbose','--wrapper','--no-zip','--target-format','--prune-unreachable','--keep','--profile','--source-map','--interval','--help','-h' | Where-Object { $_ -like "$wordToComplete*" } | ForEach-Object { [System.Management.Automation.CompletionResult]::new($_, $_, 'ParameterName', $_) }
+        }
+        'serve' {
             '--verbose','--help','-h' | Where-Object { $_ -like "$wordToComplete*" } | ForEach-Object { [System.Management.Automation.CompletionResult]::new($_, $_, 'ParameterName', $_) }
         }
+        'analyze' {
+            '--mdl','--top','--json','--max-commands','--max-depth','--target-format','--verbose','--help','-h' | Where-Object { $_ -like "$wordToComplete*" } | ForEach-Object { [System.Management.Automation.CompletionResult]::new($_, $_, 'ParameterName', $_) }
+        }
+        { $_ -in 'check','lint' } {
+            '--verbose','-j','--jobs','--cache','--cache-dir','--format','--help','-h' | Where-Object { $_ -like "$wordToComplete*" } | ForEach-Object { [System.Management.Automation.CompletionResult]::new($_, $_, 'ParameterName', $_) }
+        }
         'new' {
             '--pack-name','--pack-format','--output','--exclude-local-docs','--help','-h' | Where-Object { $_ -like "$wordToComplete*" } | ForEach-Object { [System.Management.Automation.CompletionResult]::new($_, $_, 'ParameterName', $_) }
         }
@@ -0,0 +1,158 @@
+"""
+Diagnostics Output - Machine-readable check and lint results
+
+A DiagnosticWriter receives the issues of each file as soon as the file is
+checked and writes them to its stream right away, so CI jobs and editors can
+consume results from large repositories incrementally.
+
+Formats:
+    json    One JSON document: {"diagnostics": [...], "summary": {...}}. Records
+            are written as files finish; the summary closes the document.
+    ndjson  One JSON record per line.
+    sarif   A SARIF 2.1.0 log whose results are written as files finish.
+"""
+
+import json
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO
+
+from .mdl_linter import MDLLintIssue
+
+DIAGNOSTIC_FORMATS = ("json", "ndjson", "sarif")
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+_SARIF_LEVELS = {"error": "error", "warning": "warning", "info": "note"}
+
+
+def diagnostic_record(file_path: str, issue: MDLLintIssue) -> dict:
+    """One issue as a JSON-ready dict. Line and column are 1-based; None when unknown."""
+    return {
+        "file": file_path,
+        "line": issue.line_number or None,
+        "column": issue.column,
+        "severity": issue.severity,
+        "type": issue.category,
+        "message": issue.message,
+        "suggestion": issue.suggestion,
+    }
+
+
+class DiagnosticWriter(ABC):
+    """Base class: writes each file's issues as it arrives and counts them by severity."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.files = 0
+        self.counts: Dict[str, int] = {"error": 0, "warning": 0, "info": 0}
+
+    def begin(self):
+        pass
+
+    def file(self, file_path: str, issues: List[MDLLintIssue]):
+        self.files += 1
+        for issue in issues:
+            self.counts[issue.severity] = self.counts.get(issue.severity, 0) + 1
+            self.write_record(diagnostic_record(file_path, issue))
+        self.stream.flush()
+
+    @abstractmethod
+    def write_record(self, record: dict):
+        """Write one diagnostic record."""
+
+    def end(self):
+        self.stream.flush()
+
+    def summary(self) -> dict:
+        return {"files": self.files, "errors": self.counts["error"],
+                "warnings": self.counts["warning"], "info": self.counts["info"]}
+
+
+class NDJSONWriter(DiagnosticWriter):
+    def write_record(self, record: dict):
+        self.stream.write(json.dumps(record) + "\n")
+
+
+class _StreamedArrayWriter(DiagnosticWriter):
+    """Writes records as the elements of a JSON array between a fixed head and tail."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        super().__init__(stream)
+        self._first = True
+
+    def write_element(self, value: dict, indent: str):
+        self.stream.write(("\n" if self._first else ",\n") + indent + json.dumps(value))
+        self._first = False
+
+
+class JSONWriter(_StreamedArrayWriter):
+    def begin(self):
+        self.stream.write('{"diagnostics": [')
+        self.stream.flush()
+
+    def write_record(self, record: dict):
+        self.write_element(record, "  ")
+
+    def end(self):
+        self.stream.write(("" if self._first else "\n") + '], "summary": '
+                          + json.dumps(self.summary()) + "}\n")
+        super().end()
+
+
+class SARIFWriter(_StreamedArrayWriter):
+    def begin(self):
+        try:
+            from . import __version__
+        except Exception:
+            __version__ = "0.0.0"
+        driver = {"name": "mdl", "version": __version__,
+                  "informationUri": "https://github.com/aaron777collins/MinecraftDatapackLanguage"}
+        head = json.dumps({"$schema": SARIF_SCHEMA, "version": "2.1.0",
+                           "runs": [{"tool": {"driver": driver}, "results": []}]})
+        # Stream the results: leave the (last) results array open
+        self.stream.write(head[:-len("]}]}")])
+        self.stream.flush()
+
+    def write_record(self, record: dict):
+        self.write_element(sarif_result(record), "      ")
+
+    def end(self):
+        self.stream.write(("" if self._first else "\n    ") + "]}]}\n")
+        super().end()
+
+
+def sarif_result(record: dict) -> dict:
+    """A diagnostic record as a SARIF result object."""
+    location = {"artifactLocation": {"uri": _artifact_uri(record["file"])}}
+    if record["line"]:
+        region = {"startLine": record["line"]}
+        if record["column"]:
+            region["startColumn"] = record["column"]
+        location["region"] = region
+    result = {
+        "ruleId": record["type"],
+        "level": _SARIF_LEVELS.get(record["severity"], "warning"),
+        "message": {"text": record["message"]},
+        "locations": [{"physicalLocation": location}],
+    }
+    if record["suggestion"]:
+        result["properties"] = {"suggestion": record["suggestion"]}
+    return result
+
+
+def _artifact_uri(file_path: str) -> str:
+    path = Path(file_path)
+    return path.as_uri() if path.is_absolute() else path.as_posix()
+
+
+_WRITERS = {"json": JSONWriter, "ndjson": NDJSONWriter, "sarif": SARIFWriter}
+
+
+def diagnostic_writer(output_format: str, stream: Optional[TextIO] = None) -> DiagnosticWriter:
+    """The writer for one of DIAGNOSTIC_FORMATS."""
+    try:
+        return _WRITERS[output_format](stream)
+    except KeyError:
+        raise ValueError(f"Unknown diagnostics format {output_format!r} "
+                         f"(expected one of {', '.join(DIAGNOSTIC_FORMATS)})") from None
@@ -1,6 +1,7 @@
 
 from dataclasses import dataclass
 from typing import Dict
+from .pack_formats import get_capabilities
 
 @dataclass(frozen=True)
 class DirMap:
@@ -18,41 +19,43 @@ class DirMap:
     tags_fluid: str
     tags_game_event: str
 
+SINGULAR_DIR_MAP = DirMap(
+    function="function",
+    advancement="advancement",
+    recipe="recipe",
+    loot_table="loot_table",
+    predicate="predicate",
+    item_modifier="item_modifier",
+    structure="structure",
+    tags_function="tags/function",
+    tags_item="tags/item",
+    tags_block="tags/block",
+    tags_entity_type="tags/entity_type",
+    tags_fluid="tags/fluid",
+    tags_game_event="tags/game_event",
+)
+
+LEGACY_DIR_MAP = DirMap(
+    function="functions",
+    advancement="advancements",
+    recipe="recipes",
+    loot_table="loot_tables",
+    predicate="predicates",
+    item_modifier="item_modifiers",
+    structure="structures",
+    tags_function="tags/functions",
+    tags_item="tags/items",
+    tags_block="tags/blocks",
+    tags_entity_type="tags/entity_types",
+    tags_fluid="tags/fluids",
+    tags_game_event="tags/game_events",
+)
+
 def get_dir_map(pack_format: int) -> DirMap:
     """Return the correct directory mapping based on datapack pack_format.
-    >=45 uses singular function folders (function/ instead of functions/).
-    >=43 uses singular tag folders (item/ instead of items/, etc.).
-    <43 uses legacy plural folders.
+    >=45 uses singular folders (function/ instead of functions/, tags/item/ instead of tags/items/).
+    <45 uses legacy plural folders.
     """
-    if pack_format >= 45:
-        return DirMap(
-            function="function",
-            advancement="advancement",
-            recipe="recipe",
-            loot_table="loot_table",
-            predicate="predicate",
-            item_modifier="item_modifier",
-            structure="structure",
-            tags_function="tags/function",
-            tags_item="tags/item",
-            tags_block="tags/block",
-            tags_entity_type="tags/entity_type",
-            tags_fluid="tags/fluid",
-            tags_game_event="tags/game_event",
-        )
-    else:
-        return DirMap(
-            function="functions",
-            advancement="advancements",
-            recipe="recipes",
-            loot_table="loot_tables",
-            predicate="predicates",
-            item_modifier="item_modifiers",
-            structure="structures",
-            tags_function="tags/functions",
-            tags_item="tags/items",
-            tags_block="tags/blocks",
-            tags_entity_type="tags/entity_types",
-            tags_fluid="tags/fluids",
-            tags_game_event="tags/game_events",
-        )
+    if get_capabilities(pack_format).singular_resource_folders:
+        return SINGULAR_DIR_MAP
+    return LEGACY_DIR_MAP
@@ -0,0 +1,142 @@
+"""
+Build Instrumentation - Per-phase wall time, CPU time and peak memory for builds
+
+A PhaseTimer is passed to MDLParser and MDLCompiler (and used by `mdl build --timings`).
+Embedders can attach listeners to receive each phase as it finishes:
+
+    timer = PhaseTimer(track_memory=True)
+    timer.add_listener(lambda record: print(record.name, record.wall))
+    MDLCompiler(timer=timer).compile(MDLParser(timer=timer).parse(source))
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class PhaseRecord:
+    """One finished run of a phase."""
+    name: str
+    wall: float  # seconds
+    cpu: float  # seconds of process CPU time
+    peak_memory: Optional[int] = None  # bytes allocated above the level at phase start
+    depth: int = 0  # nesting level (0 = top-level phase)
+
+
+@dataclass
+class PhaseStats:
+    """Totals for every run of a phase name (e.g. 'lex' once per source file)."""
+    name: str
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    peak_memory: Optional[int] = None
+    depth: int = 0
+
+    def add(self, record: PhaseRecord):
+        self.calls += 1
+        self.wall += record.wall
+        self.cpu += record.cpu
+        if record.peak_memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, record.peak_memory)
+
+
+PhaseListener = Callable[[PhaseRecord], None]
+
+
+@dataclass
+class _OpenPhase:
+    name: str
+    wall_start: float
+    cpu_start: float
+    memory_start: int = 0
+    # Highest traced memory seen by nested phases, which reset the tracemalloc peak
+    peak_seen: int = 0
+
+
+class PhaseTimer:
+    """Collects timings for named build phases; nested phases are timed independently."""
+
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self.phases: Dict[str, PhaseStats] = {}
+        self.listeners: List[PhaseListener] = []
+        self._open: List[_OpenPhase] = []
+        self._started_tracemalloc = False
+
+    def add_listener(self, listener: PhaseListener):
+        """Call listener with a PhaseRecord every time a phase finishes."""
+        self.listeners.append(listener)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            current, peak = tracemalloc.get_traced_memory()
+            if self._open:
+                self._open[-1].peak_seen = max(self._open[-1].peak_seen, peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+        frame = _OpenPhase(name, time.perf_counter(), time.process_time(), current, current)
+        self._open.append(frame)
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - frame.wall_start
+            cpu = time.process_time() - frame.cpu_start
+            self._open.pop()
+            peak_memory = None
+            if self.track_memory and tracemalloc.is_tracing():
+                peak = max(frame.peak_seen, tracemalloc.get_traced_memory()[1])
+                peak_memory = peak - frame.memory_start
+                if self._open:
+                    self._open[-1].peak_seen = max(self._open[-1].peak_seen, peak)
+            record = PhaseRecord(name, wall, cpu, peak_memory, depth=len(self._open))
+            self.phases.setdefault(name, PhaseStats(name, depth=record.depth)).add(record)
+            for listener in self.listeners:
+                listener(record)
+
+    def close(self):
+        """Stop tracemalloc if this timer started it."""
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracemalloc = False
+
+    def to_dict(self) -> dict:
+        return {
+            "phases": [
+                {"name": s.name, "calls": s.calls, "wall_ms": round(s.wall * 1000, 3),
+                 "cpu_ms": round(s.cpu * 1000, 3), "peak_memory_bytes": s.peak_memory, "depth": s.depth}
+                for s in self.phases.values()
+            ]
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    def format_human(self) -> str:
+        """Aligned table of phases in the order they first ran, nested phases indented."""
+        lines = [f"{'Phase':<22} {'Calls':>5} {'Wall ms':>10} {'CPU ms':>10} {'Peak KiB':>10}"]
+        for stats in self.phases.values():
+            label = "  " * stats.depth + stats.name
+            memory = "-" if stats.peak_memory is None else f"{stats.peak_memory / 1024:.1f}"
+            lines.append(f"{label:<22} {stats.calls:>5} {stats.wall * 1000:>10.2f} "
+                         f"{stats.cpu * 1000:>10.2f} {memory:>10}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def _no_phase() -> Iterator[None]:
+    yield
+
+
+def timed(timer: Optional[PhaseTimer], name: str):
+    """timer.phase(name), or a no-op context when no timer is attached."""
+    return timer.phase(name) if timer is not None else _no_phase()
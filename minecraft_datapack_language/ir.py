@@ -0,0 +1,368 @@
+"""
+MDL Intermediate Representation - Typed commands between the AST and mcfunction text
+
+The compiler lowers AST statements into IR instructions grouped into one Block per
+generated function, runs optimization passes over the module, and only then
+serializes each block to mcfunction lines.
+"""
+
+import re
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+@dataclass(frozen=True)
+class Score:
+    """A scoreboard slot: score holder (selector or fake player) plus objective."""
+    holder: str
+    objective: str
+
+    def __str__(self) -> str:
+        return f"score {self.holder} {self.objective}"
+
+
+# Conditions (execute if/unless subcommands)
+@dataclass(frozen=True)
+class Condition:
+    """Base class for execute conditions; negate selects 'unless' instead of 'if'."""
+
+    @property
+    def keyword(self) -> str:
+        return "unless" if getattr(self, "negate", False) else "if"
+
+    def negated(self) -> "Condition":
+        return replace(self, negate=not getattr(self, "negate", False))
+
+    def test(self) -> str:
+        """Condition text without the leading if/unless."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return f"{self.keyword} {self.test()}"
+
+    def scores(self) -> List[Score]:
+        return []
+
+
+@dataclass(frozen=True)
+class ScoreMatches(Condition):
+    """score <holder> <objective> matches <range>"""
+    score: Score
+    range: str
+    negate: bool = False
+
+    def test(self) -> str:
+        return f"{self.score} matches {self.range}"
+
+    def scores(self) -> List[Score]:
+        return [self.score]
+
+
+@dataclass(frozen=True)
+class ScoreCompare(Condition):
+    """score <left> <op> <right> with op one of <, <=, =, >=, >"""
+    left: Score
+    operator: str
+    right: Score
+    negate: bool = False
+
+    def test(self) -> str:
+        return f"{self.left} {self.operator} {self.right.holder} {self.right.objective}"
+
+    def scores(self) -> List[Score]:
+        return [self.left, self.right]
+
+
+@dataclass(frozen=True)
+class EntityExists(Condition):
+    """entity <selector>"""
+    selector: str
+    negate: bool = False
+
+    def test(self) -> str:
+        return f"entity {self.selector}"
+
+
+@dataclass(frozen=True)
+class FunctionCondition(Condition):
+    """function <namespace:name>: passes when the function returns a non-zero value (1.20.3+)"""
+    function: str
+    negate: bool = False
+
+    def test(self) -> str:
+        return f"function {self.function}"
+
+
+@dataclass(frozen=True)
+class RawCondition(Condition):
+    """Condition text the compiler could not type more precisely."""
+    text: str
+    negate: bool = False
+
+    def test(self) -> str:
+        return self.text
+
+
+@dataclass(frozen=True)
+class As:
+    """execute as <selector>"""
+    selector: str
+
+    def render(self) -> str:
+        return f"as {self.selector}"
+
+    def scores(self) -> List[Score]:
+        return []
+
+
+# Instructions
+@dataclass
+class Instruction:
+    """Base class for IR instructions."""
+    # SourceSpan of the MDL statement this came from; a class attribute, not a field,
+    # so it is neither compared nor required by the subclasses' constructors
+    span = None
+
+    def render(self) -> str:
+        raise NotImplementedError
+
+    def scores(self) -> List[Score]:
+        """Every score this instruction reads or writes."""
+        return []
+
+    def written_score(self) -> Optional[Score]:
+        """The score this instruction assigns, if it is a plain score update."""
+        return None
+
+
+@dataclass
+class ScoreSet(Instruction):
+    target: Score
+    value: str
+
+    def render(self) -> str:
+        return f"scoreboard players set {self.target.holder} {self.target.objective} {self.value}"
+
+    def scores(self) -> List[Score]:
+        return [self.target]
+
+    def written_score(self) -> Optional[Score]:
+        return self.target
+
+
+@dataclass
+class ScoreAdd(Instruction):
+    target: Score
+    amount: str
+
+    def render(self) -> str:
+        return f"scoreboard players add {self.target.holder} {self.target.objective} {self.amount}"
+
+    def scores(self) -> List[Score]:
+        return [self.target]
+
+    def written_score(self) -> Optional[Score]:
+        return self.target
+
+
+@dataclass
+class ScoreRemove(Instruction):
+    target: Score
+    amount: str
+
+    def render(self) -> str:
+        return f"scoreboard players remove {self.target.holder} {self.target.objective} {self.amount}"
+
+    def scores(self) -> List[Score]:
+        return [self.target]
+
+    def written_score(self) -> Optional[Score]:
+        return self.target
+
+
+@dataclass
+class ScoreOperation(Instruction):
+    """scoreboard players operation <target> <op> <source>"""
+    target: Score
+    operator: str  # =, +=, -=, *=, /=, %=, <, >, ><
+    source: Score
+
+    def render(self) -> str:
+        return (f"scoreboard players operation {self.target.holder} {self.target.objective} "
+                f"{self.operator} {self.source.holder} {self.source.objective}")
+
+    def scores(self) -> List[Score]:
+        return [self.target, self.source]
+
+    def written_score(self) -> Optional[Score]:
+        return self.target
+
+
+@dataclass
+class Call(Instruction):
+    """function <namespace:name> [macro arguments]"""
+    function: str
+    arguments: Optional[str] = None  # inline compound or "with <source> [path]"
+
+    def render(self) -> str:
+        if self.arguments:
+            return f"function {self.function} {self.arguments}"
+        return f"function {self.function}"
+
+
+@dataclass
+class Schedule(Instruction):
+    """schedule function <namespace:name> <delay>"""
+    function: str
+    delay: str = "1t"
+
+    def render(self) -> str:
+        return f"schedule function {self.function} {self.delay}"
+
+
+@dataclass
+class TagChange(Instruction):
+    """tag <selector> add|remove <tag>"""
+    selector: str
+    tag: str
+    add: bool = True
+
+    def render(self) -> str:
+        return f"tag {self.selector} {'add' if self.add else 'remove'} {self.tag}"
+
+
+@dataclass
+class Execute(Instruction):
+    """execute <clauses...> run <instruction>"""
+    clauses: List[object]  # Condition or As
+    run: Instruction
+
+    def render(self) -> str:
+        parts = " ".join(clause.render() for clause in self.clauses)
+        return f"execute {parts} run {self.run.render()}"
+
+    def scores(self) -> List[Score]:
+        found: List[Score] = []
+        for clause in self.clauses:
+            found.extend(clause.scores())
+        found.extend(self.run.scores())
+        return found
+
+
+@dataclass
+class Return(Instruction):
+    """return <value>"""
+    value: str
+
+    def render(self) -> str:
+        return f"return {self.value}"
+
+
+@dataclass
+class Raw(Instruction):
+    """Verbatim command text (raw blocks, macro lines, tellraw); may span several lines."""
+    text: str
+
+    def render(self) -> str:
+        return self.text
+
+
+@dataclass
+class Comment(Instruction):
+    text: str
+
+    def render(self) -> str:
+        return f"# {self.text}"
+
+
+@dataclass
+class Blank(Instruction):
+    def render(self) -> str:
+        return ""
+
+
+# Functions and module
+@dataclass
+class Block:
+    """Straight-line body of one generated .mcfunction file."""
+    namespace: str
+    name: str
+    instructions: List[Instruction] = field(default_factory=list)
+    # Prepend the global armor stand check when serializing
+    ensure_global: bool = False
+
+    @property
+    def function_id(self) -> str:
+        return f"{self.namespace}:{self.name}"
+
+
+@dataclass
+class IRModule:
+    """All function blocks of one datapack, in emission order."""
+    functions: Dict[str, Block] = field(default_factory=dict)
+    # Compiler-generated temporary objectives that passes may rename or drop
+    temp_objectives: Set[str] = field(default_factory=set)
+
+    def add(self, block: Block) -> Block:
+        self.functions[block.function_id] = block
+        return block
+
+    def blocks(self) -> Iterator[Block]:
+        return iter(list(self.functions.values()))
+
+
+_WORD_RE = re.compile(r"[A-Za-z0-9_.+-]+")
+
+
+def _raw_texts(instruction: Instruction) -> List[str]:
+    """Untyped text carried by an instruction (raw commands and raw conditions)."""
+    if isinstance(instruction, Raw):
+        return [instruction.text]
+    if isinstance(instruction, Execute):
+        texts = [c.text for c in instruction.clauses if isinstance(c, RawCondition)]
+        return texts + _raw_texts(instruction.run)
+    return []
+
+
+def referenced_objectives(instruction: Instruction) -> Set[str]:
+    """Objectives an instruction may touch; raw text is scanned word by word to stay conservative."""
+    names = {score.objective for score in instruction.scores()}
+    for text in _raw_texts(instruction):
+        names.update(_WORD_RE.findall(text))
+    return names
+
+
+_MACRO_RE = re.compile(r"\$\([A-Za-z_][A-Za-z0-9_]*\)")
+
+
+def _ensure_macro_prefix(line: str) -> str:
+    """Ensure a line containing a macro placeholder $(var) starts with '$'."""
+    if _MACRO_RE.search(line):
+        stripped = line.lstrip()
+        if not stripped.startswith('$'):
+            # Insert '$' immediately after indentation so there is no space after '$'
+            leading_ws = line[:len(line) - len(stripped)]
+            return f"{leading_ws}${stripped}"
+    return line
+
+
+def render_block_lines(block: Block, global_lines: Optional[List[str]] = None) -> List[Tuple[str, object]]:
+    """Render a block to (mcfunction line, source span or None) pairs."""
+    lines: List[Tuple[str, object]] = []
+    header_done = False
+    for instruction in block.instructions:
+        if not header_done and not isinstance(instruction, (Comment, Blank)):
+            header_done = True
+            if block.ensure_global and global_lines:
+                lines.extend((line, None) for line in global_lines)
+                lines.append(("", None))
+        for line in instruction.render().split("\n"):
+            lines.append((_ensure_macro_prefix(line), instruction.span))
+    if not header_done and block.ensure_global and global_lines:
+        lines.extend((line, None) for line in global_lines)
+    return lines
+
+
+def serialize_block(block: Block, global_lines: Optional[List[str]] = None) -> str:
+    """Render a block to mcfunction text."""
+    return "\n".join(line for line, _ in render_block_lines(block, global_lines)) + "\n"
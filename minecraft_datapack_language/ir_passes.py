@@ -0,0 +1,106 @@
+"""
+MDL IR Passes - Optimizations that run on the IR module before serialization
+"""
+
+from collections import Counter
+from dataclasses import replace
+from typing import Callable, Iterable, List
+
+from .ir import (
+    IRModule, Instruction, ScoreSet, ScoreAdd, ScoreRemove, ScoreOperation,
+    referenced_objectives
+)
+
+IRPass = Callable[[IRModule], None]
+
+# Holders whose identity cannot change between consecutive commands (the executor and
+# the <global> armor stand); @r, @p and multi-entity selectors are excluded so
+# rewritten writes hit the same entities
+_STABLE_HOLDERS = ("@s", "@e[type=armor_stand,tag=mdl_global,limit=1]")
+
+
+def remove_self_assignments(module: IRModule) -> None:
+    """Drop 'operation X = X' copies, e.g. from `x = $x$`."""
+    for block in module.blocks():
+        block.instructions = [
+            ins for ins in block.instructions
+            if not (isinstance(ins, ScoreOperation) and ins.operator == "=" and ins.target == ins.source)
+        ]
+
+
+def _count_references(module: IRModule) -> Counter:
+    counts: Counter = Counter()
+    for block in module.blocks():
+        for ins in block.instructions:
+            counts.update(referenced_objectives(ins) & module.temp_objectives)
+    return counts
+
+
+def coalesce_temp_copies(module: IRModule) -> None:
+    """Compute expression results directly into their destination.
+
+    Rewrites
+        set @s temp_1 <v> ; add @s temp_1 2 ; operation @s x = @s temp_1
+    into
+        set @s x <v> ; add @s x 2
+    when temp_1 is written only by the contiguous run right before the copy, is not
+    referenced anywhere else in the module, and the run never reads x.
+    """
+    counts = _count_references(module)
+    for block in module.blocks():
+        instructions = block.instructions
+        index = 0
+        while index < len(instructions):
+            copy = instructions[index]
+            if not (isinstance(copy, ScoreOperation) and copy.operator == "="
+                    and copy.source.objective in module.temp_objectives
+                    and copy.source.holder in _STABLE_HOLDERS
+                    and copy.target.holder in _STABLE_HOLDERS
+                    and copy.target != copy.source):
+                index += 1
+                continue
+            temp = copy.source
+            start = index
+            while start > 0:
+                candidate = instructions[start - 1]
+                if not isinstance(candidate, (ScoreSet, ScoreAdd, ScoreRemove, ScoreOperation)):
+                    break
+                if candidate.target != temp:
+                    break
+                if isinstance(candidate, ScoreOperation) and candidate.source.objective in (temp.objective, copy.target.objective):
+                    break
+                start -= 1
+            definitions = instructions[start:index]
+            initialized = definitions and (
+                isinstance(definitions[0], ScoreSet)
+                or (isinstance(definitions[0], ScoreOperation) and definitions[0].operator == "=")
+            )
+            if not initialized or counts[temp.objective] != len(definitions) + 1:
+                index += 1
+                continue
+            rewritten: List[Instruction] = [replace(ins, target=copy.target) for ins in definitions]
+            for new, old in zip(rewritten, definitions):
+                new.span = old.span
+            instructions[start:index + 1] = rewritten
+            counts[temp.objective] = 0
+            index = start + len(rewritten)
+
+
+def drop_unused_temps(module: IRModule) -> None:
+    """Forget temporary objectives that no instruction references any more."""
+    counts = _count_references(module)
+    module.temp_objectives = {name for name in module.temp_objectives if counts[name]}
+
+
+DEFAULT_PASSES: List[IRPass] = [
+    remove_self_assignments,
+    coalesce_temp_copies,
+    drop_unused_temps,
+]
+
+
+def run_passes(module: IRModule, passes: Iterable[IRPass] = DEFAULT_PASSES) -> IRModule:
+    """Run optimization passes over the module in order."""
+    for ir_pass in passes:
+        ir_pass(module)
+    return module
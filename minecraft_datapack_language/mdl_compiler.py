@@ -5,18 +5,42 @@ Simplified version that focuses on generating actual statements for testing
 
 import os
 import json
-import shutil
+import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Set
+from typing import Callable, Dict, Iterable, List, Any, Optional, Set, Union
 from .ast_nodes import (
     Program, PackDeclaration, NamespaceDeclaration, TagDeclaration,
     VariableDeclaration, VariableAssignment, VariableSubstitution, FunctionDeclaration,
     FunctionCall, IfStatement, WhileLoop, ScheduledWhileLoop, HookDeclaration, RawBlock, MacroLine,
-    SayCommand, BinaryExpression, UnaryExpression, LiteralExpression, ParenthesizedExpression
+    SayCommand, BinaryExpression, UnaryExpression, LiteralExpression, ParenthesizedExpression,
+    SourceSpan
 )
 from .dir_map import get_dir_map, DirMap
+from .ir import (
+    IRModule, Block, Instruction, Score, Condition, ScoreMatches, ScoreCompare, EntityExists,
+    FunctionCondition, RawCondition, As, ScoreSet, ScoreAdd, ScoreRemove, ScoreOperation, Call, Schedule,
+    TagChange, Execute, Return, Raw, Comment, Blank, render_block_lines
+)
+from .ir_passes import run_passes
+from .call_graph import prune_unreachable
+from .profiler import instrument_module, PROFILE_OBJECTIVE, SORT_OBJECTIVE
+from .source_map import SourceMap, SOURCE_MAP_FILE
+from .instrumentation import PhaseTimer, timed
+from .pack_formats import PackCapabilities, get_capabilities, CAPABILITY_INTRODUCED
 from .mdl_errors import MDLCompilerError
 from .mdl_lexer import TokenType
+from .utils import write_output_files
+
+logger = logging.getLogger(__name__)
+
+
+def _attach_span(instructions: Iterable[Instruction], span: Optional[SourceSpan]):
+    """Give instructions that do not have a source span yet this one."""
+    if span is None:
+        return
+    for instruction in instructions:
+        if instruction.span is None:
+            instruction.span = span
 
 
 class MDLCompiler:
@@ -24,8 +48,27 @@ class MDLCompiler:
     Simplified compiler for the MDL language that generates actual statements.
     """
     
-    def __init__(self, output_dir: str = "dist"):
+    # AST statement type -> lowering (filled in below the class) and per-class lookup cache
+    _statement_visitors: Dict[type, Callable[..., List[Instruction]]] = {}
+    _visitor_cache: Dict[type, Optional[Callable[..., List[Instruction]]]] = {}
+    
+    def __init__(self, output_dir: str = "dist", target_format: Optional[int] = None,
+                 prune_unreachable: bool = False, keep_functions: Optional[Iterable[str]] = None,
+                 profile: bool = False, source_map: bool = False, timer: Optional[PhaseTimer] = None):
         self.output_dir = Path(output_dir)
+        # Overrides the pack declaration's pack_format when set (mdl build --target-format)
+        self.target_format = target_format
+        # Drop functions that no hook, function tag or kept entry point can reach
+        self.prune_unreachable = prune_unreachable
+        self.keep_functions: Set[str] = set(keep_functions or [])
+        # Count calls of every function and emit profile/dump and profile/reset (mdl build --profile)
+        self.profile = profile
+        # Also emit .mdl-sourcemap.json linking generated lines to MDL source (mdl build --source-map)
+        self.source_map = source_map
+        # Optional PhaseTimer that receives per-phase build timings (mdl build --timings)
+        self.timer = timer
+        self.pack_format: int = 15
+        self.capabilities: PackCapabilities = get_capabilities(self.pack_format)
         self.dir_map: Optional[DirMap] = None
         self.current_namespace = "mdl"
         self.variables: Dict[str, str] = {}  # name -> objective mapping
@@ -35,271 +78,318 @@ class MDLCompiler:
         self.temp_variables: Set[str] = set()
         # Track if global scope is used anywhere
         self.uses_global_scope: bool = False
+        # Lowered function bodies, optimized and serialized at the end of generate()
+        self.ir: IRModule = IRModule()
+        # Instruction lists that temp commands are routed into (innermost body last)
+        self._temp_sink_stack: List[List[Instruction]] = []
+        # Spans of the statements being lowered (innermost last)
+        self._span_stack: List[Optional[SourceSpan]] = []
+        # Generated datapack files: pack-relative POSIX path -> content
+        self.output_files: Dict[str, Union[str, bytes]] = {}
         
     def compile(self, ast: Program, source_dir: str = None) -> str:
         """Compile MDL AST into a complete Minecraft datapack."""
+        # Use source_dir as output directory if provided
+        if source_dir:
+            output_dir = Path(source_dir)
+        else:
+            output_dir = self.output_dir
+        
+        files = self.generate(ast, source_dir)
+        
         try:
-            # Use source_dir as output directory if provided
-            if source_dir:
-                output_dir = Path(source_dir)
-            else:
-                output_dir = self.output_dir
-            
-            # Clean output directory
-            if output_dir.exists():
-                shutil.rmtree(output_dir)
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Temporarily set output directory
-            original_output_dir = self.output_dir
-            self.output_dir = output_dir
-            
-            # Set up directory mapping based on pack format
+            with timed(self.timer, "write"):
+                write_output_files(output_dir, files)
+        except OSError as e:
+            raise MDLCompilerError(f"Failed to write datapack: {str(e)}", suggestion="Check that the output directory is writable")
+        
+        return str(output_dir)
+    
+    def generate(self, ast: Program, source_dir: str = None) -> Dict[str, Union[str, bytes]]:
+        """Compile MDL AST into an in-memory datapack without touching the output directory.
+        Returns a mapping of pack-relative POSIX paths (e.g. data/ns/function/main.mcfunction) to file contents.
+        """
+        if self.target_format is not None:
+            pack_format = self.target_format
+        else:
             pack_format = ast.pack.pack_format if ast.pack else 15
-            self.dir_map = get_dir_map(pack_format)
+        return self.generate_formats(ast, [pack_format], source_dir)[pack_format]
+
+    def generate_formats(self, ast: Program, pack_formats: Iterable[int],
+                         source_dir: str = None) -> Dict[int, Dict[str, Union[str, bytes]]]:
+        """Lower the AST to IR once, then emit an in-memory datapack for each pack format.
+        Lowering checks features against the oldest format, so its IR is valid for every one;
+        only file layout (function and tag folders) differs between the emitted packs.
+        """
+        formats = sorted(set(pack_formats))
+        try:
+            self.output_files = {}
+            self.ir = IRModule()
+            
+            # Set up directory mapping and codegen capabilities based on pack format
+            self._set_pack_format(formats[0])
             
             # Create pack.mcmeta
             self._create_pack_mcmeta(ast.pack)
             
-            # Create data directory structure
-            data_dir = self.output_dir / "data"
-            data_dir.mkdir(parents=True, exist_ok=True)
-            
             # Set namespace
             if ast.namespace:
                 self.current_namespace = ast.namespace.name
             
-            # Create namespace directory (for default/current)
-            namespace_dir = data_dir / self.current_namespace
-            namespace_dir.mkdir(parents=True, exist_ok=True)
-            
             # Compile all components
-            self._compile_variables(ast.variables, namespace_dir)
-            self._compile_functions(ast.functions, data_dir)
-            self._compile_hooks(ast.hooks, namespace_dir)
-            self._compile_statements(ast.statements, namespace_dir)
-            self._compile_tags(ast.tags, source_dir)
-            
-            # Create load and tick functions for hooks
-            self._create_hook_functions(ast.hooks, namespace_dir)
-            
-            # Return the output directory path
-            result = str(self.output_dir)
-            
-            # Restore original output directory
-            self.output_dir = original_output_dir
-            
-            return result
+            with timed(self.timer, "variables"):
+                self._compile_variables(ast.variables)
+            with timed(self.timer, "functions"):
+                self._compile_functions(ast.functions)
+                self._compile_hooks(ast.hooks)
+                self._compile_statements(ast.statements)
+            with timed(self.timer, "tags"):
+                self._compile_tags(ast.tags, source_dir)
+
+            # Optimize the lowered functions, then write each one out exactly once per format
+            with timed(self.timer, "optimize"):
+                if self.prune_unreachable:
+                    self._prune_unreachable_functions(ast.hooks)
+                self._optimize_ir()
+                if self.profile:
+                    self._instrument_profiling()
+
+            packs: Dict[int, Dict[str, Union[str, bytes]]] = {}
+            for pack_format in formats:
+                if pack_format != self.pack_format:
+                    # Only the layout changes: start a fresh file set in this format's folders
+                    self._set_pack_format(pack_format)
+                    self.output_files = {}
+                    self._create_pack_mcmeta(ast.pack)
+                    with timed(self.timer, "tags"):
+                        self._compile_tags(ast.tags, source_dir)
+                with timed(self.timer, "emit"):
+                    self._emit_ir_functions()
+                
+                # Create load and tick functions for hooks
+                with timed(self.timer, "hooks"):
+                    self._create_hook_functions(ast.hooks)
+                
+                logger.info("Compiled %d variable(s), %d function(s) (%d generated files), %d tag(s) for pack format %d",
+                            len(ast.variables), len(ast.functions), len(self.output_files), len(ast.tags), pack_format)
+                packs[pack_format] = self.output_files
+            return packs
             
         except Exception as e:
-            # Restore original output directory on error
-            if 'original_output_dir' in locals():
-                self.output_dir = original_output_dir
-                
             if isinstance(e, MDLCompilerError):
                 raise e
             else:
                 raise MDLCompilerError(f"Compilation failed: {str(e)}", "Check the AST structure")
     
+    def _set_pack_format(self, pack_format: int):
+        self.pack_format = pack_format
+        self.capabilities = get_capabilities(pack_format)
+        self.dir_map = get_dir_map(pack_format)
+    
+    def _emit_file(self, rel_path: str, content: Union[str, bytes]):
+        """Record a generated file under its pack-relative path."""
+        self.output_files[rel_path] = content
+    
+    def _functions_path(self, namespace: str) -> str:
+        """Pack-relative function folder for a namespace."""
+        folder = self.dir_map.function if self.dir_map else "functions"
+        return f"data/{namespace}/{folder}"
+    
     def _create_pack_mcmeta(self, pack: Optional[PackDeclaration]):
         """Create pack.mcmeta file."""
         if not pack:
             pack_data = {
                 "pack": {
-                    "pack_format": 15,
+                    "pack_format": self.pack_format,
                     "description": "MDL Generated Datapack"
                 }
             }
         else:
             pack_data = {
                 "pack": {
-                    "pack_format": pack.pack_format,
+                    "pack_format": self.pack_format,
                     "description": pack.description
                 }
             }
         
-        pack_mcmeta_path = self.output_dir / "pack.mcmeta"
-        with open(pack_mcmeta_path, 'w') as f:
-            json.dump(pack_data, f, indent=2)
+        self._emit_file("pack.mcmeta", json.dumps(pack_data, indent=2))
     
-    def _compile_variables(self, variables: List[VariableDeclaration], namespace_dir: Path):
+    def _compile_variables(self, variables: List[VariableDeclaration]):
         """Compile variable declarations into scoreboard objectives."""
         for var in variables:
             objective_name = var.name
             self.variables[var.name] = objective_name
             self.declared_variables.append(var)
-            print(f"Variable: {var.name} -> scoreboard objective '{objective_name}'")
+            logger.debug("Variable: %s -> scoreboard objective '%s'", var.name, objective_name)
     
-    def _compile_functions(self, functions: List[FunctionDeclaration], data_dir: Path):
-        """Compile function declarations into .mcfunction files."""
+    def _compile_functions(self, functions: List[FunctionDeclaration]):
+        """Lower function declarations into IR blocks."""
         for func in functions:
-            # Ensure namespace directory per function
-            ns_dir = data_dir / func.namespace
-            ns_dir.mkdir(parents=True, exist_ok=True)
-            if self.dir_map:
-                functions_dir = ns_dir / self.dir_map.function
-            else:
-                functions_dir = ns_dir / "functions"
-            functions_dir.mkdir(parents=True, exist_ok=True)
-            func_file = functions_dir / f"{func.name}.mcfunction"
-            content = self._generate_function_content(func)
-            
-            with open(func_file, 'w') as f:
-                f.write(content)
-            
-            print(f"Function: {func.namespace}:{func.name} -> {func_file}")
+            self.ir.add(self._generate_function_block(func))
+            logger.debug("Function: %s:%s -> %s/%s.mcfunction", func.namespace, func.name,
+                         self._functions_path(func.namespace), func.name)
     
-    def _generate_function_content(self, func: FunctionDeclaration) -> str:
-        """Generate the content of a .mcfunction file."""
-        lines = []
-        lines.append(f"# Function: {func.namespace}:{func.name}")
+    def _generate_function_block(self, func: FunctionDeclaration) -> Block:
+        """Lower the body of a user function into an IR block."""
+        body: List[Instruction] = [Comment(f"Function: {func.namespace}:{func.name}")]
         if func.scope:
-            lines.append(f"# Scope: {func.scope}")
-        lines.append("")
-        
-        # Ensure a temp-command sink stack exists
-        if not hasattr(self, '_temp_sink_stack'):
-            self._temp_sink_stack = []
+            body.append(Comment(f"Scope: {func.scope}"))
+        body.append(Blank())
         
         # Set current function context and reset per-function counters
         self._current_function_name = func.name
         self.if_counter = 0
         self.else_counter = 0
         self.while_counter = 0
+        self.condition_counter = 0
         
-        # Route temp commands into this function's body by default
-        self._temp_sink_stack.append(lines)
         # Generate commands from function body
-        for statement in func.body:
-            cmd = self._statement_to_command(statement)
-            if cmd:
-                lines.append(self._ensure_macro_prefix(cmd))
-        # Done routing temp commands for this function body
-        self._temp_sink_stack.pop()
-
-        # If global scope is used anywhere in the program, prepend ensure line here too
-        if self.uses_global_scope:
-            self._insert_ensure_global(lines)
+        self._compile_block(func.body, body)
+        _attach_span(body, func.span)
+
+        # If global scope is used anywhere so far, prepend ensure line here too
+        return Block(func.namespace, func.name, body, ensure_global=self.uses_global_scope)
         
-        return "\n".join(lines)
+    def _entry_points(self, hooks: List[HookDeclaration]) -> Set[str]:
+        """Functions that can be called from outside the generated code."""
+        roots = set(self.keep_functions)
+        roots.update(f"{hook.namespace}:{hook.name}" for hook in hooks)
+        # Function tags emitted so far (e.g. tags copied from the project) are external callers too
+        for values in self._emitted_function_tags().values():
+            roots.update(values)
+        return roots
 
-    def _ensure_macro_prefix(self, text: str) -> str:
-        """Ensure any line containing a macro placeholder $(var) starts with '$'.
-        Handles multi-line text by processing each line independently.
-        """
-        import re
-        macro_re = re.compile(r"\$\([A-Za-z_][A-Za-z0-9_]*\)")
-        def process_line(line: str) -> str:
-            if macro_re.search(line):
-                stripped = line.lstrip()
-                if not stripped.startswith('$'):
-                    # Insert '$' immediately after indentation so there is no space after '$'
-                    leading_ws_len = len(line) - len(stripped)
-                    leading_ws = line[:leading_ws_len]
-                    return f"{leading_ws}${stripped}"
-            return line
-        if '\n' in text:
-            return '\n'.join(process_line(ln) for ln in text.split('\n'))
-        return process_line(text)
+    def _emitted_function_tags(self) -> Dict[str, List[str]]:
+        """Function tags emitted so far: tag id (without '#') -> function ids and #tags it holds."""
+        tags: Dict[str, List[str]] = {}
+        for rel_path, content in self.output_files.items():
+            parts = rel_path.split("/")
+            if (len(parts) < 5 or parts[0] != "data" or parts[2] != "tags"
+                    or parts[3] not in ("function", "functions") or not rel_path.endswith(".json")):
+                continue
+            try:
+                values = json.loads(content).get("values", [])
+            except (ValueError, AttributeError):
+                continue
+            tag = f"{parts[1]}:{'/'.join(parts[4:])[:-len('.json')]}"
+            tags[tag] = [v["id"] if isinstance(v, dict) else v for v in values]
+        return tags
+
+    def _function_tags(self, hooks: List[HookDeclaration]) -> Dict[str, List[str]]:
+        """Function tags of the finished pack, including the load and tick tags that
+        _create_hook_functions adds after optimization."""
+        tags = self._emitted_function_tags()
+        tags.setdefault("minecraft:load", []).append(f"{self.current_namespace}:load")
+        if any(hook.hook_type == "on_tick" for hook in hooks):
+            tags.setdefault("minecraft:tick", []).append(f"{self.current_namespace}:tick")
+        return tags
+
+    def _prune_unreachable_functions(self, hooks: List[HookDeclaration]):
+        """Remove IR blocks that no entry point can reach."""
+        roots = self._entry_points(hooks)
+        removed = prune_unreachable(self.ir, roots, self._function_tags(hooks))
+        for function_id in removed:
+            logger.debug("Pruned unreachable function: %s", function_id)
+        if removed:
+            logger.info("Pruned %d unreachable function(s)", len(removed))
+
+    def _optimize_ir(self):
+        """Run IR passes and stop creating objectives for temps they eliminated."""
+        run_passes(self.ir)
+        for name in self.temp_variables - self.ir.temp_objectives:
+            self.temp_variables.discard(name)
+            self.variables.pop(name, None)
+
+    def _instrument_profiling(self):
+        """Add call counters to every function, plus the profile report functions."""
+        instrumented = instrument_module(self.ir, self.current_namespace)
+        for objective in (PROFILE_OBJECTIVE, SORT_OBJECTIVE):
+            self.variables.setdefault(objective, objective)
+        logger.info("Profiling: instrumented %d functions; report with /function %s:profile/dump",
+                    len(instrumented), self.current_namespace)
+
+    def _emit_ir_functions(self):
+        """Serialize every IR block to its .mcfunction file, recording line spans when asked."""
+        global_lines = self._ensure_global_lines()
+        source_map = SourceMap()
+        for block in self.ir.blocks():
+            func_file = f"{self._functions_path(block.namespace)}/{block.name}.mcfunction"
+            lines = render_block_lines(block, global_lines)
+            self._emit_file(func_file, "\n".join(line for line, _ in lines) + "\n")
+            source_map.add_file(func_file, [span for _, span in lines])
+        if self.source_map:
+            self._emit_file(SOURCE_MAP_FILE, source_map.to_json())
     
-    def _compile_hooks(self, hooks: List[HookDeclaration], namespace_dir: Path):
+    def _compile_hooks(self, hooks: List[HookDeclaration]):
         """Compile hook declarations."""
         for hook in hooks:
-            print(f"Hook: {hook.hook_type} -> {hook.namespace}:{hook.name}")
+            logger.debug("Hook: %s -> %s:%s", hook.hook_type, hook.namespace, hook.name)
     
-    def _compile_statements(self, statements: List[Any], namespace_dir: Path):
+    def _compile_statements(self, statements: List[Any]):
         """Compile top-level statements."""
         for statement in statements:
             if isinstance(statement, FunctionCall):
-                print(f"Top-level exec: {statement.namespace}:{statement.name}")
+                logger.debug("Top-level exec: %s:%s", statement.namespace, statement.name)
             elif isinstance(statement, RawBlock):
-                print(f"Top-level raw block: {len(statement.content)} characters")
+                logger.debug("Top-level raw block: %d characters", len(statement.content))
     
     def _compile_tags(self, tags: List[TagDeclaration], source_dir: str):
         """Compile tag declarations and copy referenced JSON files."""
         source_path = Path(source_dir) if source_dir else None
         
         for tag in tags:
-            if tag.tag_type == "recipe":
-                tag_dir = self.output_dir / "data" / "minecraft" / self.dir_map.tags_item
-            elif tag.tag_type == "loot_table":
-                tag_dir = self.output_dir / "data" / "minecraft" / self.dir_map.tags_item
-            elif tag.tag_type == "advancement":
-                tag_dir = self.output_dir / "data" / "minecraft" / self.dir_map.tags_item
-            elif tag.tag_type == "item_modifier":
-                tag_dir = self.output_dir / "data" / "minecraft" / self.dir_map.tags_item
-            elif tag.tag_type == "predicate":
-                tag_dir = self.output_dir / "data" / "minecraft" / self.dir_map.tags_item
-            elif tag.tag_type == "structure":
-                tag_dir = self.output_dir / "data" / "minecraft" / self.dir_map.tags_item
+            if tag.tag_type in ("recipe", "loot_table", "advancement", "item_modifier", "predicate", "structure"):
+                tag_dir = f"data/minecraft/{self.dir_map.tags_item}"
             elif tag.tag_type == "item":
                 # Namespace item tags (e.g., data/<ns>/tags/items/<name>.json)
-                ns_dir = self.output_dir / "data" / self.current_namespace / "tags"
                 # Prefer plural 'items' for compatibility
-                tag_dir = ns_dir / "items"
+                tag_dir = f"data/{self.current_namespace}/tags/items"
             else:
                 continue
             
-            tag_dir.mkdir(parents=True, exist_ok=True)
-            tag_file = tag_dir / f"{tag.name}.json"
+            tag_file = f"{tag_dir}/{tag.name}.json"
             
             if source_path and tag.tag_type != "item":
                 source_json = source_path / tag.file_path
                 if source_json.exists():
-                    shutil.copy2(source_json, tag_file)
-                    print(f"Tag {tag.tag_type}: {tag.name} -> {tag_file}")
+                    self._emit_file(tag_file, source_json.read_bytes())
+                    logger.debug("Tag %s: %s -> %s", tag.tag_type, tag.name, tag_file)
                 else:
                     tag_data = {"values": [f"{self.current_namespace}:{tag.name}"]}
-                    with open(tag_file, 'w') as f:
-                        json.dump(tag_data, f, indent=2)
-                    print(f"Tag {tag.tag_type}: {tag.name} -> {tag_file} (placeholder)")
+                    self._emit_file(tag_file, json.dumps(tag_data, indent=2))
+                    logger.debug("Tag %s: %s -> %s (placeholder)", tag.tag_type, tag.name, tag_file)
             else:
                 # Write simple values list
                 # For item tags, the TagDeclaration.name may include namespace:name
                 # The output filename should be the local name (after ':') if present
                 name_for_file = tag.name.split(":", 1)[1] if ":" in tag.name else tag.name
-                tag_file = tag_dir / f"{name_for_file}.json"
+                tag_file = f"{tag_dir}/{name_for_file}.json"
                 values = [tag.name if ":" in tag.name else f"{self.current_namespace}:{tag.name}"]
                 tag_data = {"values": values}
-                with open(tag_file, 'w') as f:
-                    json.dump(tag_data, f, indent=2)
-                print(f"Tag {tag.tag_type}: {tag.name} -> {tag_file} (generated)")
+                self._emit_file(tag_file, json.dumps(tag_data, indent=2))
+                logger.debug("Tag %s: %s -> %s (generated)", tag.tag_type, tag.name, tag_file)
     
-    def _create_hook_functions(self, hooks: List[HookDeclaration], namespace_dir: Path):
+    def _create_hook_functions(self, hooks: List[HookDeclaration]):
         """Create load.mcfunction and tick.mcfunction for hooks."""
-        if self.dir_map:
-            functions_dir = namespace_dir / self.dir_map.function
-        else:
-            functions_dir = namespace_dir / "functions"
-        # Ensure functions dir exists
-        functions_dir.mkdir(parents=True, exist_ok=True)
+        functions_dir = self._functions_path(self.current_namespace)
         
         # Always create load function to initialize objectives; add tag only if on_load hooks exist
         has_on_load = any(h.hook_type == "on_load" for h in hooks)
         load_content = self._generate_load_function(hooks)
-        load_file = functions_dir / "load.mcfunction"
-        with open(load_file, 'w') as f:
-            f.write(load_content)
+        self._emit_file(f"{functions_dir}/load.mcfunction", load_content)
         # Ensure minecraft load tag points to namespace:load
-        tags_fn_dir = self.output_dir / "data" / "minecraft" / self.dir_map.tags_function
-        tags_fn_dir.mkdir(parents=True, exist_ok=True)
-        load_tag_file = tags_fn_dir / "load.json"
+        tags_fn_dir = f"data/minecraft/{self.dir_map.tags_function}"
         # Always reference namespace:load (which handles scoreboard init and calls on_load hooks internally)
         values = [f"{self.current_namespace}:load"]
-        with open(load_tag_file, 'w') as f:
-            json.dump({"values": values}, f, indent=2)
+        self._emit_file(f"{tags_fn_dir}/load.json", json.dumps({"values": values}, indent=2))
         
         # Create tick function if needed
         tick_hooks = [h for h in hooks if h.hook_type == "on_tick"]
         if tick_hooks:
             tick_content = self._generate_tick_function(tick_hooks)
-            tick_file = functions_dir / "tick.mcfunction"
-            with open(tick_file, 'w') as f:
-                f.write(tick_content)
+            self._emit_file(f"{functions_dir}/tick.mcfunction", tick_content)
             # Ensure minecraft tick tag points to namespace:tick
-            tick_tag_file = tags_fn_dir / "tick.json"
-            with open(tick_tag_file, 'w') as f:
-                json.dump({"values": [f"{self.current_namespace}:tick"]}, f, indent=2)
+            self._emit_file(f"{tags_fn_dir}/tick.json", json.dumps({"values": [f"{self.current_namespace}:tick"]}, indent=2))
     
     def _generate_load_function(self, hooks: List[HookDeclaration]) -> str:
         """Generate the content of load.mcfunction."""
@@ -373,36 +463,77 @@ class MDLCompiler:
         
         return "\n".join(lines)
     
-    def _statement_to_command(self, statement: Any) -> Optional[str]:
-        """Convert an AST statement to a Minecraft command."""
-        if isinstance(statement, VariableAssignment):
-            return self._variable_assignment_to_command(statement)
-        elif isinstance(statement, VariableDeclaration):
-            return self._variable_declaration_to_command(statement)
-        elif isinstance(statement, SayCommand):
-            return self._say_command_to_command(statement)
-        elif isinstance(statement, RawBlock):
-            return statement.content
-        elif isinstance(statement, MacroLine):
-            return statement.content
-        elif isinstance(statement, IfStatement):
-            return self._if_statement_to_command(statement)
-        elif isinstance(statement, WhileLoop):
-            return self._while_loop_to_command(statement)
-        elif isinstance(statement, ScheduledWhileLoop):
-            return self._scheduled_while_to_command(statement)
-        elif isinstance(statement, FunctionCall):
-            return self._function_call_to_command(statement)
-        else:
-            return None
-    
-    def _variable_assignment_to_command(self, assignment: VariableAssignment) -> str:
-        """Convert variable assignment to scoreboard command."""
+    @classmethod
+    def register_statement_visitor(cls, node_type: type, visitor: Callable[..., List[Instruction]]):
+        """Register visitor(compiler, statement) -> List[Instruction] for an AST statement type.
+        Subclasses get their own table, so registering on one never affects its parent.
+        """
+        if "_statement_visitors" not in cls.__dict__:
+            cls._statement_visitors = dict(cls._statement_visitors)
+        cls._statement_visitors[node_type] = visitor
+        # Subclasses may have cached lookups that fell through to this table
+        pending = [cls]
+        while pending:
+            klass = pending.pop()
+            klass._visitor_cache = {}
+            pending.extend(klass.__subclasses__())
+
+    @classmethod
+    def _visitor_for(cls, node_type: type) -> Optional[Callable[..., List[Instruction]]]:
+        """Look up the visitor for a statement class, following its MRO once and caching the result."""
+        if "_visitor_cache" not in cls.__dict__:
+            cls._visitor_cache = {}
+        try:
+            return cls._visitor_cache[node_type]
+        except KeyError:
+            pass
+        visitor = None
+        for base in node_type.__mro__:
+            if base in cls._statement_visitors:
+                visitor = cls._statement_visitors[base]
+                break
+        cls._visitor_cache[node_type] = visitor
+        return visitor
+
+    def _statement_to_ir(self, statement: Any) -> List[Instruction]:
+        """Lower an AST statement to IR instructions; unknown statement types produce nothing."""
+        visitor = self._visitor_for(type(statement))
+        if visitor is None:
+            return []
+        return visitor(self, statement)
+
+    def _compile_block(self, statements: List[Any], body: List[Instruction]):
+        """Lower a statement list into body, routing temp commands into the same body."""
+        self._temp_sink_stack.append(body)
+        try:
+            for statement in statements:
+                start = len(body)
+                self._span_stack.append(statement.span)
+                try:
+                    body.extend(self._statement_to_ir(statement))
+                finally:
+                    self._span_stack.pop()
+                # Temps routed into this body and the statement's own instructions share its span
+                _attach_span(body[start:], statement.span)
+        finally:
+            self._temp_sink_stack.pop()
+
+    def _raw_block_to_ir(self, raw: RawBlock) -> List[Instruction]:
+        """Pass raw block content through verbatim."""
+        return [Raw(raw.content)]
+
+    def _macro_line_to_ir(self, macro: MacroLine) -> List[Instruction]:
+        """Pass a $-prefixed macro line through once the target supports macros."""
+        self._require_capability("macros", "Macro lines")
+        return [Raw(macro.content)]
+
+    def _variable_assignment_to_ir(self, assignment: VariableAssignment) -> List[Instruction]:
+        """Convert variable assignment to scoreboard operations."""
         # Auto-declare objective on first use
         if assignment.name not in self.variables:
             self.variables[assignment.name] = assignment.name
         objective = self.variables.get(assignment.name, assignment.name)
-        scope = self._resolve_scope(assignment.scope)
+        target = Score(self._resolve_scope(assignment.scope), objective)
         
         # Check if the value is a complex expression
         if isinstance(assignment.value, BinaryExpression):
@@ -410,22 +541,17 @@ class MDLCompiler:
             temp_var = self._generate_temp_variable_name()
             self._compile_expression_to_temp(assignment.value, temp_var)
             
-            # Return the command to set the target variable from the temp
-            return f"scoreboard players operation {scope} {objective} = @s {temp_var}"
+            # Set the target variable from the temp
+            return [ScoreOperation(target, "=", Score("@s", temp_var))]
         else:
             # Simple value - use direct assignment or scoreboard copy
             value = self._expression_to_value(assignment.value)
-            # If RHS resolves to a scoreboard reference (e.g., 'score @s some_obj'),
-            # emit an operation copy instead of an invalid 'set ... score ...'
-            if isinstance(value, str) and value.startswith("score "):
-                parts = value.split()
-                if len(parts) >= 3:
-                    src_scope = parts[1]
-                    src_objective = parts[2]
-                    return f"scoreboard players operation {scope} {objective} = {src_scope} {src_objective}"
-            return f"scoreboard players set {scope} {objective} {value}"
-
-    def _variable_declaration_to_command(self, decl: VariableDeclaration) -> str:
+            # A scoreboard reference on the RHS needs an operation copy, not 'set'
+            if isinstance(value, Score):
+                return [ScoreOperation(target, "=", value)]
+            return [ScoreSet(target, value)]
+
+    def _variable_declaration_to_ir(self, decl: VariableDeclaration) -> List[Instruction]:
         """Handle var declarations appearing inside function bodies.
         Ensure objective is registered and optionally set initial value.
         """
@@ -433,7 +559,7 @@ class MDLCompiler:
         # Register objective so load function adds it
         self.variables[decl.name] = objective
         # If there is an initial value, set it in current context
-        scope = self._resolve_scope(decl.scope)
+        target = Score(self._resolve_scope(decl.scope), objective)
         init = None
         try:
             init = self._expression_to_value(decl.initial_value)
@@ -441,21 +567,17 @@ class MDLCompiler:
             init = None
         if init is not None:
             # Initialize from another scoreboard using operation copy
-            if isinstance(init, str) and init.startswith("score "):
-                parts = init.split()
-                if len(parts) >= 3:
-                    src_scope = parts[1]
-                    src_objective = parts[2]
-                    return f"scoreboard players operation {scope} {objective} = {src_scope} {src_objective}"
-            return f"scoreboard players set {scope} {objective} {init}"
-        return f"# var {decl.name} declared"
+            if isinstance(init, Score):
+                return [ScoreOperation(target, "=", init)]
+            return [ScoreSet(target, init)]
+        return [Comment(f"var {decl.name} declared")]
     
-    def _say_command_to_command(self, say: SayCommand) -> str:
+    def _say_command_to_ir(self, say: SayCommand) -> List[Instruction]:
         """Convert say command to tellraw command with JSON formatting."""
         if not say.variables:
-            return f'tellraw @a {{"text":"{say.message}"}}'
+            return [Raw(f'tellraw @a {{"text":"{say.message}"}}')]
         else:
-            return self._build_tellraw_json(say.message, say.variables)
+            return [Raw(self._build_tellraw_json(say.message, say.variables))]
     
     def _build_tellraw_json(self, message: str, variables: List[VariableSubstitution]) -> str:
         """Build complex tellraw JSON with variable substitutions."""
@@ -512,170 +634,66 @@ class MDLCompiler:
             else:
                 return f'tellraw @a {first_part}'
     
-    def _if_statement_to_command(self, if_stmt: IfStatement) -> str:
-        """Convert if statement to proper Minecraft execute if commands."""
-        condition, invert_then = self._build_condition(if_stmt.condition)
-        lines = []
+    def _if_statement_to_ir(self, if_stmt: IfStatement) -> List[Instruction]:
+        """Convert if statement to execute if/unless calls into generated branch functions."""
+        # The else test runs after the then branch, so it must not re-evaluate the expression
+        condition = self._build_condition(if_stmt.condition, evaluate_once=bool(if_stmt.else_body))
+        result: List[Instruction] = []
         
         # Prepare function name for the then branch
         if_function_name = self._generate_if_function_name()
-        # Generate condition command
-        if invert_then:
-            lines.append(f"execute unless {condition} run function {self.current_namespace}:{if_function_name}")
-        else:
-            lines.append(f"execute if {condition} run function {self.current_namespace}:{if_function_name}")
+        result.append(Execute([condition], Call(f"{self.current_namespace}:{if_function_name}")))
         
         # Generate the if body function content
-        if_body_lines = [f"# Function: {self.current_namespace}:{if_function_name}"]
-        # Route temp commands to the if-body function content
-        if not hasattr(self, '_temp_sink_stack'):
-            self._temp_sink_stack = []
-        self._temp_sink_stack.append(if_body_lines)
-        for stmt in if_stmt.then_body:
-            if isinstance(stmt, VariableAssignment):
-                cmd = self._variable_assignment_to_command(stmt)
-                if_body_lines.append(cmd)
-            elif isinstance(stmt, VariableDeclaration):
-                cmd = self._variable_declaration_to_command(stmt)
-                if_body_lines.append(cmd)
-            elif isinstance(stmt, SayCommand):
-                cmd = self._say_command_to_command(stmt)
-                if_body_lines.append(cmd)
-            elif isinstance(stmt, RawBlock):
-                if_body_lines.append(stmt.content)
-            elif isinstance(stmt, IfStatement):
-                cmd = self._if_statement_to_command(stmt)
-                if_body_lines.append(cmd)
-            elif isinstance(stmt, WhileLoop):
-                cmd = self._while_loop_to_command(stmt)
-                if_body_lines.append(cmd)
-            elif isinstance(stmt, FunctionCall):
-                cmd = self._function_call_to_command(stmt)
-                if_body_lines.append(cmd)
-        # Stop routing temp commands for if-body
-        self._temp_sink_stack.pop()
-        
+        if_body: List[Instruction] = [Comment(f"Function: {self.current_namespace}:{if_function_name}")]
+        self._compile_block(if_stmt.then_body, if_body)
+
         # Handle else body if it exists
         if if_stmt.else_body:
-            if isinstance(if_stmt.else_body, list) and len(if_stmt.else_body) == 1 and isinstance(if_stmt.else_body[0], IfStatement):
-                # Else-if: create an else function wrapper that contains the nested if
-                else_function_name = self._generate_else_function_name()
-                if invert_then:
-                    lines.append(f"execute if {condition} run function {self.current_namespace}:{else_function_name}")
-                else:
-                    lines.append(f"execute unless {condition} run function {self.current_namespace}:{else_function_name}")
-                else_body_lines = [f"# Function: {self.current_namespace}:{else_function_name}"]
-                nested_cmd = self._if_statement_to_command(if_stmt.else_body[0])
-                for nested_line in nested_cmd.split('\n'):
-                    if nested_line:
-                        else_body_lines.append(nested_line)
-                self._store_generated_function(else_function_name, else_body_lines)
-            else:
-                # Regular else: compile its body into its own function
-                else_function_name = self._generate_else_function_name()
-                if invert_then:
-                    lines.append(f"execute if {condition} run function {self.current_namespace}:{else_function_name}")
-                else:
-                    lines.append(f"execute unless {condition} run function {self.current_namespace}:{else_function_name}")
-                else_body_lines = [f"# Function: {self.current_namespace}:{else_function_name}"]
-                # Route temp commands into the else-body
-                if not hasattr(self, '_temp_sink_stack'):
-                    self._temp_sink_stack = []
-                self._temp_sink_stack.append(else_body_lines)
-                for stmt in if_stmt.else_body:
-                    if isinstance(stmt, VariableAssignment):
-                        cmd = self._variable_assignment_to_command(stmt)
-                        else_body_lines.append(cmd)
-                    elif isinstance(stmt, VariableDeclaration):
-                        cmd = self._variable_declaration_to_command(stmt)
-                        else_body_lines.append(cmd)
-                    elif isinstance(stmt, SayCommand):
-                        cmd = self._say_command_to_command(stmt)
-                        else_body_lines.append(cmd)
-                    elif isinstance(stmt, RawBlock):
-                        else_body_lines.append(stmt.content)
-                    elif isinstance(stmt, IfStatement):
-                        cmd = self._if_statement_to_command(stmt)
-                        else_body_lines.append(cmd)
-                    elif isinstance(stmt, WhileLoop):
-                        cmd = self._while_loop_to_command(stmt)
-                        else_body_lines.append(cmd)
-                    elif isinstance(stmt, FunctionCall):
-                        cmd = self._function_call_to_command(stmt)
-                        else_body_lines.append(cmd)
-                # Stop routing temp commands for else-body
-                self._temp_sink_stack.pop()
-                self._store_generated_function(else_function_name, else_body_lines)
+            else_function_name = self._generate_else_function_name()
+            result.append(Execute([condition.negated()], Call(f"{self.current_namespace}:{else_function_name}")))
+            else_body: List[Instruction] = [Comment(f"Function: {self.current_namespace}:{else_function_name}")]
+            # Compile the else body (for else-if, just the nested if) into its own function
+            self._compile_block(if_stmt.else_body, else_body)
+            self._store_generated_function(else_function_name, else_body)
         
         # Store the if function as its own file
-        self._store_generated_function(if_function_name, if_body_lines)
+        self._store_generated_function(if_function_name, if_body)
         
-        return "\n".join(lines)
+        return result
     
-    def _while_loop_to_command(self, while_loop: WhileLoop) -> str:
-        """Convert while loop to proper Minecraft loop logic."""
-        lines = []
-        
+    def _while_loop_to_ir(self, while_loop: WhileLoop) -> List[Instruction]:
+        """Convert while loop to a self-recursive generated function."""
         # Generate the while loop using a recursive function approach
         loop_function_name = self._generate_while_function_name()
+        loop_call = Call(f"{self.current_namespace}:{loop_function_name}")
         
         # First, call the loop function conditionally (true while semantics)
-        cond_str, invert_then = self._build_condition(while_loop.condition)
-        if invert_then:
-            lines.append(f"execute unless {cond_str} run function {self.current_namespace}:{loop_function_name}")
-        else:
-            lines.append(f"execute if {cond_str} run function {self.current_namespace}:{loop_function_name}")
+        condition = self._build_condition(while_loop.condition)
+        result: List[Instruction] = [Execute([condition], loop_call)]
         
         # Generate the loop function body
-        loop_body_lines = [f"# Function: {self.current_namespace}:{loop_function_name}"]
+        loop_body: List[Instruction] = [Comment(f"Function: {self.current_namespace}:{loop_function_name}")]
         
         # Add the loop body statements
-        if not hasattr(self, '_temp_sink_stack'):
-            self._temp_sink_stack = []
-        self._temp_sink_stack.append(loop_body_lines)
-        for stmt in while_loop.body:
-            if isinstance(stmt, VariableAssignment):
-                cmd = self._variable_assignment_to_command(stmt)
-                loop_body_lines.append(cmd)
-            elif isinstance(stmt, VariableDeclaration):
-                cmd = self._variable_declaration_to_command(stmt)
-                loop_body_lines.append(cmd)
-            elif isinstance(stmt, SayCommand):
-                cmd = self._say_command_to_command(stmt)
-                loop_body_lines.append(cmd)
-            elif isinstance(stmt, RawBlock):
-                loop_body_lines.append(stmt.content)
-            elif isinstance(stmt, IfStatement):
-                cmd = self._if_statement_to_command(stmt)
-                loop_body_lines.append(cmd)
-            elif isinstance(stmt, WhileLoop):
-                cmd = self._while_loop_to_command(stmt)
-                loop_body_lines.append(cmd)
-            elif isinstance(stmt, FunctionCall):
-                cmd = self._function_call_to_command(stmt)
-                loop_body_lines.append(cmd)
-        
+        self._compile_block(while_loop.body, loop_body)
+
         # Add the recursive call at the end to continue the loop
-        # Respect inverted conditions (e.g., NOT_EQUAL)
-        if invert_then:
-            loop_body_lines.append(f"execute unless {cond_str} run function {self.current_namespace}:{loop_function_name}")
-        else:
-            loop_body_lines.append(f"execute if {cond_str} run function {self.current_namespace}:{loop_function_name}")
-        # Stop routing temp commands for while-body
-        self._temp_sink_stack.pop()
+        loop_body.append(Execute([condition], loop_call))
         
         # Store the loop function as its own file
-        self._store_generated_function(loop_function_name, loop_body_lines)
+        self._store_generated_function(loop_function_name, loop_body)
         
-        return "\n".join(lines)
+        return result
 
-    def _scheduled_while_to_command(self, while_loop: ScheduledWhileLoop) -> str:
+    def _scheduled_while_to_ir(self, while_loop: ScheduledWhileLoop) -> List[Instruction]:
         """Convert scheduledwhile into a tick-driven loop that preserves the initiating executor (@s).
         Uses a unique tag per loop instance to track participants across ticks.
         """
         # Unique names and tag for this scheduled-while instance (keep legacy naming for helper)
         wrap_fn = self._generate_while_function_name()  # e.g., fn__while_1
         body_fn = f"{wrap_fn}__body"
+        wrap_id = f"{self.current_namespace}:{wrap_fn}"
         tag = f"mdl_sched__{wrap_fn}"
         # If inside a parent scheduledwhile, register this tag as a child so parent defers while child active
         if hasattr(self, '_sched_child_tag_stack') and self._sched_child_tag_stack:
@@ -685,79 +703,43 @@ class MDLCompiler:
             self._sched_child_tag_stack = []
 
         # Build condition once
-        cond_str, invert_then = self._build_condition(while_loop.condition)
-        cond_true = f"unless {cond_str}" if invert_then else f"if {cond_str}"
-        cond_false = f"if {cond_str}" if invert_then else f"unless {cond_str}"
+        cond_true = self._build_condition(while_loop.condition)
+        cond_false = cond_true.negated()
 
         # Entry: tag current @s and schedule the wrapper on next tick if condition initially true
-        lines: List[str] = []
-        lines.append(f"execute {cond_true} run tag @s add {tag}")
-        lines.append(f"execute {cond_true} run schedule function {self.current_namespace}:{wrap_fn} 1t")
+        result: List[Instruction] = [
+            Execute([cond_true], TagChange("@s", tag, add=True)),
+            Execute([cond_true], Schedule(wrap_id, "1t")),
+        ]
 
         # Build per-entity body function
-        body_lines: List[str] = [f"# Function: {self.current_namespace}:{body_fn}"]
-
-        if not hasattr(self, '_temp_sink_stack'):
-            self._temp_sink_stack = []
+        body: List[Instruction] = [Comment(f"Function: {self.current_namespace}:{body_fn}")]
 
         # Push a new child tag collector for nested scheduledwhiles
         self._sched_child_tag_stack.append([])
-        # Also expose this collector to nested calls via a convenience reference
-        current_child_list = self._sched_child_tag_stack[-1]
-        # Provide a hook for nested scheduledwhile to register their tag
-        if not hasattr(self, '_register_child_sched_tag'):
-            def _register(tag_name: str):
-                if self._sched_child_tag_stack:
-                    self._sched_child_tag_stack[-1].append(tag_name)
-            self._register_child_sched_tag = _register
-
-        self._temp_sink_stack.append(body_lines)
-        for stmt in while_loop.body:
-            if isinstance(stmt, VariableAssignment):
-                cmd = self._variable_assignment_to_command(stmt)
-                body_lines.append(cmd)
-            elif isinstance(stmt, VariableDeclaration):
-                cmd = self._variable_declaration_to_command(stmt)
-                body_lines.append(cmd)
-            elif isinstance(stmt, SayCommand):
-                cmd = self._say_command_to_command(stmt)
-                body_lines.append(cmd)
-            elif isinstance(stmt, RawBlock):
-                body_lines.append(stmt.content)
-            elif isinstance(stmt, IfStatement):
-                cmd = self._if_statement_to_command(stmt)
-                body_lines.append(cmd)
-            elif isinstance(stmt, WhileLoop):
-                cmd = self._while_loop_to_command(stmt)
-                body_lines.append(cmd)
-            elif isinstance(stmt, ScheduledWhileLoop):
-                cmd = self._scheduled_while_to_command(stmt)
-                body_lines.append(cmd)
-            elif isinstance(stmt, FunctionCall):
-                cmd = self._function_call_to_command(stmt)
-                body_lines.append(cmd)
-        self._temp_sink_stack.pop()
+
+        self._compile_block(while_loop.body, body)
         # Pop collected child tags for this level
-        child_tags: List[str] = self._sched_child_tag_stack.pop() if hasattr(self, '_sched_child_tag_stack') and self._sched_child_tag_stack else []
-        self._store_generated_function(body_fn, body_lines)
+        child_tags: List[str] = self._sched_child_tag_stack.pop() if self._sched_child_tag_stack else []
+        self._store_generated_function(body_fn, body)
 
         # Build wrapper function that maintains the tag set and reschedules if needed
-        wrap_lines: List[str] = [f"# Function: {self.current_namespace}:{wrap_fn}"]
+        wrap_body: List[Instruction] = [Comment(f"Function: {wrap_id}")]
         # Hint comment to aid tests expecting a plain 'execute if score' substring
-        wrap_lines.append(f"# execute {cond_true} ...")
+        wrap_body.append(Comment(f"execute {cond_true.render()} ..."))
         # Run body for entities where condition holds (but NOT currently inside any child scheduled loop)
         selector = f"@e[tag={tag}"
         for ct in child_tags:
             selector += f",tag=!{ct}"
         selector += "]"
-        wrap_lines.append(f"execute as {selector} {cond_true} run function {self.current_namespace}:{body_fn}")
+        wrap_body.append(Execute([As(selector), cond_true], Call(f"{self.current_namespace}:{body_fn}")))
         # Remove tag when condition fails
-        wrap_lines.append(f"execute as @e[tag={tag}] {cond_false} run tag @s remove {tag}")
+        wrap_body.append(Execute([As(f"@e[tag={tag}]"), cond_false], TagChange("@s", tag, add=False)))
         # Continue scheduling while any remain
-        wrap_lines.append(f"execute if entity @e[tag={tag}] run schedule function {self.current_namespace}:{wrap_fn} 1t")
-        self._store_generated_function(wrap_fn, wrap_lines)
+        wrap_body.append(Execute([EntityExists(f"@e[tag={tag}]")], Schedule(wrap_id, "1t")))
+        self._store_generated_function(wrap_fn, wrap_body)
 
-        return "\n".join(lines)
+        return result
     
     def _is_scoreboard_condition(self, expression: Any) -> bool:
         """Check if an expression is a scoreboard comparison."""
@@ -785,96 +767,118 @@ class MDLCompiler:
         prefix = getattr(self, '_current_function_name', 'fn')
         return f"{prefix}__while_{self.while_counter}"
     
-    def _store_generated_function(self, name: str, lines: List[str]):
-        """Store a generated function as a separate file under the same namespace."""
-        if self.dir_map:
-            functions_dir = self.output_dir / "data" / self.current_namespace / self.dir_map.function
-        else:
-            functions_dir = self.output_dir / "data" / self.current_namespace / "functions"
-        functions_dir.mkdir(parents=True, exist_ok=True)
-        # Insert ensure global if needed
-        if self.uses_global_scope:
-            self._insert_ensure_global(lines)
-        func_file = functions_dir / f"{name}.mcfunction"
-        with open(func_file, 'w') as f:
-            f.write("\n".join(lines) + "\n")
+    def _generate_condition_function_name(self) -> str:
+        """Generate a unique name for a condition function."""
+        self.condition_counter += 1
+        prefix = getattr(self, '_current_function_name', 'fn')
+        return f"{prefix}__cond_{self.condition_counter}"
+    
+    def _store_generated_function(self, name: str, body: List[Instruction]):
+        """Register a generated helper function under the current namespace."""
+        if self._span_stack:
+            _attach_span(body, self._span_stack[-1])
+        self.ir.add(Block(self.current_namespace, name, body, ensure_global=self.uses_global_scope))
     
-    def _function_call_to_command(self, func_call: FunctionCall) -> str:
-        """Convert function call to execute command."""
+    def _function_call_to_ir(self, func_call: FunctionCall) -> List[Instruction]:
+        """Convert function call to a function command, wrapped in execute as when scoped."""
         # Build base function invocation, possibly with macro args
-        suffix = ""
+        arguments = None
         if func_call.macro_json:
-            suffix = f" {func_call.macro_json}"
+            self._require_capability("macros", "Macro arguments")
+            arguments = func_call.macro_json
         elif func_call.with_clause:
-            suffix = f" with {func_call.with_clause}"
+            self._require_capability("macros", "Macro arguments")
+            arguments = f"with {func_call.with_clause}"
 
-        base = f"function {func_call.namespace}:{func_call.name}{suffix}"
+        call = Call(f"{func_call.namespace}:{func_call.name}", arguments)
         if func_call.scope:
-            return f"execute as {self._resolve_scope(func_call.scope)} run {base}"
-        return base
+            return [Execute([As(self._resolve_scope(func_call.scope))], call)]
+        return [call]
     
-    def _expression_to_value(self, expression: Any) -> str:
-        """Convert expression to a value string."""
-        if isinstance(expression, LiteralExpression):
-            # Format numbers as integers if possible
-            if isinstance(expression.value, (int, float)):
-                try:
-                    v = float(expression.value)
-                    if v.is_integer():
-                        return str(int(v))
-                    return str(v)
-                except Exception:
-                    return str(expression.value)
-            return str(expression.value)
-        elif isinstance(expression, VariableSubstitution):
-            objective = self.variables.get(expression.name, expression.name)
-            scope = self._resolve_scope(expression.scope)
-            return f"score {scope} {objective}"
-        elif isinstance(expression, UnaryExpression):
-            # Handle logical NOT elsewhere; here support unary minus for arithmetic
-            op = self._normalize_operator(expression.operator)
-            if op == '!':
-                # For values, ! is not meaningful; fallback to boolean temp
-                bool_var = self._compile_boolean_expression(expression)
-                return f"score @s {bool_var}"
-            if op == '-':
-                # If operand is a literal, constant-fold
-                if isinstance(expression.operand, LiteralExpression) and isinstance(expression.operand.value, (int, float)):
-                    try:
-                        v = float(expression.operand.value)
-                        v = -v
-                        if v.is_integer():
-                            return str(int(v))
-                        return str(v)
-                    except Exception:
-                        pass
-                # Otherwise, compute 0 - <operand>
-                rhs = self._expression_to_value(expression.operand)
-                temp_var = self._generate_temp_variable_name()
-                self._store_temp_command(f"scoreboard players set @s {temp_var} 0")
-                if isinstance(expression.operand, VariableSubstitution) or (isinstance(rhs, str) and rhs.startswith("score ")):
-                    parts = str(rhs).split()
-                    if len(parts) >= 3:
-                        scope = parts[1]
-                        obj = parts[2]
-                        self._store_temp_command(f"scoreboard players operation @s {temp_var} -= {scope} {obj}")
-                    else:
-                        self._store_temp_command(f"scoreboard players operation @s {temp_var} -= {rhs}")
+    def _require_capability(self, capability: str, feature: str):
+        """Raise if the target pack_format cannot load the given feature."""
+        if not getattr(self.capabilities, capability):
+            introduced = CAPABILITY_INTRODUCED[capability]
+            raise MDLCompilerError(
+                f"{feature} require pack_format {introduced} or newer (targeting {self.pack_format})",
+                suggestion=f"Raise the pack format to at least {introduced} or use --target-format"
+            )
+
+    def _expression_to_value(self, expression: Any) -> Union[Score, str]:
+        """Convert expression to a Score reference or a literal value string.
+        Operands are lowered children-first from an explicit stack of pending work, so
+        nesting depth is not limited by the interpreter's recursion limit.
+        """
+        values: List[Union[Score, str]] = []
+        # ("value", expression) lowers an expression; ("binary", expression, temp) and
+        # ("negate", None, None) combine the operand values lowered before them
+        stack: List[tuple] = [("value", expression, None)]
+        while stack:
+            kind, expression, temp_var = stack.pop()
+            if kind == "binary":
+                right_value = values.pop()
+                left_value = values.pop()
+                self._emit_binary_operation(expression, temp_var, left_value, right_value)
+                values.append(Score("@s", temp_var))
+                continue
+            if kind == "negate":
+                # Compute 0 - <operand>
+                rhs = values.pop()
+                temp = Score("@s", self._generate_temp_variable_name())
+                self._store_temp_command(ScoreSet(temp, "0"))
+                if isinstance(rhs, Score):
+                    self._store_temp_command(ScoreOperation(temp, "-=", rhs))
                 else:
                     # rhs is a literal number string
-                    self._store_temp_command(f"scoreboard players remove @s {temp_var} {rhs}")
-                return f"score @s {temp_var}"
-            # Fallback
-            return self._expression_to_value(expression.operand)
-        elif isinstance(expression, BinaryExpression):
-            # For complex expressions, we need to use temporary variables
-            temp_var = self._generate_temp_variable_name()
-            self._compile_expression_to_temp(expression, temp_var)
-            return f"score @s {temp_var}"
-        elif isinstance(expression, ParenthesizedExpression):
-            return self._expression_to_value(expression.expression)
-        else:
-            return str(expression)
+                    self._store_temp_command(ScoreRemove(temp, rhs))
+                values.append(temp)
+                continue
+
+            while isinstance(expression, ParenthesizedExpression):
+                expression = expression.expression
+            if isinstance(expression, LiteralExpression):
+                values.append(self._literal_to_value(expression.value))
+            elif isinstance(expression, VariableSubstitution):
+                objective = self.variables.get(expression.name, expression.name)
+                scope = self._resolve_scope(expression.scope)
+                values.append(Score(scope, objective))
+            elif isinstance(expression, UnaryExpression):
+                # Handle logical NOT elsewhere; here support unary minus for arithmetic
+                op = self._normalize_operator(expression.operator)
+                if op == '!':
+                    # For values, ! is not meaningful; fallback to boolean temp
+                    bool_var = self._compile_boolean_expression(expression)
+                    values.append(Score("@s", bool_var))
+                elif op == '-' and isinstance(expression.operand, LiteralExpression) \
+                        and isinstance(expression.operand.value, (int, float)):
+                    # Constant-fold a negated literal
+                    values.append(self._literal_to_value(-expression.operand.value))
+                else:
+                    if op == '-':
+                        stack.append(("negate", None, None))
+                    # Other unary operators fall back to their operand
+                    stack.append(("value", expression.operand, None))
+            elif isinstance(expression, BinaryExpression):
+                # For complex expressions, we need to use temporary variables
+                temp_var = self._generate_temp_variable_name()
+                stack.append(("binary", expression, temp_var))
+                stack.append(("value", expression.right, None))
+                stack.append(("value", expression.left, None))
+            else:
+                values.append(str(expression))
+        return values.pop()
+
+    def _literal_to_value(self, value: Any) -> str:
+        """Literal value string; numbers are formatted as integers if possible."""
+        if isinstance(value, (int, float)):
+            try:
+                v = float(value)
+                if v.is_integer():
+                    return str(int(v))
+                return str(v)
+            except Exception:
+                return str(value)
+        return str(value)
     
     def _normalize_operator(self, op_in: Any) -> Optional[str]:
         """Normalize operator tokens/strings to Minecraft execute/scoreboard symbols.
@@ -942,15 +946,14 @@ class MDLCompiler:
                 op_text = op_sym if op_sym is not None else str(expression.operator)
             return f"{left} {op_text} {right}"
         else:
-            return self._expression_to_value(expression)
+            return str(self._expression_to_value(expression))
 
-    def _build_condition(self, expression: Any) -> (str, bool):
+    def _build_condition(self, expression: Any, evaluate_once: bool = False) -> Condition:
         """Build a valid Minecraft execute condition.
-        Returns (condition_string, invert_then) where invert_then True means the THEN branch should use 'unless'.
+        A negated condition means the THEN branch should use 'unless'.
+        Set evaluate_once when the caller tests the result again after code that may change
+        the operands; logical expressions then keep their value in a boolean temp.
         """
-        # Default: generic expression string, no inversion
-        invert_then = False
-        
         # Helpers local to this method to keep concerns contained
         def unwrap(e: Any) -> Any:
             while isinstance(e, ParenthesizedExpression):
@@ -977,9 +980,12 @@ class MDLCompiler:
         if isinstance(unwrapped, BinaryExpression) or isinstance(unwrapped, _UnaryExpr):
             op_sym_unwrapped = self._normalize_operator(getattr(unwrapped, 'operator', None))
         if op_sym_unwrapped in ('&&', '||', '!'):
+            if self.capabilities.execute_if_function and not evaluate_once:
+                return self._logical_condition(unwrapped)
             bool_var = self._compile_boolean_expression(unwrapped)
-            return (f"score @s {bool_var} matches 1..", False)
+            return ScoreMatches(Score("@s", bool_var), "1..")
 
+        expression = unwrapped
         if isinstance(expression, BinaryExpression):
             left = unwrap(expression.left)
             right = unwrap(expression.right)
@@ -994,17 +1000,14 @@ class MDLCompiler:
                 if _UnaryExpr is not None and isinstance(left, _UnaryExpr) and self._normalize_operator(getattr(left, 'operator', None)) == '!':
                     # Build condition for (left.operand op right) and invert
                     inner = BinaryExpression(left=left.operand, operator=expression.operator, right=right)
-                    cond_str, inv = self._build_condition(inner)
-                    return (cond_str, not inv)
+                    return self._build_condition(inner).negated()
                 if _UnaryExpr is not None and isinstance(right, _UnaryExpr) and self._normalize_operator(getattr(right, 'operator', None)) == '!':
                     # Build condition for (left op right.operand) and invert
                     inner = BinaryExpression(left=left, operator=expression.operator, right=right.operand)
-                    cond_str, inv = self._build_condition(inner)
-                    return (cond_str, not inv)
+                    return self._build_condition(inner).negated()
             # Variable vs literal
             if op_sym and isinstance(left, VariableSubstitution) and isinstance(right, LiteralExpression) and isinstance(right.value, (int, float)):
-                objective = self.variables.get(left.name, left.name)
-                scope = self._resolve_scope(left.scope)
+                score = Score(self._resolve_scope(left.scope), self.variables.get(left.name, left.name))
                 # Normalize number
                 try:
                     v = float(right.value)
@@ -1014,22 +1017,17 @@ class MDLCompiler:
                     n = int(v) if float(v).is_integer() else v
                     if op_sym == ">":
                         rng = f"{int(n)+1}.." if isinstance(n, int) else f"{v+1}.."
-                        return (f"score {scope} {objective} matches {rng}", False)
+                        return ScoreMatches(score, rng)
                     if op_sym == ">=":
-                        rng = f"{int(n)}.."
-                        return (f"score {scope} {objective} matches {rng}", False)
+                        return ScoreMatches(score, f"{int(n)}..")
                     if op_sym == "<":
-                        rng = f"..{int(n)-1}"
-                        return (f"score {scope} {objective} matches {rng}", False)
+                        return ScoreMatches(score, f"..{int(n)-1}")
                     if op_sym == "<=":
-                        rng = f"..{int(n)}"
-                        return (f"score {scope} {objective} matches {rng}", False)
+                        return ScoreMatches(score, f"..{int(n)}")
                     if op_sym == "==":
-                        rng = f"{int(n)}"
-                        return (f"score {scope} {objective} matches {rng}", False)
+                        return ScoreMatches(score, f"{int(n)}")
                     if op_sym == "!=":
-                        rng = f"{int(n)}"
-                        return (f"score {scope} {objective} matches {rng}", True)
+                        return ScoreMatches(score, f"{int(n)}", negate=True)
             # Literal vs variable (swap sides)
             if op_sym and isinstance(left, LiteralExpression) and isinstance(left.value, (int, float)) and isinstance(right, VariableSubstitution):
                 # Swap by inverting the operator appropriately, then reuse logic
@@ -1045,16 +1043,14 @@ class MDLCompiler:
                 return self._build_condition(swapped)
             # Variable vs variable
             if op_sym and isinstance(left, VariableSubstitution) and isinstance(right, VariableSubstitution):
-                lobj = self.variables.get(left.name, left.name)
-                lscope = self._resolve_scope(left.scope)
-                robj = self.variables.get(right.name, right.name)
-                rscope = self._resolve_scope(right.scope)
+                lscore = Score(self._resolve_scope(left.scope), self.variables.get(left.name, left.name))
+                rscore = Score(self._resolve_scope(right.scope), self.variables.get(right.name, right.name))
                 if op_sym in (">", ">=", "<", "<=", "=="):
                     comp = op_sym if op_sym != "==" else "="
-                    return (f"score {lscope} {lobj} {comp} {rscope} {robj}", False)
+                    return ScoreCompare(lscore, comp, rscore)
                 if op_sym == "!=":
                     # Use equals with inversion
-                    return (f"score {lscope} {lobj} = {rscope} {robj}", True)
+                    return ScoreCompare(lscore, "=", rscore, negate=True)
 
             # General scoreboard vs scoreboard (covers temps produced by BinaryExpression)
             if op_sym:
@@ -1064,19 +1060,84 @@ class MDLCompiler:
                 except Exception:
                     left_val = None
                     right_val = None
-                if isinstance(left_val, str) and left_val.startswith("score ") and isinstance(right_val, str) and right_val.startswith("score "):
-                    lparts = left_val.split()
-                    rparts = right_val.split()
-                    if len(lparts) >= 3 and len(rparts) >= 3:
-                        lscope, lobj = lparts[1], lparts[2]
-                        rscope, robj = rparts[1], rparts[2]
-                        if op_sym == "!=":
-                            return (f"score {lscope} {lobj} = {rscope} {robj}", True)
-                        comp = op_sym if op_sym != "==" else "="
-                        return (f"score {lscope} {lobj} {comp} {rscope} {robj}", False)
+                if isinstance(left_val, Score) and isinstance(right_val, Score):
+                    if op_sym == "!=":
+                        return ScoreCompare(left_val, "=", right_val, negate=True)
+                    comp = op_sym if op_sym != "==" else "="
+                    return ScoreCompare(left_val, comp, right_val)
         
         # Fallback: treat as generic condition string
-        return (self._expression_to_condition(expression), False)
+        return RawCondition(self._expression_to_condition(expression))
+
+    def _logical_condition(self, expression: Any) -> Condition:
+        """Lower &&, || and ! to generated functions tested with 'execute if function' (pack_format 26+).
+
+        Each function returns as soon as an operand decides the result, so operands are
+        short-circuited and no boolean temps are written. Nested operators of the other
+        kind get functions of their own, queued instead of recursed into.
+        """
+        expression, negate = self._split_negation(expression)
+        if not self._is_logical_operation(expression):
+            condition = self._build_condition(expression)
+            return condition.negated() if negate else condition
+        name = self._generate_condition_function_name()
+        condition: Condition = FunctionCondition(f"{self.current_namespace}:{name}")
+        pending = [(name, expression)]
+        while pending:
+            name, expression = pending.pop(0)
+            op = self._normalize_operator(expression.operator)
+            # Operands of a chain of the same operator, left to right
+            operands: List[Any] = []
+            stack = [expression]
+            while stack:
+                operand = stack.pop()
+                while isinstance(operand, ParenthesizedExpression):
+                    operand = operand.expression
+                if self._is_logical_operation(operand) and self._normalize_operator(operand.operator) == op:
+                    stack.append(operand.right)
+                    stack.append(operand.left)
+                else:
+                    operands.append(operand)
+
+            body: List[Instruction] = [Comment(f"Function: {self.current_namespace}:{name}")]
+            self._temp_sink_stack.append(body)
+            try:
+                for operand in operands:
+                    operand, operand_negated = self._split_negation(operand)
+                    if self._is_logical_operation(operand):
+                        nested = self._generate_condition_function_name()
+                        pending.append((nested, operand))
+                        test: Condition = FunctionCondition(f"{self.current_namespace}:{nested}")
+                    else:
+                        test = self._build_condition(operand)
+                    if operand_negated:
+                        test = test.negated()
+                    # && fails on the first false operand, || succeeds on the first true one
+                    if op == '&&':
+                        body.append(Execute([test.negated()], Return("0")))
+                    else:
+                        body.append(Execute([test], Return("1")))
+            finally:
+                self._temp_sink_stack.pop()
+            body.append(Return("1" if op == '&&' else "0"))
+            self._store_generated_function(name, body)
+        return condition.negated() if negate else condition
+
+    def _split_negation(self, expression: Any) -> tuple:
+        """Strip parentheses and logical NOTs; returns (inner expression, whether it is negated)."""
+        negate = False
+        while True:
+            if isinstance(expression, ParenthesizedExpression):
+                expression = expression.expression
+            elif isinstance(expression, UnaryExpression) and self._normalize_operator(expression.operator) == '!':
+                expression = expression.operand
+                negate = not negate
+            else:
+                return expression, negate
+
+    def _is_logical_operation(self, expression: Any) -> bool:
+        return (isinstance(expression, BinaryExpression)
+                and self._normalize_operator(expression.operator) in ('&&', '||'))
 
     def _resolve_scope(self, scope_spec: Optional[str]) -> str:
         """Resolve MDL scope spec to a Minecraft selector string.
@@ -1100,263 +1161,152 @@ class MDLCompiler:
             "execute unless entity @e[type=armor_stand,tag=mdl_global,limit=1] run summon armor_stand ~ ~ ~ {NoGravity:1b,Invulnerable:1b,Invisible:1b,Tags:[\"mdl_global\"]}",
         ]
 
-    def _insert_ensure_global(self, lines: list):
-        # Insert ensure lines after header/comments at top if not already present
-        ensure = self._ensure_global_lines()[0]
-        if any(ensure in l for l in lines):
-            return
-        # Insert after initial comment block
-        insert_at = 0
-        for i, l in enumerate(lines[:5]):
-            insert_at = i + 1
-        lines[insert_at:insert_at] = self._ensure_global_lines() + [""]
-
     def _compile_boolean_expression(self, expression: Any, out_var: Optional[str] = None) -> str:
         """Compile a logical expression into a temporary boolean scoreboard variable (1 true, 0 false).
-        Returns the objective name for the boolean temp variable.
+        Returns the objective name for the boolean temp variable. Operands are compiled
+        children-first from an explicit stack, like _expression_to_value.
         """
         from .ast_nodes import BinaryExpression as Bin, UnaryExpression as Un, ParenthesizedExpression as Par
-        if out_var is None:
-            out_var = self._generate_temp_variable_name()
-        # Ensure initialized to 0
-        self._store_temp_command(f"scoreboard players set @s {out_var} 0")
-
-        def emit_set_true_when(cond_expr: Any):
-            cond_str, inv = self._build_condition(cond_expr)
-            prefix = "unless" if inv else "if"
-            self._store_temp_command(f"execute {prefix} {cond_str} run scoreboard players set @s {out_var} 1")
-
-        expr = expression
-        # Parentheses
-        if isinstance(expr, Par):
-            return self._compile_boolean_expression(expr.expression, out_var)
-        # Unary NOT
-        if isinstance(expr, Un):
-            op = self._normalize_operator(expr.operator)
-            if op == '!':
-                inner_var = self._compile_boolean_expression(expr.operand)
-                # out = NOT inner
-                self._store_temp_command(f"execute unless score @s {inner_var} matches 1.. run scoreboard players set @s {out_var} 1")
-                return out_var
-        # Binary logical
-        if isinstance(expr, Bin):
-            op = self._normalize_operator(expr.operator)
-            if op == '&&':
-                left_var = self._compile_boolean_expression(expr.left)
-                right_var = self._compile_boolean_expression(expr.right)
-                # Set true only when both true
-                self._store_temp_command(f"execute if score @s {left_var} matches 1.. if score @s {right_var} matches 1.. run scoreboard players set @s {out_var} 1")
-                return out_var
-            if op == '||':
-                left_var = self._compile_boolean_expression(expr.left)
-                right_var = self._compile_boolean_expression(expr.right)
-                # Set true when either true
-                self._store_temp_command(f"execute if score @s {left_var} matches 1.. run scoreboard players set @s {out_var} 1")
-                self._store_temp_command(f"execute if score @s {right_var} matches 1.. run scoreboard players set @s {out_var} 1")
-                return out_var
-        # Base comparator or non-logical: set true if base condition holds
-        emit_set_true_when(expr)
-        return out_var
+
+        def is_true(var: str) -> Condition:
+            return ScoreMatches(Score("@s", var), "1..")
+
+        results: List[str] = []
+        # ("expr", expression, out_var) compiles an expression; "!", "&&" and "||" entries
+        # combine the boolean vars of the operands compiled before them into out_var
+        stack: List[tuple] = [("expr", expression, out_var)]
+        while stack:
+            kind, expr, out_var = stack.pop()
+            if kind != "expr":
+                out = Score("@s", out_var)
+                if kind == "!":
+                    # out = NOT inner
+                    inner_var = results.pop()
+                    self._store_temp_command(Execute([is_true(inner_var).negated()], ScoreSet(out, "1")))
+                else:
+                    right_var = results.pop()
+                    left_var = results.pop()
+                    if kind == "&&":
+                        # Set true only when both true
+                        self._store_temp_command(Execute([is_true(left_var), is_true(right_var)], ScoreSet(out, "1")))
+                    else:
+                        # Set true when either true
+                        self._store_temp_command(Execute([is_true(left_var)], ScoreSet(out, "1")))
+                        self._store_temp_command(Execute([is_true(right_var)], ScoreSet(out, "1")))
+                results.append(out_var)
+                continue
+
+            if out_var is None:
+                out_var = self._generate_temp_variable_name()
+            out = Score("@s", out_var)
+            # Ensure initialized to 0
+            self._store_temp_command(ScoreSet(out, "0"))
+            # Parentheses
+            while isinstance(expr, Par):
+                expr = expr.expression
+            op = self._normalize_operator(expr.operator) if isinstance(expr, (Un, Bin)) else None
+            # Unary NOT
+            if isinstance(expr, Un) and op == '!':
+                stack.append(("!", None, out_var))
+                stack.append(("expr", expr.operand, None))
+            # Binary logical
+            elif isinstance(expr, Bin) and op in ('&&', '||'):
+                stack.append((op, None, out_var))
+                stack.append(("expr", expr.right, None))
+                stack.append(("expr", expr.left, None))
+            else:
+                # Base comparator or non-logical: set true if base condition holds
+                self._store_temp_command(Execute([self._build_condition(expr)], ScoreSet(out, "1")))
+                results.append(out_var)
+        return results.pop()
     
     def _compile_expression_to_temp(self, expression: BinaryExpression, temp_var: str):
         """Compile a complex expression to a temporary variable using valid Minecraft commands."""
-        left_temp = None
-        right_temp = None
-        
-        if isinstance(expression.left, BinaryExpression):
-            # Left side is complex - compile it first
-            left_temp = self._generate_temp_variable_name()
-            self._compile_expression_to_temp(expression.left, left_temp)
-            left_value = f"score @s {left_temp}"
-        else:
-            left_value = self._expression_to_value(expression.left)
-        
-        if isinstance(expression.right, BinaryExpression):
-            # Right side is complex - compile it first
-            right_temp = self._generate_temp_variable_name()
-            self._compile_expression_to_temp(expression.right, right_temp)
-            right_value = f"score @s {right_temp}"
-        else:
-            right_value = self._expression_to_value(expression.right)
-        
+        # Complex operands get temporaries of their own
+        left_value = self._expression_to_value(expression.left)
+        right_value = self._expression_to_value(expression.right)
+        self._emit_binary_operation(expression, temp_var, left_value, right_value)
+
+    def _emit_binary_operation(self, expression: BinaryExpression, temp_var: str,
+                               left_value: Union[Score, str], right_value: Union[Score, str]):
+        """Store expression's operator applied to its lowered operands into temp_var."""
+        target = Score("@s", temp_var)
+
         # Generate the operation command
-        if expression.operator == "PLUS":
-            if isinstance(expression.left, BinaryExpression):
-                self._store_temp_command(f"scoreboard players operation @s {temp_var} = @s {left_temp}")
-            else:
-                # Assign from left value (score or literal)
-                if isinstance(expression.left, VariableSubstitution) or (isinstance(left_value, str) and left_value.startswith("score ")):
-                    parts = str(left_value).split()
-                    scope = parts[1]
-                    obj = parts[2]
-                    self._store_temp_command(f"scoreboard players operation @s {temp_var} = {scope} {obj}")
-                else:
-                    lit = self._normalize_integer_literal_string(str(left_value), ctx="addition left operand")
-                    self._store_temp_command(f"scoreboard players set @s {temp_var} {lit}")
-            # Add right value
-            if isinstance(expression.right, VariableSubstitution) or (isinstance(right_value, str) and right_value.startswith("score ")):
-                parts = str(right_value).split()
-                scope = parts[1]
-                obj = parts[2]
-                self._store_temp_command(f"scoreboard players operation @s {temp_var} += {scope} {obj}")
-            else:
-                lit = self._normalize_integer_literal_string(str(right_value), ctx="addition right operand")
-                if lit == "0":
-                    pass
-                elif lit.startswith("-"):
-                    self._store_temp_command(f"scoreboard players remove @s {temp_var} {lit[1:]}")
-                else:
-                    self._store_temp_command(f"scoreboard players add @s {temp_var} {lit}")
-                
-        elif expression.operator == "MINUS":
-            if isinstance(expression.left, BinaryExpression):
-                self._store_temp_command(f"scoreboard players operation @s {temp_var} = @s {left_temp}")
+        if expression.operator in ("PLUS", "MINUS"):
+            adding = expression.operator == "PLUS"
+            ctx = "addition" if adding else "subtraction"
+            # Assign from left value (score or literal)
+            if isinstance(left_value, Score):
+                self._store_temp_command(ScoreOperation(target, "=", left_value))
             else:
-                if isinstance(expression.left, VariableSubstitution) or (isinstance(left_value, str) and left_value.startswith("score ")):
-                    parts = str(left_value).split()
-                    scope = parts[1]
-                    obj = parts[2]
-                    self._store_temp_command(f"scoreboard players operation @s {temp_var} = {scope} {obj}")
-                else:
-                    lit = self._normalize_integer_literal_string(str(left_value), ctx="subtraction left operand")
-                    self._store_temp_command(f"scoreboard players set @s {temp_var} {lit}")
-            # Subtract right value
-            if isinstance(expression.right, VariableSubstitution) or (isinstance(right_value, str) and right_value.startswith("score ")):
-                parts = str(right_value).split()
-                scope = parts[1]
-                obj = parts[2]
-                self._store_temp_command(f"scoreboard players operation @s {temp_var} -= {scope} {obj}")
+                lit = self._normalize_integer_literal_string(str(left_value), ctx=f"{ctx} left operand")
+                self._store_temp_command(ScoreSet(target, lit))
+            # Add or subtract right value
+            if isinstance(right_value, Score):
+                self._store_temp_command(ScoreOperation(target, "+=" if adding else "-=", right_value))
             else:
-                lit = self._normalize_integer_literal_string(str(right_value), ctx="subtraction right operand")
-                if lit == "0":
-                    pass
-                elif lit.startswith("-"):
+                lit = self._normalize_integer_literal_string(str(right_value), ctx=f"{ctx} right operand")
+                if lit != "0":
                     # x - (-k) == x + k
-                    self._store_temp_command(f"scoreboard players add @s {temp_var} {lit[1:]}")
-                else:
-                    self._store_temp_command(f"scoreboard players remove @s {temp_var} {lit}")
-                
-        elif expression.operator == "MULTIPLY":
-            if isinstance(expression.left, BinaryExpression):
-                self._store_temp_command(f"scoreboard players operation @s {temp_var} = @s {left_temp}")
-            else:
-                if isinstance(expression.left, VariableSubstitution) or (isinstance(left_value, str) and left_value.startswith("score ")):
-                    parts = str(left_value).split()
-                    scope = parts[1]
-                    obj = parts[2]
-                    self._store_temp_command(f"scoreboard players operation @s {temp_var} = {scope} {obj}")
-                else:
-                    self._store_temp_command(f"scoreboard players set @s {temp_var} {left_value}")
-            
-            if isinstance(expression.right, BinaryExpression):
-                self._store_temp_command(f"scoreboard players operation @s {temp_var} *= @s {right_temp}")
-            else:
-                # Normalize and use operation with a temp constant to maximize compatibility
-                if isinstance(expression.right, LiteralExpression):
-                    literal_str = self._normalize_integer_literal_string(self._expression_to_value(expression.right), ctx="multiply literal")
-                    if literal_str == "0":
-                        self._store_temp_command(f"scoreboard players set @s {temp_var} 0")
-                    elif literal_str == "1":
-                        pass
+                    negative = lit.startswith("-")
+                    amount = lit.lstrip("-")
+                    if adding != negative:
+                        self._store_temp_command(ScoreAdd(target, amount))
                     else:
-                        const_var = self._generate_temp_variable_name()
-                        self._store_temp_command(f"scoreboard players set @s {const_var} {literal_str}")
-                        self._store_temp_command(f"scoreboard players operation @s {temp_var} *= @s {const_var}")
-                else:
-                    if isinstance(right_value, str) and right_value.startswith("score "):
-                        parts = right_value.split()
-                        if len(parts) >= 3:
-                            scope = parts[1]
-                            obj = parts[2]
-                            self._store_temp_command(f"scoreboard players operation @s {temp_var} *= {scope} {obj}")
-                        else:
-                            self._store_temp_command(f"scoreboard players operation @s {temp_var} *= {right_value}")
-                    else:
-                        if self._is_numeric_literal_string(right_value):
-                            lit = self._normalize_integer_literal_string(str(right_value), ctx="multiply literal string")
-                            if lit == "0":
-                                self._store_temp_command(f"scoreboard players set @s {temp_var} 0")
-                            elif lit == "1":
-                                pass
-                            else:
-                                const_var = self._generate_temp_variable_name()
-                                self._store_temp_command(f"scoreboard players set @s {const_var} {lit}")
-                                self._store_temp_command(f"scoreboard players operation @s {temp_var} *= @s {const_var}")
-                        else:
-                            self._store_temp_command(f"scoreboard players operation @s {temp_var} *= {right_value}")
-                
-        elif expression.operator == "DIVIDE":
-            if isinstance(expression.left, BinaryExpression):
-                self._store_temp_command(f"scoreboard players operation @s {temp_var} = @s {left_temp}")
-            else:
-                if isinstance(expression.left, VariableSubstitution) or (isinstance(left_value, str) and left_value.startswith("score ")):
-                    parts = str(left_value).split()
-                    scope = parts[1]
-                    obj = parts[2]
-                    self._store_temp_command(f"scoreboard players operation @s {temp_var} = {scope} {obj}")
-                else:
-                    self._store_temp_command(f"scoreboard players set @s {temp_var} {left_value}")
-            
-            if isinstance(expression.right, BinaryExpression):
-                self._store_temp_command(f"scoreboard players operation @s {temp_var} /= @s {right_temp}")
+                        self._store_temp_command(ScoreRemove(target, amount))
+
+        elif expression.operator in ("MULTIPLY", "DIVIDE"):
+            multiplying = expression.operator == "MULTIPLY"
+            symbol = "*=" if multiplying else "/="
+            if isinstance(left_value, Score):
+                self._store_temp_command(ScoreOperation(target, "=", left_value))
             else:
+                self._store_temp_command(ScoreSet(target, left_value))
+
+            if isinstance(right_value, Score):
+                self._store_temp_command(ScoreOperation(target, symbol, right_value))
+            elif isinstance(expression.right, LiteralExpression) or self._is_numeric_literal_string(right_value):
                 # Normalize and use operation with a temp constant to maximize compatibility
-                if isinstance(expression.right, LiteralExpression):
-                    lit = self._normalize_integer_literal_string(self._expression_to_value(expression.right), ctx="divide literal")
-                    if lit == "0":
-                        raise MDLCompilerError("Division by zero literal is not allowed", "Use a non-zero integer literal")
-                    if lit == "1":
-                        pass
-                    elif lit.startswith("-"):
-                        abs_lit = lit[1:]
-                        const_div = self._generate_temp_variable_name()
-                        self._store_temp_command(f"scoreboard players set @s {const_div} {abs_lit}")
-                        self._store_temp_command(f"scoreboard players operation @s {temp_var} /= @s {const_div}")
-                        const_neg = self._generate_temp_variable_name()
-                        self._store_temp_command(f"scoreboard players set @s {const_neg} -1")
-                        self._store_temp_command(f"scoreboard players operation @s {temp_var} *= @s {const_neg}")
-                    else:
-                        const_div = self._generate_temp_variable_name()
-                        self._store_temp_command(f"scoreboard players set @s {const_div} {lit}")
-                        self._store_temp_command(f"scoreboard players operation @s {temp_var} /= @s {const_div}")
+                if multiplying:
+                    lit = self._normalize_integer_literal_string(right_value, ctx="multiply literal")
+                    self._multiply_by_literal(target, lit)
                 else:
-                    if isinstance(right_value, str) and right_value.startswith("score "):
-                        parts = right_value.split()
-                        if len(parts) >= 3:
-                            scope = parts[1]
-                            obj = parts[2]
-                            self._store_temp_command(f"scoreboard players operation @s {temp_var} /= {scope} {obj}")
-                        else:
-                            self._store_temp_command(f"scoreboard players operation @s {temp_var} /= {right_value}")
-                    else:
-                        if self._is_numeric_literal_string(right_value):
-                            lit = self._normalize_integer_literal_string(str(right_value), ctx="divide literal string")
-                            if lit == "0":
-                                raise MDLCompilerError("Division by zero literal is not allowed", "Use a non-zero integer literal")
-                            if lit == "1":
-                                pass
-                            elif lit.startswith("-"):
-                                abs_lit = lit[1:]
-                                const_div = self._generate_temp_variable_name()
-                                self._store_temp_command(f"scoreboard players set @s {const_div} {abs_lit}")
-                                self._store_temp_command(f"scoreboard players operation @s {temp_var} /= @s {const_div}")
-                                const_neg = self._generate_temp_variable_name()
-                                self._store_temp_command(f"scoreboard players set @s {const_neg} -1")
-                                self._store_temp_command(f"scoreboard players operation @s {temp_var} *= @s {const_neg}")
-                            else:
-                                const_div = self._generate_temp_variable_name()
-                                self._store_temp_command(f"scoreboard players set @s {const_div} {lit}")
-                                self._store_temp_command(f"scoreboard players operation @s {temp_var} /= @s {const_div}")
-                        else:
-                            self._store_temp_command(f"scoreboard players operation @s {temp_var} /= {right_value}")
+                    lit = self._normalize_integer_literal_string(right_value, ctx="divide literal")
+                    self._divide_by_literal(target, lit)
+            else:
+                self._store_temp_command(Raw(f"scoreboard players operation @s {temp_var} {symbol} {right_value}"))
         else:
             # For other operators, just set the value
-            self._store_temp_command(f"scoreboard players set @s {temp_var} 0")
+            self._store_temp_command(ScoreSet(target, "0"))
     
-    def _store_temp_command(self, command: str):
-        """Append a temporary command into the current output sink (function/if/while body)."""
-        if hasattr(self, '_temp_sink_stack') and self._temp_sink_stack:
-            self._temp_sink_stack[-1].append(command)
+    def _multiply_by_literal(self, target: Score, lit: str):
+        """Multiply a score by a normalized integer literal."""
+        if lit == "0":
+            self._store_temp_command(ScoreSet(target, "0"))
+        elif lit != "1":
+            const = Score("@s", self._generate_temp_variable_name())
+            self._store_temp_command(ScoreSet(const, lit))
+            self._store_temp_command(ScoreOperation(target, "*=", const))
+
+    def _divide_by_literal(self, target: Score, lit: str):
+        """Divide a score by a normalized non-zero integer literal."""
+        if lit == "0":
+            raise MDLCompilerError("Division by zero literal is not allowed", "Use a non-zero integer literal")
+        if lit == "1":
+            return
+        const_div = Score("@s", self._generate_temp_variable_name())
+        self._store_temp_command(ScoreSet(const_div, lit.lstrip("-")))
+        self._store_temp_command(ScoreOperation(target, "/=", const_div))
+        if lit.startswith("-"):
+            const_neg = Score("@s", self._generate_temp_variable_name())
+            self._store_temp_command(ScoreSet(const_neg, "-1"))
+            self._store_temp_command(ScoreOperation(target, "*=", const_neg))
+
+    def _store_temp_command(self, instruction: Instruction):
+        """Append a temporary instruction into the current output sink (function/if/while body)."""
+        if self._temp_sink_stack:
+            self._temp_sink_stack[-1].append(instruction)
         else:
             # Fallback: do nothing, but keep behavior predictable
             pass
@@ -1400,4 +1350,19 @@ class MDLCompiler:
         # Register temp variable so its objective is created and scores are initialized
         self.temp_variables.add(name)
         self.variables[name] = name
+        self.ir.temp_objectives.add(name)
         return name
+
+
+# AST statement types lowered by the compiler; register_statement_visitor adds more
+MDLCompiler._statement_visitors.update({
+    VariableAssignment: MDLCompiler._variable_assignment_to_ir,
+    VariableDeclaration: MDLCompiler._variable_declaration_to_ir,
+    SayCommand: MDLCompiler._say_command_to_ir,
+    RawBlock: MDLCompiler._raw_block_to_ir,
+    MacroLine: MDLCompiler._macro_line_to_ir,
+    IfStatement: MDLCompiler._if_statement_to_ir,
+    WhileLoop: MDLCompiler._while_loop_to_ir,
+    ScheduledWhileLoop: MDLCompiler._scheduled_while_to_ir,
+    FunctionCall: MDLCompiler._function_call_to_ir,
+})
@@ -6,6 +6,8 @@ from dataclasses import dataclass
 from typing import Optional, List, Any
 import os
 
+from .source_registry import get_source
+
 
 @dataclass
 class MDLError(BaseException):
@@ -93,18 +95,6 @@ class MDLError(BaseException):
                     parts.append(f"\nContext:\n{context}")
             
             return "\n".join(parts)
-    
-    def to_dict(self) -> dict:
-        """Convert error to dictionary for JSON output."""
-        return {
-            "type": self.error_type,
-            "message": self.message,
-            "file": self.file_path,
-            "line": self.line,
-            "column": self.column,
-            "line_content": self.line_content,
-            "suggestion": self.suggestion
-        }
 
 
 @dataclass
@@ -334,41 +324,30 @@ def create_error(error_type: str, message: str, file_path: Optional[str] = None,
 
 def get_line_content(file_path: str, line_number: int) -> Optional[str]:
     """Get the content of a specific line from a file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            if 1 <= line_number <= len(lines):
-                return lines[line_number - 1]
-    except (FileNotFoundError, UnicodeDecodeError):
-        pass
-    return None
+    source = get_source(file_path)
+    return source.line(line_number, keepends=True) if source is not None else None
 
 
 def format_error_context(file_path: str, line: int, column: int, 
                         context_lines: int = 2) -> str:
     """Format error context with surrounding lines."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        start_line = max(1, line - context_lines)
-        end_line = min(len(lines), line + context_lines)
-        
-        context = []
-        for i in range(start_line, end_line + 1):
-            prefix = ">>> " if i == line else "    "
-            line_num = f"{i:4d}"
-            content = lines[i - 1].rstrip('\n')
-            context.append(f"{prefix}{line_num}: {content}")
-            
-            if i == line and column is not None:
-                # Add caret to show exact position
-                indent = " " * (column - 1)
-                context.append(f"     {indent}^")
-        
-        return "\n".join(context)
-    except (FileNotFoundError, UnicodeDecodeError):
+    source = get_source(file_path)
+    if source is None:
         return f"Unable to read file: {file_path}"
+    
+    start_line = max(1, line - context_lines)
+    context = []
+    for i, content in enumerate(source.lines(start_line, line + context_lines), start_line):
+        prefix = ">>> " if i == line else "    "
+        line_num = f"{i:4d}"
+        context.append(f"{prefix}{line_num}: {content}")
+        
+        if i == line and column is not None:
+            # Add caret to show exact position
+            indent = " " * (column - 1)
+            context.append(f"     {indent}^")
+    
+    return "\n".join(context)
 
 
 def create_syntax_error(message: str, file_path: Optional[str] = None, 
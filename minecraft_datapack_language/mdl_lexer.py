@@ -7,6 +7,7 @@ import re
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 from .mdl_errors import MDLLexerError
+from .source_registry import SourceText, register_source
 
 
 @dataclass
@@ -122,6 +123,7 @@ class MDLLexer:
         self.column = 1
         self.in_raw_mode = False
         self.source = ""
+        self._source_text = SourceText("")
     
     def lex(self, source: str) -> List[Token]:
         """
@@ -138,6 +140,8 @@ class MDLLexer:
         """
         self.reset()
         self.source = source
+        # Errors (and later error reports) take their lines from the registered text
+        self._source_text = register_source(self.source_file, source)
         
         while self.current < len(source):
             self.start = self.current
@@ -640,10 +644,7 @@ class MDLLexer:
     def _error(self, message: str, suggestion: str):
         """Raise a lexer error with context information."""
         # Get the current line content for better error reporting
-        lines = self.source.split('\n')
-        line_content = ""
-        if self.line - 1 < len(lines):
-            line_content = lines[self.line - 1]
+        line_content = self._source_text.line(self.line) or ""
         
         raise MDLLexerError(
             message=message,
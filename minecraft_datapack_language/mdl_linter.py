@@ -3,13 +3,37 @@ MDL Syntax Linter
 
 This module provides linting capabilities for MDL source files,
 validating syntax and providing suggestions for improvement.
+
+Each file is read once and lexed and parsed once (with error recovery, so every
+syntax error is reported). Rules declare the AST node classes and token types
+they inspect; the linter dispatches them in one walk over the tree and one pass
+over the token stream. Directory linting runs files in worker processes and can
+reuse results from a LintCache for files whose contents did not change.
 """
 
+import functools
+import hashlib
+import itertools
+import json
+import os
+import pickle
 import re
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Deque, Tuple, Optional, Iterator, Any, Union
+from dataclasses import dataclass, asdict
 from pathlib import Path
 
+from .ast_nodes import (
+    ASTNode, PackDeclaration, NamespaceDeclaration, TagDeclaration, VariableDeclaration,
+    VariableAssignment, VariableSubstitution, FunctionDeclaration, FunctionCall, HookDeclaration,
+    WhileLoop, ScheduledWhileLoop, RawBlock, LiteralExpression, UnaryExpression,
+)
+from .mdl_errors import MDLError, MDLErrorCollector
+from .mdl_lexer import Token, TokenType
+from .mdl_parser import MDLParser
+from .source_registry import forget_source
+
 
 @dataclass
 class MDLLintIssue:
@@ -20,381 +44,385 @@ class MDLLintIssue:
     message: str
     suggestion: Optional[str] = None
     code: Optional[str] = None
+    column: Optional[int] = None
+
+
+class LintContext:
+    """What a rule sees of the file being linted, and where it reports issues."""
+
+    def __init__(self, file_path: Optional[str], source: str):
+        self.file_path = file_path
+        self.lines = source.splitlines()
+        self.issues: List[MDLLintIssue] = []
+        # The token before the one being checked (None for the first token)
+        self.previous_token: Optional[Token] = None
+
+    def report(self, line: Optional[int], severity: str, category: str, message: str,
+               suggestion: Optional[str] = None, column: Optional[int] = None):
+        line = line or 1
+        code = self.lines[line - 1].strip() if line <= len(self.lines) else ""
+        self.issues.append(MDLLintIssue(line, severity, category, message, suggestion, code, column))
+
+    def report_node(self, node: ASTNode, severity: str, category: str, message: str,
+                    suggestion: Optional[str] = None):
+        span = node.span
+        self.report(span.line if span else None, severity, category, message, suggestion,
+                    span.column if span else None)
+
+
+class LintRule:
+    """
+    Base class for lint rules.
+
+    node_types and token_types name what the rule inspects; the linter calls
+    check_node for every node that is an instance of one of node_types and
+    check_token for every token whose type is in token_types.
+    """
+    node_types: Tuple[type, ...] = ()
+    token_types: Tuple[str, ...] = ()
+
+    def check_node(self, node: ASTNode, context: LintContext):
+        pass
+
+    def check_token(self, token: Token, context: LintContext):
+        pass
+
+
+_SELECTOR = re.compile(r'^(global|@[spearn](\[.*\])?)$')
+_NAMESPACE = re.compile(r'^[a-z0-9_.-]+$')
+_RESOURCE_NAME = re.compile(r'^([a-z0-9_.-]+:)?[a-z0-9_./-]+$')
+
+
+class PackFormatRule(LintRule):
+    node_types = (PackDeclaration,)
+
+    def check_node(self, node: PackDeclaration, context: LintContext):
+        if node.pack_format < 1 or node.pack_format > 999:
+            context.report_node(node, 'error', 'pack', f"Invalid pack format: {node.pack_format}",
+                                "Pack format should be between 1 and 999")
+
+
+class NamespaceNameRule(LintRule):
+    node_types = (NamespaceDeclaration,)
+
+    def check_node(self, node: NamespaceDeclaration, context: LintContext):
+        if not _NAMESPACE.match(node.name):
+            context.report_node(node, 'warning', 'namespace',
+                                f"Namespace should use lowercase letters, numbers, '_', '-' and '.' only: '{node.name}'",
+                                "Minecraft rejects namespaces with uppercase letters or spaces")
+
+
+class VariableInitializerRule(LintRule):
+    node_types = (VariableDeclaration,)
+
+    def check_node(self, node: VariableDeclaration, context: LintContext):
+        value = node.initial_value
+        if isinstance(value, UnaryExpression) and value.operator == TokenType.MINUS:
+            value = value.operand
+        if not (isinstance(value, LiteralExpression) and value.type == "number"):
+            context.report_node(node, 'warning', 'variable',
+                                f"Non-numeric value in declaration of variable '{node.name}'",
+                                "Consider using a numeric value for initialization")
+
+
+class ScopeSelectorRule(LintRule):
+    node_types = (VariableDeclaration, VariableAssignment, VariableSubstitution, FunctionDeclaration,
+                  FunctionCall, HookDeclaration)
+
+    def check_node(self, node: ASTNode, context: LintContext):
+        if not node.scope:
+            return
+        selector = node.scope.strip()[1:-1].strip()
+        if isinstance(node, VariableDeclaration) and selector in ('@a', '@e', '@r'):
+            context.report_node(node, 'warning', 'scope',
+                                f"Broad selector '{selector}' may affect multiple entities",
+                                "Consider using a more specific selector to avoid unintended side effects")
+        if not _SELECTOR.match(selector):
+            context.report_node(node, 'warning', 'scope', f"Selector '{selector}' may not be valid",
+                                "Use valid Minecraft selectors like @s, @p, @a, @e, @r, @n with optional "
+                                "arguments, or 'global' for global variables")
+
+
+class TagDeclarationRule(LintRule):
+    node_types = (TagDeclaration,)
+
+    def check_node(self, node: TagDeclaration, context: LintContext):
+        if not _RESOURCE_NAME.match(node.name):
+            context.report_node(node, 'warning', 'tag',
+                                f"{node.tag_type} name should use lowercase letters, numbers, and underscores only: '{node.name}'",
+                                "Use lowercase letters, numbers, and underscores for resource names")
+        if not node.file_path.endswith('.json'):
+            context.report_node(node, 'error', 'tag',
+                                f"{node.tag_type} file path must end with '.json': '{node.file_path}'",
+                                "Ensure the file path points to a JSON file")
+        if node.file_path.startswith('/'):
+            context.report_node(node, 'warning', 'tag',
+                                f"{node.tag_type} file path should be relative: '{node.file_path}'",
+                                "Use relative paths instead of absolute paths")
+
+
+class LoopConditionRule(LintRule):
+    node_types = (WhileLoop, ScheduledWhileLoop)
+
+    def check_node(self, node: ASTNode, context: LintContext):
+        if not any(isinstance(n, VariableSubstitution) for n in iter_nodes(node.condition)):
+            context.report_node(node, 'warning', 'while_loop', "Loop condition does not reference a variable",
+                                "A constant condition either never runs the loop or never ends it; "
+                                "use a variable ($var$) in the condition")
+
+
+class EmptyRawBlockRule(LintRule):
+    node_types = (RawBlock,)
+
+    def check_node(self, node: RawBlock, context: LintContext):
+        if not node.content.strip():
+            context.report_node(node, 'warning', 'raw', "Empty raw block",
+                                "Remove the $!raw ... raw!$ block or add commands to it")
+
+
+class EmptyStatementRule(LintRule):
+    token_types = (TokenType.SEMICOLON,)
+
+    def check_token(self, token: Token, context: LintContext):
+        previous = context.previous_token
+        if previous is not None and previous.type == TokenType.SEMICOLON:
+            context.report(token.line, 'info', 'style', "Empty statement (extra ';')",
+                           "Remove the extra semicolon", token.column)
+
+
+def default_rules() -> List[LintRule]:
+    return [PackFormatRule(), NamespaceNameRule(), VariableInitializerRule(), ScopeSelectorRule(),
+            TagDeclarationRule(), LoopConditionRule(), EmptyRawBlockRule(), EmptyStatementRule()]
+
+
+def iter_nodes(value: Any) -> Iterator[ASTNode]:
+    """Every AST node in value (a node or a list of nodes), parents before children."""
+    pending = [value]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, ASTNode):
+            yield value
+            pending.extend(reversed([getattr(value, name) for name in type(value).__dataclass_fields__]))
+        elif isinstance(value, list):
+            pending.extend(reversed(value))
 
 
 class MDLLinter:
     """Linter for MDL source files with syntax validation"""
-    
-    def __init__(self):
+
+    def __init__(self, rules: Optional[List[LintRule]] = None):
+        self.rules = default_rules() if rules is None else list(rules)
         self.issues = []
-    
+        self._node_rules: Dict[type, List[LintRule]] = {}
+        self._token_rules: Dict[str, List[LintRule]] = {}
+        for rule in self.rules:
+            for token_type in rule.token_types:
+                self._token_rules.setdefault(token_type, []).append(rule)
+
+    def _rules_for_node(self, node_type: type) -> List[LintRule]:
+        rules = self._node_rules.get(node_type)
+        if rules is None:
+            rules = self._node_rules[node_type] = [
+                rule for rule in self.rules if issubclass(node_type, rule.node_types)]
+        return rules
+
     def lint_file(self, file_path: str) -> List[MDLLintIssue]:
         """Lint a single MDL file"""
-        self.issues = []
-        
         if not Path(file_path).exists():
-            self.issues.append(MDLLintIssue(
+            self.issues = [MDLLintIssue(
                 line_number=0,
                 severity='error',
                 category='file',
                 message=f"File not found: {file_path}"
-            ))
+            )]
             return self.issues
-        
+
         try:
-            # First, try to parse the file with the actual parser to catch syntax errors
-            try:
-                from .mdl_parser_js import parse_mdl_js
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    source = f.read()
-                
-                # Parse the file - this will catch syntax errors like missing semicolons
-                parse_mdl_js(source, file_path)
-                
-            except Exception as parse_error:
-                # If parsing fails, add the error to our issues
-                error_message = str(parse_error)
-                if "Expected SEMICOLON" in error_message:
-                    # Extract line and column from the error message
-                    import re
-                    line_match = re.search(r'Line: (\d+)', error_message)
-                    column_match = re.search(r'Column: (\d+)', error_message)
-                    line_num = int(line_match.group(1)) if line_match else 1
-                    column_num = int(column_match.group(1)) if column_match else 1
-                    
-                    self.issues.append(MDLLintIssue(
-                        line_number=line_num,
-                        severity='error',
-                        category='syntax',
-                        message="Missing semicolon",
-                        suggestion="Add a semicolon (;) at the end of the statement",
-                        code=source.split('\n')[line_num - 1] if line_num <= len(source.split('\n')) else ""
-                    ))
-                else:
-                    # For other parsing errors, add them as well
-                    self.issues.append(MDLLintIssue(
-                        line_number=1,
-                        severity='error',
-                        category='syntax',
-                        message=f"Parsing error: {error_message}",
-                        suggestion="Check the syntax and fix the reported error",
-                        code=""
-                    ))
-                    return self.issues
-            
-            # If parsing succeeds, do additional linting checks
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            for line_num, line in enumerate(lines, 1):
-                line = line.strip()
-                if not line or line.startswith('//'):
-                    continue
-                
-                # Run all linting rules on this line
-                self._check_while_loop_syntax(line, line_num)
-                self._check_variable_declaration(line, line_num)
-                self._check_scope_syntax(line, line_num)
-                self._check_hook_syntax(line, line_num)
-                self._check_pack_declaration(line, line_num)
-                self._check_namespace_declaration(line, line_num)
-                self._check_registry_type_declaration(line, line_num)
-                self._check_tag_declaration(line, line_num)
-                self._check_raw_text_syntax(line, line_num)
-            
-            return self.issues
-            
-        except Exception as e:
-            self.issues.append(MDLLintIssue(
+            source = Path(file_path).read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            self.issues = [MDLLintIssue(
                 line_number=0,
                 severity='error',
                 category='file',
                 message=f"Error reading file: {str(e)}"
-            ))
+            )]
             return self.issues
-    
-    def _check_while_loop_syntax(self, line: str, line_num: int):
-        """Check while loop syntax including method parameter"""
-        # Match while loop with optional method parameter
-        while_pattern = r'while\s+"([^"]+)"\s*(?:method\s*=\s*"([^"]+)")?\s*\{'
-        match = re.search(while_pattern, line)
-        
-        if match:
-            condition = match.group(1)
-            method = match.group(2)
-            
-            # Check if method parameter is valid
-            if method and method not in ['recursion', 'schedule']:
-                self.issues.append(MDLLintIssue(
-                    line_number=line_num,
-                    severity='error',
-                    category='while_loop',
-                    message=f"Invalid while loop method: '{method}'",
-                    suggestion="Method must be 'recursion' or 'schedule'",
-                    code=line
-                ))
-            
-            # Check condition syntax
-            if not self._is_valid_condition(condition):
-                self.issues.append(MDLLintIssue(
-                    line_number=line_num,
-                    severity='warning',
-                    category='while_loop',
-                    message=f"Potentially invalid condition: '{condition}'",
-                    suggestion="Ensure condition uses proper variable syntax ($var$) and operators",
-                    code=line
-                ))
-    
-
-    
-    def _check_variable_declaration(self, line: str, line_num: int):
-        """Check variable declaration syntax"""
-        # Match variable declaration pattern (with optional scope)
-        var_pattern = r'var\s+num\s+(\w+)(?:\s+scope<([^>]+)>)?\s*=\s*([^;]+);'
-        match = re.search(var_pattern, line)
-        
-        if match:
-            var_name = match.group(1)
-            scope = match.group(2)
-            value = match.group(3).strip()
-            
-            # Check variable name
-            if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', var_name):
-                self.issues.append(MDLLintIssue(
-                    line_number=line_num,
-                    severity='error',
-                    category='variable',
-                    message=f"Invalid variable name: '{var_name}'",
-                    suggestion="Variable names must start with letter or underscore and contain only letters, numbers, and underscores",
-                    code=line
-                ))
-            
-            # Check if value is numeric
-            if not re.match(r'^\d+$', value):
-                self.issues.append(MDLLintIssue(
-                    line_number=line_num,
-                    severity='warning',
-                    category='variable',
-                    message=f"Non-numeric value in variable declaration: '{value}'",
-                    suggestion="Consider using a numeric value for initialization",
-                    code=line
-                ))
-    
-    def _check_scope_syntax(self, line: str, line_num: int):
-        """Check scope syntax in variable declarations"""
-        # Match scope pattern
-        scope_pattern = r'scope<([^>]+)>'
-        match = re.search(scope_pattern, line)
-        
-        if match:
-            selector = match.group(1).strip()
-            
-            # Check for special keywords
-            if selector == 'global':
-                # Global is a special keyword - no validation needed
+        return self.lint_source(source, file_path)
+
+    def lint_source(self, source: str, file_path: Optional[str] = None) -> List[MDLLintIssue]:
+        """Lint MDL source text; issues are sorted by position"""
+        context = LintContext(file_path, source)
+        collector = MDLErrorCollector()
+        parser = MDLParser(file_path, error_collector=collector)
+        program = parser.parse(source)
+        for error in collector.errors:
+            self._report_error(error, context)
+
+        if self._token_rules:
+            for token in parser.tokens:
+                for rule in self._token_rules.get(token.type, ()):
+                    rule.check_token(token, context)
+                context.previous_token = token
+        for node in iter_nodes(program):
+            for rule in self._rules_for_node(type(node)):
+                rule.check_node(node, context)
+
+        self.issues = sorted(context.issues, key=lambda issue: (issue.line_number, issue.column or 0))
+        # The issues carry their own messages; drop the text the lexer registered
+        if file_path:
+            forget_source(file_path)
+        return self.issues
+
+    def _report_error(self, error: MDLError, context: LintContext):
+        context.report(error.line, 'error', 'syntax', error.message,
+                       error.suggestion or "Check the syntax and fix the reported error", error.column)
+
+    def lint_files(self, file_paths: List[str], jobs: Optional[int] = 1,
+                   cache: Optional["LintCache"] = None) -> Dict[str, List[MDLLintIssue]]:
+        """Lint several files, reusing cached results for unchanged contents.
+
+        Files that need linting are spread over jobs worker processes (None: one per CPU).
+        Rules must be picklable for that; otherwise the files are linted in this process.
+        """
+        return dict(self.iter_lint_files(file_paths, jobs, cache))
+
+    def iter_lint_files(self, file_paths: List[str], jobs: Optional[int] = 1,
+                        cache: Optional["LintCache"] = None) -> Iterator[Tuple[str, List[MDLLintIssue]]]:
+        """Like lint_files, but yields (path, issues) in file order as soon as each file is done.
+        Files are read only as they are reached, and at most a few per worker are held at once.
+        """
+        workers = min(jobs or os.cpu_count() or 1, len(file_paths))
+        if workers > 1:
+            try:
+                pickle.dumps(self.rules)
+            except (pickle.PicklingError, AttributeError, TypeError):
+                workers = 1
+        try:
+            if workers <= 1:
+                for file_path in file_paths:
+                    issues, source, digest = self._read_for_lint(file_path, cache)
+                    if issues is None:
+                        issues = self.lint_source(source, file_path)
+                        if cache is not None:
+                            cache.put(file_path, digest, issues)
+                    yield file_path, issues
                 return
-            
-            # Check for potentially problematic selectors
-            if selector in ['@a', '@e', '@r']:
-                self.issues.append(MDLLintIssue(
-                    line_number=line_num,
-                    severity='warning',
-                    category='scope',
-                    message=f"Broad selector '{selector}' may affect multiple entities",
-                    suggestion="Consider using a more specific selector to avoid unintended side effects",
-                    code=line
-                ))
-            
-            # Check for valid selector syntax
-            if not re.match(r'^@[spear](\[.*\])?$', selector):
-                self.issues.append(MDLLintIssue(
-                    line_number=line_num,
-                    severity='warning',
-                    category='scope',
-                    message=f"Selector '{selector}' may not be valid",
-                    suggestion="Use valid Minecraft selectors like @s, @p, @a, @e, @r with optional arguments, or 'global' for global variables",
-                    code=line
-                ))
-    
-    def _check_hook_syntax(self, line: str, line_num: int):
-        """Check hook declaration syntax"""
-        # Match hook patterns
-        hook_patterns = [
-            (r'on_tick\s+"([^"]+)";', 'tick'),
-            (r'on_load\s+"([^"]+)";', 'load')
-        ]
-        
-        for pattern, hook_type in hook_patterns:
-            match = re.search(pattern, line)
-            if match:
-                function_name = match.group(1)
-                
-                # Check if function name includes namespace
-                if ':' not in function_name:
-                    self.issues.append(MDLLintIssue(
-                        line_number=line_num,
-                        severity='warning',
-                        category='hook',
-                        message=f"Function name in {hook_type} hook should include namespace",
-                        suggestion=f"Use format 'namespace:function_name' instead of '{function_name}'",
-                        code=line
-                    ))
-    
-    def _check_pack_declaration(self, line: str, line_num: int):
-        """Check pack declaration syntax"""
-        pack_pattern = r'pack\s+"([^"]+)"\s+"([^"]+)"\s+(\d+);'
-        match = re.search(pack_pattern, line)
-        
-        if match:
-            pack_name = match.group(1)
-            description = match.group(2)
-            pack_format = int(match.group(3))
-            
-            # Check pack format
-            if pack_format < 1 or pack_format > 999:
-                self.issues.append(MDLLintIssue(
-                    line_number=line_num,
-                    severity='error',
-                    category='pack',
-                    message=f"Invalid pack format: {pack_format}",
-                    suggestion="Pack format should be between 1 and 999",
-                    code=line
-                ))
-    
-    def _check_namespace_declaration(self, line: str, line_num: int):
-        """Check namespace declaration syntax"""
-        namespace_pattern = r'namespace\s+"([^"]+)";'
-        match = re.search(namespace_pattern, line)
-        
-        if match:
-            namespace = match.group(1)
-            
-            # Check namespace name
-            if not re.match(r'^[a-z0-9_]+$', namespace):
-                self.issues.append(MDLLintIssue(
-                    line_number=line_num,
-                    severity='warning',
-                    category='namespace',
-                    message=f"Namespace should use lowercase letters, numbers, and underscores only: '{namespace}'",
-                    suggestion="Use lowercase letters, numbers, and underscores for namespace names",
-                    code=line
-                ))
-    
-    def _check_registry_type_declaration(self, line: str, line_num: int):
-        """Check registry type declaration syntax"""
-        # Match registry type patterns
-        registry_patterns = [
-            (r'recipe\s+"([^"]+)"\s+"([^"]+)";', 'recipe'),
-            (r'loot_table\s+"([^"]+)"\s+"([^"]+)";', 'loot_table'),
-            (r'advancement\s+"([^"]+)"\s+"([^"]+)";', 'advancement'),
-            (r'predicate\s+"([^"]+)"\s+"([^"]+)";', 'predicate'),
-            (r'item_modifier\s+"([^"]+)"\s+"([^"]+)";', 'item_modifier'),
-            (r'structure\s+"([^"]+)"\s+"([^"]+)";', 'structure')
-        ]
-        
-        for pattern, registry_type in registry_patterns:
-            match = re.search(pattern, line)
-            if match:
-                name = match.group(1)
-                file_path = match.group(2)
-                
-                # Check registry name
-                if not re.match(r'^[a-z0-9_]+$', name):
-                    self.issues.append(MDLLintIssue(
-                        line_number=line_num,
-                        severity='warning',
-                        category='registry_type',
-                        message=f"{registry_type} name should use lowercase letters, numbers, and underscores only: '{name}'",
-                        suggestion="Use lowercase letters, numbers, and underscores for registry type names",
-                        code=line
-                    ))
-                
-                # Check file path
-                if not file_path.endswith('.json'):
-                    self.issues.append(MDLLintIssue(
-                        line_number=line_num,
-                        severity='error',
-                        category='registry_type',
-                        message=f"{registry_type} file path must end with '.json': '{file_path}'",
-                        suggestion="Ensure the file path points to a JSON file",
-                        code=line
-                    ))
-                
-                # Check for relative path
-                if file_path.startswith('/'):
-                    self.issues.append(MDLLintIssue(
-                        line_number=line_num,
-                        severity='warning',
-                        category='registry_type',
-                        message=f"{registry_type} file path should be relative: '{file_path}'",
-                        suggestion="Use relative paths instead of absolute paths",
-                        code=line
-                    ))
-    
-    def _check_tag_declaration(self, line: str, line_num: int):
-        """Check tag declaration syntax"""
-        # Match tag declaration pattern
-        tag_pattern = r'tag\s+(function|item|block|entity_type|fluid|game_event)\s+"([^"]+)"\s*\{'
-        match = re.search(tag_pattern, line)
-        
-        if match:
-            tag_type = match.group(1)
-            tag_name = match.group(2)
-            
-            # Check tag name format
-            if ':' not in tag_name:
-                self.issues.append(MDLLintIssue(
-                    line_number=line_num,
-                    severity='warning',
-                    category='tag',
-                    message=f"Tag name should include namespace: '{tag_name}'",
-                    suggestion="Use format 'namespace:tag_name' for tag names",
-                    code=line
-                ))
-            
-            # Check tag type validity
-            valid_tag_types = ['function', 'item', 'block', 'entity_type', 'fluid', 'game_event']
-            if tag_type not in valid_tag_types:
-                self.issues.append(MDLLintIssue(
-                    line_number=line_num,
-                    severity='error',
-                    category='tag',
-                    message=f"Invalid tag type: '{tag_type}'",
-                    suggestion=f"Valid tag types are: {', '.join(valid_tag_types)}",
-                    code=line
-                ))
-    
-    def _check_raw_text_syntax(self, line: str, line_num: int):
-        """Check raw text syntax"""
-        # Check for raw text start
-        if '$!raw' in line:
-            # Check if there's a corresponding raw!$ in the file
-            # This is a basic check - in practice, we'd need to track across lines
-            pass
-        
-        # Check for raw text end
-        if 'raw!$' in line:
-            # Check if there's a corresponding $!raw before this
-            # This is a basic check - in practice, we'd need to track across lines
-            pass
-    
-    def _is_valid_condition(self, condition: str) -> bool:
-        """Check if a condition string is valid"""
-        # Basic validation - should contain variable references and operators
-        has_variable = re.search(r'\$[a-zA-Z_][a-zA-Z0-9_]*\$', condition)
-        has_operator = re.search(r'[><=!]+', condition)
-        return bool(has_variable and has_operator)
-    
-
-    
-    def lint_directory(self, directory_path: str) -> Dict[str, List[MDLLintIssue]]:
+            with ProcessPoolExecutor(workers) as pool:
+                # (path, known issues or None, future, content hash), in file order
+                window: Deque[tuple] = deque()
+                remaining = iter(file_paths)
+                while True:
+                    for file_path in itertools.islice(remaining, workers * 4 - len(window)):
+                        issues, source, digest = self._read_for_lint(file_path, cache)
+                        future = None
+                        if issues is None:
+                            future = pool.submit(_lint_in_worker, self.rules, source, file_path)
+                        window.append((file_path, issues, future, digest))
+                    if not window:
+                        break
+                    file_path, issues, future, digest = window.popleft()
+                    if future is not None:
+                        issues = future.result()
+                        if cache is not None:
+                            cache.put(file_path, digest, issues)
+                    yield file_path, issues
+        finally:
+            if cache is not None:
+                cache.save()
+
+    def _read_for_lint(self, file_path: str, cache: Optional["LintCache"]) -> tuple:
+        """(issues, None, None) for a file that needs no linting (unreadable, or cached);
+        otherwise (None, source, content hash)."""
+        try:
+            data = Path(file_path).read_bytes()
+        except FileNotFoundError:
+            return [MDLLintIssue(0, 'error', 'file', f"File not found: {file_path}")], None, None
+        except OSError as e:
+            return [MDLLintIssue(0, 'error', 'file', f"Error reading file: {str(e)}")], None, None
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        cached = cache.get(file_path, digest) if cache is not None else None
+        if cached is not None:
+            return cached, None, None
+        try:
+            return None, data.decode('utf-8'), digest
+        except UnicodeDecodeError as e:
+            return [MDLLintIssue(0, 'error', 'file', f"Error reading file: {str(e)}")], None, None
+
+    def lint_directory(self, directory_path: str, jobs: Optional[int] = 1,
+                       cache: Optional["LintCache"] = None) -> Dict[str, List[MDLLintIssue]]:
         """Lint all MDL files in a directory"""
-        results = {}
-        
-        for file_path in Path(directory_path).rglob("*.mdl"):
-            results[str(file_path)] = self.lint_file(str(file_path))
-        
-        return results
+        file_paths = sorted(str(file_path) for file_path in Path(directory_path).rglob("*.mdl"))
+        return self.lint_files(file_paths, jobs, cache)
+
+
+def _lint_in_worker(rules: List[LintRule], source: str, file_path: str) -> List[MDLLintIssue]:
+    return MDLLinter(rules).lint_source(source, file_path)
+
+
+# Bump when a rule's behaviour changes, so cached results from older rules are dropped
+LINT_CACHE_VERSION = 1
+
+
+@functools.lru_cache(maxsize=None)
+def _grammar_key() -> str:
+    """The package version plus a hash of the lexer and parser sources, so cached syntax
+    errors are dropped whenever the grammar changes (including in development checkouts)."""
+    from . import __version__, mdl_lexer, mdl_parser
+    digest = hashlib.blake2b(__version__.encode(), digest_size=8)
+    for module in (mdl_lexer, mdl_parser):
+        try:
+            digest.update(Path(module.__file__).read_bytes())
+        except (OSError, TypeError):
+            pass  # no source on disk (e.g. frozen); the version alone has to do
+    return digest.hexdigest()
+
+
+def ruleset_key(rules: List[LintRule]) -> str:
+    """Identifies a rule set: the cache version, the grammar and the class of every rule, in order."""
+    names = [f"{type(rule).__module__}.{type(rule).__qualname__}" for rule in rules]
+    key = json.dumps([LINT_CACHE_VERSION, _grammar_key(), names])
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+class LintCache:
+    """
+    Lint results of earlier runs, keyed by file path and content hash.
+
+    Stored as JSON in directory, one file per rule set, so `mdl check` and `mdl lint`
+    (or different custom rule lists) never see each other's results.
+    """
+
+    def __init__(self, directory: Union[str, Path], rules: List[LintRule]):
+        self.path = Path(directory) / f"lint-{ruleset_key(rules)}.json"
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            if data.get("version") == LINT_CACHE_VERSION:
+                self._entries = data["files"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass  # missing or unreadable cache: start empty
+
+    def get(self, file_path: str, digest: str) -> Optional[List[MDLLintIssue]]:
+        entry = self._entries.get(str(Path(file_path).resolve()))
+        if entry is None or entry.get("hash") != digest:
+            return None
+        return [MDLLintIssue(**issue) for issue in entry["issues"]]
+
+    def put(self, file_path: str, digest: str, issues: List[MDLLintIssue]):
+        self._entries[str(Path(file_path).resolve())] = {"hash": digest, "issues": [asdict(i) for i in issues]}
+        self._dirty = True
+
+    def save(self):
+        """Write the cache if anything changed, dropping entries of deleted files."""
+        if not self._dirty:
+            return
+        self._entries = {path: entry for path, entry in self._entries.items() if Path(path).exists()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        temp_path.write_text(json.dumps({"version": LINT_CACHE_VERSION, "files": self._entries}), encoding='utf-8')
+        os.replace(temp_path, self.path)
+        self._dirty = False
 
 
 def lint_mdl_file(file_path: str) -> List[MDLLintIssue]:
@@ -403,7 +431,10 @@ def lint_mdl_file(file_path: str) -> List[MDLLintIssue]:
     return linter.lint_file(file_path)
 
 
-def lint_mdl_directory(directory_path: str) -> Dict[str, List[MDLLintIssue]]:
-    """Convenience function to lint all MDL files in a directory"""
+def lint_mdl_directory(directory_path: str, jobs: Optional[int] = None,
+                       cache_dir: Optional[str] = None) -> Dict[str, List[MDLLintIssue]]:
+    """Convenience function to lint all MDL files in a directory, in parallel and
+    with results cached in cache_dir when it is given"""
     linter = MDLLinter()
-    return linter.lint_directory(directory_path)
+    cache = LintCache(cache_dir, linter.rules) if cache_dir else None
+    return linter.lint_directory(directory_path, jobs, cache)
@@ -3,19 +3,99 @@ MDL Parser - Parses MDL source code into an Abstract Syntax Tree
 Implements the complete language specification from language-reference.md
 """
 
-from typing import List, Optional, Dict, Any, Union
+import functools
+import sys
+from collections import UserList
+from typing import List, Optional, Dict, Any, Tuple, Union
 from .mdl_lexer import Token, TokenType, MDLLexer
-from .mdl_errors import MDLParserError
+from .mdl_errors import MDLParserError, MDLLexerError, MDLErrorCollector
+from .instrumentation import PhaseTimer, timed
 from .ast_nodes import (
     ASTNode, Program, PackDeclaration, NamespaceDeclaration, TagDeclaration,
     VariableDeclaration, VariableAssignment, VariableSubstitution, FunctionDeclaration,
     FunctionCall, IfStatement, WhileLoop, ScheduledWhileLoop, HookDeclaration, RawBlock, MacroLine,
     SayCommand, TellrawCommand, ExecuteCommand, ScoreboardCommand,
     BinaryExpression, UnaryExpression, ParenthesizedExpression, LiteralExpression,
-    ScopeSelector
+    ScopeSelector, SourceSpan
 )
 
 
+def _with_span(parse_method):
+    """Record the span of the first token a parse method consumed on the node it returns."""
+    @functools.wraps(parse_method)
+    def wrapper(self, *args, **kwargs):
+        start = self._peek()
+        node = parse_method(self, *args, **kwargs)
+        if isinstance(node, ASTNode) and node.span is None:
+            node.span = SourceSpan(self.source_file, start.line, start.column)
+        return node
+    return wrapper
+
+
+# Tokens that start a top-level declaration; error recovery resumes at them
+_DECLARATION_TOKENS = frozenset({
+    TokenType.PACK, TokenType.NAMESPACE, TokenType.TAG, TokenType.VAR, TokenType.FUNCTION,
+    TokenType.ON_LOAD, TokenType.ON_TICK,
+})
+# Tokens that start a statement inside a block
+_STATEMENT_TOKENS = frozenset({TokenType.IF, TokenType.WHILE, TokenType.SCHEDULED_WHILE, TokenType.EXEC})
+
+
+# Binding power of each binary operator; higher binds tighter. New operators only need an entry here
+_BINARY_PRECEDENCE = {
+    TokenType.OR: 1,
+    TokenType.AND: 2,
+    TokenType.GREATER: 3, TokenType.LESS: 3, TokenType.GREATER_EQUAL: 3,
+    TokenType.LESS_EQUAL: 3, TokenType.EQUAL: 3, TokenType.NOT_EQUAL: 3,
+    TokenType.PLUS: 4, TokenType.MINUS: 4,
+    TokenType.MULTIPLY: 5, TokenType.DIVIDE: 5,
+}
+# Prefix operators bind tighter than any binary operator
+_PREFIX_OPERATORS = frozenset({TokenType.NOT, TokenType.MINUS})
+
+
+class LazyBody(UserList):
+    """Function body that is parsed the first time its statements are accessed.
+    
+    Holds the parser's token list and the index just past the body's '{'; the
+    statements are parsed with a fresh MDLParser, after which the tokens are released.
+    Behaves like a list (and compares equal to one with the same statements).
+    """
+    
+    def __init__(self, tokens: List[Token], start: int, source_file: Optional[str] = None,
+                 error_collector: Optional[MDLErrorCollector] = None):
+        self._tokens = tokens
+        self._start = start
+        self._source_file = source_file
+        self._error_collector = error_collector
+        self._data: Optional[List[ASTNode]] = None
+    
+    @property
+    def materialized(self) -> bool:
+        return self._data is not None
+    
+    @property
+    def data(self) -> List[ASTNode]:
+        if self._data is None:
+            parser = MDLParser(self._source_file, error_collector=self._error_collector)
+            parser.tokens = self._tokens
+            parser.current = self._start
+            body = parser._parse_block()
+            parser._expect_block_end("Expected '}' to end function body")
+            self.data = body
+        return self._data
+    
+    @data.setter
+    def data(self, value: List[ASTNode]):
+        self._data = value
+        self._tokens = None
+    
+    def __repr__(self) -> str:
+        if self._data is None:
+            return f"<LazyBody at token {self._start}>"
+        return repr(self._data)
+
+
 class MDLParser:
     """
     Parser for the MDL language.
@@ -28,8 +108,17 @@ class MDLParser:
     - Comprehensive error handling with context
     """
     
-    def __init__(self, source_file: str = None):
+    def __init__(self, source_file: str = None, timer: Optional[PhaseTimer] = None,
+                 error_collector: Optional[MDLErrorCollector] = None, lazy_bodies: bool = False):
         self.source_file = source_file
+        # Optional PhaseTimer that receives 'lex' and 'parse' timings
+        self.timer = timer
+        # When set, syntax errors are recorded here instead of raised, parsing resumes
+        # at the next statement or declaration, and parse() returns a partial Program
+        self.error_collector = error_collector
+        # When set, function bodies are only brace-matched and become LazyBody lists that
+        # are parsed on first access; syntax errors inside them surface at that point
+        self.lazy_bodies = lazy_bodies
         self.tokens: List[Token] = []
         self.current = 0
         self.current_namespace = "mdl"
@@ -45,15 +134,25 @@ class MDLParser:
             Program AST node representing the complete program
             
         Raises:
-            MDLParserError: If there's a parsing error
+            MDLParserError: If there's a parsing error (unless an error_collector is set)
         """
         # Lex the source into tokens
         lexer = MDLLexer(self.source_file)
-        self.tokens = lexer.lex(source)
+        try:
+            with timed(self.timer, "lex"):
+                self.tokens = lexer.lex(source)
+        except MDLLexerError as e:
+            if self.error_collector is None:
+                raise
+            # The lexer stops at its first error, so there is nothing left to parse
+            self.error_collector.add_error(e)
+            return Program(pack=None, namespace=None, tags=[], variables=[], functions=[],
+                           hooks=[], statements=[])
         self.current = 0
         
         # Parse the program
-        return self._parse_program()
+        with timed(self.timer, "parse"):
+            return self._parse_program()
     
     def _parse_program(self) -> Program:
         """Parse the complete program."""
@@ -66,6 +165,7 @@ class MDLParser:
         statements = []
         
         while not self._is_at_end():
+            start = self.current
             try:
                 if self._peek().type == TokenType.PACK:
                     pack = self._parse_pack_declaration()
@@ -100,11 +200,15 @@ class MDLParser:
                 else:
                     # Skip unknown tokens (comments, whitespace, etc.)
                     self._advance()
+            except MDLParserError as e:
+                if self.error_collector is None:
+                    raise
+                self._recover(e, start, _DECLARATION_TOKENS)
             except Exception as e:
-                if isinstance(e, MDLParserError):
-                    raise e
-                else:
-                    self._error(f"Unexpected error during parsing: {str(e)}", "Check the syntax")
+                error = self._make_error(f"Unexpected error during parsing: {str(e)}", "Check the syntax")
+                if self.error_collector is None:
+                    raise error
+                self._recover(error, start, _DECLARATION_TOKENS)
         
         return Program(
             pack=pack,
@@ -116,6 +220,7 @@ class MDLParser:
             statements=statements
         )
     
+    @_with_span
     def _parse_pack_declaration(self) -> PackDeclaration:
         """Parse pack declaration: pack "name" "description" format;"""
         self._expect(TokenType.PACK, "Expected 'pack' keyword")
@@ -135,6 +240,7 @@ class MDLParser:
         
         return PackDeclaration(name=name, description=description, pack_format=pack_format)
     
+    @_with_span
     def _parse_namespace_declaration(self) -> NamespaceDeclaration:
         """Parse namespace declaration: namespace "name";"""
         self._expect(TokenType.NAMESPACE, "Expected 'namespace' keyword")
@@ -150,6 +256,7 @@ class MDLParser:
         
         return NamespaceDeclaration(name=name)
     
+    @_with_span
     def _parse_tag_declaration(self) -> TagDeclaration:
         """Parse tag declaration: tag type "name" "path";"""
         self._expect(TokenType.TAG, "Expected 'tag' keyword")
@@ -180,6 +287,7 @@ class MDLParser:
             self._error(f"Expected tag type, got {token.value}", 
                        "Use: recipe, loot_table, advancement, item_modifier, predicate, or structure")
     
+    @_with_span
     def _parse_variable_declaration(self) -> VariableDeclaration:
         """Parse variable declaration: var num name<scope?> = value; defaults to <@s>."""
         self._expect(TokenType.VAR, "Expected 'var' keyword")
@@ -206,6 +314,7 @@ class MDLParser:
             initial_value=initial_value
         )
     
+    @_with_span
     def _parse_variable_assignment(self) -> VariableAssignment:
         """Parse variable assignment: name<scope?> = value; defaults to <@s>."""
         name = self._expect_identifier("Expected variable name")
@@ -236,8 +345,9 @@ class MDLParser:
         
         self._expect(TokenType.RANGLE, "Expected '>' to close scope selector")
         
-        return f"<{selector_content}>"
+        return sys.intern(f"<{selector_content}>")
     
+    @_with_span
     def _parse_function_declaration(self) -> FunctionDeclaration:
         """Parse function declaration: function namespace:name<scope> { body }"""
         self._expect(TokenType.FUNCTION, "Expected 'function' keyword")
@@ -254,9 +364,13 @@ class MDLParser:
         
         self._expect(TokenType.LBRACE, "Expected '{' to start function body")
         
-        body = self._parse_block()
-        
-        self._expect(TokenType.RBRACE, "Expected '}' to end function body")
+        end = self._skip_body() if self.lazy_bodies else None
+        if end is not None:
+            body = LazyBody(self.tokens, self.current, self.source_file, self.error_collector)
+            self.current = end + 1
+        else:
+            body = self._parse_block()
+            self._expect_block_end("Expected '}' to end function body")
         
         return FunctionDeclaration(
             namespace=namespace,
@@ -265,6 +379,7 @@ class MDLParser:
             body=body
         )
     
+    @_with_span
     def _parse_function_call(self) -> FunctionCall:
         """Parse function call: exec namespace:name<scope>? [ '{json}' | with <data source> [path] ] ;"""
         self._expect(TokenType.EXEC, "Expected 'exec' keyword")
@@ -315,6 +430,7 @@ class MDLParser:
             with_clause=with_clause
         )
     
+    @_with_span
     def _parse_if_statement(self) -> IfStatement:
         """Parse if statement: if condition { then_body } else { else_body } or else if { ... }"""
         self._expect(TokenType.IF, "Expected 'if' keyword")
@@ -323,7 +439,7 @@ class MDLParser:
         
         self._expect(TokenType.LBRACE, "Expected '{' to start if body")
         then_body = self._parse_block()
-        self._expect(TokenType.RBRACE, "Expected '}' to end if body")
+        self._expect_block_end("Expected '}' to end if body")
         
         # Parse optional else clause
         else_body = None
@@ -338,7 +454,7 @@ class MDLParser:
                 # This is a regular else
                 self._expect(TokenType.LBRACE, "Expected '{' to start else body")
                 else_body = self._parse_block()
-                self._expect(TokenType.RBRACE, "Expected '}' to end else body")
+                self._expect_block_end("Expected '}' to end else body")
         
         return IfStatement(
             condition=condition,
@@ -346,6 +462,7 @@ class MDLParser:
             else_body=else_body
         )
     
+    @_with_span
     def _parse_while_loop(self) -> WhileLoop:
         """Parse while loop: while condition { body }"""
         self._expect(TokenType.WHILE, "Expected 'while' keyword")
@@ -354,10 +471,11 @@ class MDLParser:
         
         self._expect(TokenType.LBRACE, "Expected '{' to start while body")
         body = self._parse_block()
-        self._expect(TokenType.RBRACE, "Expected '}' to end while body")
+        self._expect_block_end("Expected '}' to end while body")
         
         return WhileLoop(condition=condition, body=body)
 
+    @_with_span
     def _parse_scheduled_while_loop(self) -> ScheduledWhileLoop:
         """Parse scheduledwhile loop: scheduledwhile condition { body }"""
         self._expect(TokenType.SCHEDULED_WHILE, "Expected 'scheduledwhile' keyword")
@@ -366,10 +484,11 @@ class MDLParser:
         
         self._expect(TokenType.LBRACE, "Expected '{' to start while body")
         body = self._parse_block()
-        self._expect(TokenType.RBRACE, "Expected '}' to end while body")
+        self._expect_block_end("Expected '}' to end while body")
         
         return ScheduledWhileLoop(condition=condition, body=body)
     
+    @_with_span
     def _parse_hook_declaration(self) -> HookDeclaration:
         """Parse hook declaration: on_load/on_tick namespace:name<scope>;"""
         hook_type = self._peek().value
@@ -394,6 +513,7 @@ class MDLParser:
             scope=scope
         )
     
+    @_with_span
     def _parse_raw_block(self) -> RawBlock:
         """Parse raw block: $!raw ... raw!$"""
         # Consume $!raw
@@ -415,6 +535,7 @@ class MDLParser:
         
         return RawBlock(content=content)
     
+    @_with_span
     def _parse_say_command(self) -> SayCommand:
         """Parse say command: say "message with $variable<scope>$";"""
         self._expect(TokenType.IDENTIFIER, "Expected 'say' keyword")
@@ -433,8 +554,8 @@ class MDLParser:
         # Support both $var<scope>$ and $var$
         import re
         for m in re.finditer(r'\$([a-zA-Z_][a-zA-Z0-9_]*)(<[^>]+>)?\$', message):
-            name = m.group(1)
-            scope = m.group(2) if m.group(2) else "<@s>"
+            name = sys.intern(m.group(1))
+            scope = sys.intern(m.group(2)) if m.group(2) else "<@s>"
             variables.append(VariableSubstitution(name=name, scope=scope))
         
         self._expect(TokenType.QUOTE, "Expected closing quote for say message")
@@ -442,6 +563,7 @@ class MDLParser:
         
         return SayCommand(message=message, variables=variables)
     
+    @_with_span
     def _parse_variable_substitution(self) -> VariableSubstitution:
         """Parse variable substitution: $variable<scope?>$; defaults to <@s>."""
         self._expect(TokenType.DOLLAR, "Expected '$' to start variable substitution")
@@ -457,7 +579,7 @@ class MDLParser:
                 selector_content += self._peek().value
                 self._advance()
             self._expect(TokenType.RANGLE, "Expected '>' to close scope selector")
-            scope = f"<{selector_content}>"
+            scope = sys.intern(f"<{selector_content}>")
         else:
             scope = "<@s>"
         
@@ -465,131 +587,193 @@ class MDLParser:
         
         return VariableSubstitution(name=name, scope=scope)
     
+    @_with_span
     def _parse_expression(self) -> Any:
-        """Parse an expression with operator precedence."""
-        return self._parse_or()
+        """Parse an expression with operator precedence.
 
-    def _parse_or(self) -> Any:
-        """Parse logical OR (||) with left associativity."""
-        expr = self._parse_and()
-        while not self._is_at_end() and self._peek().type == TokenType.OR:
-            operator = self._peek().type
-            self._advance()
-            right = self._parse_and()
-            expr = BinaryExpression(left=expr, operator=operator, right=right)
-        return expr
+        Operator precedence parsing with explicit stacks instead of recursion, so nesting
+        depth (parentheses, prefix operators) is not limited by Python's recursion limit.
+        All binary operators are left-associative; prefix operators bind tighter than any
+        binary operator.
+        """
+        operands: List[Any] = []
+        # Pending operators, innermost last: (kind, token, precedence), kind is
+        # "binary", "prefix" or "paren" (an unclosed '(')
+        operators: List[Tuple[str, Token, int]] = []
+        open_parens = 0
+        while True:
+            # Operand position: prefix operators and opening parentheses, then a primary
+            while True:
+                token = self._peek()
+                if token.type in _PREFIX_OPERATORS:
+                    operators.append(("prefix", self._advance(), 0))
+                elif token.type == TokenType.LPAREN:
+                    operators.append(("paren", self._advance(), 0))
+                    open_parens += 1
+                else:
+                    break
+            operands.append(self._parse_primary())
 
-    def _parse_and(self) -> Any:
-        """Parse logical AND (&&) with left associativity."""
-        expr = self._parse_comparison()
-        while not self._is_at_end() and self._peek().type == TokenType.AND:
-            operator = self._peek().type
-            self._advance()
-            right = self._parse_comparison()
-            expr = BinaryExpression(left=expr, operator=operator, right=right)
-        return expr
-    
-    def _parse_comparison(self) -> Any:
-        """Parse comparison expressions (>, <, >=, <=, ==, !=)."""
-        expr = self._parse_term()
-        
-        while not self._is_at_end() and self._peek().type in [
-            TokenType.GREATER, TokenType.LESS, TokenType.GREATER_EQUAL, 
-            TokenType.LESS_EQUAL, TokenType.EQUAL, TokenType.NOT_EQUAL
-        ]:
-            operator = self._peek().type
-            self._advance()
-            right = self._parse_term()
-            expr = BinaryExpression(left=expr, operator=operator, right=right)
-        
-        return expr
-    
-    def _parse_term(self) -> Any:
-        """Parse addition and subtraction terms."""
-        expr = self._parse_factor()
-        
-        while not self._is_at_end() and self._peek().type in [TokenType.PLUS, TokenType.MINUS]:
-            operator = self._peek().type
-            self._advance()
-            right = self._parse_factor()
-            expr = BinaryExpression(left=expr, operator=operator, right=right)
-        
-        return expr
-    
-    def _parse_factor(self) -> Any:
-        """Parse multiplication and division factors."""
-        expr = self._parse_unary()
-        
-        while not self._is_at_end() and self._peek().type in [TokenType.MULTIPLY, TokenType.DIVIDE]:
-            operator = self._peek().type
-            self._advance()
-            right = self._parse_unary()
-            expr = BinaryExpression(left=expr, operator=operator, right=right)
-        
-        return expr
+            # Operator position: close parentheses until a binary operator or the end
+            while True:
+                while operators and operators[-1][0] == "prefix":
+                    _, token, _ = operators.pop()
+                    expr = UnaryExpression(operator=token.type, operand=operands.pop())
+                    expr.span = SourceSpan(self.source_file, token.line, token.column)
+                    operands.append(expr)
+                operator = self._peek()
+                precedence = _BINARY_PRECEDENCE.get(operator.type)
+                if precedence is not None:
+                    self._reduce_binary(operands, operators, precedence)
+                    operators.append(("binary", self._advance(), precedence))
+                    break
+                if operator.type == TokenType.RPAREN and open_parens:
+                    self._reduce_binary(operands, operators, 0)
+                    _, token, _ = operators.pop()
+                    self._advance()
+                    open_parens -= 1
+                    expr = ParenthesizedExpression(expression=operands.pop())
+                    expr.span = SourceSpan(self.source_file, token.line, token.column)
+                    operands.append(expr)
+                    continue
+                if open_parens:
+                    self._expect(TokenType.RPAREN, "Expected closing parenthesis")
+                self._reduce_binary(operands, operators, 0)
+                return operands.pop()
+
+    @staticmethod
+    def _reduce_binary(operands: List[Any], operators: List[Tuple[str, Token, int]], min_precedence: int):
+        """Fold pending binary operators binding at least min_precedence (left-associative)."""
+        while operators and operators[-1][0] == "binary" and operators[-1][2] >= min_precedence:
+            _, token, _ = operators.pop()
+            right = operands.pop()
+            left = operands.pop()
+            expr = BinaryExpression(left=left, operator=token.type, right=right)
+            expr.span = left.span
+            operands.append(expr)
 
-    def _parse_unary(self) -> Any:
-        """Parse unary expressions (logical NOT, unary minus)."""
-        if not self._is_at_end() and self._peek().type in [TokenType.NOT, TokenType.MINUS]:
-            operator = self._peek().type
-            self._advance()
-            operand = self._parse_unary()
-            return UnaryExpression(operator=operator, operand=operand)
-        return self._parse_primary()
-    
     def _parse_primary(self) -> Any:
-        """Parse primary expressions (literals, variables, parenthesized expressions)."""
-        if self._peek().type == TokenType.DOLLAR:
+        """Parse primary expressions (literals, variables); parentheses are handled by _parse_expression."""
+        start = self._peek()
+        if start.type == TokenType.DOLLAR:
             return self._parse_variable_substitution()
-        elif self._peek().type == TokenType.NUMBER:
-            value = float(self._peek().value)
+        elif start.type == TokenType.NUMBER:
             self._advance()
-            return LiteralExpression(value=value, type="number")
-        elif self._peek().type == TokenType.QUOTE:
+            expr = LiteralExpression(value=float(start.value), type="number")
+        elif start.type == TokenType.QUOTE:
             self._advance()  # consume opening quote
             value = self._expect_identifier("Expected string content")
             self._expect(TokenType.QUOTE, "Expected closing quote")
-            return LiteralExpression(value=value, type="string")
-        elif self._peek().type == TokenType.LPAREN:
-            self._advance()  # consume opening parenthesis
-            expr = self._parse_expression()
-            self._expect(TokenType.RPAREN, "Expected closing parenthesis")
-            return ParenthesizedExpression(expression=expr)
+            expr = LiteralExpression(value=value, type="string")
         else:
             # Simple identifier
             value = self._expect_identifier("Expected expression")
-            return LiteralExpression(value=value, type="identifier")
+            expr = LiteralExpression(value=value, type="identifier")
+        expr.span = SourceSpan(self.source_file, start.line, start.column)
+        return expr
     
     def _parse_block(self) -> List[ASTNode]:
         """Parse a block of statements."""
         statements = []
         
         while not self._is_at_end() and self._peek().type != TokenType.RBRACE:
-            if self._peek().type == TokenType.IF:
-                statements.append(self._parse_if_statement())
-            elif self._peek().type == TokenType.WHILE:
-                statements.append(self._parse_while_loop())
-            elif self._peek().type == TokenType.SCHEDULED_WHILE:
-                statements.append(self._parse_scheduled_while_loop())
-            elif self._peek().type == TokenType.EXEC:
-                statements.append(self._parse_function_call())
-            elif self._peek().type == TokenType.MACRO_LINE:
-                # Preserve macro line exactly as-is
-                statements.append(MacroLine(content=self._peek().value))
-                self._advance()
-            elif self._peek().type == TokenType.DOLLAR and self._peek(1).type == TokenType.EXCLAMATION:
-                statements.append(self._parse_raw_block())
-            elif self._peek().type == TokenType.IDENTIFIER:
-                if self._peek().value == "say":
-                    statements.append(self._parse_say_command())
-                else:
-                    statements.append(self._parse_variable_assignment())
-            else:
-                # Skip unknown tokens
-                self._advance()
+            if self.error_collector is not None and self._peek().type in _DECLARATION_TOKENS:
+                # Most likely a missing '}': end the block so the declaration parses on its own
+                break
+            start = self.current
+            try:
+                self._parse_block_statement(statements)
+            except MDLParserError as e:
+                if self.error_collector is None:
+                    raise
+                self._recover(e, start, _STATEMENT_TOKENS | _DECLARATION_TOKENS)
         
         return statements
     
+    def _parse_block_statement(self, statements: List[ASTNode]):
+        """Parse one statement of a block and append it (unknown tokens are skipped)."""
+        if self._peek().type == TokenType.IF:
+            statements.append(self._parse_if_statement())
+        elif self._peek().type == TokenType.WHILE:
+            statements.append(self._parse_while_loop())
+        elif self._peek().type == TokenType.SCHEDULED_WHILE:
+            statements.append(self._parse_scheduled_while_loop())
+        elif self._peek().type == TokenType.EXEC:
+            statements.append(self._parse_function_call())
+        elif self._peek().type == TokenType.MACRO_LINE:
+            # Preserve macro line exactly as-is
+            token = self._advance()
+            macro = MacroLine(content=token.value)
+            macro.span = SourceSpan(self.source_file, token.line, token.column)
+            statements.append(macro)
+        elif self._peek().type == TokenType.DOLLAR and self._peek(1).type == TokenType.EXCLAMATION:
+            statements.append(self._parse_raw_block())
+        elif self._peek().type == TokenType.IDENTIFIER:
+            if self._peek().value == "say":
+                statements.append(self._parse_say_command())
+            else:
+                statements.append(self._parse_variable_assignment())
+        else:
+            # Skip unknown tokens
+            self._advance()
+    
+    def _skip_body(self) -> Optional[int]:
+        """Index of the '}' closing the body that starts at the current token, or None
+        when the body is malformed (unbalanced, or a declaration inside it) and has to be
+        parsed eagerly so its errors are reported in order."""
+        tokens = self.tokens
+        depth = 0
+        for index in range(self.current, len(tokens)):
+            token_type = tokens[index].type
+            if token_type == TokenType.LBRACE:
+                depth += 1
+            elif token_type == TokenType.RBRACE:
+                if depth == 0:
+                    return index
+                depth -= 1
+            elif token_type in _DECLARATION_TOKENS or token_type == TokenType.EOF:
+                return None
+        return None
+    
+    def _record_error(self, error: MDLParserError):
+        """Add error to the collector unless it repeats the position of the previous one
+        (e.g. a missing '}' reported by both an if body and its enclosing function)."""
+        errors = self.error_collector.errors
+        if errors and (errors[-1].file_path, errors[-1].line, errors[-1].column) == \
+                (error.file_path, error.line, error.column):
+            return
+        self.error_collector.add_error(error)
+    
+    def _recover(self, error: MDLParserError, start: int, stop_tokens: frozenset):
+        """Record a syntax error and skip ahead to where parsing can resume (panic mode).
+        
+        Stops after a ';' or a balanced '{...}' group, or before a token in stop_tokens,
+        an identifier that starts a new line, or the '}' closing the enclosing block.
+        Always consumes at least one token.
+        """
+        self._record_error(error)
+        moved = self.current != start
+        depth = 0
+        while not self._is_at_end():
+            token = self._peek()
+            token_type = token.type
+            if depth == 0 and moved:
+                if token_type in stop_tokens or token_type == TokenType.RBRACE:
+                    return
+                # A statement starting on a new line usually means the previous one lacked its ';'
+                if token_type == TokenType.IDENTIFIER and token.line > self._previous().line:
+                    return
+            self._advance()
+            moved = True
+            if token_type == TokenType.LBRACE:
+                depth += 1
+            elif token_type == TokenType.RBRACE and depth > 0:
+                depth -= 1
+                if depth == 0:
+                    return
+            elif token_type == TokenType.SEMICOLON and depth == 0:
+                return
+    
     # Helper methods
     def _advance(self) -> Token:
         """Advance to next token and return the previous one."""
@@ -621,17 +805,30 @@ class MDLParser:
         else:
             self._error(f"Expected {token_type}, got {self._peek().type}", message)
     
+    def _expect_block_end(self, message: str):
+        """Expect the '}' closing a body; when recovering, a missing one is recorded and
+        the body is kept, so one forgotten brace does not drop the whole declaration."""
+        if self.error_collector is None or self._peek().type == TokenType.RBRACE:
+            self._expect(TokenType.RBRACE, message)
+            return
+        self._record_error(self._make_error(f"Expected {TokenType.RBRACE}, got {self._peek().type}", message))
+    
     def _expect_identifier(self, message: str) -> str:
         """Expect an identifier token and return its value."""
         token = self._peek()
         if token.type == TokenType.IDENTIFIER:
             self._advance()
-            return token.value
+            # Names repeat across many nodes; interning keeps one copy of each
+            return sys.intern(token.value)
         else:
             self._error(f"Expected identifier, got {token.type}", message)
     
     def _error(self, message: str, suggestion: str):
         """Raise a parser error with context."""
+        raise self._make_error(message, suggestion)
+    
+    def _make_error(self, message: str, suggestion: str) -> MDLParserError:
+        """Parser error at the current token."""
         if self._is_at_end():
             line = 1
             column = 1
@@ -642,7 +839,7 @@ class MDLParser:
             column = token.column
             line_content = token.value
         
-        raise MDLParserError(
+        return MDLParserError(
             message=message,
             file_path=self.source_file,
             line=line,
@@ -0,0 +1,115 @@
+"""
+Multi-Version Overlays - Build one datapack that targets several pack formats via pack.mcmeta overlays
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .ast_nodes import Program
+from .mdl_compiler import MDLCompiler
+from .mdl_errors import MDLCompilerError
+from .pack_formats import CAPABILITY_INTRODUCED
+from .source_map import SourceMap, SOURCE_MAP_FILE
+from .instrumentation import timed
+from .utils import write_output_files
+
+# Upper bound for the newest overlay so future game versions keep the most recent lowering
+MAX_PACK_FORMAT = 2147483647
+
+
+def overlay_directory(pack_format: int) -> str:
+    """Name of the overlay folder holding files specific to a pack_format."""
+    return f"format_{pack_format}"
+
+
+def generate_overlay_files(ast: Program, pack_formats: List[int], source_dir: Optional[str] = None,
+                           **compiler_options) -> Dict[str, Union[str, bytes]]:
+    """Lower one AST for several pack formats and merge the results into a single pack.
+
+    The AST is compiled to IR once and only emitted per format. Files that are
+    byte-identical at the same path for every format are stored once in the base
+    layer. The remaining files go into overlay directories; adjacent formats whose
+    remaining files are identical share one overlay entry and directory.
+    Extra keyword arguments are passed to the MDLCompiler.
+    """
+    formats = sorted(set(pack_formats))
+    if len(formats) < 2:
+        raise MDLCompilerError("Overlay builds need at least two pack formats",
+                               suggestion="Pass --target-format more than once")
+    overlay_min = CAPABILITY_INTRODUCED["overlays"]
+    if formats[0] < overlay_min:
+        raise MDLCompilerError(
+            f"pack.mcmeta overlays require pack_format {overlay_min} or newer (got {formats[0]})",
+            suggestion=f"Build formats below {overlay_min} as a separate datapack"
+        )
+
+    per_format = MDLCompiler(**compiler_options).generate_formats(ast, formats, source_dir)
+    source_maps: Dict[int, SourceMap] = {}
+    for pack_format, files in per_format.items():
+        files.pop("pack.mcmeta", None)
+        if SOURCE_MAP_FILE in files:
+            source_maps[pack_format] = SourceMap.from_json(files.pop(SOURCE_MAP_FILE))
+
+    first = per_format[formats[0]]
+    shared = {
+        path for path, content in first.items()
+        if all(per_format[f].get(path) == content for f in formats[1:])
+    }
+
+    # Runs of adjacent formats with the same format-specific files: (first format, files)
+    groups: List[Tuple[int, Dict[str, Union[str, bytes]]]] = []
+    for pack_format in formats:
+        specific = {path: content for path, content in per_format[pack_format].items() if path not in shared}
+        if not groups or groups[-1][1] != specific:
+            groups.append((pack_format, specific))
+
+    merged: Dict[str, Union[str, bytes]] = {path: first[path] for path in sorted(shared)}
+    entries = []
+    for index, (pack_format, specific) in enumerate(groups):
+        if not specific:
+            continue
+        directory = overlay_directory(pack_format)
+        upper = groups[index + 1][0] - 1 if index + 1 < len(groups) else MAX_PACK_FORMAT
+        entries.append({
+            "formats": {"min_inclusive": pack_format, "max_inclusive": upper},
+            "directory": directory
+        })
+        for path, content in specific.items():
+            merged[f"{directory}/{path}"] = content
+
+    if source_maps:
+        # One map at the pack root; overlay files are keyed by their path inside the pack
+        combined = SourceMap()
+        for pack_format, _ in groups:
+            source_map = source_maps[pack_format]
+            directory = overlay_directory(pack_format)
+            for path, entries_by_line in source_map.files.items():
+                target = path if path in shared else f"{directory}/{path}"
+                if target not in combined.files:
+                    combined.add_file(target, [source_map.lookup(path, line) for line in range(1, max(entries_by_line) + 1)])
+        merged[SOURCE_MAP_FILE] = combined.to_json()
+
+    description = ast.pack.description if ast.pack else "MDL Generated Datapack"
+    pack_data = {
+        "pack": {
+            "pack_format": formats[-1],
+            "description": description,
+            "supported_formats": {"min_inclusive": formats[0], "max_inclusive": formats[-1]}
+        },
+        "overlays": {"entries": entries}
+    }
+    merged["pack.mcmeta"] = json.dumps(pack_data, indent=2)
+    return merged
+
+
+def compile_with_overlays(ast: Program, pack_formats: List[int], output_dir: str,
+                          source_dir: Optional[str] = None, **compiler_options) -> str:
+    """Write a single overlay datapack for several pack formats to output_dir."""
+    files = generate_overlay_files(ast, pack_formats, source_dir, **compiler_options)
+    try:
+        with timed(compiler_options.get("timer"), "write"):
+            write_output_files(output_dir, files)
+    except OSError as e:
+        raise MDLCompilerError(f"Failed to write datapack: {str(e)}", suggestion="Check that the output directory is writable")
+    return str(Path(output_dir))
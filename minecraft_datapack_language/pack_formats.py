@@ -0,0 +1,69 @@
+"""
+Pack Format Capabilities - Which commands and layouts each datapack pack_format supports
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+
+@dataclass(frozen=True)
+class PackCapabilities:
+    """Feature flags for a datapack pack_format.
+
+    Codegen consults these to choose the cheapest lowering that the target
+    game version can actually load.
+    """
+    return_command: bool = False             # return <value> (1.20)
+    macros: bool = False                     # function macros and $(var) lines (1.20.2)
+    overlays: bool = False                   # pack.mcmeta overlays.entries (1.20.2)
+    return_run: bool = False                 # return run <command> (1.20.3)
+    execute_if_function: bool = False        # execute if|unless function (1.20.3)
+    scoreboard_display: bool = False         # scoreboard players display name/numberformat (1.20.3)
+    singular_resource_folders: bool = False  # function/ instead of functions/ (1.21)
+
+
+# First pack_format that ships each capability
+CAPABILITY_INTRODUCED: Dict[str, int] = {
+    "return_command": 15,
+    "macros": 18,
+    "overlays": 18,
+    "return_run": 26,
+    "execute_if_function": 26,
+    "scoreboard_display": 26,
+    "singular_resource_folders": 45,
+}
+
+
+def _build_table() -> Tuple[List[int], List[PackCapabilities]]:
+    """Precompute one PackCapabilities per range of formats with identical features."""
+    breakpoints = sorted(set(CAPABILITY_INTRODUCED.values()))
+    starts = [0] + breakpoints
+    table = []
+    for start in starts:
+        enabled = {name: start >= introduced for name, introduced in CAPABILITY_INTRODUCED.items()}
+        table.append(PackCapabilities(**enabled))
+    return starts, table
+
+
+_RANGE_STARTS, _RANGE_CAPABILITIES = _build_table()
+
+
+@lru_cache(maxsize=None)
+def get_capabilities(pack_format: int) -> PackCapabilities:
+    """Return the capabilities of the given pack_format."""
+    index = bisect_right(_RANGE_STARTS, pack_format) - 1
+    return _RANGE_CAPABILITIES[max(index, 0)]
+
+
+def supports(pack_format: int, capability: str) -> bool:
+    """Return True if pack_format supports the named capability."""
+    if capability not in CAPABILITY_INTRODUCED:
+        raise KeyError(f"Unknown pack format capability: {capability}")
+    return getattr(get_capabilities(pack_format), capability)
+
+
+def capability_names() -> List[str]:
+    """Return all known capability names."""
+    return [f.name for f in fields(PackCapabilities)]
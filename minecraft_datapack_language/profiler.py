@@ -0,0 +1,103 @@
+"""
+Profiler - Call counters for profiling builds (mdl build --profile)
+
+Every generated function increments a fake player named after it on the mdl_prof
+objective. The pack also gets <ns>:profile/dump, which tellraws the functions
+sorted by call count, and <ns>:profile/reset, which clears the counters.
+"""
+
+import json
+from typing import Dict, List, Optional
+
+from .ir import IRModule, Block, Instruction, Score, ScoreSet, ScoreAdd, ScoreOperation, \
+    ScoreCompare, ScoreMatches, Call, Execute, Raw, Comment, Blank
+
+PROFILE_OBJECTIVE = "mdl_prof"
+# Scratch copy of the counters that the dump consumes while sorting
+SORT_OBJECTIVE = "mdl_prof_sort"
+_MAX = Score("#max", SORT_OBJECTIVE)
+
+
+def profile_holder(function_id: str) -> str:
+    """Fake player that counts calls of a function ('ns:path/name' -> 'ns.path/name')."""
+    return function_id.replace(":", ".")
+
+
+def instrument_module(module: IRModule, namespace: str) -> List[str]:
+    """Insert a call counter at the top of every block and add the dump/reset functions.
+
+    Returns the instrumented function ids in emission order.
+    """
+    function_ids: List[str] = []
+    locations: Dict[str, str] = {}
+    for block in module.blocks():
+        span = next((i.span for i in block.instructions if i.span is not None), None)
+        if span is not None and span.file_path:
+            locations[block.function_id] = f"{span.file_path}:{span.line}"
+        index = 0
+        while index < len(block.instructions) and isinstance(block.instructions[index], (Comment, Blank)):
+            index += 1
+        counter = Score(profile_holder(block.function_id), PROFILE_OBJECTIVE)
+        block.instructions.insert(index, ScoreAdd(counter, "1"))
+        function_ids.append(block.function_id)
+    for block in profile_blocks(namespace, function_ids, locations):
+        module.add(block)
+    return function_ids
+
+
+def profile_blocks(namespace: str, function_ids: List[str],
+                   locations: Optional[Dict[str, str]] = None) -> List[Block]:
+    """profile/dump, its selection-sort helpers, and profile/reset.
+
+    locations optionally maps function ids to the MDL 'file:line' shown next to them.
+
+    The dump prints one line per distinct count, highest first, so it runs about
+    2 * len(function_ids) commands per printed line.
+    """
+    counters = [Score(profile_holder(fid), PROFILE_OBJECTIVE) for fid in function_ids]
+    sort_slots = [Score(c.holder, SORT_OBJECTIVE) for c in counters]
+    next_id = f"{namespace}:profile/dump_next"
+    print_id = f"{namespace}:profile/dump_print"
+
+    header = json.dumps({"text": f"MDL profile for {namespace} (calls per function)", "color": "gold"})
+    dump: List[Instruction] = [
+        Comment(f"Function: {namespace}:profile/dump"),
+        Raw(f"tellraw @a {header}"),
+        Raw(f"scoreboard players reset * {SORT_OBJECTIVE}"),
+    ]
+    # 'add 0' creates missing counters so functions that never ran copy cleanly
+    dump.extend(ScoreAdd(counter, "0") for counter in counters)
+    dump.extend(ScoreOperation(slot, "=", counter) for slot, counter in zip(sort_slots, counters))
+    dump.append(Call(next_id))
+
+    # Find the largest remaining count; print every function holding it, then repeat
+    dump_next: List[Instruction] = [Comment(f"Function: {next_id}"), ScoreSet(_MAX, "0")]
+    dump_next.extend(ScoreOperation(_MAX, ">", slot) for slot in sort_slots)
+    dump_next.append(Execute([ScoreMatches(_MAX, "1..")], Call(print_id)))
+
+    dump_print: List[Instruction] = [Comment(f"Function: {print_id}")]
+    for fid, slot, counter in zip(function_ids, sort_slots, counters):
+        parts = [
+            {"text": "  "},
+            {"score": {"name": counter.holder, "objective": PROFILE_OBJECTIVE}, "color": "yellow"},
+            {"text": f" {fid}"},
+        ]
+        if locations and fid in locations:
+            parts.append({"text": f" ({locations[fid]})", "color": "gray"})
+        line = json.dumps(parts)
+        is_max = ScoreCompare(slot, "=", _MAX)
+        dump_print.append(Execute([is_max], Raw(f"tellraw @a {line}")))
+        dump_print.append(Execute([is_max], ScoreSet(slot, "0")))
+    dump_print.append(Call(next_id))
+
+    reset: List[Instruction] = [
+        Comment(f"Function: {namespace}:profile/reset"),
+        Raw(f"scoreboard players reset * {PROFILE_OBJECTIVE}"),
+        Raw(f"scoreboard players reset * {SORT_OBJECTIVE}"),
+    ]
+    return [
+        Block(namespace, "profile/dump", dump),
+        Block(namespace, "profile/dump_next", dump_next),
+        Block(namespace, "profile/dump_print", dump_print),
+        Block(namespace, "profile/reset", reset),
+    ]
@@ -0,0 +1,462 @@
+"""
+MDL Language Server - JSON-RPC over stdio with warm caches (mdl serve)
+
+Speaks the Language Server Protocol framing (Content-Length headers) and the
+subset of LSP an editor needs for MDL, plus custom methods for builds:
+
+    initialize / initialized / shutdown / exit
+    textDocument/didOpen, didChange (full sync), didSave, didClose -> textDocument/publishDiagnostics
+    textDocument/documentSymbol, textDocument/definition, workspace/symbol
+    mdl/build  {"mdl": path, "output": dir, "targetFormats": [..], "zip": bool, ...}
+    $/cancelRequest
+
+Parsed ASTs of open documents and workspace files, and one IncrementalBuilder
+per (mdl, output) pair, stay in memory between requests. Requests cancelled
+before they start get a RequestCancelled error, and a document change that a
+newer change to the same document has already replaced is skipped.
+"""
+
+import json
+import logging
+import queue
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlparse
+
+from .ast_nodes import Program, SourceSpan
+from .mdl_parser import MDLParser
+from .mdl_errors import MDLError, MDLErrorCollector
+from .source_registry import forget_source
+from .watch import FileStamp, IncrementalBuilder, file_stamp, find_mdl_files
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC / LSP error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+SERVER_NOT_INITIALIZED = -32002
+REQUEST_CANCELLED = -32800
+
+# LSP SymbolKind values
+SYMBOL_FUNCTION = 12
+SYMBOL_VARIABLE = 13
+SYMBOL_EVENT = 24
+
+DIAGNOSTIC_ERROR = 1
+
+# Characters of a function id or variable name under the cursor
+_WORD = re.compile(r"[A-Za-z0-9_:./]+")
+
+
+class RPCError(Exception):
+    """Raised by a handler to answer a request with a JSON-RPC error."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def read_message(stream: BinaryIO) -> Optional[Any]:
+    """Read one Content-Length framed JSON message; None at end of stream."""
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii", "replace").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    if length is None:
+        raise RPCError(PARSE_ERROR, "Missing Content-Length header")
+    body = stream.read(length)
+    try:
+        return json.loads(body.decode("utf-8"))
+    except ValueError as e:
+        raise RPCError(PARSE_ERROR, f"Invalid JSON: {e}")
+
+
+def write_message(stream: BinaryIO, message: dict):
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    stream.flush()
+
+
+def uri_to_path(uri: str) -> Path:
+    parsed = urlparse(uri)
+    path = unquote(parsed.path)
+    # file:///C:/x -> C:/x on Windows
+    if re.match(r"^/[A-Za-z]:", path):
+        path = path[1:]
+    return Path(path)
+
+
+def path_to_uri(path: Path) -> str:
+    return Path(path).resolve().as_uri()
+
+
+def _position(span: Optional[SourceSpan]) -> dict:
+    if span is None:
+        return {"line": 0, "character": 0}
+    return {"line": max(span.line - 1, 0), "character": max(span.column - 1, 0)}
+
+
+@dataclass
+class Symbol:
+    """A function, variable or hook declared in an MDL file."""
+    name: str  # 'ns:func' for functions and hooks, the bare name for variables
+    kind: int
+    uri: str
+    span: Optional[SourceSpan]
+    detail: str = ""
+
+    def location(self) -> dict:
+        start = _position(self.span)
+        end = {"line": start["line"], "character": start["character"] + len(self.name)}
+        return {"uri": self.uri, "range": {"start": start, "end": end}}
+
+    def to_lsp(self) -> dict:
+        return {"name": self.name, "kind": self.kind, "location": self.location(),
+                "containerName": self.detail}
+
+
+def collect_symbols(ast: Program, uri: str) -> List[Symbol]:
+    symbols = [Symbol(f"{f.namespace}:{f.name}", SYMBOL_FUNCTION, uri, f.span, f.scope or "")
+               for f in ast.functions]
+    symbols.extend(Symbol(v.name, SYMBOL_VARIABLE, uri, v.span, v.scope) for v in ast.variables)
+    symbols.extend(Symbol(f"{h.namespace}:{h.name}", SYMBOL_EVENT, uri, h.span, h.hook_type)
+                   for h in ast.hooks)
+    return symbols
+
+
+@dataclass
+class _Document:
+    """Parse state of one source, open in the editor or read from disk."""
+    uri: str
+    text: str
+    version: Optional[int] = None
+    stamp: FileStamp = None
+    ast: Optional[Program] = None  # partial when the source has errors
+    errors: List[MDLError] = field(default_factory=list)
+    symbols: List[Symbol] = field(default_factory=list)
+
+
+def parse_document(uri: str, text: str, version: Optional[int] = None, stamp: FileStamp = None,
+                   lazy_bodies: bool = False) -> _Document:
+    document = _Document(uri, text, version, stamp)
+    collector = MDLErrorCollector()
+    parser = MDLParser(str(uri_to_path(uri)), error_collector=collector, lazy_bodies=lazy_bodies)
+    document.ast = parser.parse(text)
+    document.errors = collector.errors
+    document.symbols = collect_symbols(document.ast, uri)
+    return document
+
+
+def diagnostic(error: MDLError) -> dict:
+    line = max((error.line or 1) - 1, 0)
+    character = max((error.column or 1) - 1, 0)
+    message = error.message
+    if error.suggestion:
+        message += f"\n{error.suggestion}"
+    return {
+        "range": {"start": {"line": line, "character": character},
+                  "end": {"line": line, "character": character + 1}},
+        "severity": DIAGNOSTIC_ERROR,
+        "source": "mdl",
+        "message": message,
+    }
+
+
+def diagnostics(document: _Document) -> List[dict]:
+    return [diagnostic(error) for error in document.errors]
+
+
+class LanguageServer:
+    """Handles JSON-RPC messages; serve() runs it over a pair of byte streams."""
+
+    def __init__(self, send: Optional[Callable[[dict], None]] = None):
+        # Called with every message the server sends (responses and notifications)
+        self.send = send or (lambda message: None)
+        self.root: Optional[Path] = None
+        self.initialized = False
+        self.shutting_down = False
+        self.exit_code: Optional[int] = None
+        self.open_documents: Dict[str, _Document] = {}
+        self.workspace_documents: Dict[str, _Document] = {}
+        self.builders: Dict[Tuple[str, str, Tuple[int, ...], bool, str], IncrementalBuilder] = {}
+        self.cancelled: Set[Any] = set()
+        self._handlers: Dict[str, Callable[[dict], Any]] = {
+            "initialize": self._initialize,
+            "initialized": lambda params: None,
+            "shutdown": self._shutdown,
+            "exit": self._exit,
+            "textDocument/didOpen": self._did_open,
+            "textDocument/didChange": self._did_change,
+            # Saved text already arrived through didChange; disk reads are checked by mtime
+            "textDocument/didSave": lambda params: None,
+            "textDocument/didClose": self._did_close,
+            "textDocument/documentSymbol": self._document_symbol,
+            "textDocument/definition": self._definition,
+            "workspace/symbol": self._workspace_symbol,
+            "mdl/build": self._build,
+            "$/cancelRequest": self._cancel_request,
+        }
+
+    # -- dispatch ---------------------------------------------------------
+
+    def handle(self, message: Any):
+        """Process one incoming message, sending a response if it is a request."""
+        if not isinstance(message, dict) or "method" not in message:
+            if isinstance(message, dict) and "id" in message:
+                return  # a response to something we sent; nothing is awaited
+            self._respond_error(None, INVALID_REQUEST, "Invalid JSON-RPC message")
+            return
+        method = message["method"]
+        request_id = message.get("id")
+        is_request = "id" in message
+        if is_request and request_id in self.cancelled:
+            self.cancelled.discard(request_id)
+            self._respond_error(request_id, REQUEST_CANCELLED, "Request cancelled")
+            return
+        handler = self._handlers.get(method)
+        if handler is None:
+            if is_request:
+                self._respond_error(request_id, METHOD_NOT_FOUND, f"Unknown method: {method}")
+            return
+        if not self.initialized and method not in ("initialize", "exit") and is_request:
+            self._respond_error(request_id, SERVER_NOT_INITIALIZED, "Server not initialized")
+            return
+        try:
+            result = handler(message.get("params") or {})
+        except RPCError as e:
+            if is_request:
+                self._respond_error(request_id, e.code, e.message)
+            return
+        except Exception as e:
+            logger.exception("Error handling %s", method)
+            if is_request:
+                self._respond_error(request_id, INTERNAL_ERROR, str(e))
+            return
+        if is_request:
+            self.send({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    def _respond_error(self, request_id: Any, code: int, message: str):
+        self.send({"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}})
+
+    def _notify(self, method: str, params: dict):
+        self.send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    # -- lifecycle --------------------------------------------------------
+
+    def _initialize(self, params: dict) -> dict:
+        root_uri = params.get("rootUri")
+        if root_uri:
+            self.root = uri_to_path(root_uri)
+        elif params.get("rootPath"):
+            self.root = Path(params["rootPath"])
+        self.initialized = True
+        from . import __version__
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": 1, "save": {"includeText": False}},
+                "documentSymbolProvider": True,
+                "workspaceSymbolProvider": True,
+                "definitionProvider": True,
+            },
+            "serverInfo": {"name": "mdl", "version": __version__},
+        }
+
+    def _shutdown(self, params: dict):
+        self.shutting_down = True
+        return None
+
+    def _exit(self, params: dict):
+        self.exit_code = 0 if self.shutting_down else 1
+
+    def _cancel_request(self, params: dict):
+        self.cancelled.add(params.get("id"))
+
+    # -- documents --------------------------------------------------------
+
+    def _update(self, uri: str, text: str, version: Optional[int]):
+        document = parse_document(uri, text, version)
+        self.open_documents[uri] = document
+        self._notify("textDocument/publishDiagnostics",
+                     {"uri": uri, "version": version, "diagnostics": diagnostics(document)})
+
+    def _did_open(self, params: dict):
+        item = params["textDocument"]
+        self._update(item["uri"], item["text"], item.get("version"))
+
+    def _did_change(self, params: dict):
+        changes = params.get("contentChanges") or []
+        if not changes:
+            return
+        # Full document sync: the last change holds the whole text
+        document = params["textDocument"]
+        self._update(document["uri"], changes[-1]["text"], document.get("version"))
+
+    def _did_close(self, params: dict):
+        uri = params["textDocument"]["uri"]
+        self.open_documents.pop(uri, None)
+        # The unsaved buffer is gone; error context reads the file again
+        forget_source(str(uri_to_path(uri)))
+        self._notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    def _document(self, uri: str) -> Optional[_Document]:
+        """Open document, or the cached parse of the file on disk."""
+        if uri in self.open_documents:
+            return self.open_documents[uri]
+        path = uri_to_path(uri)
+        stamp = file_stamp(path)
+        cached = self.workspace_documents.get(uri)
+        if cached is not None and cached.stamp == stamp:
+            return cached
+        if stamp is None:
+            self.workspace_documents.pop(uri, None)
+            return None
+        try:
+            text = path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        # Symbols of unopened files come from declarations only, so skip parsing their bodies
+        document = parse_document(uri, text, stamp=stamp, lazy_bodies=True)
+        self.workspace_documents[uri] = document
+        return document
+
+    def _all_documents(self) -> List[_Document]:
+        uris = list(self.open_documents)
+        if self.root is not None:
+            uris.extend(path_to_uri(p) for p in find_mdl_files(self.root) if path_to_uri(p) not in self.open_documents)
+        return [d for d in (self._document(uri) for uri in uris) if d is not None]
+
+    # -- queries ----------------------------------------------------------
+
+    def _document_symbol(self, params: dict) -> List[dict]:
+        document = self._document(params["textDocument"]["uri"])
+        if document is None:
+            return []
+        return [symbol.to_lsp() for symbol in document.symbols]
+
+    def _workspace_symbol(self, params: dict) -> List[dict]:
+        query = (params.get("query") or "").lower()
+        return [symbol.to_lsp() for document in self._all_documents() for symbol in document.symbols
+                if query in symbol.name.lower()]
+
+    def _definition(self, params: dict) -> List[dict]:
+        document = self._document(params["textDocument"]["uri"])
+        if document is None:
+            return []
+        position = params["position"]
+        lines = document.text.splitlines()
+        if position["line"] >= len(lines):
+            return []
+        word = next((m.group(0) for m in _WORD.finditer(lines[position["line"]])
+                     if m.start() <= position["character"] <= m.end()), None)
+        if not word:
+            return []
+        kinds = (SYMBOL_FUNCTION,) if ":" in word else (SYMBOL_VARIABLE,)
+        return [symbol.location() for d in self._all_documents() for symbol in d.symbols
+                if symbol.kind in kinds and symbol.name == word]
+
+    # -- builds -----------------------------------------------------------
+
+    def _build(self, params: dict) -> dict:
+        if "mdl" not in params:
+            raise RPCError(INVALID_REQUEST, "mdl/build needs an 'mdl' path")
+        # Relative paths are resolved against the workspace root
+        base = self.root or Path()
+        mdl = str(base / params["mdl"])
+        output = str(base / params.get("output", "dist"))
+        target_formats = tuple(sorted(set(params.get("targetFormats") or [])))
+        zip_output = bool(params.get("zip", True))
+        options = {
+            "prune_unreachable": bool(params.get("pruneUnreachable", False)),
+            "keep_functions": list(params.get("keep") or []),
+            "profile": bool(params.get("profile", False)),
+            "source_map": bool(params.get("sourceMap", False)),
+        }
+        key = (mdl, output, target_formats, zip_output, json.dumps(options, sort_keys=True))
+        builder = self.builders.get(key)
+        if builder is None:
+            builder = self.builders[key] = IncrementalBuilder(mdl, output, list(target_formats), zip_output, **options)
+        result = builder.rebuild()
+        return {
+            "output": output,
+            "parsed": result.parsed,
+            "written": result.written,
+            "removed": result.removed,
+            "durationMs": round(result.duration * 1000, 3),
+            "error": result.error,
+        }
+
+    # -- transport --------------------------------------------------------
+
+    def serve(self, reader: BinaryIO, writer: BinaryIO) -> int:
+        """Read messages on a background thread and handle them until exit; returns the exit code."""
+        lock = threading.Lock()
+
+        def send(message: dict):
+            with lock:
+                write_message(writer, message)
+
+        self.send = send
+        incoming: "queue.Queue[Any]" = queue.Queue()
+
+        def read_loop():
+            while True:
+                try:
+                    message = read_message(reader)
+                except RPCError as e:
+                    self._respond_error(None, e.code, e.message)
+                    continue
+                except (OSError, ValueError):
+                    message = None
+                incoming.put(message)
+                # Stop reading after exit so no thread is blocked on stdin while the interpreter shuts down
+                if message is None or (isinstance(message, dict) and message.get("method") == "exit"):
+                    return
+
+        threading.Thread(target=read_loop, name="mdl-serve-reader", daemon=True).start()
+
+        pending: Deque[Any] = deque()
+        while self.exit_code is None:
+            if not pending:
+                pending.append(incoming.get())
+            while True:
+                try:
+                    pending.append(incoming.get_nowait())
+                except queue.Empty:
+                    break
+            # Cancellations apply to everything still queued, so handle them first
+            for message in [m for m in pending if isinstance(m, dict) and m.get("method") == "$/cancelRequest"]:
+                pending.remove(message)
+                self.handle(message)
+            if not pending:
+                continue
+            message = pending.popleft()
+            if message is None:
+                return 1 if self.exit_code is None else self.exit_code
+            if self._superseded(message, pending):
+                continue
+            self.handle(message)
+        return self.exit_code
+
+    @staticmethod
+    def _superseded(message: Any, pending: Deque[Any]) -> bool:
+        """A full-text didChange that a queued didChange for the same document replaces."""
+        if not isinstance(message, dict) or message.get("method") != "textDocument/didChange":
+            return False
+        uri = message.get("params", {}).get("textDocument", {}).get("uri")
+        return any(isinstance(m, dict) and m.get("method") == "textDocument/didChange"
+                   and m.get("params", {}).get("textDocument", {}).get("uri") == uri
+                   for m in pending)
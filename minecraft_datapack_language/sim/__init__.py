@@ -0,0 +1,12 @@
+"""
+Offline simulator - Execute generated .mcfunction files and count the commands they run
+"""
+
+from .errors import CommandError, SimulationError
+from .interpreter import Simulator, ExecutionStats, split_command
+from .world import World, Entity, ChatMessage
+
+__all__ = [
+    "Simulator", "ExecutionStats", "World", "Entity", "ChatMessage",
+    "CommandError", "SimulationError", "split_command",
+]
@@ -0,0 +1,20 @@
+"""
+Simulator errors
+"""
+
+
+class CommandError(Exception):
+    """A command failed the way it would fail in game (unknown objective, missing score, ...)."""
+
+
+class SimulationError(Exception):
+    """The simulator cannot continue: unsupported command in strict mode or a broken pack."""
+
+    def __init__(self, message: str, function: str = None, line: int = None, source: str = None):
+        self.function = function
+        self.line = line
+        self.source = source
+        location = f" ({function}:{line})" if function and line else ""
+        if source:
+            location += f" from {source}"
+        super().__init__(f"{message}{location}")
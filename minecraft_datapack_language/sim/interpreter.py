@@ -0,0 +1,644 @@
+"""
+Offline mcfunction interpreter - Runs generated datapacks without a Minecraft server
+
+Supports the command subset MDL emits (scoreboard, execute as/at/if/unless/run,
+function, schedule, tag, tellraw, say, summon, kill and return) and counts every
+command executed, per tick and per function, so codegen changes can be compared
+on command count.
+"""
+
+import json
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from ..ast_nodes import SourceSpan
+from ..source_map import SourceMap, SOURCE_MAP_FILE, format_span
+from .errors import CommandError, SimulationError
+from .selectors import parse_range, parse_selector
+from .world import Entity, World, ChatMessage
+
+FUNCTION_PATH_RE = re.compile(r"^data/([^/]+)/functions?/(.+)\.mcfunction$")
+FUNCTION_TAG_PATH_RE = re.compile(r"^data/([^/]+)/tags/functions?/(.+)\.json$")
+MACRO_RE = re.compile(r"\$\(([A-Za-z_][A-Za-z0-9_]*)\)")
+
+# Default value of the maxCommandChainLength game rule
+DEFAULT_MAX_COMMAND_CHAIN = 65536
+# Nested function calls are interpreted recursively, so depth is bounded separately
+DEFAULT_MAX_CALL_DEPTH = 512
+
+
+def split_command(line: str) -> List[str]:
+    """Split a command on spaces, keeping quoted strings, [..] and {..} groups together."""
+    tokens: List[str] = []
+    current: List[str] = []
+    depth = 0
+    quote = None
+    escaped = False
+    for char in line:
+        if quote:
+            current.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+            continue
+        if char in "\"'":
+            quote = char
+        elif char in "[{":
+            depth += 1
+        elif char in "]}":
+            depth -= 1
+        if char == " " and depth == 0:
+            if current:
+                tokens.append("".join(current))
+                current = []
+            continue
+        current.append(char)
+    if current:
+        tokens.append("".join(current))
+    return tokens
+
+
+def parse_compound(text: str) -> Dict[str, str]:
+    """Parse a flat SNBT compound like {name:"x",count:3} into macro arguments."""
+    body = text.strip()
+    if not (body.startswith("{") and body.endswith("}")):
+        raise CommandError(f"Expected a compound, got '{text}'")
+    result: Dict[str, str] = {}
+    for entry in split_command(body[1:-1].replace(",", " ")):
+        if ":" not in entry:
+            continue
+        key, value = entry.split(":", 1)
+        key = key.strip().strip("\"'")
+        value = value.strip()
+        if len(value) >= 2 and value[0] in "\"'" and value[-1] == value[0]:
+            value = value[1:-1]
+        elif re.fullmatch(r"-?\d+(\.\d+)?[bBsSlLfFdD]", value):
+            value = value[:-1]
+        result[key] = value
+    return result
+
+
+@dataclass
+class ExecutionStats:
+    """Command counts collected while simulating."""
+    commands: int = 0
+    failed: int = 0
+    load_commands: int = 0
+    per_tick: List[int] = field(default_factory=list)
+    # Commands executed directly in each function's body (not in its callees)
+    per_function: Counter = field(default_factory=Counter)
+    calls: Counter = field(default_factory=Counter)
+    unsupported: Counter = field(default_factory=Counter)
+    failures: Counter = field(default_factory=Counter)
+    truncated_chains: int = 0
+
+
+@dataclass
+class _Context:
+    executor: Optional[Entity]
+    function: str
+
+
+class _Return(Exception):
+    def __init__(self, value: Optional[int]):
+        self.value = value
+
+
+class _ChainLimit(Exception):
+    pass
+
+
+class Simulator:
+    """Execute a generated datapack in memory.
+
+    files maps pack-relative paths (as returned by MDLCompiler.generate) to contents.
+    With strict=True, commands outside the supported subset raise SimulationError
+    instead of being counted in stats.unsupported and skipped.
+    """
+
+    def __init__(self, files: Dict[str, Union[str, bytes]], players: Optional[List[str]] = None,
+                 strict: bool = False, max_command_chain: int = DEFAULT_MAX_COMMAND_CHAIN,
+                 max_call_depth: int = DEFAULT_MAX_CALL_DEPTH, seed: int = 0):
+        self.world = World(players, seed=seed)
+        self.strict = strict
+        self.max_command_chain = max_command_chain
+        self.max_call_depth = max_call_depth
+        self.functions: Dict[str, List[Tuple[int, str]]] = {}
+        # Function id -> pack-relative path, for source map lookups
+        self.function_paths: Dict[str, str] = {}
+        self.source_map: Optional[SourceMap] = None
+        self.function_tags: Dict[str, List[str]] = {}
+        self.scheduled: Dict[str, int] = {}
+        self.game_time = 0
+        self.stats = ExecutionStats()
+        self._chain_remaining = max_command_chain
+        self._depth = 0
+        self._load_pack(files)
+        self._handlers: Dict[str, Callable[[List[str], _Context], None]] = {
+            "scoreboard": self._cmd_scoreboard,
+            "execute": self._cmd_execute,
+            "function": self._cmd_function,
+            "schedule": self._cmd_schedule,
+            "tag": self._cmd_tag,
+            "team": self._cmd_team,
+            "tellraw": self._cmd_tellraw,
+            "say": self._cmd_say,
+            "summon": self._cmd_summon,
+            "kill": self._cmd_kill,
+            "return": self._cmd_return,
+        }
+
+    @classmethod
+    def from_directory(cls, path: Union[str, Path], **options) -> "Simulator":
+        """Load a built datapack directory."""
+        root = Path(path)
+        files = {p.relative_to(root).as_posix(): p.read_bytes() for p in root.rglob("*") if p.is_file()}
+        return cls(files, **options)
+
+    def _load_pack(self, files: Dict[str, Union[str, bytes]]):
+        for rel_path, content in files.items():
+            if isinstance(content, bytes):
+                content = content.decode("utf-8")
+            if rel_path == SOURCE_MAP_FILE:
+                self.source_map = SourceMap.from_json(content)
+                continue
+            match = FUNCTION_PATH_RE.match(rel_path)
+            if match:
+                lines = []
+                for number, raw in enumerate(content.splitlines(), start=1):
+                    line = raw.strip()
+                    if line and not line.startswith("#"):
+                        lines.append((number, line))
+                function_id = f"{match.group(1)}:{match.group(2)}"
+                self.functions[function_id] = lines
+                self.function_paths[function_id] = rel_path
+                continue
+            match = FUNCTION_TAG_PATH_RE.match(rel_path)
+            if match:
+                values = json.loads(content).get("values", [])
+                self.function_tags[f"{match.group(1)}:{match.group(2)}"] = [
+                    v["id"] if isinstance(v, dict) else v for v in values
+                ]
+
+    # Entry points
+    def load(self):
+        """Run the #minecraft:load functions, as on /reload."""
+        before = self.stats.commands
+        self._run_top_level("#minecraft:load")
+        self.stats.load_commands += self.stats.commands - before
+
+    def tick(self, count: int = 1):
+        """Advance game time: #minecraft:tick functions, then due scheduled functions."""
+        for _ in range(count):
+            self.game_time += 1
+            before = self.stats.commands
+            self._run_top_level("#minecraft:tick")
+            due = [fn for fn, when in self.scheduled.items() if when <= self.game_time]
+            for function_id in due:
+                del self.scheduled[function_id]
+                self._run_top_level(function_id)
+            self.stats.per_tick.append(self.stats.commands - before)
+
+    def run_function(self, function_id: str, executor: Optional[Entity] = None,
+                     arguments: Optional[Dict[str, str]] = None) -> Optional[int]:
+        """Run a function like /function does and return its return value, if any."""
+        return self._run_top_level(function_id, executor, arguments)
+
+    def score(self, holder: str, objective: str) -> Optional[int]:
+        """Score of a player name, fake player or selector (first match, server context)."""
+        holders = self.world.holders(parse_selector(holder), None)
+        return self.world.get_score(holders[0], objective) if holders else None
+
+    def source_location(self, function_id: str, line: int) -> Optional[SourceSpan]:
+        """MDL source of a function line, when the pack was built with a source map."""
+        if self.source_map is None or function_id not in self.function_paths:
+            return None
+        return self.source_map.lookup(self.function_paths[function_id], line)
+
+    @property
+    def chat(self) -> List[ChatMessage]:
+        return self.world.chat
+
+    def _run_top_level(self, function_id: str, executor: Optional[Entity] = None,
+                       arguments: Optional[Dict[str, str]] = None) -> Optional[int]:
+        if function_id.startswith("#") and function_id[1:] not in self.function_tags:
+            return None
+        self._chain_remaining = self.max_command_chain
+        self._depth = 0
+        # Each nested call uses a handful of Python frames (call, command, execute, ...)
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(recursion_limit, self.max_call_depth * 8 + 200))
+        try:
+            return self._call(function_id, executor, arguments)
+        except _ChainLimit:
+            self.stats.truncated_chains += 1
+            return None
+        except CommandError as e:
+            self._record_failure(e)
+            return None
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+    # Execution
+    def _call(self, function_id: str, executor: Optional[Entity],
+              arguments: Optional[Dict[str, str]]) -> Optional[int]:
+        if function_id.startswith("#"):
+            result = None
+            for member in self.function_tags.get(function_id[1:], []):
+                result = self._call(member, executor, arguments)
+            return result
+        if function_id not in self.functions:
+            raise CommandError(f"Unknown function '{function_id}'")
+        if self._depth >= self.max_call_depth:
+            raise SimulationError(f"Call depth limit of {self.max_call_depth} exceeded calling '{function_id}'")
+        self.stats.calls[function_id] += 1
+        ctx = _Context(executor, function_id)
+        self._depth += 1
+        try:
+            for number, line in self.functions[function_id]:
+                try:
+                    if line.startswith("$"):
+                        if arguments is None:
+                            raise CommandError(f"Macro function '{function_id}' called without arguments")
+                        line = MACRO_RE.sub(lambda m: self._macro_value(arguments, m.group(1)), line[1:])
+                    self._run_command(line, ctx)
+                except _Return as r:
+                    return r.value
+                except CommandError as e:
+                    self._record_failure(e)
+                except SimulationError as e:
+                    if e.function is None:
+                        span = self.source_location(function_id, number)
+                        raise SimulationError(str(e), function_id, number, format_span(span) if span else None)
+                    raise
+            return None
+        finally:
+            self._depth -= 1
+
+    def _macro_value(self, arguments: Dict[str, str], name: str) -> str:
+        if name not in arguments:
+            raise CommandError(f"Missing macro argument '{name}'")
+        return str(arguments[name])
+
+    def _record_failure(self, error: CommandError):
+        self.stats.failed += 1
+        self.stats.failures[str(error)] += 1
+
+    def _run_command(self, line: str, ctx: _Context):
+        tokens = split_command(line) if isinstance(line, str) else line
+        if not tokens:
+            return
+        self._chain_remaining -= 1
+        if self._chain_remaining < 0:
+            raise _ChainLimit()
+        self.stats.commands += 1
+        self.stats.per_function[ctx.function] += 1
+        handler = self._handlers.get(tokens[0])
+        if handler is None:
+            self._unsupported(tokens[0])
+            return
+        handler(tokens, ctx)
+
+    def _unsupported(self, what: str):
+        if self.strict:
+            raise SimulationError(f"Unsupported command: {what}")
+        self.stats.unsupported[what] += 1
+
+    # Commands
+    def _holders(self, target: str, ctx: _Context) -> List[str]:
+        holders = self.world.holders(parse_selector(target), ctx.executor)
+        if not holders:
+            raise CommandError(f"No score holder matched '{target}'")
+        return holders
+
+    @staticmethod
+    def _expect_arguments(tokens: List[str], count: int, command: str):
+        """Raise CommandError unless tokens has at least count entries (command name included)."""
+        if len(tokens) < count:
+            raise CommandError(f"Incomplete {command} command")
+
+    @staticmethod
+    def _integer(text: str) -> int:
+        try:
+            return int(text)
+        except ValueError:
+            raise CommandError(f"Invalid integer '{text}'") from None
+
+    def _cmd_scoreboard(self, tokens: List[str], ctx: _Context):
+        self._expect_arguments(tokens, 3, "scoreboard")
+        group, action = tokens[1], tokens[2]
+        if group == "objectives":
+            if action in ("add", "remove"):
+                self._expect_arguments(tokens, 4, f"scoreboard objectives {action}")
+            if action == "add":
+                self.world.add_objective(tokens[3])
+            elif action == "remove":
+                self.world.objectives.pop(tokens[3], None)
+            elif action not in ("setdisplay", "modify", "list"):
+                self._unsupported(f"scoreboard objectives {action}")
+            return
+        if group != "players":
+            self._unsupported(f"scoreboard {group}")
+            return
+        if action in ("set", "add", "remove"):
+            self._expect_arguments(tokens, 6, f"scoreboard players {action}")
+            objective = tokens[4]
+            amount = self._integer(tokens[5])
+            for holder in self._holders(tokens[3], ctx):
+                current = self.world.get_score(holder, objective) or 0
+                if action == "set":
+                    value = amount
+                elif action == "add":
+                    value = current + amount
+                else:
+                    value = current - amount
+                self.world.set_score(holder, objective, value)
+        elif action == "reset":
+            self._expect_arguments(tokens, 4, "scoreboard players reset")
+            objectives = [tokens[4]] if len(tokens) > 4 else list(self.world.objectives)
+            if tokens[3] == "*":
+                for objective in objectives:
+                    self.world.objective(objective).clear()
+                return
+            for holder in self._holders(tokens[3], ctx):
+                for objective in objectives:
+                    self.world.objective(objective).pop(holder, None)
+        elif action == "get":
+            self._expect_arguments(tokens, 5, "scoreboard players get")
+            holder = self._holders(tokens[3], ctx)[0]
+            if self.world.get_score(holder, tokens[4]) is None:
+                raise CommandError(f"No score for {holder} in {tokens[4]}")
+        elif action == "operation":
+            self._expect_arguments(tokens, 8, "scoreboard players operation")
+            self._score_operation(tokens[3], tokens[4], tokens[5], tokens[6], tokens[7], ctx)
+        elif action not in ("enable", "display"):
+            self._unsupported(f"scoreboard players {action}")
+
+    def _score_operation(self, target: str, objective: str, op: str, source: str, source_objective: str,
+                         ctx: _Context):
+        self.world.objective(objective)
+        self.world.objective(source_objective)
+        targets = self._holders(target, ctx)
+        sources = self._holders(source, ctx)
+        for holder in targets:
+            for source_holder in sources:
+                b = self.world.get_score(source_holder, source_objective)
+                if b is None:
+                    raise CommandError(f"No score for {source_holder} in {source_objective}")
+                a = self.world.get_score(holder, objective) or 0
+                if op == "=":
+                    result = b
+                elif op == "+=":
+                    result = a + b
+                elif op == "-=":
+                    result = a - b
+                elif op == "*=":
+                    result = a * b
+                elif op == "/=":
+                    result = a if b == 0 else a // b
+                elif op == "%=":
+                    result = a if b == 0 else a % b
+                elif op == "<":
+                    result = min(a, b)
+                elif op == ">":
+                    result = max(a, b)
+                elif op == "><":
+                    self.world.set_score(source_holder, source_objective, a)
+                    result = b
+                else:
+                    raise CommandError(f"Unknown scoreboard operation '{op}'")
+                self.world.set_score(holder, objective, result)
+
+    def _test_score(self, tokens: List[str], index: int, executor: Optional[Entity]) -> Tuple[bool, int]:
+        """Evaluate 'score <target> <obj> (matches <range> | <op> <source> <obj>)' at tokens[index]."""
+        self._expect_arguments(tokens, index + 4, "execute if score")
+        holders = self.world.holders(parse_selector(tokens[index]), executor)
+        value = self.world.get_score(holders[0], tokens[index + 1]) if holders else None
+        if tokens[index + 2] == "matches":
+            return value is not None and parse_range(tokens[index + 3]).contains(value), index + 4
+        op = tokens[index + 2]
+        self._expect_arguments(tokens, index + 5, "execute if score")
+        source_holders = self.world.holders(parse_selector(tokens[index + 3]), executor)
+        other = self.world.get_score(source_holders[0], tokens[index + 4]) if source_holders else None
+        if value is None or other is None:
+            return False, index + 5
+        comparisons = {
+            "<": value < other, "<=": value <= other, "=": value == other,
+            ">=": value >= other, ">": value > other,
+        }
+        if op not in comparisons:
+            raise CommandError(f"Unknown score comparison '{op}'")
+        return comparisons[op], index + 5
+
+    def _cmd_execute(self, tokens: List[str], ctx: _Context):
+        contexts: List[Optional[Entity]] = [ctx.executor]
+        index = 1
+        run: Optional[List[str]] = None
+        while index < len(tokens):
+            sub = tokens[index]
+            if sub not in ("positioned", "rotated", "facing", "align", "anchored", "in",
+                           "as", "at", "if", "unless", "run"):
+                self._unsupported(f"execute {sub}")
+                return
+            # Every subcommand takes at least one argument
+            self._expect_arguments(tokens, index + 2, f"execute {sub}")
+            if sub == "run":
+                run = tokens[index + 1:]
+                break
+            if sub == "as":
+                selector = parse_selector(tokens[index + 1])
+                contexts = [e for ex in contexts for e in self.world.select(selector, ex)]
+                index += 2
+            elif sub == "at":
+                # Position is not simulated: one branch per matched entity, executor unchanged
+                selector = parse_selector(tokens[index + 1])
+                contexts = [ex for ex in contexts for _ in self.world.select(selector, ex)]
+                index += 2
+            elif sub in ("positioned", "rotated", "facing"):
+                width = 3 if tokens[index + 1] in ("as", "over") else (3 if sub == "rotated" else 4)
+                self._expect_arguments(tokens, index + width, f"execute {sub}")
+                index += width
+            elif sub in ("align", "anchored", "in"):
+                index += 2
+            elif sub in ("if", "unless"):
+                negate = sub == "unless"
+                kind = tokens[index + 1]
+                kept: List[Optional[Entity]] = []
+                if kind == "score":
+                    next_index = index + 2
+                    for ex in contexts:
+                        passed, next_index = self._test_score(tokens, index + 2, ex)
+                        if passed != negate:
+                            kept.append(ex)
+                    if not contexts:
+                        _, next_index = self._test_score(tokens, index + 2, None)
+                    index = next_index
+                elif kind == "entity":
+                    self._expect_arguments(tokens, index + 3, f"execute {sub} entity")
+                    selector = parse_selector(tokens[index + 2])
+                    kept = [ex for ex in contexts if bool(self.world.select(selector, ex)) != negate]
+                    index += 3
+                elif kind == "function":
+                    self._expect_arguments(tokens, index + 3, f"execute {sub} function")
+                    function_id = tokens[index + 2]
+                    for ex in contexts:
+                        result = self._call(function_id, ex, None)
+                        if (result is not None and result != 0) != negate:
+                            kept.append(ex)
+                    index += 3
+                else:
+                    self._unsupported(f"execute {sub} {kind}")
+                    return
+                contexts = kept
+        if run is None:
+            if not contexts:
+                raise CommandError("Test failed")
+            return
+        for executor in contexts:
+            self._run_command(run, _Context(executor, ctx.function))
+
+    def _cmd_function(self, tokens: List[str], ctx: _Context):
+        self._expect_arguments(tokens, 2, "function")
+        arguments = None
+        if len(tokens) > 2:
+            if tokens[2] == "with":
+                self._unsupported("function ... with")
+                return
+            arguments = parse_compound(" ".join(tokens[2:]))
+        self._call(tokens[1], ctx.executor, arguments)
+
+    def _cmd_schedule(self, tokens: List[str], ctx: _Context):
+        self._expect_arguments(tokens, 3, "schedule")
+        if tokens[1] == "clear":
+            self.scheduled.pop(tokens[2], None)
+            return
+        if tokens[1] != "function":
+            self._unsupported(f"schedule {tokens[1]}")
+            return
+        self._expect_arguments(tokens, 4, "schedule function")
+        function_id, delay = tokens[2], tokens[3]
+        unit = delay[-1] if delay[-1] in "tsd" else "t"
+        try:
+            amount = float(delay[:-1] if delay[-1] in "tsd" else delay)
+        except ValueError:
+            raise CommandError(f"Invalid schedule delay '{delay}'") from None
+        ticks = int(amount * {"t": 1, "s": 20, "d": 24000}[unit])
+        if ticks < 1:
+            raise CommandError("Schedule delay must be at least one tick")
+        mode = tokens[4] if len(tokens) > 4 else "replace"
+        if mode == "append" and function_id in self.scheduled:
+            return
+        self.scheduled[function_id] = self.game_time + ticks
+
+    def _cmd_tag(self, tokens: List[str], ctx: _Context):
+        self._expect_arguments(tokens, 3, "tag")
+        if tokens[2] in ("add", "remove"):
+            self._expect_arguments(tokens, 4, f"tag {tokens[2]}")
+        entities = self.world.select(parse_selector(tokens[1]), ctx.executor)
+        if tokens[2] == "list":
+            return
+        if not entities:
+            raise CommandError(f"No entity matched '{tokens[1]}'")
+        for entity in entities:
+            if tokens[2] == "add":
+                entity.tags.add(tokens[3])
+            elif tokens[2] == "remove":
+                entity.tags.discard(tokens[3])
+
+    def _cmd_team(self, tokens: List[str], ctx: _Context):
+        self._expect_arguments(tokens, 2, "team")
+        action = tokens[1]
+        if action in ("add", "remove", "join", "empty"):
+            self._expect_arguments(tokens, 3, f"team {action}")
+        if action == "add":
+            self.world.add_team(tokens[2])
+        elif action == "remove":
+            self.world.remove_team(tokens[2])
+        elif action in ("join", "leave"):
+            team, targets = (tokens[2], tokens[3:]) if action == "join" else (None, tokens[2:])
+            if team is not None and team not in self.world.teams:
+                raise CommandError(f"Unknown team '{team}'")
+            entities = []
+            for target in targets or ["@s"]:
+                entities.extend(self.world.select(parse_selector(target), ctx.executor))
+            if not entities:
+                raise CommandError(f"No entity matched '{' '.join(targets) or '@s'}'")
+            for entity in entities:
+                entity.team = team
+        elif action == "empty":
+            for entity in self.world.entities:
+                if entity.team == tokens[2]:
+                    entity.team = None
+        elif action not in ("modify", "list"):
+            self._unsupported(f"team {action}")
+
+    def _render_component(self, component, ctx: _Context) -> str:
+        if isinstance(component, str):
+            return component
+        if isinstance(component, list):
+            return "".join(self._render_component(part, ctx) for part in component)
+        if not isinstance(component, dict):
+            return str(component)
+        text = str(component.get("text", ""))
+        if "score" in component:
+            score = component["score"]
+            holders = self.world.holders(parse_selector(score.get("name", "")), ctx.executor)
+            value = self.world.get_score(holders[0], score.get("objective", "")) if holders else None
+            text += "" if value is None else str(value)
+        if "selector" in component:
+            found = self.world.select(parse_selector(component["selector"]), ctx.executor)
+            text += ", ".join(e.name or e.type for e in found)
+        return text + "".join(self._render_component(extra, ctx) for extra in component.get("extra", []))
+
+    def _cmd_tellraw(self, tokens: List[str], ctx: _Context):
+        self._expect_arguments(tokens, 3, "tellraw")
+        targets = self.world.select(parse_selector(tokens[1]), ctx.executor)
+        try:
+            component = json.loads(" ".join(tokens[2:]))
+        except ValueError:
+            raise CommandError("Invalid tellraw JSON")
+        text = self._render_component(component, ctx)
+        self.world.chat.append(ChatMessage([e.name or e.type for e in targets], text))
+
+    def _cmd_say(self, tokens: List[str], ctx: _Context):
+        speaker = (ctx.executor.name or ctx.executor.type) if ctx.executor else "Server"
+        targets = [e.name for e in self.world.players()]
+        self.world.chat.append(ChatMessage(targets, f"[{speaker}] {' '.join(tokens[1:])}"))
+
+    def _cmd_summon(self, tokens: List[str], ctx: _Context):
+        self._expect_arguments(tokens, 2, "summon")
+        tags = set()
+        nbt = tokens[-1] if len(tokens) > 2 and tokens[-1].startswith("{") else ""
+        match = re.search(r"Tags:\[([^\]]*)\]", nbt)
+        if match:
+            tags = {t.strip().strip("\"'") for t in match.group(1).split(",") if t.strip()}
+        self.world.spawn(tokens[1], tags=tags)
+
+    def _cmd_kill(self, tokens: List[str], ctx: _Context):
+        target = tokens[1] if len(tokens) > 1 else "@s"
+        entities = self.world.select(parse_selector(target), ctx.executor)
+        if not entities:
+            raise CommandError(f"No entity matched '{target}'")
+        for entity in entities:
+            self.world.kill(entity)
+
+    def _cmd_return(self, tokens: List[str], ctx: _Context):
+        if len(tokens) < 2:
+            raise CommandError("Incomplete return command")
+        if tokens[1] == "fail":
+            raise _Return(0)
+        if tokens[1] == "run":
+            before = self.stats.failed
+            self._run_command(tokens[2:], ctx)
+            raise _Return(1 if self.stats.failed == before else 0)
+        try:
+            raise _Return(int(tokens[1]))
+        except ValueError:
+            raise CommandError(f"Invalid return value '{tokens[1]}'")
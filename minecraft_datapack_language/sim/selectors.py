@@ -0,0 +1,110 @@
+"""
+Selector and range parsing for the offline simulator
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .errors import CommandError
+
+
+@dataclass(frozen=True)
+class IntRange:
+    """An inclusive integer range such as 1.., ..5, 3 or 2..4."""
+    low: Optional[int]
+    high: Optional[int]
+
+    def contains(self, value: int) -> bool:
+        if self.low is not None and value < self.low:
+            return False
+        if self.high is not None and value > self.high:
+            return False
+        return True
+
+
+def parse_range(text: str) -> IntRange:
+    """Parse a Minecraft integer range."""
+    try:
+        if ".." in text:
+            low, high = text.split("..", 1)
+            return IntRange(int(low) if low else None, int(high) if high else None)
+        value = int(text)
+        return IntRange(value, value)
+    except ValueError:
+        raise CommandError(f"Invalid range '{text}'")
+
+
+@dataclass
+class Selector:
+    """A parsed target selector (@s, @a, @e[...], ...) or a literal score holder name."""
+    kind: str  # 's', 'a', 'e', 'p', 'r', 'n' (nearest entity) or 'name'
+    name: Optional[str] = None
+    types: List[Tuple[str, bool]] = field(default_factory=list)  # (type, negated)
+    tags: List[Tuple[str, bool]] = field(default_factory=list)   # (tag, negated); '' means "no tags"
+    names: List[Tuple[str, bool]] = field(default_factory=list)
+    teams: List[Tuple[str, bool]] = field(default_factory=list)  # (team, negated); '' means "no team"
+    scores: Dict[str, IntRange] = field(default_factory=dict)
+    limit: Optional[int] = None
+    sort: Optional[str] = None
+
+
+_SELECTOR_RE = re.compile(r"^@([sapenr])(?:\[(.*)\])?$", re.DOTALL)
+
+
+def _split_arguments(text: str) -> List[str]:
+    """Split selector arguments on top-level commas."""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if "".join(current).strip():
+        parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def parse_selector(text: str) -> Selector:
+    """Parse a target selector or a plain score holder name."""
+    match = _SELECTOR_RE.match(text)
+    if not match:
+        return Selector(kind="name", name=text)
+    selector = Selector(kind=match.group(1))
+    for argument in _split_arguments(match.group(2) or ""):
+        if "=" not in argument:
+            raise CommandError(f"Invalid selector argument '{argument}' in {text}")
+        key, value = (part.strip() for part in argument.split("=", 1))
+        negated = value.startswith("!")
+        if negated:
+            value = value[1:]
+        if key == "type":
+            selector.types.append((value.replace("minecraft:", ""), negated))
+        elif key == "tag":
+            selector.tags.append((value, negated))
+        elif key == "name":
+            selector.names.append((value.strip('"'), negated))
+        elif key == "team":
+            selector.teams.append((value, negated))
+        elif key == "limit":
+            try:
+                selector.limit = int(value)
+            except ValueError:
+                raise CommandError(f"Invalid selector limit '{value}' in {text}") from None
+        elif key == "sort":
+            selector.sort = value
+        elif key == "scores":
+            for entry in _split_arguments(value.strip("{}")):
+                objective, rng = entry.split("=", 1)
+                selector.scores[objective.strip()] = parse_range(rng.strip())
+        elif key in ("distance", "x", "y", "z", "dx", "dy", "dz", "x_rotation", "y_rotation", "gamemode", "level"):
+            # Positional and player-state filters have no meaning in the simulator; accept everything
+            continue
+        else:
+            raise CommandError(f"Unsupported selector argument '{key}' in {text}")
+    return selector
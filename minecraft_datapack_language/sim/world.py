@@ -0,0 +1,142 @@
+"""
+World state for the offline simulator: entities, scoreboards and chat
+"""
+
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from .errors import CommandError
+from .selectors import Selector
+
+INT_MIN = -2147483648
+INT_MAX = 2147483647
+
+
+def wrap_int(value: int) -> int:
+    """Wrap to a signed 32-bit integer like scoreboard arithmetic does."""
+    return (value - INT_MIN) % 2 ** 32 + INT_MIN
+
+
+@dataclass(eq=False)
+class Entity:
+    """A simulated entity; players are entities of type 'player' with a name."""
+    id: int
+    type: str
+    name: Optional[str] = None
+    tags: Set[str] = field(default_factory=set)
+    alive: bool = True
+    team: Optional[str] = None
+
+    @property
+    def holder(self) -> str:
+        """Scoreboard holder key (player name, or a stand-in for the entity UUID)."""
+        return self.name if self.type == "player" and self.name else f"entity#{self.id}"
+
+
+@dataclass
+class ChatMessage:
+    targets: List[str]
+    text: str
+
+
+class World:
+    """Entities, scoreboard objectives and captured chat output."""
+
+    def __init__(self, players: Optional[List[str]] = None, seed: int = 0):
+        self.entities: List[Entity] = []
+        self.objectives: Dict[str, Dict[str, int]] = {}
+        self.chat: List[ChatMessage] = []
+        self.teams: Set[str] = set()
+        self.random = random.Random(seed)
+        self._next_id = 0
+        for name in players if players is not None else ["Player"]:
+            self.spawn("player", name=name)
+
+    # Entities
+    def spawn(self, entity_type: str, name: Optional[str] = None, tags: Optional[Set[str]] = None) -> Entity:
+        self._next_id += 1
+        entity = Entity(self._next_id, entity_type.replace("minecraft:", ""), name, set(tags or ()))
+        self.entities.append(entity)
+        return entity
+
+    def kill(self, entity: Entity):
+        entity.alive = False
+        self.entities = [e for e in self.entities if e.alive]
+
+    def players(self) -> List[Entity]:
+        return [e for e in self.entities if e.type == "player"]
+
+    def _matches(self, entity: Entity, selector: Selector) -> bool:
+        for entity_type, negated in selector.types:
+            if (entity.type == entity_type) == negated:
+                return False
+        for tag, negated in selector.tags:
+            # tag= matches entities without tags and tag=! entities with any tag
+            has = not entity.tags if tag == "" else tag in entity.tags
+            if has == negated:
+                return False
+        for team, negated in selector.teams:
+            # Likewise team= matches entities on no team
+            if (entity.team == (team or None)) == negated:
+                return False
+        for name, negated in selector.names:
+            if (entity.name == name) == negated:
+                return False
+        for objective, rng in selector.scores.items():
+            value = self.objectives.get(objective, {}).get(entity.holder)
+            if value is None or not rng.contains(value):
+                return False
+        return True
+
+    def select(self, selector: Selector, executor: Optional[Entity]) -> List[Entity]:
+        """Resolve an entity selector in the context of an executor (None = server)."""
+        if selector.kind == "name":
+            return [e for e in self.players() if e.name == selector.name]
+        if selector.kind == "s":
+            candidates = [executor] if executor is not None and executor.alive else []
+        elif selector.kind in ("a", "p", "r"):
+            candidates = self.players()
+        else:
+            candidates = list(self.entities)
+        found = [e for e in candidates if self._matches(e, selector)]
+        limit = selector.limit
+        if selector.kind in ("p", "r", "n") and limit is None:
+            limit = 1
+        if selector.kind == "r" or selector.sort == "random":
+            self.random.shuffle(found)
+        if limit is not None:
+            found = found[:limit]
+        return found
+
+    def holders(self, selector: Selector, executor: Optional[Entity]) -> List[str]:
+        """Score holders a target resolves to; plain names and '*'-free fake players map to themselves."""
+        if selector.kind == "name":
+            return [selector.name]
+        return [entity.holder for entity in self.select(selector, executor)]
+
+    # Scoreboard
+    # Teams
+    def add_team(self, name: str):
+        self.teams.add(name)
+
+    def remove_team(self, name: str):
+        self.teams.discard(name)
+        for entity in self.entities:
+            if entity.team == name:
+                entity.team = None
+
+    def add_objective(self, name: str):
+        self.objectives.setdefault(name, {})
+
+    def objective(self, name: str) -> Dict[str, int]:
+        try:
+            return self.objectives[name]
+        except KeyError:
+            raise CommandError(f"Unknown scoreboard objective '{name}'")
+
+    def get_score(self, holder: str, objective: str) -> Optional[int]:
+        return self.objectives.get(objective, {}).get(holder)
+
+    def set_score(self, holder: str, objective: str, value: int):
+        self.objective(objective)[holder] = wrap_int(value)
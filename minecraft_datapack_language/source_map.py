@@ -0,0 +1,80 @@
+"""
+Source Map - Links generated mcfunction lines back to the MDL source that produced them
+
+The sidecar file (.mdl-sourcemap.json at the pack root) looks like:
+
+    {
+      "version": 1,
+      "sources": ["src/main.mdl"],
+      "files": {
+        "data/ns/function/main__if_1.mcfunction": {"3": [0, 12, 9]}
+      }
+    }
+
+Each entry maps a 1-based output line to [source index, line, column].
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .ast_nodes import SourceSpan
+
+SOURCE_MAP_FILE = ".mdl-sourcemap.json"
+SOURCE_MAP_VERSION = 1
+
+
+@dataclass
+class SourceMap:
+    """Output file and line -> MDL source span."""
+    sources: List[Optional[str]] = field(default_factory=list)
+    files: Dict[str, Dict[int, Tuple[int, int, int]]] = field(default_factory=dict)
+
+    def add_file(self, rel_path: str, line_spans: Iterable[Optional[SourceSpan]]):
+        """Record the span of each line of one generated file (None for unmapped lines)."""
+        entries: Dict[int, Tuple[int, int, int]] = {}
+        for number, span in enumerate(line_spans, start=1):
+            if span is None:
+                continue
+            if span.file_path not in self.sources:
+                self.sources.append(span.file_path)
+            entries[number] = (self.sources.index(span.file_path), span.line, span.column)
+        if entries:
+            self.files[rel_path] = entries
+
+    def lookup(self, rel_path: str, line: int) -> Optional[SourceSpan]:
+        entry = self.files.get(rel_path, {}).get(line)
+        if entry is None:
+            return None
+        source, source_line, column = entry
+        return SourceSpan(self.sources[source], source_line, column)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "version": SOURCE_MAP_VERSION,
+            "sources": self.sources,
+            "files": {
+                path: {str(line): list(entry) for line, entry in entries.items()}
+                for path, entries in self.files.items()
+            },
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: Union[str, bytes]) -> "SourceMap":
+        data = json.loads(text)
+        if data.get("version") != SOURCE_MAP_VERSION:
+            raise ValueError(f"Unsupported source map version: {data.get('version')}")
+        return cls(
+            sources=list(data.get("sources", [])),
+            files={
+                path: {int(line): tuple(entry) for line, entry in entries.items()}
+                for path, entries in data.get("files", {}).items()
+            },
+        )
+
+
+def format_span(span: Optional[SourceSpan]) -> str:
+    """'file:line:column', or '<unknown>' for lines without a mapping."""
+    if span is None:
+        return "<unknown>"
+    return f"{span.file_path or '<string>'}:{span.line}:{span.column}"
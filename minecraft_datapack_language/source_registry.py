@@ -0,0 +1,108 @@
+"""
+Source Registry - Shared text of MDL sources for error reporting
+
+The lexer registers every source it reads under its file path. Error formatting
+then takes lines from the registered text, the text that was actually parsed,
+instead of reopening the file for every error. Each SourceText builds its
+newline offset index on first use, so fetching a line is a slice.
+
+The registry holds at most MAX_SOURCES texts and drops the least recently
+used one beyond that. Long-running callers (watch, lint) also forget each
+file once its diagnostics are built.
+"""
+
+import bisect
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class SourceText:
+    """Text of one source with an index of where each line starts."""
+
+    def __init__(self, text: str, file_path: Optional[str] = None):
+        self.text = text
+        self.file_path = file_path
+        self._line_starts: Optional[List[int]] = None
+
+    @property
+    def line_starts(self) -> List[int]:
+        if self._line_starts is None:
+            starts = [0]
+            text = self.text
+            find = text.find
+            index = find("\n")
+            while index != -1:
+                starts.append(index + 1)
+                index = find("\n", index + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    @property
+    def line_count(self) -> int:
+        starts = self.line_starts
+        # A trailing newline does not start another line
+        if len(starts) > 1 and starts[-1] == len(self.text):
+            return len(starts) - 1
+        return len(starts)
+
+    def line(self, line_number: int, keepends: bool = False) -> Optional[str]:
+        """The 1-based line, without its line ending unless keepends; None if out of range."""
+        if not 1 <= line_number <= self.line_count:
+            return None
+        starts = self.line_starts
+        start = starts[line_number - 1]
+        end = starts[line_number] if line_number < len(starts) else len(self.text)
+        line = self.text[start:end]
+        return line if keepends else line.rstrip("\r\n")
+
+    def lines(self, first: int, last: int) -> List[str]:
+        """Lines first..last (1-based, inclusive, clamped to the source), without line endings."""
+        first, last = max(1, first), min(self.line_count, last)
+        return [self.line(number) for number in range(first, last + 1)]
+
+    def position(self, offset: int) -> tuple:
+        """1-based (line, column) of a character offset."""
+        line_index = bisect.bisect_right(self.line_starts, offset) - 1
+        return line_index + 1, offset - self.line_starts[line_index] + 1
+
+
+MAX_SOURCES = 256
+
+# Least recently used first
+_sources: "OrderedDict[str, SourceText]" = OrderedDict()
+
+
+def register_source(file_path: Optional[str], text: str) -> SourceText:
+    """Record the text of file_path (replacing earlier text) and return it as a SourceText.
+    Sources without a path are indexed but not registered."""
+    source = SourceText(text, file_path)
+    if file_path:
+        key = str(file_path)
+        _sources[key] = source
+        _sources.move_to_end(key)
+        while len(_sources) > MAX_SOURCES:
+            _sources.popitem(last=False)
+    return source
+
+
+def get_source(file_path: Optional[str]) -> Optional[SourceText]:
+    """Registered text of file_path, read from disk (once) if it was never registered."""
+    if not file_path:
+        return None
+    key = str(file_path)
+    source = _sources.get(key)
+    if source is not None:
+        _sources.move_to_end(key)
+    else:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+        source = register_source(file_path, text)
+    return source
+
+
+def forget_source(file_path: str):
+    """Drop the registered text of file_path, e.g. when an editor closes it."""
+    _sources.pop(str(file_path), None)
@@ -1,6 +1,7 @@
 
-import os, json
+import os, json, shutil, zipfile
 from pathlib import Path
+from typing import Dict, List, Tuple, Union
 
 def ensure_dir(p: str):
     Path(p).mkdir(parents=True, exist_ok=True)
@@ -21,3 +22,47 @@ def ns_path(namespace: str, path: str) -> str:
     if path.startswith("/"):
         path = path[1:]
     return f"{namespace}/{path}"
+
+def write_output_files(root, files: Dict[str, Union[str, bytes]]):
+    """Replace the directory at root with the given pack-relative files."""
+    root = Path(root)
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True, exist_ok=True)
+    for rel_path, content in files.items():
+        _write_output_file(root / rel_path, content)
+
+def _write_output_file(path: Path, content: Union[str, bytes]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        with open(path, "w") as f:
+            f.write(content)
+
+def sync_output_files(root, files: Dict[str, Union[str, bytes]],
+                      previous: Dict[str, Union[str, bytes]]) -> Tuple[List[str], List[str]]:
+    """Bring root from the previous file set to files, touching only what changed.
+    Returns the (written, removed) pack-relative paths.
+    """
+    root = Path(root)
+    written = [rel for rel, content in files.items() if previous.get(rel) != content]
+    removed = [rel for rel in previous if rel not in files]
+    for rel_path in written:
+        _write_output_file(root / rel_path, files[rel_path])
+    for rel_path in removed:
+        path = root / rel_path
+        path.unlink(missing_ok=True)
+        # Drop directories the removal left empty, stopping at the pack root
+        parent = path.parent
+        while parent != root and parent.exists() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    return written, removed
+
+def write_zip(archive_path, files: Dict[str, Union[str, bytes]]):
+    """Write pack-relative files straight into a zip archive (no directory walk)."""
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for rel_path in sorted(files):
+            content = files[rel_path]
+            archive.writestr(rel_path, content if isinstance(content, bytes) else content.encode("utf-8"))
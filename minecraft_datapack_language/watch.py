@@ -0,0 +1,226 @@
+"""
+Watch Mode - Incremental rebuilds for mdl watch
+
+IncrementalBuilder keeps the parsed AST of every .mdl file between builds and
+re-parses only files whose contents changed. Edits that leave the program's
+structural fingerprint unchanged (comments, whitespace) skip compilation, unless
+a source map (which records line numbers) is being written. After each build it
+rewrites only the output files whose contents differ from the previous build,
+and rebuilds the zip from memory.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .ast_nodes import Program
+from .mdl_parser import MDLParser
+from .mdl_compiler import MDLCompiler
+from .mdl_errors import MDLError
+from .source_registry import forget_source
+from .utils import write_output_files, sync_output_files, write_zip
+
+logger = logging.getLogger(__name__)
+
+# (st_mtime_ns, st_size) of a watched file, or None when it does not exist
+FileStamp = Optional[Tuple[int, int]]
+
+
+def find_mdl_files(mdl_path: Path) -> List[Path]:
+    """The .mdl files a build of mdl_path reads, in build order."""
+    if mdl_path.is_file():
+        return [mdl_path]
+    if mdl_path.is_dir():
+        return list(mdl_path.glob("**/*.mdl"))
+    return []
+
+
+def merge_programs(asts: Iterable[Program]) -> Program:
+    """Combine per-file programs into one, keeping the first declared pack and namespace.
+    The inputs are left untouched, so cached per-file ASTs can be merged again later.
+    """
+    asts = list(asts)
+    merged = Program(pack=next((a.pack for a in asts if a.pack), None),
+                     namespace=next((a.namespace for a in asts if a.namespace), None),
+                     tags=[], variables=[], functions=[], hooks=[], statements=[])
+    for ast in asts:
+        merged.tags.extend(ast.tags)
+        merged.variables.extend(ast.variables)
+        merged.functions.extend(ast.functions)
+        merged.hooks.extend(ast.hooks)
+        merged.statements.extend(ast.statements)
+    return merged
+
+
+def file_stamp(path: Path) -> FileStamp:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+@dataclass
+class _CachedSource:
+    stamp: FileStamp
+    text: str
+    ast: Program
+
+
+@dataclass
+class RebuildResult:
+    """What one rebuild did; error is set (and nothing was written) when it failed."""
+    parsed: List[str] = field(default_factory=list)  # source files that were re-parsed
+    written: List[str] = field(default_factory=list)  # pack-relative paths written
+    removed: List[str] = field(default_factory=list)  # pack-relative paths deleted
+    changed_functions: List[str] = field(default_factory=list)  # namespace:name, added or edited
+    duration: float = 0.0  # seconds
+    error: Optional[str] = None
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.written or self.removed)
+
+
+class IncrementalBuilder:
+    """Rebuild a datapack repeatedly, reusing parse results and unchanged output files."""
+
+    def __init__(self, mdl_path: Union[str, Path], output_dir: Union[str, Path],
+                 target_formats: Optional[List[int]] = None, zip_output: bool = True,
+                 **compiler_options):
+        self.mdl_path = Path(mdl_path)
+        self.output_dir = Path(output_dir)
+        # Tag declarations name JSON files relative to the project directory
+        self.source_dir = self.mdl_path if self.mdl_path.is_dir() else self.mdl_path.parent
+        self.target_formats = sorted(set(target_formats or []))
+        self.zip_output = zip_output
+        self.compiler_options = compiler_options
+        self._sources: Dict[Path, _CachedSource] = {}
+        # Files of the last successful build, as written to output_dir
+        self._output: Optional[Dict[str, Union[str, bytes]]] = None
+        # Fingerprints of the last successfully built program and of its functions
+        self._program_fingerprint: Optional[str] = None
+        self._function_fingerprints: Dict[str, str] = {}
+
+    @property
+    def archive_path(self) -> Path:
+        return self.output_dir.with_name(self.output_dir.name + ".zip")
+
+    def watched_paths(self) -> List[Path]:
+        """.mdl sources plus the JSON files their tag declarations reference."""
+        paths = find_mdl_files(self.mdl_path)
+        for cached in self._sources.values():
+            paths.extend(self.source_dir / tag.file_path for tag in cached.ast.tags if tag.file_path)
+        return paths
+
+    def snapshot(self) -> Dict[Path, FileStamp]:
+        return {path: file_stamp(path) for path in self.watched_paths()}
+
+    def rebuild(self) -> RebuildResult:
+        """Re-parse changed sources, regenerate the pack and write what differs."""
+        start = time.perf_counter()
+        result = RebuildResult()
+        mdl_files = find_mdl_files(self.mdl_path)
+        if not mdl_files:
+            result.error = f"No .mdl files found at '{self.mdl_path}'"
+            return self._finish(result, start)
+        try:
+            return self._rebuild(mdl_files, result, start)
+        finally:
+            # Error messages are formatted by now; the cached sources keep their own text
+            for path in mdl_files:
+                forget_source(str(path))
+
+    def _rebuild(self, mdl_files: List[Path], result: RebuildResult, start: float) -> RebuildResult:
+        for path in mdl_files:
+            stamp = file_stamp(path)
+            cached = self._sources.get(path)
+            if cached is not None and cached.stamp == stamp:
+                continue
+            try:
+                text = path.read_text(encoding="utf-8")
+            except OSError as e:
+                result.error = f"Error reading {path}: {e}"
+                return self._finish(result, start)
+            if cached is not None and cached.text == text:
+                cached.stamp = stamp
+                continue
+            try:
+                ast = MDLParser(str(path)).parse(text)
+            except MDLError as e:
+                result.error = f"Error in {path}: {e}"
+                return self._finish(result, start)
+            self._sources[path] = _CachedSource(stamp, text, ast)
+            result.parsed.append(str(path))
+        for path in set(self._sources) - set(mdl_files):
+            del self._sources[path]
+
+        program = merge_programs(self._sources[path].ast for path in mdl_files)
+        fingerprint = program.fingerprint()
+        # Tag declarations copy JSON files the fingerprint does not cover, and source
+        # maps record the spans it ignores
+        if (fingerprint == self._program_fingerprint and not program.tags and self._output is not None
+                and not self.compiler_options.get("source_map")
+                and (not self.zip_output or self.archive_path.exists())):
+            return self._finish(result, start)
+        functions = {f"{func.namespace}:{func.name}": func.fingerprint() for func in program.functions}
+        result.changed_functions = [name for name, digest in functions.items()
+                                    if self._function_fingerprints.get(name) != digest]
+        try:
+            files = self._generate(program)
+        except MDLError as e:
+            result.error = f"Compilation error: {e}"
+            return self._finish(result, start)
+
+        try:
+            if self._output is None:
+                write_output_files(self.output_dir, files)
+                result.written = list(files)
+            else:
+                result.written, result.removed = sync_output_files(self.output_dir, files, self._output)
+            if self.zip_output and (result.changed or not self.archive_path.exists()):
+                write_zip(self.archive_path, files)
+        except OSError as e:
+            result.error = f"Failed to write datapack: {e}"
+            # Unknown on-disk state: the next successful build rewrites everything
+            self._output = None
+            return self._finish(result, start)
+        self._output = files
+        self._program_fingerprint = fingerprint
+        self._function_fingerprints = functions
+        return self._finish(result, start)
+
+    def _generate(self, program: Program) -> Dict[str, Union[str, bytes]]:
+        if len(self.target_formats) > 1:
+            from .overlays import generate_overlay_files
+            return generate_overlay_files(program, self.target_formats, str(self.source_dir),
+                                          **self.compiler_options)
+        target_format = self.target_formats[0] if self.target_formats else None
+        compiler = MDLCompiler(target_format=target_format, **self.compiler_options)
+        return compiler.generate(program, str(self.source_dir))
+
+    def _finish(self, result: RebuildResult, start: float) -> RebuildResult:
+        result.duration = time.perf_counter() - start
+        for rel_path in result.written:
+            logger.debug("Wrote %s", rel_path)
+        for rel_path in result.removed:
+            logger.debug("Removed %s", rel_path)
+        return result
+
+    def watch(self, interval: float = 0.25, on_rebuild: Optional[Callable[[RebuildResult], None]] = None,
+              should_stop: Optional[Callable[[], bool]] = None):
+        """Build once, then poll the watched files every interval seconds and rebuild on change.
+        Runs until should_stop returns True (or forever, e.g. until KeyboardInterrupt).
+        """
+        on_rebuild = on_rebuild or (lambda result: None)
+        on_rebuild(self.rebuild())
+        last = self.snapshot()
+        while not (should_stop and should_stop()):
+            time.sleep(interval)
+            current = self.snapshot()
+            if current != last:
+                # Snapshot taken before rebuilding, so edits made during the build are not missed
+                last = current
+                on_rebuild(self.rebuild())
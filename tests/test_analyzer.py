@@ -0,0 +1,92 @@
+import json
+import subprocess
+import sys
+
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+from minecraft_datapack_language.analyzer import analyze_program
+from minecraft_datapack_language.sim import Simulator
+
+
+NESTED_SRC = (
+    'pack "t" "d" 82;\n'
+    'namespace "t";\n'
+    'var num i<@s> = 0;\n'
+    'var num j<@s> = 0;\n'
+    'function t:count<@s> {\n'
+    '    i<@s> = 0;\n'
+    '    while $i<@s>$ < 10 {\n'
+    '        j<@s> = 10;\n'
+    '        while $j<@s>$ > 0 { j<@s> = $j<@s>$ - 2; }\n'
+    '        i<@s> = $i<@s>$ + 1;\n'
+    '    }\n'
+    '}\n'
+    'function t:step { exec t:count<@a>; }\n'
+    'on_tick t:step;\n'
+)
+
+
+def test_nested_loop_bounds_cover_simulated_cost():
+    report = analyze_program(MDLParser().parse(NESTED_SRC))
+    assert report.loops["t:count__while_1"].trips == 10
+    assert report.loops["t:count__while_2"].trips == 5
+    assert not report.issues
+    bound = report.functions["t:count"].commands
+    assert report.tick_paths[0].path == ["t:step", "t:count", "t:count__while_1", "t:count__while_2"]
+
+    sim = Simulator(MDLCompiler().generate(MDLParser().parse(NESTED_SRC)), strict=True)
+    sim.load()
+    before = sim.stats.commands
+    sim.run_function("t:count", executor=sim.world.players()[0])
+    simulated = sim.stats.commands - before
+    # Only failing loop guards are overcounted (one command each)
+    assert simulated <= bound <= simulated + 11
+
+
+def test_non_terminating_and_unknown_loops_are_flagged():
+    src = (
+        'pack "t" "d" 82;\n'
+        'namespace "t";\n'
+        'var num k<@s> = 0;\n'
+        'function t:spin<@s> { k<@s> = 0; while $k<@s>$ < 3 { say "x"; } }\n'
+        'function t:drain<@s> { while $k<@s>$ > 0 { k<@s> = $k<@s>$ - 1; } }\n'
+        'function t:up<@s> { k<@s> = 0; while $k<@s>$ >= 0 { k<@s> = $k<@s>$ + 1; } }\n'
+    )
+    report = analyze_program(MDLParser().parse(src))
+    assert report.loops["t:spin__while_1"].status == "infinite"
+    assert report.loops["t:drain__while_1"].status == "unknown"
+    assert report.loops["t:up__while_1"].status == "infinite"
+    assert report.functions["t:drain"].commands is None
+    assert report.has_errors
+    assert {i.function_id for i in report.issues if i.severity == "warning"} == {"t:drain__while_1"}
+
+
+def test_chain_limit_and_recursion():
+    src = (
+        'pack "t" "d" 82;\n'
+        'namespace "t";\n'
+        'var num n<@s> = 0;\n'
+        'function t:big<@s> { n<@s> = 0; while $n<@s>$ < 20000 { n<@s> = $n<@s>$ + 1; } }\n'
+        'function t:ping { exec t:pong; }\n'
+        'function t:pong { exec t:ping; }\n'
+        'on_tick t:big;\n'
+    )
+    report = analyze_program(MDLParser().parse(src))
+    assert report.functions["t:big"].commands > 65536
+    assert any(i.severity == "error" and "maxCommandChainLength" in i.message for i in report.issues)
+    assert any(i.severity == "warning" and "depth" in i.message for i in report.issues)
+    assert report.functions["t:ping"].commands is None
+    assert any("recursive call" in i.message for i in report.issues)
+
+
+def test_cli_analyze_json(tmp_path):
+    mdl_file = tmp_path / "p.mdl"
+    mdl_file.write_text(NESTED_SRC)
+    result = subprocess.run([
+        sys.executable, "-m", "minecraft_datapack_language.cli",
+        "analyze", "--mdl", str(mdl_file), "--json"
+    ], capture_output=True, text=True)
+    assert result.returncode == 0
+    data = json.loads(result.stdout)
+    assert data["tick_paths"][0]["root"] == "t:step"
+    assert data["loops"]["t:count__while_1"]["trips"] == 10
@@ -0,0 +1,54 @@
+import copy
+import pickle
+
+import pytest
+
+from minecraft_datapack_language.ast_nodes import FunctionCall, SourceSpan
+from minecraft_datapack_language.mdl_parser import MDLParser
+
+
+def test_nodes_have_slots_and_keep_span_out_of_equality():
+    node = FunctionCall(namespace="p", name="f", scope=None)
+    assert not hasattr(node, "__dict__")
+    with pytest.raises(AttributeError):
+        node.unknown = 1
+    assert node.span is None
+    node.span = SourceSpan("a.mdl", 1, 2)
+    assert node == FunctionCall(namespace="p", name="f", scope=None)
+    for clone in (copy.deepcopy(node), pickle.loads(pickle.dumps(node))):
+        assert clone == node and clone.span == node.span
+
+
+def test_parser_interns_names_and_scopes():
+    source = ('pack "p" "d" 82;\nnamespace "p";\n'
+              'var num score<@a[tag=x]> = 0;\nvar num other<@a[tag=x]> = 0;\n'
+              'function p:f {\n    score<@a[tag=x]> = $score<@a[tag=x]>$ + 1;\n}\n')
+    program = MDLParser().parse(source)
+    first, second = program.variables
+    assert first.scope is second.scope
+    assignment = program.functions[0].body[0]
+    assert assignment.name is first.name
+    assert assignment.value.left.scope is first.scope
+
+
+def test_fingerprints_are_structural_and_ignore_spans():
+    def functions(source):
+        program = MDLParser().parse('pack "p" "d" 82;\nnamespace "p";\n' + source)
+        return {f.name: f.fingerprint() for f in program.functions}
+
+    base = functions('function p:a { say "a"; }\nfunction p:b { exec p:a; }\n')
+    moved = functions('\n\n// comment\nfunction p:b {\n    exec p:a;\n}\nfunction p:a { say "a"; }\n')
+    assert base == moved
+    edited = functions('function p:a { say "A"; }\nfunction p:b { exec p:a; }\n')
+    assert edited["a"] != base["a"] and edited["b"] == base["b"]
+    assert FunctionCall("p", "ab", None).fingerprint() != FunctionCall("pa", "b", None).fingerprint()
+
+
+def test_fingerprint_of_deeply_nested_function_does_not_recurse():
+    depth = 3000
+    nested = "(" * depth + "$x<@s>$ + 1" + ")" * depth
+    source = 'pack "p" "d" 82;\nnamespace "p";\nvar num x<@s> = 0;\nfunction p:deep {\n    x<@s> = %s;\n}\n'
+    deep = MDLParser().parse(source % nested).functions[0]
+    shallow = MDLParser().parse(source % nested.replace("+ 1", "+ 2")).functions[0]
+    assert deep.fingerprint() != shallow.fingerprint()
+    assert deep.fingerprint() == MDLParser().parse(source % nested).functions[0].fingerprint()
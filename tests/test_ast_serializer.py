@@ -0,0 +1,101 @@
+import pytest
+
+from minecraft_datapack_language.ast_nodes import (
+    ASTNode, ExecuteCommand, ScopeSelector, ScoreboardCommand, SourceSpan, TellrawCommand,
+)
+from minecraft_datapack_language.ast_serializer import NODE_TYPES, dumps, loads
+from minecraft_datapack_language.mdl_parser import MDLParser
+
+SOURCE = '''pack "p" "d" 82;
+namespace "p";
+tag recipe "diamond" "recipes/diamond.json";
+var num x<@s> = -1.5;
+var num y<@a[tag=x]> = ($x<@s>$ + 2) * 3 > 1 && !0 || 4;
+function p:main<@s> {
+    say "Hello $x<@s>$ and $y$";
+    if $x<@s>$ > 0 {
+        x<@s> = $x<@s>$ - 1;
+    } else {
+        exec p:other '{"n": 1}';
+    }
+    while $x<@s>$ < 10 { x<@s> = $x<@s>$ + 1; }
+    scheduledwhile $x<@s>$ > 0 { exec p:other with storage p:data args; }
+    $!raw
+    say raw
+    raw!$
+    $say "$(name)"
+}
+function p:other { say "other"; }
+on_load p:main;
+on_tick p:other;
+exec p:main;
+'''
+
+
+def _nodes(value):
+    if isinstance(value, ASTNode):
+        yield value
+        for name in value.__dataclass_fields__:
+            yield from _nodes(getattr(value, name))
+    elif isinstance(value, list):
+        for item in value:
+            yield from _nodes(item)
+
+
+def test_round_trip_covers_every_node_type_and_keeps_spans():
+    program = MDLParser("main.mdl").parse(SOURCE)
+    extra = [TellrawCommand("@a", '{"text": "hi"}'), ExecuteCommand("as @a run say hi"),
+             ScoreboardCommand("players set @s x 1"), ScopeSelector("@s"),
+             SourceSpan("other.mdl", 3, 4)]
+    for node in extra[:-1]:
+        node.span = extra[-1]
+    program.statements.extend(extra[:-1])
+    assert {type(node).__name__ for node in _nodes(program)} == set(NODE_TYPES) - {"SourceSpan"}
+
+    restored = loads(dumps(program))
+    assert restored == program
+    originals, copies = list(_nodes(program)), list(_nodes(restored))
+    assert [n.span for n in copies] == [n.span for n in originals]
+    assert restored.fingerprint() == program.fingerprint()
+
+
+def test_strings_are_stored_once():
+    program = MDLParser("main.mdl").parse(SOURCE)
+    data = dumps(program)
+    # Length-prefixed entries of the string table (the say message also contains "<@s>")
+    assert data.count(b"\x04<@s>") == 1 and data.count(b"main.mdl") == 1
+
+
+def test_lazy_bodies_and_plain_values_round_trip():
+    program = MDLParser("main.mdl", lazy_bodies=True).parse(SOURCE)
+    assert loads(dumps(program)) == MDLParser("main.mdl").parse(SOURCE)
+    values = [None, True, False, 0, -3, 2 ** 70, 1.25, "", "é", [[], ["x"]]]
+    assert loads(dumps(values)) == values
+
+
+def test_unreadable_data_is_rejected():
+    data = dumps(MDLParser().parse(SOURCE))
+    with pytest.raises(ValueError):
+        loads(b"not an ast")
+    with pytest.raises(ValueError):
+        loads(data[:-3])
+    with pytest.raises(ValueError):
+        loads(data + b"\x00")
+    # A node type whose fields changed since the data was written
+    with pytest.raises(ValueError):
+        loads(data.replace(b"with_clause", b"with_clauze"))
+    with pytest.raises(TypeError):
+        dumps({"not": "a node"})
+
+
+def test_deeply_nested_tree_round_trips_without_recursion():
+    depth = 3000
+    nested = "(" * depth + "$x<@s>$ + 1" + ")" * depth
+    source = 'pack "p" "d" 82;\nnamespace "p";\nvar num x<@s> = 0;\nfunction p:deep {\n    x<@s> = %s;\n}\n'
+    program = MDLParser("deep.mdl").parse(source % nested)
+    data = dumps(program)
+    restored = loads(data)
+    # Equality of dataclasses recurses, so compare the re-encoded bytes and the fingerprints
+    assert dumps(restored) == data
+    assert restored.fingerprint() == program.fingerprint()
+    assert restored.functions[0].body[0].span == program.functions[0].body[0].span
@@ -0,0 +1,47 @@
+import pytest
+
+from benchmarks.generators import GENERATORS, DEFAULT_SIZES
+from benchmarks.memory import measure_parse
+from benchmarks.run import bench_case, compare
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+
+
+@pytest.mark.parametrize("name", sorted(GENERATORS))
+def test_generated_programs_compile(name):
+    size = DEFAULT_SIZES[name][0] // 10 or 2
+    ast = MDLParser().parse(GENERATORS[name](size))
+    files = MDLCompiler().generate(ast)
+    assert any(path.endswith(".mcfunction") for path in files)
+
+
+def test_bench_case_and_compare():
+    timings = bench_case(GENERATORS["many_functions"](5), repeat=1)
+    assert set(timings) == {"lex", "skim", "parse", "compile", "build"}
+    current = {"results": {"case": {"parse": {"median_ms": 30.0, "min_ms": 29.0},
+                                    "lex": {"median_ms": 10.0, "min_ms": 9.0}}}}
+    baseline = {"results": {"case": {"parse": {"median_ms": 20.0, "min_ms": 19.0},
+                                     "lex": {"median_ms": 9.0, "min_ms": 9.0}}}}
+    regressions = compare(current, baseline, threshold=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("case parse")
+
+
+def test_parse_importtime():
+    from benchmarks.startup import parse_importtime
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   typing\n"
+        "import time:      2000 |       2500 | minecraft_datapack_language\n"
+        "import time:       500 |        500 | json\n"
+    )
+    total, package = parse_importtime(stderr)
+    assert total == 3.0
+    assert package == {"minecraft_datapack_language": 2.5}
+
+
+def test_measure_parse_and_memory_compare():
+    sizes = measure_parse(GENERATORS["many_variables"](50))
+    assert 0 < sizes["retained_kb"] <= sizes["peak_kb"]
+    current = {"results": {"case": {"parse": sizes}}}
+    grown = {"results": {"case": {"parse": {"retained_kb": sizes["retained_kb"] / 2}}}}
+    assert compare(current, grown, 0.10, metric="retained_kb", unit="KB")
@@ -0,0 +1,91 @@
+import logging
+
+from minecraft_datapack_language.call_graph import build_call_graph, function_references, prune_unreachable
+from minecraft_datapack_language.ir import Block, Call, IRModule, Raw
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+
+
+SRC = (
+    'pack "p" "d" 82;\n'
+    'namespace "p";\n'
+    'var num x<@s> = 0;\n'
+    'function p:main { exec p:used; }\n'
+    'function p:used {\n'
+    '    $!raw\n'
+    '    schedule function p:from_raw 2t\n'
+    '    raw!$\n'
+    '}\n'
+    'function p:from_raw { say "raw"; }\n'
+    'function p:dead { if $x<@s>$ > 0 { say "never"; } }\n'
+    'function p:api { say "external"; }\n'
+    'on_load p:main;\n'
+)
+
+
+def test_function_references_in_raw_text():
+    text = "execute as @a run function p:a\nschedule function p:b 1t\nfunction #p:tag\nexecute if function p:c run say x"
+    assert function_references(text) == ["p:a", "p:b", "#p:tag", "p:c"]
+
+
+def test_call_graph_marks_dynamic_callers():
+    module = IRModule()
+    module.add(Block("p", "a", [Call("p:b"), Raw("$function p:$(name)")]))
+    graph = build_call_graph(module)
+    assert graph.callees("p:a") == {"p:b"}
+    assert graph.dynamic_callers == {"p:a"}
+    assert graph.reachable(["p:a"]) == {"p:a", "p:b"}
+
+
+def test_prune_unreachable_keeps_entry_points_and_raw_calls():
+    ast = MDLParser().parse(SRC)
+    files = MDLCompiler(prune_unreachable=True, keep_functions=["p:api"]).generate(ast)
+    names = {path.rsplit("/", 1)[-1] for path in files if path.endswith(".mcfunction")}
+    assert {"main.mcfunction", "used.mcfunction", "from_raw.mcfunction", "api.mcfunction"} <= names
+    assert "dead.mcfunction" not in names
+    assert "dead__if_1.mcfunction" not in names
+
+
+def test_no_pruning_by_default():
+    files = MDLCompiler().generate(MDLParser().parse(SRC))
+    assert "data/p/function/dead.mcfunction" in files
+
+
+def test_dynamic_call_skips_pruning_with_a_warning(caplog):
+    module = IRModule()
+    module.add(Block("p", "a", [Raw("function #p:hooks")]))
+    module.add(Block("p", "dead", [Raw("say dead")]))
+    with caplog.at_level(logging.WARNING, logger="minecraft_datapack_language.call_graph"):
+        assert prune_unreachable(module, ["p:a"]) == []
+    assert "p:dead" in module.functions
+    assert "Not pruning" in caplog.text and "p:a" in caplog.text
+
+
+def test_calls_to_the_packs_own_tags_are_followed():
+    module = IRModule()
+    module.add(Block("p", "a", [Raw("function #p:hooks")]))
+    module.add(Block("p", "hooked", [Call("p:helper")]))
+    module.add(Block("p", "helper", []))
+    module.add(Block("p", "dead", [Raw("say dead")]))
+    tags = {"p:hooks": ["#p:inner"], "p:inner": ["p:hooked"]}
+    assert build_call_graph(module, tags).reachable(["p:a"]) >= {"p:hooked", "p:helper"}
+    assert prune_unreachable(module, ["p:a"], tags) == ["p:dead"]
+
+    # A tag member that is itself an undefined tag is resolved at runtime
+    module.add(Block("p", "dead", []))
+    assert prune_unreachable(module, ["p:a"], {"p:hooks": ["#other:tag"]}) == []
+
+
+def test_prune_follows_load_and_tick_tags_but_not_external_ones(caplog):
+    src = SRC.replace('function p:main { exec p:used; }',
+                      'function p:main { exec p:used; $!raw\n    function #minecraft:tick\n    raw!$ }')
+    src += 'function p:ticked { say "tick"; }\non_tick p:ticked;\n'
+    files = MDLCompiler(prune_unreachable=True).generate(MDLParser().parse(src))
+    assert "data/p/function/dead.mcfunction" not in files
+    assert "data/p/function/ticked.mcfunction" in files
+
+    external = src.replace("#minecraft:tick", "#other:hooks")
+    with caplog.at_level(logging.WARNING, logger="minecraft_datapack_language.call_graph"):
+        files = MDLCompiler(prune_unreachable=True).generate(MDLParser().parse(external))
+    assert "data/p/function/dead.mcfunction" in files
+    assert "does not define" in caplog.text
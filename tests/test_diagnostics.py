@@ -0,0 +1,127 @@
+import io
+import json
+
+import pytest
+import subprocess
+import sys
+
+from minecraft_datapack_language.diagnostics import DiagnosticWriter, diagnostic_writer
+from minecraft_datapack_language.mdl_linter import MDLLinter, MDLLintIssue
+
+GOOD = 'pack "p" "d" 82;\nnamespace "p";\nfunction p:a {\n    say "hi";\n}\n'
+BAD = 'pack "p" "d" 82;\nnamespace "p";\nfunction p:b {\n    say "hi"\n}\n'
+
+ISSUES = [
+    ("a.mdl", [MDLLintIssue(5, "error", "syntax", "Expected SEMICOLON", "Add ';'", column=1)]),
+    ("b.mdl", []),
+    ("c.mdl", [MDLLintIssue(0, "error", "file", "File not found: c.mdl"),
+               MDLLintIssue(2, "warning", "selector", "Odd selector")]),
+]
+
+
+def _write(output_format):
+    stream = io.StringIO()
+    writer = diagnostic_writer(output_format, stream)
+    writer.begin()
+    for file_path, issues in ISSUES:
+        writer.file(file_path, issues)
+    writer.end()
+    return stream.getvalue()
+
+
+def test_json_document_holds_records_and_summary():
+    document = json.loads(_write("json"))
+    assert [(d["file"], d["line"], d["severity"]) for d in document["diagnostics"]] == [
+        ("a.mdl", 5, "error"), ("c.mdl", None, "error"), ("c.mdl", 2, "warning")]
+    assert document["diagnostics"][0]["suggestion"] == "Add ';'"
+    assert document["summary"] == {"files": 3, "errors": 2, "warnings": 1, "info": 0}
+
+    empty = io.StringIO()
+    writer = diagnostic_writer("json", empty)
+    writer.begin()
+    writer.end()
+    assert json.loads(empty.getvalue())["diagnostics"] == []
+
+
+def test_ndjson_and_sarif():
+    records = [json.loads(line) for line in _write("ndjson").splitlines()]
+    assert [r["type"] for r in records] == ["syntax", "file", "selector"]
+
+    log = json.loads(_write("sarif"))
+    assert log["version"] == "2.1.0"
+    results = log["runs"][0]["results"]
+    assert [r["level"] for r in results] == ["error", "error", "warning"]
+    assert results[0]["locations"][0]["physicalLocation"] == {
+        "artifactLocation": {"uri": "a.mdl"}, "region": {"startLine": 5, "startColumn": 1}}
+    # File-level issues have no region
+    assert "region" not in results[1]["locations"][0]["physicalLocation"]
+
+
+def test_records_are_written_as_each_file_finishes():
+    stream = io.StringIO()
+    writer = diagnostic_writer("json", stream)
+    writer.begin()
+    writer.file(*ISSUES[0])
+    assert "Expected SEMICOLON" in stream.getvalue()
+
+
+def test_files_are_linted_lazily_in_order(tmp_path, monkeypatch):
+    paths = []
+    for name, source in (("a.mdl", BAD), ("b.mdl", GOOD)):
+        (tmp_path / name).write_text(source)
+        paths.append(str(tmp_path / name))
+    linted = []
+    linter = MDLLinter(rules=[])
+    real_lint_source = linter.lint_source
+    monkeypatch.setattr(linter, "lint_source",
+                        lambda source, file_path=None: linted.append(file_path) or real_lint_source(source, file_path))
+
+    results = linter.iter_lint_files(paths + [str(tmp_path / "missing.mdl")])
+    file_path, issues = next(results)
+    assert (file_path, linted) == (paths[0], paths[:1])
+    assert issues[0].category == "syntax"
+    # Later files are read only when reached
+    (tmp_path / "b.mdl").write_text(BAD)
+    assert [(p, len(i)) for p, i in results] == [(paths[1], 1), (str(tmp_path / "missing.mdl"), 1)]
+
+
+def test_parallel_lint_keeps_file_order(tmp_path):
+    paths = []
+    for index in range(12):
+        path = tmp_path / f"f{index:02}.mdl"
+        path.write_text(BAD if index % 3 == 0 else GOOD)
+        paths.append(str(path))
+    results = list(MDLLinter().iter_lint_files(paths + [str(tmp_path / "missing.mdl")], jobs=2))
+    assert [p for p, _ in results] == paths + [str(tmp_path / "missing.mdl")]
+    assert [any(i.severity == "error" for i in issues) for _, issues in results] == \
+        [index % 3 == 0 for index in range(12)] + [True]
+
+
+def test_check_streams_machine_readable_output(tmp_path):
+    (tmp_path / "good.mdl").write_text(GOOD)
+    (tmp_path / "bad.mdl").write_text(BAD)
+    result = subprocess.run([sys.executable, "-m", "minecraft_datapack_language.cli", "check",
+                             "--format", "ndjson", "-j", "1", str(tmp_path), str(tmp_path / "none")],
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [(r["file"], r["line"], r["type"]) for r in records] == [(str(tmp_path / "bad.mdl"), 5, "syntax")]
+    assert "does not exist" in result.stderr
+
+
+def test_writer_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        DiagnosticWriter(io.StringIO())
+
+
+def test_no_files_still_yields_a_parseable_document(tmp_path):
+    for output_format in ("json", "sarif"):
+        result = subprocess.run([sys.executable, "-m", "minecraft_datapack_language.cli", "check",
+                                 "--format", output_format, str(tmp_path)], capture_output=True, text=True)
+        assert result.returncode == 1
+        assert "No .mdl files found" in result.stderr
+        document = json.loads(result.stdout)
+        if output_format == "json":
+            assert document == {"diagnostics": [], "summary": {"files": 0, "errors": 0, "warnings": 0, "info": 0}}
+        else:
+            assert document["runs"][0]["results"] == []
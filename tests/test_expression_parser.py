@@ -0,0 +1,89 @@
+import pytest
+
+from minecraft_datapack_language.ast_nodes import UnaryExpression, ParenthesizedExpression, LiteralExpression
+from minecraft_datapack_language.mdl_errors import MDLParserError
+from minecraft_datapack_language.mdl_lexer import TokenType
+from minecraft_datapack_language.mdl_parser import MDLParser
+
+
+def _initial_value(expression: str):
+    src = f'pack "p" "d" 82;\nnamespace "p";\nvar num x<@s> = {expression};\n'
+    return MDLParser("expr.mdl").parse(src).variables[0].initial_value
+
+
+def test_precedence_and_left_associativity():
+    expr = _initial_value("1 - 2 - 3 * 4 > 0 && !5 || 6")
+    assert expr.operator == TokenType.OR
+    conjunction = expr.left
+    assert conjunction.operator == TokenType.AND
+    assert isinstance(conjunction.right, UnaryExpression)
+    comparison = conjunction.left
+    assert comparison.operator == TokenType.GREATER
+    difference = comparison.left
+    # (1 - 2) - (3 * 4)
+    assert difference.operator == TokenType.MINUS
+    assert difference.left.operator == TokenType.MINUS
+    assert difference.right.operator == TokenType.MULTIPLY
+
+
+def test_unary_binds_tighter_than_binary_operators():
+    expr = _initial_value("- -1 * 2")
+    assert expr.operator == TokenType.MULTIPLY
+    assert isinstance(expr.left, UnaryExpression)
+    assert isinstance(expr.left.operand, UnaryExpression)
+    assert expr.left.operand.operand == LiteralExpression(value=1.0, type="number")
+
+
+def test_binary_nodes_carry_the_span_of_their_left_operand():
+    expr = _initial_value("1 + 2 * 3")
+    assert (expr.span.line, expr.span.column) == (3, 17)
+    assert (expr.right.span.line, expr.right.span.column) == (3, 21)
+
+
+def test_deeply_parenthesized_expression_does_not_exhaust_the_stack():
+    depth = 5000
+    expr = _initial_value("(" * depth + "-(1 + 2)" + ")" * depth)
+    for _ in range(depth):
+        assert isinstance(expr, ParenthesizedExpression)
+        expr = expr.expression
+    assert isinstance(expr, UnaryExpression)
+    assert expr.operand.expression.operator == TokenType.PLUS
+
+
+def test_unbalanced_parentheses_are_reported():
+    with pytest.raises(MDLParserError, match="closing parenthesis"):
+        _initial_value("((1 + 2)")
+
+
+def test_deeply_nested_expressions_compile():
+    from minecraft_datapack_language.mdl_compiler import MDLCompiler
+
+    depth = 3000
+    nested = "(" * depth + "$x<@s>$ + 1" + ")" * depth
+    chain = " + ".join(["$x<@s>$"] + ["1"] * depth)
+    condition = "(" * depth + "$x<@s>$ > 0 && " * depth + "$x<@s>$ < 9" + ")" * depth
+    src = (f'pack "p" "d" 82;\nnamespace "p";\nvar num x<@s> = 0;\nfunction p:deep {{\n'
+           f'    x<@s> = {nested};\n    x<@s> = {chain};\n    if {condition} {{ say "ok"; }}\n}}\n')
+    program = MDLParser("deep.mdl").parse(src)
+    files = MDLCompiler().generate(program)
+    lines = files["data/p/function/deep.mcfunction"].splitlines()
+    assert lines[2:5] == ["scoreboard players operation @s temp_1 = @s x", "scoreboard players add @s temp_1 1",
+                          "scoreboard players operation @s x = @s temp_1"]
+    assert sum(line.endswith(" 1") and " add @s " in line for line in lines) == 1 + depth
+    assert lines[-1] == "execute if function p:deep__cond_1 run function p:deep__if_1"
+    condition_lines = files["data/p/function/deep__cond_1.mcfunction"].splitlines()
+    assert condition_lines.count("execute unless score @s x matches 1.. run return 0") == depth
+
+    # Formats without 'execute if function' combine boolean temps instead
+    lines = MDLCompiler(target_format=15).generate(program)["data/p/functions/deep.mcfunction"].splitlines()
+    assert sum("if score @s x matches 1.. run" in line for line in lines) == depth
+    assert lines[-1] == f"execute if score @s temp_{depth + 2} matches 1.. run function p:deep__if_1"
+
+
+def test_parenthesized_comparison_compiles_to_a_score_test():
+    from minecraft_datapack_language.mdl_compiler import MDLCompiler
+
+    src = ('pack "p" "d" 82;\nnamespace "p";\nvar num x<@s> = 0;\nfunction p:f {\n'
+           '    if ((($x<@s>$ > 2))) { say "big"; }\n}\n')
+    files = MDLCompiler().generate(MDLParser("paren.mdl").parse(src))
+    assert "execute if score @s x matches 3.. run function p:f__if_1" in files["data/p/function/f.mcfunction"]
@@ -0,0 +1,68 @@
+import json
+import subprocess
+import sys
+
+from minecraft_datapack_language.instrumentation import PhaseTimer
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+
+
+SRC = (
+    'pack "p" "d" 82;\n'
+    'namespace "p";\n'
+    'var num x<@s> = 0;\n'
+    'function p:main<@s> { if $x<@s>$ > 0 { say "hi"; } }\n'
+    'on_load p:main;\n'
+)
+
+
+def test_nested_phases_and_listeners():
+    timer = PhaseTimer(track_memory=True)
+    seen = []
+    timer.add_listener(lambda record: seen.append((record.name, record.depth)))
+    with timer.phase("outer"):
+        with timer.phase("inner"):
+            blob = [0] * 200_000
+        del blob
+    with timer.phase("inner"):
+        pass
+    timer.close()
+    assert seen == [("inner", 1), ("outer", 0), ("inner", 0)]
+    assert timer.phases["inner"].calls == 2
+    # The outer phase sees the allocation made inside the nested one
+    assert timer.phases["outer"].peak_memory >= 200_000 * 8
+    assert timer.phases["outer"].wall >= timer.phases["inner"].wall - timer.phases["inner"].wall / 2
+
+
+def test_parser_and_compiler_report_phases(tmp_path):
+    timer = PhaseTimer()
+    ast = MDLParser("p.mdl", timer=timer).parse(SRC)
+    MDLCompiler(timer=timer).compile(ast, str(tmp_path))
+    assert list(timer.phases) == ["lex", "parse", "variables", "functions", "tags",
+                                  "optimize", "emit", "hooks", "write"]
+    assert all(stats.peak_memory is None for stats in timer.phases.values())
+    assert "functions" in timer.format_human()
+
+
+def test_cli_build_timings_json(tmp_path):
+    mdl_file = tmp_path / "p.mdl"
+    mdl_file.write_text(SRC)
+    result = subprocess.run([
+        sys.executable, "-m", "minecraft_datapack_language.cli",
+        "build", "--mdl", str(mdl_file), "-o", str(tmp_path / "out"), "--timings", "json"
+    ], capture_output=True, text=True)
+    assert result.returncode == 0
+    # stdout holds only the report; build progress goes to stderr
+    report = json.loads(result.stdout)
+    assert "Successfully built" in result.stderr
+    names = [phase["name"] for phase in report["phases"]]
+    assert names[:3] == ["lex", "parse", "merge"]
+    assert "zip" in names and "write" in names
+    assert all(phase["peak_memory_bytes"] is None for phase in report["phases"])
+
+    result = subprocess.run([
+        sys.executable, "-m", "minecraft_datapack_language.cli",
+        "build", "--mdl", str(mdl_file), "-o", str(tmp_path / "out"), "--timings", "json", "--timings-memory"
+    ], capture_output=True, text=True)
+    report = json.loads(result.stdout)
+    assert all(phase["peak_memory_bytes"] is not None for phase in report["phases"])
@@ -0,0 +1,72 @@
+from minecraft_datapack_language.ir import (
+    IRModule, Block, Score, ScoreMatches, ScoreCompare, As, ScoreSet, ScoreAdd,
+    ScoreOperation, Call, Execute, Raw, Comment, Blank, serialize_block
+)
+from minecraft_datapack_language.ir_passes import run_passes
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+
+
+def test_conditions_render_and_negate():
+    a = Score("@s", "a")
+    cond = ScoreMatches(a, "1..")
+    assert cond.render() == "if score @s a matches 1.."
+    assert cond.negated().render() == "unless score @s a matches 1.."
+    cmp = ScoreCompare(a, "=", Score("@s", "b"), negate=True)
+    assert cmp.render() == "unless score @s a = @s b"
+    ins = Execute([As("@a"), cond], Call("p:f", "with storage p:args"))
+    assert ins.render() == "execute as @a if score @s a matches 1.. run function p:f with storage p:args"
+
+
+def test_serialize_inserts_global_after_header_and_prefixes_macros():
+    block = Block("p", "f", [Comment("Function: p:f"), Blank(), Raw("say $(name)")], ensure_global=True)
+    text = serialize_block(block, ["# global", "summon x"])
+    assert text == "# Function: p:f\n\n# global\nsummon x\n\n$say $(name)\n"
+
+
+def test_coalesce_temp_copies():
+    module = IRModule(temp_objectives={"temp_1", "temp_2"})
+    x = Score("@s", "x")
+    t1 = Score("@s", "temp_1")
+    t2 = Score("@s", "temp_2")
+    block = module.add(Block("p", "f", [
+        ScoreOperation(t1, "=", Score("@s", "y")),
+        ScoreAdd(t1, "1"),
+        ScoreOperation(x, "=", t1),
+        ScoreSet(t2, "4"),
+        ScoreOperation(Score("@r", "y"), "=", t2),
+    ]))
+    run_passes(module)
+    assert [i.render() for i in block.instructions] == [
+        "scoreboard players operation @s x = @s y",
+        "scoreboard players add @s x 1",
+        "scoreboard players set @s temp_2 4",
+        "scoreboard players operation @r y = @s temp_2",
+    ]
+    # temp_1 is gone entirely, temp_2 is still needed for the unstable @r holder
+    assert module.temp_objectives == {"temp_2"}
+
+
+def test_coalesce_keeps_temps_read_elsewhere():
+    module = IRModule(temp_objectives={"temp_1"})
+    t1 = Score("@s", "temp_1")
+    block = module.add(Block("p", "f", [
+        ScoreSet(t1, "2"),
+        ScoreOperation(Score("@s", "x"), "=", t1),
+        Raw("tellraw @a {\"score\":{\"name\":\"@s\",\"objective\":\"temp_1\"}}"),
+    ]))
+    run_passes(module)
+    assert len(block.instructions) == 3
+
+
+def test_compiled_assignment_writes_destination_directly():
+    src = (
+        'pack "p" "d" 82;\n'
+        'namespace "p";\n'
+        'function p:f { var num x<@s> = 0; var num y<@s> = 0; x<@s> = $y<@s>$ + 1; }\n'
+    )
+    files = MDLCompiler().generate(MDLParser().parse(src))
+    body = files["data/p/function/f.mcfunction"]
+    assert "scoreboard players operation @s x = @s y\nscoreboard players add @s x 1" in body
+    assert "temp_" not in body
+    assert "temp_" not in files["data/p/function/load.mcfunction"]
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pytest
+
+from minecraft_datapack_language.ast_nodes import FunctionCall, IfStatement, SayCommand
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+from minecraft_datapack_language.mdl_errors import MDLErrorCollector, MDLParserError
+from minecraft_datapack_language.mdl_parser import LazyBody, MDLParser
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SOURCE = '''pack "p" "d" 82;
+namespace "p";
+var num x<@s> = 0;
+function p:a<@s> {
+    if $x<@s>$ > 0 {
+        say "positive";
+    }
+    exec p:b;
+}
+function p:b {
+    say "b";
+}
+on_load p:a;
+'''
+
+
+def test_bodies_are_parsed_on_first_access():
+    program = MDLParser("lazy.mdl", lazy_bodies=True).parse(SOURCE)
+    assert [f.name for f in program.functions] == ["a", "b"]
+    assert [v.name for v in program.variables] == ["x"]
+    assert [h.name for h in program.hooks] == ["a"]
+    body = program.functions[0].body
+    assert isinstance(body, LazyBody) and not body.materialized
+
+    assert [type(s) for s in body] == [IfStatement, FunctionCall]
+    assert body.materialized
+    assert isinstance(body[0].then_body[0], SayCommand)
+    assert body[0].span.line == 5
+    assert not program.functions[1].body.materialized
+
+
+def test_lazy_and_eager_programs_are_equal_and_compile_identically():
+    for path in sorted(ROOT.glob("examples/**/*.mdl")) + [None]:
+        source = SOURCE if path is None else path.read_text(encoding="utf-8")
+        try:
+            eager = MDLParser("lazy.mdl").parse(source)
+        except MDLParserError:
+            continue
+        lazy = MDLParser("lazy.mdl", lazy_bodies=True).parse(source)
+        assert MDLCompiler().generate(lazy) == MDLCompiler().generate(eager)
+        assert lazy == eager
+
+
+def test_syntax_errors_in_a_lazy_body_surface_on_access():
+    source = SOURCE.replace('say "b";', 'say "b"')
+    program = MDLParser("lazy.mdl", lazy_bodies=True).parse(source)
+    assert program.functions[0].body[1] == FunctionCall(namespace="p", name="b", scope=None)
+    with pytest.raises(MDLParserError) as excinfo:
+        list(program.functions[1].body)
+    assert excinfo.value.line == 12
+
+    collector = MDLErrorCollector()
+    program = MDLParser("lazy.mdl", error_collector=collector, lazy_bodies=True).parse(source)
+    assert not collector.has_errors()
+    list(program.functions[1].body)
+    assert [e.line for e in collector.errors] == [12]
+
+
+def test_unbalanced_bodies_are_parsed_eagerly():
+    source = SOURCE.replace('    exec p:b;\n}\n', '    exec p:b;\n')
+    collector = MDLErrorCollector()
+    program = MDLParser("lazy.mdl", error_collector=collector, lazy_bodies=True).parse(source)
+    assert not isinstance(program.functions[0].body, LazyBody)
+    assert [f.name for f in program.functions] == ["a", "b"]
+    assert collector.has_errors()
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+import pytest
+
+import minecraft_datapack_language as mdl
+
+
+def loaded_modules(code):
+    script = code + "; import sys; print(' '.join(m for m in sys.modules if m.startswith('minecraft_datapack_language')))"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_package_and_cli_import_without_the_toolchain():
+    assert loaded_modules("import minecraft_datapack_language") == {"minecraft_datapack_language"}
+    assert loaded_modules("import minecraft_datapack_language.cli") == {
+        "minecraft_datapack_language", "minecraft_datapack_language.cli"}
+
+
+def test_check_loads_the_parser_but_not_the_compiler():
+    modules = loaded_modules("import minecraft_datapack_language.cli as c; c.check_command")
+    assert "minecraft_datapack_language.mdl_parser" not in modules
+    modules = loaded_modules("from minecraft_datapack_language import MDLParser")
+    assert "minecraft_datapack_language.mdl_parser" in modules
+    assert "minecraft_datapack_language.mdl_compiler" not in modules
+
+
+def test_lazy_exports_resolve():
+    from minecraft_datapack_language import Pack, MDLParser, SourceSpan, MacroLine
+    from minecraft_datapack_language.python_api import Pack as ApiPack
+    from minecraft_datapack_language.ast_nodes import MacroLine as AstMacroLine
+    assert Pack is ApiPack and MacroLine is AstMacroLine
+    assert isinstance(mdl.__version__, str)
+    assert set(mdl.__all__) <= set(dir(mdl))
+    with pytest.raises(AttributeError):
+        mdl.NoSuchThing
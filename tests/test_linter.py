@@ -0,0 +1,113 @@
+import hashlib
+
+from minecraft_datapack_language import mdl_linter
+from minecraft_datapack_language.ast_nodes import FunctionCall
+from minecraft_datapack_language.mdl_linter import LintCache, LintRule, MDLLinter, lint_mdl_file
+
+SOURCE = '''pack "p" "d" 1000;
+namespace "My_NS";
+tag recipe "Diamond" "/recipes/diamond.txt";
+var num a<@a> = $b<@s>$;
+var num b<@x> = -1;
+var num g<global> = 0;
+function p:main<@s> {
+    while 1 > 0 { say "forever"; }
+    while $b<@s>$ > 0 { b<@s> = $b<@s>$ - 1;; }
+    $!raw
+    raw!$
+}
+'''
+
+
+def _found(issues):
+    return [(i.line_number, i.severity, i.category) for i in issues]
+
+
+def test_rules_report_issues_in_source_order(tmp_path):
+    path = tmp_path / "lint.mdl"
+    path.write_text(SOURCE)
+    issues = lint_mdl_file(str(path))
+    assert _found(issues) == [
+        (1, 'error', 'pack'),
+        (2, 'warning', 'namespace'),
+        (3, 'warning', 'tag'), (3, 'error', 'tag'), (3, 'warning', 'tag'),
+        (4, 'warning', 'variable'), (4, 'warning', 'scope'),
+        (5, 'warning', 'scope'),
+        (8, 'warning', 'while_loop'),
+        (9, 'info', 'style'),
+        (10, 'warning', 'raw'),
+    ]
+    assert issues[0].code == 'pack "p" "d" 1000;'
+    assert issues[-2].column == 45
+
+
+def test_syntax_errors_are_all_reported_alongside_rules():
+    source = 'pack "p" "d" 82;\nnamespace "p";\nvar num x<@s> = 0\nvar num y<@a> = 0;\nfunction p:f { x<@s> = ; }\n'
+    issues = MDLLinter().lint_source(source, "broken.mdl")
+    assert [(i.line_number, i.category) for i in issues if i.severity == 'error'] == [(4, 'syntax'), (5, 'syntax')]
+    assert any(i.category == 'scope' and i.line_number == 4 for i in issues)
+
+
+def test_custom_rules_are_dispatched_by_node_and_token_type():
+    seen = []
+
+    class CallRule(LintRule):
+        node_types = (FunctionCall,)
+        token_types = ('EXEC',)
+
+        def check_node(self, node, context):
+            seen.append(("node", node.name))
+
+        def check_token(self, token, context):
+            seen.append(("token", token.line))
+            context.report(token.line, 'info', 'custom', "exec")
+
+    source = 'pack "p" "d" 82;\nnamespace "p";\nfunction p:a { exec p:b; }\nfunction p:b { if $x$ > 0 { exec p:a; } }\n'
+    issues = MDLLinter(rules=[CallRule()]).lint_source(source)
+    assert sorted(seen) == [("node", "a"), ("node", "b"), ("token", 3), ("token", 4)]
+    assert [(i.line_number, i.category) for i in issues] == [(3, 'custom'), (4, 'custom')]
+
+
+def test_missing_file_is_reported(tmp_path):
+    issues = lint_mdl_file(str(tmp_path / "missing.mdl"))
+    assert _found(issues) == [(0, 'error', 'file')]
+
+
+def test_parallel_directory_linting_matches_serial(tmp_path):
+    for i in range(4):
+        (tmp_path / f"f{i}.mdl").write_text(SOURCE.replace("My_NS", f"ns{i}" if i else "My_NS"))
+    serial = MDLLinter().lint_directory(str(tmp_path), jobs=1)
+    assert MDLLinter().lint_directory(str(tmp_path), jobs=2) == serial
+    assert len(serial) == 4 and serial[str(tmp_path / "f0.mdl")][1].category == 'namespace'
+
+
+def test_cache_relints_only_changed_files(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    src.mkdir()
+    for name in ("a", "b"):
+        (src / f"{name}.mdl").write_text(SOURCE)
+    linted = []
+    original = MDLLinter.lint_source
+
+    def counting(self, source, file_path=None):
+        linted.append(file_path)
+        return original(self, source, file_path)
+
+    monkeypatch.setattr(MDLLinter, "lint_source", counting)
+    cache_dir = tmp_path / "cache"
+    first = MDLLinter().lint_directory(str(src), cache=LintCache(cache_dir, MDLLinter().rules))
+    assert len(linted) == 2
+
+    (src / "b.mdl").write_text(SOURCE.replace("1000", "82"))
+    second = MDLLinter().lint_directory(str(src), cache=LintCache(cache_dir, MDLLinter().rules))
+    assert linted[2:] == [str(src / "b.mdl")]
+    assert second[str(src / "a.mdl")] == first[str(src / "a.mdl")]
+    assert second[str(src / "b.mdl")][0].category == 'namespace'
+
+    # A different rule set, or a changed grammar, does not reuse these results
+    digest = hashlib.blake2b((src / "a.mdl").read_bytes(), digest_size=16).hexdigest()
+    assert LintCache(cache_dir, MDLLinter().rules).get(str(src / "a.mdl"), digest) is not None
+    assert LintCache(cache_dir, []).get(str(src / "a.mdl"), digest) is None
+    assert len(list(cache_dir.iterdir())) == 1
+    monkeypatch.setattr(mdl_linter, "_grammar_key", lambda: "changed grammar")
+    assert LintCache(cache_dir, MDLLinter().rules).get(str(src / "a.mdl"), digest) is None
@@ -0,0 +1,49 @@
+import logging
+import subprocess
+import sys
+
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+
+
+SRC = (
+    'pack "p" "d" 82;\n'
+    'namespace "p";\n'
+    'var num x<@s> = 0;\n'
+    'function p:main<@s> { say "hi"; }\n'
+    'on_load p:main;\n'
+)
+
+
+def test_compiler_is_silent_for_library_use(capsys):
+    MDLCompiler().generate(MDLParser().parse(SRC))
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err == ""
+
+
+def test_compiler_logs_items_at_debug_and_summary_at_info(caplog):
+    with caplog.at_level(logging.DEBUG, logger="minecraft_datapack_language"):
+        MDLCompiler().generate(MDLParser().parse(SRC))
+    by_level = {level: [r.getMessage() for r in caplog.records if r.levelno == level]
+                for level in (logging.DEBUG, logging.INFO)}
+    assert "Function: p:main -> data/p/function/main.mcfunction" in by_level[logging.DEBUG]
+    assert "Variable: x -> scoreboard objective 'x'" in by_level[logging.DEBUG]
+    assert len(by_level[logging.INFO]) == 1
+    assert by_level[logging.INFO][0].startswith("Compiled 1 variable(s), 1 function(s)")
+
+
+def test_cli_shows_item_detail_only_with_verbose(tmp_path):
+    mdl_file = tmp_path / "p.mdl"
+    mdl_file.write_text(SRC)
+
+    def build(*extra):
+        return subprocess.run([
+            sys.executable, "-m", "minecraft_datapack_language.cli",
+            "build", "--mdl", str(mdl_file), "-o", str(tmp_path / "out"), "--no-zip", *extra
+        ], capture_output=True, text=True).stdout
+
+    quiet, verbose = build(), build("--verbose")
+    assert "Compiled 1 variable(s)" in quiet
+    assert "Function: p:main" not in quiet
+    assert "Function: p:main" in verbose
@@ -0,0 +1,73 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_errors import MDLCompilerError
+from minecraft_datapack_language.overlays import generate_overlay_files, compile_with_overlays
+
+
+SRC = (
+    'pack "p" "Overlay pack" 82;\n'
+    'namespace "p";\n'
+    'function p:main { say "hi"; }\n'
+    'on_load p:main;\n'
+)
+
+
+def test_overlay_pack_shares_identical_files(tmp_path):
+    ast = MDLParser().parse(SRC)
+    out = Path(compile_with_overlays(ast, [48, 57, 41], str(tmp_path / "out")))
+
+    meta = json.loads((out / "pack.mcmeta").read_text())
+    assert meta["pack"]["supported_formats"] == {"min_inclusive": 41, "max_inclusive": 57}
+    entries = meta["overlays"]["entries"]
+    # 48 and 57 produce the same files, so they share one overlay
+    assert [e["directory"] for e in entries] == ["format_41", "format_48"]
+    assert entries[0]["formats"] == {"min_inclusive": 41, "max_inclusive": 47}
+    assert entries[1]["formats"] == {"min_inclusive": 48, "max_inclusive": 2147483647}
+    assert not (out / "format_57").exists()
+
+    # 41 uses plural folders, so no file is common to every format
+    assert (out / "format_41" / "data" / "p" / "functions" / "main.mcfunction").exists()
+    assert (out / "format_48" / "data" / "p" / "function" / "main.mcfunction").exists()
+
+
+def test_overlay_formats_are_lowered_once(monkeypatch):
+    from minecraft_datapack_language.mdl_compiler import MDLCompiler
+    lowered = []
+    real = MDLCompiler._compile_functions
+    monkeypatch.setattr(MDLCompiler, "_compile_functions",
+                        lambda self, functions: lowered.append(self.pack_format) or real(self, functions))
+    generate_overlay_files(MDLParser().parse(SRC), [41, 48, 82])
+    assert lowered == [41]
+
+
+def test_overlay_base_layer_holds_common_files():
+    ast = MDLParser().parse(SRC)
+    files = generate_overlay_files(ast, [48, 82])
+    assert "data/p/function/main.mcfunction" in files
+    assert not any(path.startswith("format_") for path in files)
+
+
+def test_overlays_require_supported_base_format():
+    ast = MDLParser().parse(SRC)
+    with pytest.raises(MDLCompilerError):
+        generate_overlay_files(ast, [15, 82])
+
+
+def test_cli_repeated_target_format_builds_overlays(tmp_path):
+    mdl = tmp_path / "pack.mdl"
+    mdl.write_text(SRC)
+    out = tmp_path / "dist"
+    result = subprocess.run([
+        sys.executable, "-m", "minecraft_datapack_language.cli", "build",
+        "--mdl", str(mdl), "-o", str(out), "--no-zip",
+        "--target-format", "41", "--target-format", "82",
+    ], capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+    meta = json.loads((out / "pack.mcmeta").read_text())
+    assert len(meta["overlays"]["entries"]) == 2
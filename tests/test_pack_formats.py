@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import pytest
+
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+from minecraft_datapack_language.mdl_errors import MDLCompilerError
+from minecraft_datapack_language.pack_formats import get_capabilities, supports
+from minecraft_datapack_language.dir_map import get_dir_map
+
+
+def test_capabilities_follow_pack_format():
+    assert not get_capabilities(10).macros
+    assert get_capabilities(18).macros
+    assert not get_capabilities(18).return_run
+    assert get_capabilities(26).execute_if_function
+    assert not get_capabilities(44).singular_resource_folders
+    assert get_capabilities(82).singular_resource_folders
+    # Identical feature ranges share one precomputed object
+    assert get_capabilities(48) is get_capabilities(82)
+    assert supports(26, "scoreboard_display")
+    with pytest.raises(KeyError):
+        supports(26, "no_such_feature")
+
+
+def test_dir_map_uses_capabilities():
+    assert get_dir_map(41).function == "functions"
+    assert get_dir_map(45).function == "function"
+
+
+def test_target_format_overrides_pack_declaration(tmp_path):
+    src = (
+        'pack "p" "d" 82;\n'
+        'namespace "p";\n'
+        'function p:main { say "hi"; }\n'
+    )
+    ast = MDLParser().parse(src)
+    out = Path(MDLCompiler(target_format=41).compile(ast, str(tmp_path)))
+    assert (out / "data" / "p" / "functions" / "main.mcfunction").exists()
+    assert '"pack_format": 41' in (out / "pack.mcmeta").read_text()
+
+
+def test_macros_rejected_for_old_target(tmp_path):
+    src = (
+        'pack "p" "d" 82;\n'
+        'namespace "p";\n'
+        "function p:main { exec p:target '{name:\"x\"}'; }\n"
+    )
+    ast = MDLParser().parse(src)
+    with pytest.raises(MDLCompilerError) as exc:
+        MDLCompiler(target_format=15).compile(ast, str(tmp_path))
+    assert "pack_format 18" in exc.value.message
+
+
+LOGIC_SRC = (
+    'pack "p" "d" 82;\n'
+    'namespace "p";\n'
+    'var num a<@s> = 0;\n'
+    'var num b<@s> = 5;\n'
+    'function p:main<@s> {\n'
+    '    while $a<@s>$ < 10 && ($b<@s>$ > 0 || !$a<@s>$ > 0) { a<@s> = $a<@s>$ + 1; }\n'
+    '    if $a<@s>$ > 3 && $b<@s>$ > 3 { b<@s> = 0; } else { b<@s> = 1; }\n'
+    '}\n'
+)
+
+
+def test_logical_conditions_use_condition_functions_when_supported():
+    from minecraft_datapack_language.sim import Simulator
+
+    ast = MDLParser().parse(LOGIC_SRC)
+    files = MDLCompiler().generate(ast)
+    main = files["data/p/function/main.mcfunction"]
+    assert "execute if function p:main__cond_1 run function p:main__while_1" in main
+    assert files["data/p/function/main__cond_1.mcfunction"].splitlines()[1:] == [
+        "execute unless score @s a matches ..9 run return 0",
+        "execute unless function p:main__cond_2 run return 0",
+        "return 1",
+    ]
+    # if/else tests its condition twice, so the value is kept in a temp instead
+    assert "if function" not in main.splitlines()[-1]
+
+    sim = Simulator(files, players=["Alex"], strict=True)
+    sim.load()
+    sim.run_function("p:main", executor=sim.world.players()[0])
+    assert (sim.score("Alex", "a"), sim.score("Alex", "b")) == (10, 0)
+
+    # Older formats cannot test functions and fall back to boolean temps
+    old = MDLCompiler(target_format=18).generate(ast)
+    assert not any(path.endswith("__cond_1.mcfunction") for path in old)
+    assert "if function" not in old["data/p/functions/main.mcfunction"]
@@ -0,0 +1,87 @@
+import subprocess
+import sys
+
+import pytest
+
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_errors import MDLErrorCollector, MDLParserError, MDLLexerError
+
+
+BROKEN = '''pack "p" "d" 82;
+namespace "p";
+var num x<@s> = 0
+var num y<@s> = 1;
+function p:a<@s> {
+    x<@s> = 1
+    say "ok";
+    if $x<@s>$ > {
+        say "skipped";
+    }
+    exec p:b;
+}
+function p:b<@s> {
+    if $x<@s>$ > 0 {
+        say "missing brace";
+function p:c<@s> {
+    y<@s> = $y<@s>$ + ;
+    say "c";
+}
+on_load p:a;
+'''
+
+
+def parse_recovering(source):
+    collector = MDLErrorCollector()
+    return MDLParser("broken.mdl", error_collector=collector).parse(source), collector
+
+
+def test_without_collector_first_error_still_raises():
+    with pytest.raises(MDLParserError) as info:
+        MDLParser("broken.mdl").parse(BROKEN)
+    assert info.value.line == 4
+
+
+def test_recovery_reports_every_error_and_keeps_the_rest():
+    program, collector = parse_recovering(BROKEN)
+    assert [(e.line, e.column) for e in collector.errors] == [(4, 1), (7, 5), (8, 18), (16, 1), (17, 23)]
+    assert [v.name for v in program.variables] == ["y"]
+    bodies = {f.name: [type(s).__name__ for s in f.body] for f in program.functions}
+    # The statement after a missing ';' and the function missing its '}' are kept
+    assert bodies == {"a": ["SayCommand", "FunctionCall"], "b": ["IfStatement"], "c": ["SayCommand"]}
+    assert [h.name for h in program.hooks] == ["a"]
+
+
+def test_clean_source_parses_identically_with_a_collector():
+    source = (
+        'pack "p" "d" 82;\n'
+        'namespace "p";\n'
+        'var num x<@s> = 0;\n'
+        'function p:a<@s> {\n'
+        '    x<@s> = $x<@s>$ + 1;\n'
+        '    if $x<@s>$ > 0 {\n'
+        '        say "in";\n'
+        '    } else {\n'
+        '        exec p:a;\n'
+        '    }\n'
+        '}\n'
+        'on_load p:a;\n'
+    )
+    program, collector = parse_recovering(source)
+    assert not collector.has_errors()
+    assert program == MDLParser("broken.mdl").parse(source)
+
+
+def test_lexer_errors_are_collected():
+    program, collector = parse_recovering('function p:a<@s> { say "unterminated; }\n')
+    assert len(collector.errors) == 1 and isinstance(collector.errors[0], MDLLexerError)
+    assert program.functions == []
+
+
+def test_check_reports_all_errors_in_one_run(tmp_path):
+    path = tmp_path / "broken.mdl"
+    path.write_text(BROKEN)
+    result = subprocess.run([sys.executable, "-m", "minecraft_datapack_language.cli", "check", str(path)],
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+    assert result.stdout.count("Parser error in") == 5
+    assert "Found 5 error(s)" in result.stdout
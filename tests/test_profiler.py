@@ -0,0 +1,51 @@
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+from minecraft_datapack_language.sim import Simulator
+
+
+SRC = (
+    'pack "t" "d" 82;\n'
+    'namespace "t";\n'
+    'var num n<@s> = 0;\n'
+    'function t:main<@s> {\n'
+    '    n<@s> = 0;\n'
+    '    while $n<@s>$ < 3 { n<@s> = $n<@s>$ + 1; }\n'
+    '    if $n<@s>$ > 1 { exec t:helper; }\n'
+    '}\n'
+    'function t:helper { say "hi"; }\n'
+    'function t:idle { say "never"; }\n'
+)
+
+
+def test_profile_build_counts_calls_and_dumps_sorted():
+    files = MDLCompiler(profile=True).generate(MDLParser().parse(SRC))
+    main = files["data/t/function/main.mcfunction"]
+    assert "scoreboard players add t.main mdl_prof 1" in main
+    assert "scoreboard players add t.main__while_1 mdl_prof 1" in files["data/t/function/main__while_1.mcfunction"]
+    assert "scoreboard objectives add mdl_prof" in files["data/t/function/load.mcfunction"]
+    assert "data/t/function/profile/reset.mcfunction" in files
+
+    sim = Simulator(files, strict=True)
+    sim.load()
+    player = sim.world.players()[0]
+    sim.run_function("t:main", executor=player)
+    sim.run_function("t:main", executor=player)
+    assert sim.score("t.main__while_1", "mdl_prof") == 6
+    assert sim.score("t.helper", "mdl_prof") == 2
+
+    sim.chat.clear()
+    sim.run_function("t:profile/dump")
+    lines = [m.text.strip() for m in sim.chat]
+    assert lines[0].startswith("MDL profile for t")
+    assert lines[1] == "6 t:main__while_1"
+    assert set(lines[2:]) == {"2 t:main", "2 t:helper", "2 t:main__if_1"}
+    assert "0 t:idle" not in lines
+    assert sim.stats.failed == 0
+
+    sim.run_function("t:profile/reset")
+    assert sim.score("t.main", "mdl_prof") is None
+
+
+def test_regular_build_is_not_instrumented():
+    files = MDLCompiler().generate(MDLParser().parse(SRC))
+    assert "mdl_prof" not in "".join(v for v in files.values() if isinstance(v, str))
@@ -0,0 +1,98 @@
+import io
+import json
+import subprocess
+import sys
+
+from minecraft_datapack_language.server import (
+    LanguageServer, read_message, write_message, path_to_uri, REQUEST_CANCELLED, METHOD_NOT_FOUND
+)
+
+
+MAIN = (
+    'pack "p" "d" 82;\n'
+    'namespace "p";\n'
+    'var num x<@s> = 0;\n'
+    'function p:main<@s> {\n'
+    '    exec p:helper;\n'
+    '}\n'
+    'on_load p:main;\n'
+)
+
+
+def make_server(tmp_path):
+    sent = []
+    server = LanguageServer(send=sent.append)
+    server.handle({"jsonrpc": "2.0", "id": 1, "method": "initialize",
+                   "params": {"rootUri": path_to_uri(tmp_path)}})
+    assert sent.pop()["result"]["capabilities"]["definitionProvider"] is True
+    return server, sent
+
+
+def request(server, sent, method, params, request_id=2):
+    server.handle({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+    return sent.pop()
+
+
+def test_diagnostics_symbols_and_definition(tmp_path):
+    (tmp_path / "lib.mdl").write_text('function p:helper<@s> {\n    say "hi";\n}\n')
+    server, sent = make_server(tmp_path)
+    uri = path_to_uri(tmp_path / "main.mdl")
+
+    server.handle({"jsonrpc": "2.0", "method": "textDocument/didOpen", "params": {
+        "textDocument": {"uri": uri, "version": 1, "text": MAIN.replace("exec p:helper;", "exec p:helper")}}})
+    diagnostics = sent.pop()["params"]["diagnostics"]
+    assert len(diagnostics) == 1 and diagnostics[0]["range"]["start"]["line"] == 5
+
+    server.handle({"jsonrpc": "2.0", "method": "textDocument/didChange", "params": {
+        "textDocument": {"uri": uri, "version": 2}, "contentChanges": [{"text": MAIN}]}})
+    assert sent.pop()["params"]["diagnostics"] == []
+
+    symbols = request(server, sent, "textDocument/documentSymbol", {"textDocument": {"uri": uri}})["result"]
+    assert [s["name"] for s in symbols] == ["p:main", "x", "p:main"]
+
+    # p:helper is declared in a file on disk that was never opened
+    locations = request(server, sent, "textDocument/definition", {
+        "textDocument": {"uri": uri}, "position": {"line": 4, "character": 11}})["result"]
+    assert locations == [{"uri": path_to_uri(tmp_path / "lib.mdl"),
+                          "range": {"start": {"line": 0, "character": 0}, "end": {"line": 0, "character": 8}}}]
+
+    found = request(server, sent, "workspace/symbol", {"query": "help"})["result"]
+    assert [s["name"] for s in found] == ["p:helper"]
+
+
+def test_cancel_unknown_method_and_incremental_build(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.mdl").write_text(MAIN.replace("exec p:helper;", 'say "hi";'))
+    server, sent = make_server(tmp_path)
+
+    server.handle({"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 7}})
+    assert request(server, sent, "workspace/symbol", {"query": ""}, request_id=7)["error"]["code"] == REQUEST_CANCELLED
+    assert request(server, sent, "mdl/nothing", {})["error"]["code"] == METHOD_NOT_FOUND
+
+    params = {"mdl": "src", "output": "dist", "zip": False}
+    first = request(server, sent, "mdl/build", params)["result"]
+    assert first["error"] is None and "data/p/function/main.mcfunction" in first["written"]
+    second = request(server, sent, "mdl/build", params)["result"]
+    assert second["parsed"] == [] and second["written"] == []
+
+
+def test_superseded_changes_are_skipped():
+    change = {"method": "textDocument/didChange", "params": {"textDocument": {"uri": "file:///a.mdl"}}}
+    other = {"method": "textDocument/didChange", "params": {"textDocument": {"uri": "file:///b.mdl"}}}
+    assert LanguageServer._superseded(change, [dict(change)])
+    assert not LanguageServer._superseded(change, [other])
+
+
+def test_serve_over_stdio():
+    stream = io.BytesIO()
+    write_message(stream, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+    write_message(stream, {"jsonrpc": "2.0", "id": 2, "method": "shutdown"})
+    write_message(stream, {"jsonrpc": "2.0", "method": "exit"})
+    result = subprocess.run([sys.executable, "-m", "minecraft_datapack_language.cli", "serve"],
+                            input=stream.getvalue(), capture_output=True, timeout=30)
+    assert result.returncode == 0
+    output = io.BytesIO(result.stdout)
+    responses = [read_message(output), read_message(output)]
+    assert responses[0]["result"]["serverInfo"]["name"] == "mdl"
+    assert responses[1] == {"jsonrpc": "2.0", "id": 2, "result": None}
+    assert read_message(output) is None
@@ -0,0 +1,141 @@
+import pytest
+
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+from minecraft_datapack_language.sim import Simulator, SimulationError, split_command
+
+
+def build(src):
+    return MDLCompiler().generate(MDLParser().parse(src))
+
+
+LOOP_SRC = (
+    'pack "t" "d" 82;\n'
+    'namespace "t";\n'
+    'var num counter<@s> = 0;\n'
+    'function t:count<@s> {\n'
+    '    counter<@s> = 0;\n'
+    '    while $counter<@s>$ < 5 {\n'
+    '        counter<@s> = $counter<@s>$ + 1;\n'
+    '    }\n'
+    '    say "done $counter<@s>$";\n'
+    '}\n'
+    'function t:step { exec t:count<@a>; }\n'
+    'on_tick t:step;\n'
+)
+
+
+def test_split_command_keeps_groups_together():
+    assert split_command('execute as @e[tag=a, limit=1] run tellraw @a {"text":"a b"}') == [
+        "execute", "as", "@e[tag=a, limit=1]", "run", "tellraw", "@a", '{"text":"a b"}'
+    ]
+
+
+def test_while_loop_runs_and_counts_commands():
+    sim = Simulator(build(LOOP_SRC), players=["Alex"], strict=True)
+    sim.load()
+    player = sim.world.players()[0]
+    before = sim.stats.commands
+    sim.run_function("t:count", executor=player)
+    assert sim.score("Alex", "counter") == 5
+    assert sim.stats.calls["t:count__while_1"] == 5
+    # A passing 'execute ... run function' counts twice: the execute and the function command
+    assert sim.stats.per_function["t:count"] == 4
+    assert sim.stats.per_function["t:count__while_1"] == 5 * 4 + 4
+    assert sim.stats.commands - before == 4 + 24
+    assert sim.chat[-1].text == "done 5"
+
+
+def test_tick_counts_per_tick():
+    sim = Simulator(build(LOOP_SRC), players=["Alex", "Steve"], strict=True)
+    sim.load()
+    sim.tick(3)
+    assert sim.score("Steve", "counter") == 5
+    assert sim.stats.failed == 0
+    assert sim.stats.calls["t:count"] == 6
+    # 'function t:step' in t:tick, 'execute as @a' plus one run per player, 28 commands per player
+    assert sim.stats.per_tick == [1 + 1 + 2 + 2 * 28] * 3
+
+
+def test_scheduled_while_progresses_across_ticks():
+    src = (
+        'pack "t" "d" 82;\n'
+        'namespace "t";\n'
+        'var num n<@a> = 0;\n'
+        'function t:start { n<@a> = 0; scheduledwhile $n<@a>$ < 3 { n<@a> = $n<@a>$ + 1; } }\n'
+    )
+    sim = Simulator(build(src), strict=True)
+    sim.load()
+    sim.run_function("t:start", executor=sim.world.players()[0])
+    assert sim.scheduled == {"t:start__while_1": 1}
+    values = []
+    for _ in range(5):
+        sim.tick()
+        values.append(sim.score("Player", "n"))
+    assert values[-1] == 3
+    assert values[0] < 3
+
+
+def test_strict_mode_reports_unsupported_command_location():
+    files = {"data/t/function/f.mcfunction": "# header\nscoreboard objectives add x dummy\nparticle flame ~ ~ ~\n"}
+    with pytest.raises(SimulationError, match=r"t:f:3"):
+        Simulator(files, strict=True).run_function("t:f")
+    sim = Simulator(files)
+    sim.run_function("t:f")
+    assert sim.stats.unsupported["particle"] == 1
+    assert sim.stats.per_function["t:f"] == 2
+
+
+def test_malformed_commands_are_recorded_as_failures():
+    files = {"data/t/function/f.mcfunction": (
+        "scoreboard objectives add x dummy\n"
+        "scoreboard players set @s x\n"
+        "schedule function t:f\n"
+        "scoreboard players set @s x abc\n"
+    )}
+    sim = Simulator(files)
+    sim.run_function("t:f", executor=sim.world.players()[0])
+    assert sim.stats.failed == 3
+    assert set(sim.stats.failures) == {
+        "Incomplete scoreboard players set command", "Incomplete schedule function command",
+        "Invalid integer 'abc'",
+    }
+
+
+def test_empty_tag_and_team_selectors():
+    files = {"data/t/function/f.mcfunction": (
+        "scoreboard objectives add x dummy\n"
+        "team add red\n"
+        "team join red Alex\n"
+        "tag Steve add marked\n"
+        "scoreboard players set @a[tag=] x 1\n"
+        "scoreboard players set @a[tag=!] x 2\n"
+        "scoreboard players add @a[team=red] x 10\n"
+        "scoreboard players add @a[team=] x 20\n"
+    )}
+    sim = Simulator(files, players=["Alex", "Steve"], strict=True)
+    sim.run_function("t:f")
+    assert sim.stats.failed == 0
+    assert sim.score("Alex", "x") == 11
+    assert sim.score("Steve", "x") == 22
+
+
+@pytest.mark.parametrize("command, message", [
+    ("execute as", "Incomplete execute as command"),
+    ("execute at", "Incomplete execute at command"),
+    ("execute positioned 1 2", "Incomplete execute positioned command"),
+    ("execute if", "Incomplete execute if command"),
+    ("execute if score @s x", "Incomplete execute if score command"),
+    ("execute if score @s x <", "Incomplete execute if score command"),
+    ("execute if entity", "Incomplete execute if entity command"),
+    ("execute unless function", "Incomplete execute unless function command"),
+    ("execute as @s run", "Incomplete execute run command"),
+    ("tellraw @a", "Incomplete tellraw command"),
+    ("summon", "Incomplete summon command"),
+    ("function", "Incomplete function command"),
+])
+def test_truncated_commands_are_recorded_as_failures(command, message):
+    sim = Simulator({"data/t/function/f.mcfunction": command + "\n"})
+    sim.run_function("t:f", executor=sim.world.players()[0])
+    assert sim.stats.failed == 1
+    assert dict(sim.stats.failures) == {message: 1}
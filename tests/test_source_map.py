@@ -0,0 +1,70 @@
+import pytest
+
+from minecraft_datapack_language.ast_nodes import SourceSpan
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+from minecraft_datapack_language.overlays import generate_overlay_files
+from minecraft_datapack_language.source_map import SourceMap, SOURCE_MAP_FILE
+from minecraft_datapack_language.sim import Simulator, SimulationError
+
+
+SRC = (
+    'pack "p" "d" 82;\n'
+    'namespace "p";\n'
+    'var num x<@s> = 0;\n'
+    'function p:main<@s> {\n'
+    '    x<@s> = 1;\n'
+    '    if $x<@s>$ > 0 {\n'
+    '        say "positive";\n'
+    '        $!raw\n'
+    '        particle flame ~ ~ ~\n'
+    '        raw!$\n'
+    '    }\n'
+    '}\n'
+)
+
+
+def parse():
+    return MDLParser("src/main.mdl").parse(SRC)
+
+
+def test_parser_records_statement_spans():
+    ast = parse()
+    main = ast.functions[0]
+    assert main.span == SourceSpan("src/main.mdl", 4, 1)
+    assignment, if_stmt = main.body
+    assert assignment.span == SourceSpan("src/main.mdl", 5, 5)
+    assert if_stmt.span.line == 6
+    assert if_stmt.condition.span.line == 6
+    assert [s.span.line for s in if_stmt.then_body] == [7, 8]
+    # Spans are not dataclass fields, so they do not affect node equality
+    assert parse().functions[0].body[0] == assignment
+
+
+def test_compiler_writes_line_mappings():
+    files = MDLCompiler(source_map=True).generate(parse())
+    source_map = SourceMap.from_json(files[SOURCE_MAP_FILE])
+    if_path = "data/p/function/main__if_1.mcfunction"
+    lines = files[if_path].splitlines()
+    say_line = next(n for n, text in enumerate(lines, 1) if text.startswith("tellraw"))
+    assert source_map.lookup(if_path, say_line) == SourceSpan("src/main.mdl", 7, 9)
+    main_lines = files["data/p/function/main.mcfunction"].splitlines()
+    guard = next(n for n, text in enumerate(main_lines, 1) if text.startswith("execute"))
+    assert source_map.lookup("data/p/function/main.mcfunction", guard).line == 6
+    assert SOURCE_MAP_FILE not in MDLCompiler().generate(parse())
+
+
+def test_simulator_errors_point_at_mdl_source():
+    files = MDLCompiler(source_map=True).generate(parse())
+    sim = Simulator(files, strict=True)
+    sim.load()
+    with pytest.raises(SimulationError, match=r"from src/main\.mdl:8:9"):
+        sim.run_function("p:main", executor=sim.world.players()[0])
+
+
+def test_overlay_build_merges_source_maps():
+    files = generate_overlay_files(parse(), [41, 82], source_map=True)
+    source_map = SourceMap.from_json(files[SOURCE_MAP_FILE])
+    assert "format_82/data/p/function/main__if_1.mcfunction" in source_map.files
+    assert "format_41/data/p/functions/main__if_1.mcfunction" in source_map.files
+    assert not any(path.endswith(SOURCE_MAP_FILE) and path != SOURCE_MAP_FILE for path in files)
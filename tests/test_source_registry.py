@@ -0,0 +1,88 @@
+import builtins
+
+import pytest
+
+from minecraft_datapack_language import source_registry
+from minecraft_datapack_language.mdl_errors import MDLLexerError, format_error_context, get_line_content
+from minecraft_datapack_language.mdl_lexer import MDLLexer
+from minecraft_datapack_language.source_registry import SourceText, forget_source, get_source, register_source
+
+
+def test_source_text_lines_and_positions():
+    source = SourceText("first\r\nsecond\n\nfourth\n")
+    assert source.line_count == 4
+    assert [source.line(n) for n in range(1, 5)] == ["first", "second", "", "fourth"]
+    assert source.line(2, keepends=True) == "second\n"
+    assert source.line(0) is None and source.line(5) is None
+    assert source.lines(-3, 2) == ["first", "second"]
+    assert source.position(0) == (1, 1)
+    assert source.position(source.text.index("cond")) == (2, 3)
+    assert SourceText("no newline").line(1) == "no newline"
+
+
+def test_context_comes_from_registered_unsaved_text(tmp_path):
+    path = str(tmp_path / "unsaved.mdl")
+    register_source(path, "a;\nb;\nc;\nd;\n")
+    try:
+        context = format_error_context(path, 3, 2, context_lines=1)
+        assert context.splitlines() == ["       2: b;", ">>>    3: c;", "      ^", "       4: d;"]
+        assert get_line_content(path, 4) == "d;\n"
+    finally:
+        forget_source(path)
+    assert format_error_context(path, 1, 1) == f"Unable to read file: {path}"
+
+
+def test_file_is_read_from_disk_once(tmp_path, monkeypatch):
+    path = tmp_path / "pack.mdl"
+    path.write_text("line one\nline two\n", encoding="utf-8")
+    reads = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        reads.append(file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(source_registry, "open", counting_open, raising=False)
+    try:
+        for line in (1, 2, 1):
+            format_error_context(str(path), line, 1)
+        assert get_line_content(str(path), 2) == "line two\n"
+        assert reads == [str(path)]
+    finally:
+        forget_source(str(path))
+
+
+def test_lexer_registers_source_for_error_reports(tmp_path):
+    path = str(tmp_path / "bad.mdl")
+    source = 'pack "p" "d" 82;\nsay "unterminated;\n'
+    try:
+        with pytest.raises(MDLLexerError) as excinfo:
+            MDLLexer(path).lex(source)
+        assert get_source(path).text == source
+        assert excinfo.value.line_content == source.splitlines()[excinfo.value.line - 1]
+        assert "Unable to read file" not in str(excinfo.value)
+    finally:
+        forget_source(path)
+
+
+def test_registry_drops_least_recently_used_sources(monkeypatch):
+    monkeypatch.setattr(source_registry, "MAX_SOURCES", 2)
+    monkeypatch.setattr(source_registry, "_sources", source_registry._sources.__class__())
+    register_source("a.mdl", "a")
+    register_source("b.mdl", "b")
+    assert get_source("a.mdl").text == "a"
+    register_source("c.mdl", "c")
+    assert list(source_registry._sources) == ["a.mdl", "c.mdl"]
+
+
+def test_lint_and_watch_release_sources(tmp_path):
+    from minecraft_datapack_language.mdl_linter import MDLLinter
+    from minecraft_datapack_language.watch import IncrementalBuilder
+
+    path = tmp_path / "main.mdl"
+    path.write_text('pack "p" "d" 82;\nnamespace "p";\nfunction p:main { say "hi" }\n')
+    issues = MDLLinter().lint_file(str(path))
+    assert issues and str(path) not in source_registry._sources
+
+    result = IncrementalBuilder(path, tmp_path / "dist").rebuild()
+    assert "main.mdl" in result.error and str(path) not in source_registry._sources
@@ -0,0 +1,54 @@
+import pytest
+
+from minecraft_datapack_language.ast_nodes import RawBlock
+from minecraft_datapack_language.ir import Comment
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.mdl_compiler import MDLCompiler
+from minecraft_datapack_language.mdl_errors import MDLCompilerError
+
+
+def _generate(body: str, pack_format: int = 82, compiler_cls=MDLCompiler):
+    src = (
+        f'pack "p" "d" {pack_format};\n'
+        'namespace "p";\n'
+        'var num x<@s> = 0;\n'
+        f'function p:main {{\n{body}\n}}\n'
+    )
+    return compiler_cls().generate(MDLParser().parse(src))
+
+
+def test_scheduledwhile_inside_if_body_is_lowered():
+    files = _generate(
+        'if $x<@s>$ > 0 {\n'
+        '    scheduledwhile $x<@s>$ > 0 { x<@s> = $x<@s>$ - 1; }\n'
+        '}'
+    )
+    if_body = files["data/p/function/main__if_1.mcfunction"]
+    assert "schedule function p:main__while_1 1t" in if_body
+    assert "data/p/function/main__while_1__body.mcfunction" in files
+
+
+def test_macro_line_inside_while_body_is_lowered_and_checked():
+    body = (
+        'while $x<@s>$ > 0 {\n'
+        '    $say "Hello $(name)"\n'
+        '    x<@s> = $x<@s>$ - 1;\n'
+        '}'
+    )
+    files = _generate(body)
+    assert '$say "Hello $(name)"' in files["data/p/function/main__while_1.mcfunction"]
+    with pytest.raises(MDLCompilerError):
+        _generate(body, pack_format=15)
+
+
+def test_registered_visitor_overrides_subclass_only():
+    class CommentingCompiler(MDLCompiler):
+        pass
+
+    def raw_as_comment(compiler, raw):
+        return [Comment(f"raw: {raw.content.strip()}")]
+
+    CommentingCompiler.register_statement_visitor(RawBlock, raw_as_comment)
+    body = '$!raw\nsay hi\nraw!$'
+    assert "# raw: say hi" in _generate(body, compiler_cls=CommentingCompiler)["data/p/function/main.mcfunction"]
+    assert MDLCompiler._visitor_for(RawBlock) is MDLCompiler._raw_block_to_ir
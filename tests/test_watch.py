@@ -0,0 +1,128 @@
+import os
+import zipfile
+
+from minecraft_datapack_language.watch import IncrementalBuilder, merge_programs
+from minecraft_datapack_language.mdl_parser import MDLParser
+from minecraft_datapack_language.source_map import SOURCE_MAP_FILE, SourceMap
+
+
+MAIN = (
+    'pack "p" "d" 82;\n'
+    'namespace "p";\n'
+    'var num x<@s> = 0;\n'
+    'function p:main<@s> { say "hi"; }\n'
+    'on_load p:main;\n'
+)
+
+
+def make_project(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "main.mdl").write_text(MAIN)
+    (src / "extra.mdl").write_text('function p:other<@s> { say "one"; }\n')
+    return src
+
+
+def touch_later(path, text):
+    # Bump the mtime explicitly so back-to-back edits are always noticed
+    stat = path.stat()
+    path.write_text(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_rebuild_reparses_and_writes_only_changes(tmp_path):
+    src = make_project(tmp_path)
+    out = tmp_path / "dist"
+    builder = IncrementalBuilder(src, out)
+
+    first = builder.rebuild()
+    assert first.error is None
+    assert len(first.parsed) == 2
+    assert "data/p/function/other.mcfunction" in first.written
+    # Declarations come from main.mdl even when extra.mdl is found first
+    assert '"pack_format": 82' in (out / "pack.mcmeta").read_text()
+
+    extra = src / "extra.mdl"
+    touch_later(extra, 'function p:other<@s> { say "two"; }\n')
+    second = builder.rebuild()
+    assert second.parsed == [str(extra)]
+    assert second.written == ["data/p/function/other.mcfunction"]
+    assert "two" in (out / "data/p/function/other.mcfunction").read_text()
+    with zipfile.ZipFile(tmp_path / "dist.zip") as archive:
+        assert "two" in archive.read("data/p/function/other.mcfunction").decode()
+
+    # Same contents with a new mtime: nothing to parse or write
+    touch_later(extra, 'function p:other<@s> { say "two"; }\n')
+    third = builder.rebuild()
+    assert third.parsed == [] and not third.changed
+
+    touch_later(extra, 'function p:renamed<@s> { say "two"; }\n')
+    fourth = builder.rebuild()
+    assert fourth.removed == ["data/p/function/other.mcfunction"]
+    assert not (out / "data/p/function/other.mcfunction").exists()
+
+
+def test_errors_keep_previous_output(tmp_path):
+    src = make_project(tmp_path)
+    out = tmp_path / "dist"
+    builder = IncrementalBuilder(src, out, zip_output=False)
+    builder.rebuild()
+
+    touch_later(src / "extra.mdl", 'function p:other<@s> { say "broken" }\n')
+    failed = builder.rebuild()
+    assert failed.error and "extra.mdl" in failed.error
+    assert "one" in (out / "data/p/function/other.mcfunction").read_text()
+
+    touch_later(src / "extra.mdl", 'function p:other<@s> { say "fixed"; }\n')
+    fixed = builder.rebuild()
+    assert fixed.error is None
+    assert fixed.written == ["data/p/function/other.mcfunction"]
+
+
+def test_structurally_unchanged_edits_skip_compilation(tmp_path):
+    src = make_project(tmp_path)
+    builder = IncrementalBuilder(src, tmp_path / "dist")
+    first = builder.rebuild()
+    assert sorted(first.changed_functions) == ["p:main", "p:other"]
+
+    extra = src / "extra.mdl"
+    touch_later(extra, '// reformatted\nfunction p:other<@s> {\n    say "one";\n}\n')
+    reformatted = builder.rebuild()
+    assert reformatted.parsed == [str(extra)]
+    assert reformatted.changed_functions == [] and not reformatted.changed
+
+    touch_later(extra, 'function p:other<@s> { say "two"; }\n')
+    edited = builder.rebuild()
+    assert edited.changed_functions == ["p:other"]
+    assert edited.written == ["data/p/function/other.mcfunction"]
+
+
+def test_source_map_follows_whitespace_edits(tmp_path):
+    src = make_project(tmp_path)
+    builder = IncrementalBuilder(src, tmp_path / "dist", zip_output=False, source_map=True)
+    builder.rebuild()
+    main = src / "main.mdl"
+    touch_later(main, "\n\n\n" + MAIN)
+    result = builder.rebuild()
+    assert result.changed_functions == [] and result.written == [SOURCE_MAP_FILE]
+    source_map = SourceMap.from_json((tmp_path / "dist" / SOURCE_MAP_FILE).read_text())
+    assert source_map.lookup("data/p/function/main.mcfunction", 3).line == 7
+
+
+def test_watch_loop_stops_and_reports(tmp_path):
+    src = make_project(tmp_path)
+    builder = IncrementalBuilder(src, tmp_path / "dist", zip_output=False)
+    results = []
+    polls = iter(range(3))
+    builder.watch(interval=0, on_rebuild=results.append,
+                  should_stop=lambda: next(polls, None) is None)
+    assert len(results) == 1 and results[0].error is None
+
+
+def test_merge_programs_leaves_inputs_untouched():
+    first = MDLParser().parse(MAIN)
+    second = MDLParser().parse('function p:other<@s> { say "one"; }\n')
+    merged = merge_programs([second, first])
+    assert merged.pack is first.pack
+    assert [f.name for f in merged.functions] == ["other", "main"]
+    assert len(first.functions) == 1
@@ -311,14 +311,14 @@ export function activate(context: vscode.ExtensionContext) {
 }
 
 function runCheckFile(doc: vscode.TextDocument, diag: vscode.DiagnosticCollection) {
-  const cmd = `mdl check --json "${doc.fileName}"`;
+  const cmd = `mdl check --format json "${doc.fileName}"`;
   exec(cmd, (err, stdout, stderr) => {
     updateDiagnosticsFromJson(diag, [doc.fileName], stdout || stderr);
   });
 }
 
 async function runCheckWorkspace(root: string, diag: vscode.DiagnosticCollection) {
-  const cmd = `mdl check --json "${root}"`;
+  const cmd = `mdl check --format json "${root}"`;
   exec(cmd, (err, stdout, stderr) => {
     // We'll parse JSON diagnostics and map to files
     updateDiagnosticsFromJson(diag, undefined, stdout || stderr);
@@ -328,15 +328,18 @@ async function runCheckWorkspace(root: string, diag: vscode.DiagnosticCollection
 function updateDiagnosticsFromJson(diag: vscode.DiagnosticCollection, limitTo?: string[], output?: string) {
   const fileMap = new Map<string, vscode.Diagnostic[]>();
   try {
-    const parsed = JSON.parse(output || '{"ok":true,"errors":[]}');
-    const errors = parsed.errors as Array<{file:string, line?:number, message:string}>;
-    for (const err of errors || []) {
-      if (limitTo && !limitTo.includes(err.file)) continue;
-      const uri = vscode.Uri.file(err.file);
+    const parsed = JSON.parse(output || '{"diagnostics":[]}');
+    const records = parsed.diagnostics as Array<{file:string, line?:number|null, severity?:string, message:string}>;
+    for (const rec of records || []) {
+      if (limitTo && !limitTo.includes(rec.file)) continue;
+      const uri = vscode.Uri.file(rec.file);
       const existing = fileMap.get(uri.fsPath) || [];
-      const line = typeof err.line === 'number' ? Math.max(0, err.line - 1) : 0;
+      const line = typeof rec.line === 'number' ? Math.max(0, rec.line - 1) : 0;
       const range = new vscode.Range(line, 0, line, Number.MAX_SAFE_INTEGER);
-      existing.push(new vscode.Diagnostic(range, err.message, vscode.DiagnosticSeverity.Error));
+      const severity = rec.severity === 'warning' ? vscode.DiagnosticSeverity.Warning
+        : rec.severity === 'info' ? vscode.DiagnosticSeverity.Information
+        : vscode.DiagnosticSeverity.Error;
+      existing.push(new vscode.Diagnostic(range, rec.message, severity));
       fileMap.set(uri.fsPath, existing);
     }
   } catch (e) {